@@ -10,6 +10,7 @@ from typing import Optional
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
 from core.pipeline import Pipeline
+from app.services.job_queue import get_job_queue, worker_mode_enabled
 from core.modules import OCRModule, TranslatorModule, InpainterModule, RendererModule
 
 
@@ -60,15 +61,27 @@ def get_settings() -> Settings:
 _pipeline_instance: Pipeline = None
 
 
+def build_pipeline() -> Pipeline:
+    """Build a local pipeline with language-aware OCR."""
+    settings = get_settings()
+    return Pipeline(
+        ocr=OCRModule(lang=settings.source_language),
+        translator=TranslatorModule(),
+        inpainter=InpainterModule(output_dir=settings.temp_dir),  # 副产品到 temp
+        renderer=RendererModule(output_dir=settings.output_dir),  # 成品到 output
+    )
+
+
 def get_pipeline() -> Pipeline:
-    """Get pipeline instance with language-aware OCR."""
+    """Get pipeline instance (queue-backed when TRANSLATE_WORKER_MODE=queue)."""
     global _pipeline_instance
     if _pipeline_instance is None:
-        settings = get_settings()
-        _pipeline_instance = Pipeline(
-            ocr=OCRModule(lang=settings.source_language),
-            translator=TranslatorModule(),
-            inpainter=InpainterModule(output_dir=settings.temp_dir),  # 副产品到 temp
-            renderer=RendererModule(output_dir=settings.output_dir),  # 成品到 output
-        )
+        if worker_mode_enabled():
+            # 页面交给 `python main.py worker` 进程处理，API 只负责入队和转发进度
+            from app.services.queued_pipeline import QueuedPipeline
+            from app.worker import poll_interval
+
+            _pipeline_instance = QueuedPipeline(get_job_queue(), poll_interval())
+        else:
+            _pipeline_instance = build_pipeline()
     return _pipeline_instance
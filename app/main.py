@@ -17,14 +17,18 @@ from fastapi.responses import JSONResponse
 from fastapi.exceptions import RequestValidationError
 
 from .deps import get_settings
+from .services.job_queue import worker_mode_enabled
+from .services.task_store import interrupt_stale_tasks, task_store_enabled
 from .routes import translate, manga, scraper, parser
 from .routes import settings as settings_router
 from .routes import system
 from fastapi.staticfiles import StaticFiles
 
 # 初始化日志系统
+from core.artifact_sink import get_artifact_sink
 from core.logging_config import init_default_logging
 from core.model_setup import ModelRegistry, ModelWarmupService
+from scraper.browser_pool import close_browser_pool
 
 init_default_logging()
 logger = logging.getLogger(__name__)
@@ -74,6 +78,15 @@ async def lifespan(app: FastAPI):
     Path(settings.temp_dir).mkdir(parents=True, exist_ok=True)
     Path(settings.static_dir).mkdir(parents=True, exist_ok=True)
 
+    # 上次进程退出时没跑完的任务不会再有进度，标记为中断
+    if task_store_enabled():
+        try:
+            interrupted = await asyncio.to_thread(interrupt_stale_tasks)
+            if interrupted:
+                logger.warning("Marked %d unfinished tasks as interrupted", interrupted)
+        except Exception as exc:  # noqa: BLE001 - 任务存储不可用不影响启动
+            logger.warning("Task store recovery failed: %s", exc)
+
     registry = ModelRegistry()
     app.state.model_registry = registry
     auto_setup = os.getenv("AUTO_SETUP_MODELS", "on").lower() not in {
@@ -81,12 +94,16 @@ async def lifespan(app: FastAPI):
         "false",
         "off",
     }
-    if auto_setup:
+    # 队列模式下模型由 worker 进程各自预热，API 进程不加载
+    if auto_setup and not worker_mode_enabled():
         service = ModelWarmupService(registry)
         app.state.model_warmup_task = asyncio.create_task(service.warmup())
 
     yield
 
+    await close_browser_pool()
+    # 等待后台写入的质量报告/调试图落盘
+    await asyncio.to_thread(get_artifact_sink().flush, 10.0)
     print("👋 Shutting down...")
 
 
@@ -210,24 +210,46 @@ async def get_chapter_details(
         key=natural_sort_key,
     )
 
-    from app.services.page_status import compute_page_status, find_translated_file
+    from app.services.page_status import (
+        compute_page_status,
+        find_translated_file,
+        page_status_from_summary,
+    )
+    from core.quality_index import get_quality_index, page_key_for, quality_index_enabled
 
     report_dir = Path(settings.output_dir) / "quality_reports"
     low_quality_threshold = float(os.getenv("LOW_QUALITY_THRESHOLD", "0.7"))
     low_quality_ratio = float(os.getenv("LOW_QUALITY_RATIO", "0.3"))
 
+    # 索引里每页只读一行预聚合的最新报告，避免每页 glob 整个报告目录
+    latest_reports = None
+    if quality_index_enabled():
+        page_keys = {p: page_key_for(str(p)) for p in original_files}
+        latest_reports = get_quality_index(report_dir).latest_many(page_keys.values())
+
     for p in original_files:
         translated_file = (
             find_translated_file(output_path, p.stem) if output_path.exists() else None
         )
-        report_pattern = f"{manga_id}__{chapter_id}__{p.stem}__*.json"
-        report_paths = list(report_dir.glob(report_pattern))
-        status = compute_page_status(
-            report_paths=report_paths,
-            translated_exists=bool(translated_file and translated_file.exists()),
-            low_quality_threshold=low_quality_threshold,
-            low_quality_ratio=low_quality_ratio,
-        )
+        translated_exists = bool(translated_file and translated_file.exists())
+        if latest_reports is not None:
+            latest = latest_reports.get(page_keys[p])
+            status = page_status_from_summary(
+                latest["summary"] if latest else None,
+                has_report=latest is not None,
+                translated_exists=translated_exists,
+                low_quality_threshold=low_quality_threshold,
+                low_quality_ratio=low_quality_ratio,
+            )
+        else:
+            report_pattern = f"{manga_id}__{chapter_id}__{p.stem}__*.json"
+            report_paths = list(report_dir.glob(report_pattern))
+            status = compute_page_status(
+                report_paths=report_paths,
+                translated_exists=translated_exists,
+                low_quality_threshold=low_quality_threshold,
+                low_quality_ratio=low_quality_ratio,
+            )
         # Use manga_id which can be 'raw/Teacher_Yunji'
         pages.append(
             {
@@ -31,17 +31,24 @@ from fastapi.responses import Response
 import aiohttp
 from pydantic import BaseModel
 
+from app.services.fetch_translate import fetch_and_translate
+from core.models import TaskContext
+from core.page_scheduler import use_schedule
+from core.pipeline import Pipeline
 from scraper import Chapter, EngineConfig, Manga, ScraperConfig, ScraperEngine
 from scraper.base import safe_name, normalize_url, load_storage_state_cookies
+from scraper.browser_pool import ContextSpec, get_browser_pool
 from scraper.downloader import AsyncDownloader, DownloadConfig
 from scraper.implementations import MangaForFreeScraper, ToonGodScraper
 from scraper.implementations.generic_playwright import CloudflareChallengeError
-from scraper.rate_limit import RequestRateLimiter
+from scraper.journal import chapter_key
+from scraper.rate_limit import get_host_limiters, parse_retry_after
 from scraper.url_utils import infer_id as _infer_id
 from scraper.url_utils import infer_url as _infer_url
 from scraper.url_utils import normalize_base_url as _normalize_base_url
 
-from ..deps import get_settings
+from . import translate as translate_routes
+from ..deps import get_pipeline, get_settings
 
 
 router = APIRouter(prefix="/scraper", tags=["scraper"])
@@ -112,6 +119,11 @@ class ScraperDownloadRequest(ScraperBaseRequest):
     chapter: ChapterPayload
 
 
+class ScraperFetchTranslateRequest(ScraperDownloadRequest):
+    source_language: Optional[str] = None
+    target_language: Optional[str] = None
+
+
 class ScraperTaskStatus(BaseModel):
     task_id: str
     status: str
@@ -241,10 +253,6 @@ async def _prefetch_cover_cache(
 ) -> None:
     if not items:
         return
-    try:
-        from playwright.async_api import async_playwright
-    except Exception:
-        return
     targets = []
     for item in items:
         if not item.cover_url:
@@ -260,42 +268,24 @@ async def _prefetch_cover_cache(
     if not targets:
         return
 
-    async with async_playwright() as playwright:
-        context = None
-        browser = None
-        if user_data_dir:
-            data_dir = Path(user_data_dir)
-            data_dir.mkdir(parents=True, exist_ok=True)
-            context = await playwright.chromium.launch_persistent_context(
-                str(data_dir),
-                headless=True,
-                channel=browser_channel,
-                user_agent=user_agent or None,
-            )
-        else:
-            browser = await playwright.chromium.launch(
-                headless=True,
-                channel=browser_channel,
-            )
-            storage_state = (
-                storage_state_path
-                if storage_state_path and Path(storage_state_path).exists()
-                else None
-            )
-            context = await browser.new_context(
-                storage_state=storage_state,
-                user_agent=user_agent or None,
-            )
-
+    spec = _image_context_spec(
+        storage_state_path, user_data_dir, browser_channel, user_agent
+    )
+    limiters = get_host_limiters()
+    async with get_browser_pool().lease(spec) as context:
         page = await context.new_page()
         for url, cache_path in targets:
+            limiter = limiters.for_url(url)
             try:
+                await limiter.acquire()
                 response = await page.goto(
                     url,
                     wait_until="domcontentloaded",
                     referer=base_url,
                     timeout=12000,
                 )
+                if response:
+                    _note_limiter_status(limiter, response.status, response.headers)
                 if not response or response.status >= 400:
                     continue
                 data = await response.body()
@@ -318,10 +308,6 @@ async def _prefetch_cover_cache(
                 if not id_cache_path.exists():
                     id_cache_path.write_bytes(data)
 
-        await context.close()
-        if browser:
-            await browser.close()
-
 
 def _is_allowed_image_host(url: str, base_url: Optional[str] = None) -> bool:
     parsed = urlparse(url)
@@ -362,9 +348,12 @@ async def _fetch_image_http(
         "Referer": base_url,
     }
     timeout = aiohttp.ClientTimeout(total=20)
+    limiter = get_host_limiters().for_url(url)
     try:
+        await limiter.acquire()
         async with aiohttp.ClientSession(timeout=timeout, cookies=cookies) as session:
             async with session.get(url, headers=headers) as response:
+                _note_limiter_status(limiter, response.status, response.headers)
                 if response.status >= 400:
                     return None
                 content_type = response.headers.get("content-type", "image/jpeg")
@@ -374,6 +363,25 @@ async def _fetch_image_http(
         return None
 
 
+def _note_limiter_status(limiter, status: int, headers) -> None:
+    limiter.on_status(status, parse_retry_after(headers.get("retry-after")))
+
+
+def _image_context_spec(
+    storage_state_path: Optional[str],
+    user_data_dir: Optional[str],
+    browser_channel: Optional[str],
+    user_agent: Optional[str],
+) -> ContextSpec:
+    return ContextSpec(
+        headless=True,
+        channel=browser_channel,
+        user_data_dir=user_data_dir,
+        storage_state_path=storage_state_path,
+        user_agent=user_agent or None,
+    )
+
+
 async def _fetch_image_playwright(
     url: str,
     base_url: str,
@@ -382,60 +390,23 @@ async def _fetch_image_playwright(
     browser_channel: Optional[str],
     user_agent: Optional[str],
 ) -> tuple[bytes, str] | None:
-    try:
-        from playwright.async_api import async_playwright
-    except Exception:
-        return None
     headers = {
         "User-Agent": user_agent or "Mozilla/5.0",
         "Referer": base_url,
     }
-    async with async_playwright() as playwright:
-        if user_data_dir:
-            data_dir = Path(user_data_dir)
-            data_dir.mkdir(parents=True, exist_ok=True)
-            context = await playwright.chromium.launch_persistent_context(
-                str(data_dir),
-                headless=True,
-                channel=browser_channel,
-                user_agent=user_agent or None,
-            )
-            response = await context.request.get(url, headers=headers)
-            if response.status >= 400:
-                await context.close()
-                return None
-            content_type = response.headers.get("content-type", "image/jpeg")
-            data = await response.body()
-            await context.close()
-            return data, content_type
-
-        browser = await playwright.chromium.launch(
-            headless=True,
-            channel=browser_channel,
-        )
-        storage_state = (
-            storage_state_path
-            if storage_state_path and Path(storage_state_path).exists()
-            else None
-        )
-        context = await browser.new_context(
-            storage_state=storage_state,
-            user_agent=user_agent or None,
-        )
+    spec = _image_context_spec(
+        storage_state_path, user_data_dir, browser_channel, user_agent
+    )
+    limiter = get_host_limiters().for_url(url)
+    async with get_browser_pool().lease(spec) as context:
+        await limiter.acquire()
         response = await context.request.get(url, headers=headers)
+        _note_limiter_status(limiter, response.status, response.headers)
         if response.status >= 400:
-            await context.close()
-            await browser.close()
             return None
         content_type = response.headers.get("content-type", "image/jpeg")
         data = await response.body()
-        await context.close()
-        await browser.close()
         return data, content_type
-    try:
-        return float(str(value))
-    except (TypeError, ValueError):
-        return None
 
 
 def _coerce_concurrency(value: int) -> int:
@@ -515,7 +486,8 @@ def _build_engine(
         storage_state_path = None
     output_root = _resolve_output_root(output_root)
     rate_limit_rps = _coerce_rate_limit_rps(request.rate_limit_rps)
-    request_limiter = RequestRateLimiter(rate_limit_rps)
+    # 站点 host 的限速器进程内共享，多个任务一起遵守同一个速率
+    request_limiter = get_host_limiters().configure(base_url, rate_limit_rps)
     config = ScraperConfig(
         base_url=base_url,
         http_mode=request.http_mode,
@@ -839,6 +811,16 @@ async def proxy_image(
     return Response(content=content, media_type=content_type)
 
 
+@router.get("/browser-pool")
+async def browser_pool_status() -> dict[str, object]:
+    return get_browser_pool().stats()
+
+
+@router.get("/rate-limits")
+async def rate_limit_status() -> dict[str, object]:
+    return get_host_limiters().stats()
+
+
 @router.get("/auth-url", response_model=ScraperAuthUrlResponse)
 async def get_auth_url(request: Request, settings=Depends(get_settings)):
     if settings.scraper_auth_url:
@@ -933,6 +915,136 @@ async def download_chapter(
     )
 
 
+@router.post("/download-translate", response_model=ScraperTaskStatus)
+async def download_and_translate_chapter(
+    request: ScraperFetchTranslateRequest,
+    settings=Depends(get_settings),
+    pipeline: Pipeline = Depends(get_pipeline),
+):
+    """Download a chapter and translate each page as soon as it is saved."""
+    engine, base_url = _build_engine(request, Path(settings.data_dir))
+    manga = _resolve_manga(base_url, request.manga)
+    chapter = _resolve_chapter(base_url, manga, request.chapter)
+    manga_id = safe_name(manga.id or manga.title)
+    chapter_id = chapter_key(chapter)
+    job_key = f"{manga_id}/{chapter_id}"
+    await translate_routes._register_chapter_job(job_key)
+    task_id = str(uuid4())
+    _set_task(task_id, "pending", message="已提交下载翻译任务")
+
+    async def _run_fetch_translate() -> None:
+        contexts: list[TaskContext] = []
+        source_lang = request.source_language or settings.source_language
+        target_lang = request.target_language or settings.target_language
+        output_base = Path(settings.output_dir) / manga_id / chapter_id
+        page_concurrency = translate_routes._read_env_int(
+            "TRANSLATE_CHAPTER_PAGE_CONCURRENCY", 2, min_value=1, max_value=16
+        )
+        chapter_slots = translate_routes._read_env_int(
+            "TRANSLATE_CHAPTER_MAX_CONCURRENT_JOBS", 1, min_value=1, max_value=16
+        )
+
+        def make_context(image_path: Path) -> TaskContext:
+            ctx = TaskContext(
+                image_path=str(image_path),
+                source_language=source_lang,
+                target_language=target_lang,
+            )
+            ctx.output_path = str(output_base / image_path.name)
+            return ctx
+
+        async def register(ctx: TaskContext) -> None:
+            contexts.append(ctx)
+            translate_routes._task_meta[ctx.task_id] = {
+                "manga_id": manga_id,
+                "chapter_id": chapter_id,
+                "image_name": Path(ctx.image_path).name,
+            }
+            await translate_routes._store_task(ctx)
+
+        _set_task(task_id, "running", message=f"下载并翻译中: {chapter.title}")
+        try:
+            output_base.mkdir(parents=True, exist_ok=True)
+            async with translate_routes._chapter_gate(chapter_slots):
+                await translate_routes.broadcast_event(
+                    {
+                        "type": "chapter_start",
+                        "manga_id": manga_id,
+                        "chapter_id": chapter_id,
+                        # 页数在下载完成前未知
+                        "total_pages": 0,
+                        "streaming": True,
+                    }
+                )
+                with use_schedule("bulk", group=f"{manga_id}/{chapter_id}"):
+                    report, results, timings = await fetch_and_translate(
+                        engine,
+                        manga,
+                        chapter,
+                        pipeline,
+                        make_context,
+                        max_concurrent=page_concurrency,
+                        status_callback=translate_routes.pipeline_status_callback,
+                        on_context=register,
+                    )
+            for result in results:
+                await translate_routes._store_task(result.task)
+            summary = translate_routes._summarize_chapter_results(
+                [ctx.image_path for ctx in contexts], results, output_base
+            )
+            await translate_routes.broadcast_event(
+                {
+                    "type": "chapter_complete",
+                    "manga_id": manga_id,
+                    "chapter_id": chapter_id,
+                    **summary,
+                }
+            )
+            _set_task(
+                task_id,
+                summary["status"],
+                message=(
+                    f"下载 {report.success_count}/{len(report.pages)}，"
+                    f"翻译成功 {summary['success_count']}/{summary['total_count']}"
+                ),
+                report={
+                    "manga_id": manga_id,
+                    "chapter_id": chapter_id,
+                    "output_dir": str(report.output_dir),
+                    "manifest_path": str(report.manifest_path),
+                    "success_count": report.success_count,
+                    "failed_count": report.failed_count,
+                    "translate": summary,
+                    "timings_ms": {k: round(v, 1) for k, v in timings.items()},
+                },
+            )
+        except Exception as exc:  # noqa: BLE001
+            _set_task(task_id, "error", message=str(exc))
+            await translate_routes.broadcast_event(
+                {
+                    "type": "chapter_complete",
+                    "manga_id": manga_id,
+                    "chapter_id": chapter_id,
+                    "status": "error",
+                    "success_count": 0,
+                    "failed_count": len(contexts),
+                    "failed_ocr_empty_count": 0,
+                    "saved_count": 0,
+                    "total_count": len(contexts),
+                    "error_message": str(exc),
+                }
+            )
+        finally:
+            for ctx in contexts:
+                translate_routes._task_meta.pop(ctx.task_id, None)
+            await translate_routes._unregister_chapter_job(job_key)
+
+    asyncio.create_task(_run_fetch_translate())
+    return ScraperTaskStatus(
+        task_id=task_id, status="pending", message="已提交下载翻译任务"
+    )
+
+
 @router.get("/task/{task_id}", response_model=ScraperTaskStatus)
 async def get_scraper_task(task_id: str):
     _prune_tasks()
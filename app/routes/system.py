@@ -7,6 +7,10 @@ from typing import List
 from fastapi import APIRouter, Request
 
 from app.deps import get_settings
+from app.services.job_queue import get_job_queue, worker_mode_enabled
+from core.artifact_sink import get_artifact_sink
+from core.page_scheduler import page_scheduler_enabled, scheduler_stats
+from core.vision.ocr.result_store import result_store_stats
 
 router = APIRouter(prefix="/system", tags=["system"])
 
@@ -66,6 +70,7 @@ async def get_runtime_status(request: Request):
             "ocr": {
                 "fail_on_empty": os.getenv("OCR_FAIL_ON_EMPTY", "1"),
                 "result_cache_enable": os.getenv("OCR_RESULT_CACHE_ENABLE", "1"),
+                "result_cache_max_mb": os.getenv("OCR_RESULT_CACHE_MAX_MB", "256"),
                 "cache_empty_results": os.getenv("OCR_CACHE_EMPTY_RESULTS", "0"),
                 "crosspage_edge_enable": os.getenv("OCR_CROSSPAGE_EDGE_ENABLE", "1"),
                 "edge_tile_enable": os.getenv("OCR_EDGE_TILE_ENABLE", "0"),
@@ -73,6 +78,7 @@ async def get_runtime_status(request: Request):
             "translator": {
                 "ai_provider": os.getenv("AI_PROVIDER", "ppio"),
                 "ai_translate_fastfail": os.getenv("AI_TRANSLATE_FASTFAIL", "1"),
+                "translation_memory_enable": os.getenv("TRANSLATION_MEMORY_ENABLE", "1"),
             },
         },
         "paths": {
@@ -82,6 +88,10 @@ async def get_runtime_status(request: Request):
             "ocr_cache_dir": str(ocr_cache_dir.resolve()),
         },
         "model_registry": model_snapshot,
+        "artifact_sink": get_artifact_sink().stats(),
+        "ocr_result_cache": result_store_stats(),
+        "worker_queue": get_job_queue().stats() if worker_mode_enabled() else None,
+        "page_scheduler": scheduler_stats() if page_scheduler_enabled() else None,
     }
 
 @router.get("/logs", response_model=List[str])
@@ -11,7 +11,9 @@ from typing import Dict, Set, Optional
 from uuid import UUID
 import logging
 import os
+import time
 import inspect
+from contextlib import nullcontext
 
 from fastapi import APIRouter, Depends, HTTPException, status, BackgroundTasks
 from fastapi.responses import StreamingResponse
@@ -26,13 +28,17 @@ from core.models import (
     TranslateImageRequest,
     TranslateImageResponse,
 )
-from core.pipeline import Pipeline
+from core.artifact_sink import artifact_sink_enabled, get_artifact_sink
+from core.page_scheduler import page_scheduler_enabled, use_schedule
+from core.pipeline import Pipeline, staged_batch_enabled
 from ..deps import get_pipeline, get_settings
+from ..services.task_store import get_task_store, stage_event_at, task_store_enabled
 
 router = APIRouter(prefix="/translate", tags=["translation"])
 logger = logging.getLogger(__name__)
 
-# In-memory task storage
+# In-memory task storage (per-process hot copy; the durable store lives in
+# app/services/task_store.py and is what /task reads when enabled).
 # Use an OrderedDict so we can enforce a bounded LRU-style store.
 _tasks: "OrderedDict[UUID, TaskContext]" = OrderedDict()
 _tasks_lock = asyncio.Lock()
@@ -40,6 +46,9 @@ _task_meta: Dict[UUID, dict] = {}
 _chapter_jobs_inflight: Set[str] = set()
 _chapter_jobs_lock = asyncio.Lock()
 
+_chapter_slots_semaphore: Optional[asyncio.Semaphore] = None
+_chapter_slots_size: Optional[int] = None
+
 # SSE event listeners
 _listeners: Set[asyncio.Queue] = set()
 
@@ -115,6 +124,20 @@ async def _store_task(task: TaskContext) -> None:
         _tasks[task.task_id] = task_to_store
         _tasks.move_to_end(task.task_id)
         _prune_tasks_locked(datetime.now(), max_tasks=max_tasks, ttl_seconds=ttl_seconds)
+    if task_store_enabled():
+        meta = _task_meta.get(task.task_id)
+        try:
+            await asyncio.to_thread(
+                _persist_task, _strip_task_for_store(task), meta, max_tasks, ttl_seconds
+            )
+        except Exception as exc:  # noqa: BLE001 - 持久化失败不影响翻译本身
+            logger.warning("[%s] task store write failed: %s", task.task_id, exc)
+
+
+def _persist_task(task: TaskContext, meta: Optional[dict], max_tasks: int, ttl_seconds: int) -> None:
+    store = get_task_store()
+    store.upsert_task(task, meta)
+    store.maybe_prune(max_tasks, ttl_seconds)
 
 
 async def _register_chapter_job(chapter_key: str) -> None:
@@ -183,9 +206,40 @@ async def pipeline_status_callback(stage: str, status: TaskStatus, task_id: UUID
     meta = _task_meta.get(task_id)
     if meta:
         payload.update(meta)
+    if task_store_enabled():
+        try:
+            await _record_stage_event(task_id, stage, status, meta)
+        except Exception as exc:  # noqa: BLE001
+            logger.warning("[%s] task store stage update failed: %s", task_id, exc)
     await broadcast_event(payload)
 
 
+async def _record_stage_event(
+    task_id: UUID, stage: str, status: TaskStatus, meta: Optional[dict]
+) -> None:
+    """Persist a stage event without holding up the page.
+
+    Events go to the artifact sink's writer thread (FIFO, never coalesced), so
+    the SQLite write stays out of page latency; the timestamp is taken now, not
+    when the row is written.
+    """
+    store = get_task_store()
+    at = stage_event_at.get() or time.time()
+    args = (task_id, stage, status, dict(meta) if meta else None, at)
+    if not artifact_sink_enabled():
+        await asyncio.to_thread(store.record_stage, *args)
+        return
+
+    def _log_failure(future) -> None:
+        exc = future.exception()
+        if exc is not None:
+            logger.warning("[%s] task store stage update failed: %s", task_id, exc)
+
+    future = await get_artifact_sink().submit_async(store.record_stage, *args, policy="degrade")
+    if future is not None:
+        future.add_done_callback(_log_failure)
+
+
 def _build_pipeline_error_detail(result, fallback_message: str) -> dict:
     task = result.task
     return {
@@ -205,6 +259,91 @@ def _pipeline_failure_status_code(result) -> int:
     return status.HTTP_500_INTERNAL_SERVER_ERROR
 
 
+def _chapter_semaphore(chapter_slots: int) -> asyncio.Semaphore:
+    """Process-wide chapter slots (TRANSLATE_CHAPTER_MAX_CONCURRENT_JOBS), shared by all chapter jobs."""
+    global _chapter_slots_semaphore, _chapter_slots_size
+    if _chapter_slots_semaphore is None or _chapter_slots_size != chapter_slots:
+        _chapter_slots_semaphore = asyncio.Semaphore(chapter_slots)
+        _chapter_slots_size = chapter_slots
+    return _chapter_slots_semaphore
+
+
+def _chapter_gate(chapter_slots: int):
+    """Chapter admission: the page scheduler shares slots between chapters when enabled.
+
+    Staged batches (PIPELINE_STAGED_BATCH=1) also take scheduler slots per page,
+    but each batch starts its own stage worker pools, so they keep the chapter
+    semaphore even with the scheduler on.
+    """
+    if page_scheduler_enabled() and not staged_batch_enabled():
+        return nullcontext()
+    return _chapter_semaphore(chapter_slots)
+
+
+def _summarize_chapter_results(image_files, results, output_base: Path) -> dict:
+    """Chapter completion counters shared by /translate/chapter and fetch-and-translate."""
+    from app.services.page_status import find_translated_file
+
+    saved_count = 0
+    effective_success_count = 0
+    pipeline_success_count = 0
+    failed_translation_count = 0
+    failed_pipeline_count = 0
+    failed_ocr_empty_count = 0
+
+    for img_path, result in zip(image_files, results):
+        translated_file = find_translated_file(output_base, Path(img_path).stem)
+        has_output_file = bool(translated_file)
+        if has_output_file:
+            saved_count += 1
+
+        if result.success:
+            pipeline_success_count += 1
+
+        regions_count = len(result.task.regions or [])
+        if regions_count == 0:
+            failed_ocr_empty_count += 1
+
+        has_failure_marker = any(
+            (region.target_text or "").strip().startswith("[翻译失败]")
+            for region in (result.task.regions or [])
+        )
+        if has_failure_marker:
+            failed_translation_count += 1
+
+        is_effective_success = (
+            result.success
+            and has_output_file
+            and not has_failure_marker
+            and regions_count > 0
+        )
+        if is_effective_success:
+            effective_success_count += 1
+        elif not result.success:
+            failed_pipeline_count += 1
+
+    total_count = len(results)
+    failed_count = total_count - effective_success_count
+    final_status = (
+        "error"
+        if effective_success_count == 0
+        else "partial" if failed_count > 0 else "success"
+    )
+    return {
+        "status": final_status,
+        # success_count for frontend should represent effective success
+        # (pipeline success + output exists + no explicit failure marker).
+        "success_count": effective_success_count,
+        "pipeline_success_count": pipeline_success_count,
+        "failed_pipeline_count": failed_pipeline_count,
+        "failed_translation_count": failed_translation_count,
+        "failed_ocr_empty_count": failed_ocr_empty_count,
+        "failed_count": failed_count,
+        "saved_count": saved_count,
+        "total_count": total_count,
+    }
+
+
 @router.get("/events")
 async def sse_events():
     """Server-Sent Events endpoint for real-time status updates."""
@@ -249,7 +388,8 @@ async def translate_image(
     )
 
     # Process through pipeline with callback
-    result = await pipeline.process(context, status_callback=pipeline_status_callback)
+    with use_schedule("interactive"):
+        result = await pipeline.process(context, status_callback=pipeline_status_callback)
 
     await _store_task(result.task)
     if not result.success:
@@ -325,14 +465,7 @@ async def translate_chapter_endpoint(
                 min_value=1,
                 max_value=16,
             )
-            chapter_semaphore = getattr(translate_chapter_endpoint, "_chapter_semaphore", None)
-            chapter_semaphore_size = getattr(translate_chapter_endpoint, "_chapter_semaphore_size", None)
-            if chapter_semaphore is None or chapter_semaphore_size != chapter_slots:
-                chapter_semaphore = asyncio.Semaphore(chapter_slots)
-                setattr(translate_chapter_endpoint, "_chapter_semaphore", chapter_semaphore)
-                setattr(translate_chapter_endpoint, "_chapter_semaphore_size", chapter_slots)
-
-            async with chapter_semaphore:
+            async with _chapter_gate(chapter_slots):
                 logger.info(
                     "[%s] chapter worker acquired (chapter_slots=%s, page_concurrency=%s, inflight=%s)",
                     chapter_key,
@@ -359,12 +492,12 @@ async def translate_chapter_endpoint(
                 for ctx in contexts:
                     img_name = Path(ctx.image_path).name
                     ctx.output_path = str(output_base / img_name)
-                    await _store_task(ctx)
                     _task_meta[ctx.task_id] = {
                         "manga_id": request.manga_id,
                         "chapter_id": request.chapter_id,
                         "image_name": img_name,
                     }
+                    await _store_task(ctx)
 
                 total_count = len(contexts)
                 await broadcast_event(
@@ -382,72 +515,19 @@ async def translate_chapter_endpoint(
                 batch_kwargs = {"status_callback": pipeline_status_callback}
                 if "max_concurrent" in process_batch_params:
                     batch_kwargs["max_concurrent"] = page_concurrency
-                results = await process_batch(contexts, **batch_kwargs)
-
-                from app.services.page_status import find_translated_file
+                with use_schedule("bulk", group=chapter_key):
+                    results = await process_batch(contexts, **batch_kwargs)
 
-                saved_count = 0
-                effective_success_count = 0
-                pipeline_success_count = 0
-                failed_translation_count = 0
-                failed_pipeline_count = 0
-                failed_ocr_empty_count = 0
-
-                for img_path, result in zip(image_files, results):
+                for result in results:
                     await _store_task(result.task)
-                    translated_file = find_translated_file(output_base, img_path.stem)
-                    has_output_file = bool(translated_file)
-                    if has_output_file:
-                        saved_count += 1
-
-                    if result.success:
-                        pipeline_success_count += 1
-
-                    regions_count = len(result.task.regions or [])
-                    if regions_count == 0:
-                        failed_ocr_empty_count += 1
-
-                    has_failure_marker = any(
-                        (region.target_text or "").strip().startswith("[翻译失败]")
-                        for region in (result.task.regions or [])
-                    )
-                    if has_failure_marker:
-                        failed_translation_count += 1
-
-                    is_effective_success = (
-                        result.success
-                        and has_output_file
-                        and not has_failure_marker
-                        and regions_count > 0
-                    )
-                    if is_effective_success:
-                        effective_success_count += 1
-                    elif not result.success:
-                        failed_pipeline_count += 1
-
-                failed_count = total_count - effective_success_count
-                final_status = (
-                    "error"
-                    if effective_success_count == 0
-                    else "partial" if failed_count > 0 else "success"
-                )
+                summary = _summarize_chapter_results(image_files, results, output_base)
 
                 await broadcast_event(
                     {
                         "type": "chapter_complete",
                         "manga_id": request.manga_id,
                         "chapter_id": request.chapter_id,
-                        "status": final_status,
-                        # success_count for frontend should represent effective success
-                        # (pipeline success + output exists + no explicit failure marker).
-                        "success_count": effective_success_count,
-                        "pipeline_success_count": pipeline_success_count,
-                        "failed_pipeline_count": failed_pipeline_count,
-                        "failed_translation_count": failed_translation_count,
-                        "failed_ocr_empty_count": failed_ocr_empty_count,
-                        "failed_count": failed_count,
-                        "saved_count": saved_count,
-                        "total_count": total_count,
+                        **summary,
                     }
                 )
         except Exception as exc:
@@ -532,8 +612,9 @@ async def retranslate_page(
     output_base.mkdir(parents=True, exist_ok=True)
     context.output_path = str(output_base / request.image_name)
 
-    # Process through pipeline with callback
-    result = await pipeline.process(context, status_callback=pipeline_status_callback)
+    # Process through pipeline with callback（单页重翻优先于章节批量任务）
+    with use_schedule("interactive", group=f"{request.manga_id}/{request.chapter_id}"):
+        result = await pipeline.process(context, status_callback=pipeline_status_callback)
 
     await _store_task(result.task)
     if not result.success:
@@ -576,6 +657,25 @@ async def get_task_status(task_id: UUID):
     """
     Get the status of a translation task.
     """
+    snapshot = None
+    if task_store_enabled():
+        snapshot = await asyncio.to_thread(get_task_store().get, task_id)
+    if snapshot:
+        return TaskStatusResponse(
+            task_id=task_id,
+            status=TaskStatus(snapshot["status"]),
+            progress=snapshot["progress"],
+            output_path=snapshot["output_path"],
+            error_message=snapshot["error_message"],
+            stage=snapshot["stage"],
+            eta_seconds=snapshot["eta_seconds"],
+            stage_timings_ms=snapshot["stage_timings_ms"],
+            manga_id=snapshot["manga_id"],
+            chapter_id=snapshot["chapter_id"],
+            image_name=snapshot["image_name"],
+        )
+
+    # 存储里没有（写入失败/尚未落盘）时退回进程内的任务表
     task = _tasks.get(task_id)
     if not task:
         raise HTTPException(
@@ -589,3 +689,23 @@ async def get_task_status(task_id: UUID):
         output_path=task.output_path,
         error_message=task.error_message,
     )
+
+
+@router.get("/chapter-progress")
+async def get_chapter_progress(manga_id: str, chapter_id: str):
+    """
+    Aggregate progress/ETA of a chapter's page tasks (from the durable task store).
+    """
+    if not task_store_enabled():
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail="Task store disabled"
+        )
+    progress = await asyncio.to_thread(
+        get_task_store().chapter_progress, manga_id, chapter_id
+    )
+    if not progress:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"No tasks for chapter: {manga_id}/{chapter_id}",
+        )
+    return progress
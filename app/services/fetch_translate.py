@@ -0,0 +1,123 @@
+"""Download a chapter and translate its pages as they land on disk.
+
+The downloader reports each page as it settles (saved, already present or
+failed). ``OrderedPageFeed`` turns those out-of-order notifications into an
+index-ordered stream and holds page N back until page N+1 has settled too, so
+the OCR crosspage pass finds both neighbours on disk. The stream feeds
+``Pipeline.process_stream``, so the first translated page is ready after
+roughly two page downloads plus one pipeline run instead of after the whole
+chapter download.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import time
+from pathlib import Path
+from typing import AsyncIterator, Callable, Optional
+
+from core.models import PipelineResult, TaskContext, TaskStatus
+from core.pipeline import Pipeline
+from scraper import Chapter, Manga, ScraperEngine
+from scraper.downloader import DownloadReport, PageRecord, use_page_listener
+
+
+class OrderedPageFeed:
+    """Index-ordered async stream of downloaded pages (failed pages are skipped)."""
+
+    def __init__(self, first_index: int = 1) -> None:
+        self._settled: dict[int, PageRecord] = {}
+        self._next = first_index
+        self._closed = False
+        self._queue: asyncio.Queue[Optional[PageRecord]] = asyncio.Queue()
+
+    def add(self, record: PageRecord) -> None:
+        if self._closed:
+            return
+        self._settled[record.index] = record
+        # 当前页的下一页也落定后才放行，保证跨页匹配能读到相邻页
+        while self._next in self._settled and self._next + 1 in self._settled:
+            self._emit(self._settled.pop(self._next))
+            self._next += 1
+
+    def close(self) -> None:
+        """Download finished: release everything left, in index order."""
+        if self._closed:
+            return
+        self._closed = True
+        for index in sorted(self._settled):
+            self._emit(self._settled[index])
+        self._settled.clear()
+        self._queue.put_nowait(None)
+
+    def _emit(self, record: PageRecord) -> None:
+        if record.ok:
+            self._queue.put_nowait(record)
+
+    async def __aiter__(self) -> AsyncIterator[PageRecord]:
+        while True:
+            record = await self._queue.get()
+            if record is None:
+                return
+            yield record
+
+
+async def fetch_and_translate(
+    engine: ScraperEngine,
+    manga: Manga,
+    chapter: Chapter,
+    pipeline: Pipeline,
+    make_context: Callable[[Path], TaskContext],
+    max_concurrent: int = 2,
+    status_callback: Optional[Callable] = None,
+    on_context: Optional[Callable[[TaskContext], object]] = None,
+    staged: Optional[bool] = None,
+) -> tuple[DownloadReport, list[PipelineResult], dict[str, float]]:
+    """
+    Run ``engine.download_chapter`` and the pipeline concurrently.
+
+    Returns the download report, the pipeline results (index order) and
+    timings: ``download_ms``, ``first_page_ms`` (time to the first completed
+    page) and ``total_ms``.
+    """
+    started = time.perf_counter()
+    timings: dict[str, float] = {}
+    feed = OrderedPageFeed()
+
+    async def download() -> DownloadReport:
+        try:
+            with use_page_listener(feed.add):
+                return await engine.download_chapter(manga, chapter)
+        finally:
+            timings["download_ms"] = (time.perf_counter() - started) * 1000
+            feed.close()
+
+    async def contexts() -> AsyncIterator[TaskContext]:
+        async for record in feed:
+            ctx = make_context(Path(record.path))
+            if on_context is not None:
+                maybe = on_context(ctx)
+                if asyncio.iscoroutine(maybe):
+                    await maybe
+            yield ctx
+
+    async def track(stage: str, status: TaskStatus, task_id) -> None:
+        if stage == "complete" and "first_page_ms" not in timings:
+            timings["first_page_ms"] = (time.perf_counter() - started) * 1000
+        if status_callback is not None:
+            await status_callback(stage, status, task_id)
+
+    download_task = asyncio.create_task(download())
+    try:
+        results = await pipeline.process_stream(
+            contexts(),
+            max_concurrent=max_concurrent,
+            status_callback=track,
+            staged=staged,
+        )
+    except BaseException:
+        download_task.cancel()
+        raise
+    report = await download_task
+    timings["total_ms"] = (time.perf_counter() - started) * 1000
+    return report, results, timings
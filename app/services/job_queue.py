@@ -0,0 +1,380 @@
+"""Durable local page-job queue (SQLite) for worker-process mode.
+
+With ``TRANSLATE_WORKER_MODE=queue`` the API process no longer runs the
+pipeline: every page becomes a row in this queue and ``python main.py worker``
+processes (each with its own warmed OCR / LaMa / upscaler models) claim and
+run them. The API only enqueues and relays progress (see
+``app/services/queued_pipeline.py``).
+
+- ``claim`` runs in a ``BEGIN IMMEDIATE`` transaction, so concurrent workers
+  never get the same job; the claim carries a lease that the worker renews
+  with ``heartbeat`` while the page runs.
+- A job whose lease expired (the worker crashed or was killed) is claimed
+  again by the next worker, up to ``max_attempts``; after that it fails.
+- Jobs are claimed by priority class first (``interactive`` > ``head`` >
+  ``bulk``, from the page scheduler tag in the payload), then FIFO.
+- Stage events are stored with the worker's timestamp, so stage latencies
+  and ETAs in the task store reflect the worker, not the polling delay.
+
+Env:
+    WORKER_QUEUE_PATH: SQLite file (default temp/job_queue.sqlite3)
+    WORKER_LEASE_SECONDS: claim lease, renewed by heartbeats (default 60)
+    WORKER_MAX_ATTEMPTS: tries per job before it fails (default 2)
+    WORKER_QUEUE_RETENTION_HOURS: finished jobs kept for (default 24)
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Iterable, Optional
+
+from core.page_scheduler import PRIORITY_CLASSES
+from core.utils.env import read_env_int
+
+QUEUED = "queued"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+
+_PRUNE_INTERVAL_SEC = 3600.0
+
+
+def worker_mode_enabled() -> bool:
+    return os.getenv("TRANSLATE_WORKER_MODE", "inline").strip().lower() == "queue"
+
+
+def _priority_rank(payload: dict) -> int:
+    priority = (payload.get("schedule") or {}).get("priority", "bulk")
+    if priority in PRIORITY_CLASSES:
+        return PRIORITY_CLASSES.index(priority)
+    return len(PRIORITY_CLASSES) - 1
+
+
+@dataclass
+class Job:
+    id: int
+    task_id: str
+    payload: dict
+    attempts: int
+
+
+class JobQueue:
+    """Page jobs, leases and stage events in one SQLite file (multi-process safe)."""
+
+    def __init__(
+        self,
+        db_path: Path,
+        lease_seconds: float = 60.0,
+        max_attempts: int = 2,
+        retention_seconds: float = 24 * 3600,
+    ) -> None:
+        self.db_path = Path(db_path)
+        self.lease_seconds = max(1.0, float(lease_seconds))
+        self.max_attempts = max(1, int(max_attempts))
+        self.retention_seconds = max(0.0, float(retention_seconds))
+        self._lock = threading.Lock()
+        self._last_prune = 0.0
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        # 显式管理事务（claim 需要 BEGIN IMMEDIATE 抢写锁）
+        self._conn = sqlite3.connect(
+            str(self.db_path), check_same_thread=False, timeout=30.0, isolation_level=None
+        )
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS jobs ("
+            " id INTEGER PRIMARY KEY AUTOINCREMENT,"
+            " task_id TEXT NOT NULL,"
+            " payload TEXT NOT NULL,"
+            " status TEXT NOT NULL,"
+            " priority INTEGER NOT NULL DEFAULT 2,"
+            " attempts INTEGER NOT NULL DEFAULT 0,"
+            " max_attempts INTEGER NOT NULL,"
+            " worker TEXT,"
+            " lease_until REAL,"
+            " enqueued_at REAL NOT NULL,"
+            " started_at REAL,"
+            " finished_at REAL,"
+            " result TEXT,"
+            " error TEXT)"
+        )
+        columns = {row[1] for row in self._conn.execute("PRAGMA table_info(jobs)")}
+        if "priority" not in columns:
+            self._conn.execute("ALTER TABLE jobs ADD COLUMN priority INTEGER NOT NULL DEFAULT 2")
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_jobs_status ON jobs(status, priority, id)"
+        )
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS job_events ("
+            " id INTEGER PRIMARY KEY AUTOINCREMENT,"
+            " job_id INTEGER NOT NULL,"
+            " stage TEXT NOT NULL,"
+            " status TEXT NOT NULL,"
+            " at REAL NOT NULL)"
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_job_events_job ON job_events(job_id, id)"
+        )
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+    # ---- producer side (API) ---------------------------------------------
+
+    def enqueue_many(self, payloads: Iterable[tuple[str, dict]]) -> list[int]:
+        """Queue ``(task_id, payload)`` pairs; returns the job ids in order."""
+        now = time.time()
+        ids: list[int] = []
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                for task_id, payload in payloads:
+                    cursor = self._conn.execute(
+                        "INSERT INTO jobs(task_id, payload, status, priority, max_attempts,"
+                        " enqueued_at) VALUES (?, ?, ?, ?, ?, ?)",
+                        (
+                            str(task_id),
+                            json.dumps(payload, ensure_ascii=False, separators=(",", ":")),
+                            QUEUED,
+                            _priority_rank(payload),
+                            self.max_attempts,
+                            now,
+                        ),
+                    )
+                    ids.append(int(cursor.lastrowid))
+                if now - self._last_prune >= _PRUNE_INTERVAL_SEC:
+                    self._prune_locked(now)
+                self._conn.execute("COMMIT")
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+        return ids
+
+    def enqueue(self, task_id: str, payload: dict) -> int:
+        return self.enqueue_many([(task_id, payload)])[0]
+
+    def poll(self, job_id: int, after_event: int = 0) -> tuple[list[dict], Optional[dict]]:
+        """Events newer than ``after_event`` plus the job row (None if unknown)."""
+        return self.poll_many({job_id: after_event})[job_id]
+
+    def poll_many(
+        self, cursors: dict[int, int]
+    ) -> dict[int, tuple[list[dict], Optional[dict]]]:
+        """``poll`` for several jobs at once: ``{job_id: after_event}`` -> results."""
+        ids = list(cursors)
+        if not ids:
+            return {}
+        marks = ",".join("?" * len(ids))
+        with self._lock:
+            # 先读任务行再读事件：任务已结束时，它之前写入的事件一定都能读到
+            cursor = self._conn.execute(
+                "SELECT id, task_id, status, attempts, worker, enqueued_at, started_at,"
+                f" finished_at, result, error FROM jobs WHERE id IN ({marks})",
+                ids,
+            )
+            names = [col[0] for col in cursor.description]
+            rows = {row[0]: dict(zip(names, row)) for row in cursor.fetchall()}
+            event_rows = self._conn.execute(
+                "SELECT id, job_id, stage, status, at FROM job_events"
+                f" WHERE job_id IN ({marks}) AND id > ? ORDER BY id",
+                (*ids, min(cursors.values())),
+            ).fetchall()
+        polled: dict[int, tuple[list[dict], Optional[dict]]] = {
+            job_id: ([], rows.get(job_id)) for job_id in ids
+        }
+        for event_id, job_id, stage, status, at in event_rows:
+            if event_id > cursors[job_id]:
+                polled[job_id][0].append(
+                    {"id": event_id, "stage": stage, "status": status, "at": at}
+                )
+        return polled
+
+    def cancel(self, job_ids: Iterable[int]) -> int:
+        """Drop jobs nobody has claimed yet; returns how many were removed."""
+        ids = list(job_ids)
+        if not ids:
+            return 0
+        marks = ",".join("?" * len(ids))
+        with self._lock:
+            cursor = self._conn.execute(
+                f"DELETE FROM jobs WHERE status = ? AND id IN ({marks})", (QUEUED, *ids)
+            )
+            return cursor.rowcount
+
+    # ---- consumer side (workers) -----------------------------------------
+
+    def claim(self, worker_id: str) -> Optional[Job]:
+        """Lease the next queued (or lease-expired) job to ``worker_id``."""
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                while True:
+                    now = time.time()
+                    row = self._conn.execute(
+                        "SELECT id, task_id, payload, status, attempts, max_attempts FROM jobs"
+                        " WHERE status = ? OR (status = ? AND lease_until < ?)"
+                        " ORDER BY priority, id LIMIT 1",
+                        (QUEUED, RUNNING, now),
+                    ).fetchone()
+                    if row is None:
+                        self._conn.execute("COMMIT")
+                        return None
+                    job_id, task_id, payload, status, attempts, max_attempts = row
+                    if status == RUNNING and attempts >= max_attempts:
+                        # 上一个 worker 崩溃且已无重试次数
+                        self._finish_locked(
+                            job_id, FAILED, None, "worker lost (lease expired)", now
+                        )
+                        continue
+                    self._conn.execute(
+                        "UPDATE jobs SET status = ?, worker = ?, lease_until = ?,"
+                        " attempts = attempts + 1, started_at = ? WHERE id = ?",
+                        (RUNNING, worker_id, now + self.lease_seconds, now, job_id),
+                    )
+                    self._conn.execute("COMMIT")
+                    return Job(
+                        id=job_id,
+                        task_id=task_id,
+                        payload=json.loads(payload),
+                        attempts=attempts + 1,
+                    )
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+
+    def heartbeat(self, job_id: int, worker_id: str) -> bool:
+        """Extend the lease; False when the job is no longer ours."""
+        with self._lock:
+            cursor = self._conn.execute(
+                "UPDATE jobs SET lease_until = ? WHERE id = ? AND worker = ? AND status = ?",
+                (time.time() + self.lease_seconds, job_id, worker_id, RUNNING),
+            )
+            return cursor.rowcount > 0
+
+    def add_event(self, job_id: int, stage: str, status: str, at: Optional[float] = None) -> None:
+        with self._lock:
+            self._conn.execute(
+                "INSERT INTO job_events(job_id, stage, status, at) VALUES (?, ?, ?, ?)",
+                (job_id, stage, status, time.time() if at is None else float(at)),
+            )
+
+    def complete(self, job_id: int, worker_id: str, result: str) -> bool:
+        """Store the serialized ``PipelineResult``; False if the lease was lost."""
+        with self._lock:
+            return self._finish_owned_locked(job_id, worker_id, DONE, result, None)
+
+    def fail(self, job_id: int, worker_id: str, error: str) -> bool:
+        """Requeue the job while attempts remain, otherwise mark it failed."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT attempts, max_attempts FROM jobs WHERE id = ? AND worker = ? AND status = ?",
+                (job_id, worker_id, RUNNING),
+            ).fetchone()
+            if row is None:
+                return False
+            if row[0] < row[1]:
+                self._conn.execute(
+                    "UPDATE jobs SET status = ?, worker = NULL, lease_until = NULL, error = ?"
+                    " WHERE id = ?",
+                    (QUEUED, error, job_id),
+                )
+                return True
+            return self._finish_owned_locked(job_id, worker_id, FAILED, None, error)
+
+    def _finish_owned_locked(
+        self, job_id: int, worker_id: str, status: str, result: Optional[str], error: Optional[str]
+    ) -> bool:
+        cursor = self._conn.execute(
+            "UPDATE jobs SET status = ?, result = ?, error = ?, finished_at = ?,"
+            " lease_until = NULL WHERE id = ? AND worker = ? AND status = ?",
+            (status, result, error, time.time(), job_id, worker_id, RUNNING),
+        )
+        return cursor.rowcount > 0
+
+    def _finish_locked(
+        self, job_id: int, status: str, result: Optional[str], error: Optional[str], now: float
+    ) -> None:
+        self._conn.execute(
+            "UPDATE jobs SET status = ?, result = ?, error = ?, finished_at = ?,"
+            " lease_until = NULL WHERE id = ?",
+            (status, result, error, now, job_id),
+        )
+
+    # ---- housekeeping ----------------------------------------------------
+
+    def _prune_locked(self, now: float) -> int:
+        self._last_prune = now
+        if self.retention_seconds <= 0:
+            return 0
+        cutoff = now - self.retention_seconds
+        ids = [
+            row[0]
+            for row in self._conn.execute(
+                "SELECT id FROM jobs WHERE status IN (?, ?) AND finished_at < ?",
+                (DONE, FAILED, cutoff),
+            )
+        ]
+        for job_id in ids:
+            self._conn.execute("DELETE FROM job_events WHERE job_id = ?", (job_id,))
+            self._conn.execute("DELETE FROM jobs WHERE id = ?", (job_id,))
+        return len(ids)
+
+    def prune(self) -> int:
+        """Delete finished jobs older than the retention window."""
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            removed = self._prune_locked(time.time())
+            self._conn.execute("COMMIT")
+        return removed
+
+    def stats(self) -> dict[str, Any]:
+        now = time.time()
+        with self._lock:
+            counts = dict(
+                self._conn.execute("SELECT status, COUNT(*) FROM jobs GROUP BY status").fetchall()
+            )
+            oldest = self._conn.execute(
+                "SELECT MIN(enqueued_at) FROM jobs WHERE status = ?", (QUEUED,)
+            ).fetchone()[0]
+            workers = [
+                row[0]
+                for row in self._conn.execute(
+                    "SELECT DISTINCT worker FROM jobs WHERE status = ? AND lease_until >= ?",
+                    (RUNNING, now),
+                )
+            ]
+        return {
+            **{status: int(counts.get(status, 0)) for status in (QUEUED, RUNNING, DONE, FAILED)},
+            "oldest_queued_sec": round(now - oldest, 1) if oldest else 0.0,
+            "active_workers": sorted(workers),
+            "lease_seconds": self.lease_seconds,
+            "max_attempts": self.max_attempts,
+        }
+
+
+_queues: dict[str, JobQueue] = {}
+_queues_lock = threading.Lock()
+
+
+def get_job_queue() -> JobQueue:
+    """Shared queue for ``WORKER_QUEUE_PATH`` (one connection per process)."""
+    db_path = Path(os.getenv("WORKER_QUEUE_PATH", "temp/job_queue.sqlite3")).expanduser()
+    key = str(db_path)
+    with _queues_lock:
+        queue = _queues.get(key)
+        if queue is None:
+            queue = JobQueue(
+                db_path,
+                lease_seconds=read_env_int("WORKER_LEASE_SECONDS", 60),
+                max_attempts=read_env_int("WORKER_MAX_ATTEMPTS", 2),
+                retention_seconds=read_env_int("WORKER_QUEUE_RETENTION_HOURS", 24) * 3600,
+            )
+            _queues[key] = queue
+        return queue
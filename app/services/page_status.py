@@ -3,6 +3,8 @@ from __future__ import annotations
 from pathlib import Path
 import json
 
+from core.quality_index import summarize_report
+
 
 def find_translated_file(output_dir: Path, stem: str) -> Path | None:
     slices_index = output_dir / f"{stem}_slices.json"
@@ -33,6 +35,31 @@ def compute_page_status(
     low_quality_ratio: float,
 ) -> dict:
     if not report_paths:
+        return page_status_from_summary(
+            None,
+            has_report=False,
+            translated_exists=translated_exists,
+            low_quality_threshold=low_quality_threshold,
+            low_quality_ratio=low_quality_ratio,
+        )
+    return page_status_from_summary(
+        summarize_report(_load_latest_report(report_paths)),
+        has_report=True,
+        translated_exists=translated_exists,
+        low_quality_threshold=low_quality_threshold,
+        low_quality_ratio=low_quality_ratio,
+    )
+
+
+def page_status_from_summary(
+    summary: dict | None,
+    has_report: bool,
+    translated_exists: bool,
+    low_quality_threshold: float,
+    low_quality_ratio: float,
+) -> dict:
+    """Page status from a pre-aggregated report (see ``core.quality_index``)."""
+    if not has_report:
         if translated_exists:
             return {
                 "status": "success",
@@ -47,8 +74,7 @@ def compute_page_status(
             "warning_counts": {"retranslate": 0, "low_quality": 0, "low_ocr": 0},
         }
 
-    report = _load_latest_report(report_paths)
-    if not report:
+    if not summary:
         return {
             "status": "processing",
             "reason": "invalid_report",
@@ -56,8 +82,8 @@ def compute_page_status(
             "warning_counts": {"retranslate": 0, "low_quality": 0, "low_ocr": 0},
         }
 
-    regions = report.get("regions") or []
-    if len(regions) == 0:
+    region_count = summary.get("regions") or 0
+    if region_count == 0:
         return {
             "status": "no_text",
             "reason": "regions_empty",
@@ -65,24 +91,18 @@ def compute_page_status(
             "warning_counts": {"retranslate": 0, "low_quality": 0, "low_ocr": 0},
         }
 
-    retranslate = 0
-    low_quality = 0
-    low_ocr = 0
-    for region in regions:
-        recs = region.get("recommendations") or []
-        if "retranslate" in recs:
-            retranslate += 1
-        quality_score = region.get("quality_score")
-        if quality_score is not None and quality_score < low_quality_threshold:
-            low_quality += 1
-        confidence = region.get("confidence")
-        if confidence is not None and confidence < 0.6:
-            low_ocr += 1
+    retranslate = summary.get("retranslate") or 0
+    low_ocr = summary.get("low_ocr") or 0
+    low_quality = sum(
+        1
+        for score in summary.get("quality_scores") or []
+        if score < low_quality_threshold
+    )
 
     warn = False
     if retranslate > 0:
         warn = True
-    elif regions and (low_quality / max(1, len(regions))) >= low_quality_ratio:
+    elif (low_quality / max(1, region_count)) >= low_quality_ratio:
         warn = True
 
     if warn:
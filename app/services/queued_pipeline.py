@@ -0,0 +1,200 @@
+"""Pipeline stand-in that hands pages to worker processes.
+
+``QueuedPipeline`` has the ``process`` / ``process_batch`` / ``process_stream``
+surface the routes use, but instead of running the stages it enqueues each
+page in the job queue (``app/services/job_queue.py``) and waits for a worker
+to finish it. Stage events written by the worker are relayed to the route's
+``status_callback`` with the worker's timestamp (``stage_event_at``), so SSE
+progress and the task store behave as in inline mode. All pages of one call
+share a single poll loop that reads the rows and new events of every
+outstanding job with one ``poll_many`` per tick.
+
+Page concurrency is set by the number of workers and their
+``WORKER_CONCURRENCY``; the ``max_concurrent`` / ``staged`` arguments are
+accepted for compatibility and ignored here.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import time
+from contextlib import nullcontext
+from dataclasses import asdict
+from typing import AsyncIterable, Callable, Optional
+
+from core.models import PipelineResult, TaskContext, TaskStatus
+from core.page_scheduler import schedule_tag, use_page_index
+
+from .job_queue import DONE, FAILED, JobQueue
+from .task_store import stage_event_at
+
+
+class QueuedPipeline:
+    """Enqueue pages for ``python main.py worker`` processes and relay progress."""
+
+    def __init__(self, queue: JobQueue, poll_interval: float = 0.25) -> None:
+        self.queue = queue
+        self.poll_interval = max(0.01, float(poll_interval))
+
+    @staticmethod
+    def _job(
+        context: TaskContext, collect_metrics: bool = True, index: Optional[int] = None
+    ) -> tuple[str, dict]:
+        payload = {
+            "context": context.model_dump(mode="json"),
+            "collect_metrics": collect_metrics,
+        }
+        # 页面调度标签随任务传给 worker：队列按优先级领取，worker 内按标签排队
+        with use_page_index(index) if index is not None else nullcontext():
+            tag = schedule_tag.get()
+        if tag is not None:
+            payload["schedule"] = asdict(tag)
+        return str(context.task_id), payload
+
+    async def process(
+        self,
+        context: TaskContext,
+        collect_metrics: bool = True,
+        status_callback: Optional[Callable] = None,
+    ) -> PipelineResult:
+        job_ids = await asyncio.to_thread(
+            self.queue.enqueue_many, [self._job(context, collect_metrics)]
+        )
+        poller = _JobPoller(self.queue, self.poll_interval, status_callback)
+        poller.add(job_ids[0], context)
+        poller.close()
+        return (await poller.run())[0]
+
+    async def process_batch(
+        self,
+        contexts: list[TaskContext],
+        max_concurrent: int = 5,
+        status_callback: Optional[Callable] = None,
+        staged: Optional[bool] = None,
+    ) -> list[PipelineResult]:
+        # 整章一次入队：空闲的 worker 都能立刻领到页面
+        job_ids = await asyncio.to_thread(
+            self.queue.enqueue_many,
+            [self._job(ctx, index=index) for index, ctx in enumerate(contexts)],
+        )
+        poller = _JobPoller(self.queue, self.poll_interval, status_callback)
+        for job_id, ctx in zip(job_ids, contexts):
+            poller.add(job_id, ctx)
+        poller.close()
+        return await poller.run()
+
+    async def process_stream(
+        self,
+        contexts: AsyncIterable[TaskContext],
+        max_concurrent: int = 5,
+        status_callback: Optional[Callable] = None,
+        staged: Optional[bool] = None,
+    ) -> list[PipelineResult]:
+        poller = _JobPoller(self.queue, self.poll_interval, status_callback)
+        runner = asyncio.create_task(poller.run())
+        try:
+            index = 0
+            async for ctx in contexts:
+                job = self._job(ctx, index=index)
+                job_ids = await asyncio.to_thread(self.queue.enqueue_many, [job])
+                poller.add(job_ids[0], ctx)
+                index += 1
+        except BaseException:
+            runner.cancel()
+            raise
+        poller.close()
+        return await runner
+
+
+class _Watch:
+    __slots__ = ("context", "last_event", "result")
+
+    def __init__(self, context: TaskContext) -> None:
+        self.context = context
+        self.last_event = 0
+        self.result: Optional[PipelineResult] = None
+
+
+class _JobPoller:
+    """One poll loop for all pages of a call: a single ``poll_many`` per tick."""
+
+    def __init__(
+        self, queue: JobQueue, poll_interval: float, status_callback: Optional[Callable]
+    ) -> None:
+        self.queue = queue
+        self.poll_interval = poll_interval
+        self.status_callback = status_callback
+        self._watches: dict[int, _Watch] = {}
+        self._order: list[int] = []
+        self._closed = False
+        self._changed = asyncio.Event()
+        self._started = time.time()
+
+    def add(self, job_id: int, context: TaskContext) -> None:
+        self._watches[job_id] = _Watch(context)
+        self._order.append(job_id)
+        self._changed.set()
+
+    def close(self) -> None:
+        """No more jobs will be added; ``run`` returns once all are finished."""
+        self._closed = True
+        self._changed.set()
+
+    def _outstanding(self) -> dict[int, int]:
+        return {
+            job_id: watch.last_event
+            for job_id, watch in self._watches.items()
+            if watch.result is None
+        }
+
+    async def run(self) -> list[PipelineResult]:
+        """Relay events and collect results, in the order the jobs were added."""
+        try:
+            while True:
+                cursors = self._outstanding()
+                if not cursors:
+                    if self._closed:
+                        return [self._watches[job_id].result for job_id in self._order]
+                    self._changed.clear()
+                    await self._changed.wait()
+                    continue
+                polled = await asyncio.to_thread(self.queue.poll_many, cursors)
+                for job_id, (events, job) in polled.items():
+                    await self._relay(self._watches[job_id], events, job)
+                if self._outstanding():
+                    await asyncio.sleep(self.poll_interval)
+        except asyncio.CancelledError:
+            # 调用方放弃等待：还没被领走的页面不再处理（不在事件循环里写 SQLite）
+            pending = list(self._outstanding())
+            if pending:
+                asyncio.get_running_loop().run_in_executor(None, self.queue.cancel, pending)
+            raise
+
+    async def _relay(self, watch: _Watch, events: list[dict], job: Optional[dict]) -> None:
+        for event in events:
+            watch.last_event = event["id"]
+            if self.status_callback is None:
+                continue
+            token = stage_event_at.set(event["at"])
+            try:
+                await self.status_callback(
+                    event["stage"], TaskStatus(event["status"]), watch.context.task_id
+                )
+            finally:
+                stage_event_at.reset(token)
+        if job is None:
+            watch.result = await self._failed(watch.context, "job disappeared from the worker queue")
+        elif job["status"] == DONE:
+            watch.result = PipelineResult.model_validate_json(job["result"])
+        elif job["status"] == FAILED:
+            watch.result = await self._failed(watch.context, job["error"] or "worker failed")
+
+    async def _failed(self, context: TaskContext, error: str) -> PipelineResult:
+        context.update_status(TaskStatus.FAILED, error=error, error_code="worker_failed")
+        if self.status_callback:
+            await self.status_callback("failed", TaskStatus.FAILED, context.task_id)
+        return PipelineResult(
+            success=False,
+            task=context,
+            processing_time_ms=(time.time() - self._started) * 1000,
+        )
@@ -0,0 +1,453 @@
+"""Durable translation task store (SQLite).
+
+Replaces the per-process task dict as the source of truth for
+``GET /translate/task/{id}``: tasks, their chapter membership and per-stage
+timestamps live in one SQLite file (WAL), so status survives restarts and is
+shared by every uvicorn worker pointing at the same file.
+
+Progress is fractional: each stage is weighted by its rolling median latency
+(the last ``TASK_STORE_LATENCY_WINDOW`` samples per stage) and the running
+stage contributes its elapsed time, capped just below its median. The ETA is
+the median time left for the remaining stages.
+
+Tasks left ``pending`` / ``processing`` by a process that died are marked
+``failed`` (error_code ``interrupted``) at API startup once they have not been
+updated for ``TASK_STORE_STALE_SECONDS``. Retention (``prune``) runs at most
+once per ``_PRUNE_INTERVAL_SEC`` from the write path.
+
+Env:
+    TASK_STORE_ENABLE: 1/0 (default 1; 0 = in-process task dict only)
+    TASK_STORE_PATH: SQLite file (default temp/task_store.sqlite3)
+    TASK_STORE_LATENCY_WINDOW: latency samples kept per stage (default 200)
+    TASK_STORE_STALE_SECONDS: idle time after which an unfinished task is
+        considered interrupted at startup (default 600)
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import sqlite3
+import threading
+import time
+from contextvars import ContextVar
+from pathlib import Path
+from typing import Any, Iterable, Optional
+from uuid import UUID
+
+from core.models import TaskContext, TaskStatus
+from core.utils.env import read_env_int
+
+PIPELINE_STAGES = ("ocr", "translator", "inpainter", "renderer", "upscaler")
+_TERMINAL = {TaskStatus.COMPLETED.value, TaskStatus.FAILED.value}
+# 运行中阶段的进度最多算到中位耗时的 95%，超时也不会显示为已完成
+_RUNNING_CAP = 0.95
+_PRUNE_INTERVAL_SEC = 60.0
+
+# 转发其他进程（worker）的阶段事件时携带事件发生时间，而不是转发时间
+stage_event_at: ContextVar[Optional[float]] = ContextVar("stage_event_at", default=None)
+
+
+def task_store_enabled() -> bool:
+    return os.getenv("TASK_STORE_ENABLE", "1") == "1"
+
+
+def _percentile(values: list[float], pct: float) -> float:
+    ordered = sorted(values)
+    if not ordered:
+        return 0.0
+    rank = (len(ordered) - 1) * pct
+    low = int(rank)
+    high = min(low + 1, len(ordered) - 1)
+    return ordered[low] + (ordered[high] - ordered[low]) * (rank - low)
+
+
+class TaskStore:
+    """Tasks, stage events and rolling stage latencies in one SQLite file."""
+
+    def __init__(self, db_path: Path, latency_window: int = 200) -> None:
+        self.db_path = Path(db_path)
+        self.latency_window = max(1, int(latency_window))
+        self._lock = threading.Lock()
+        self._last_prune = 0.0
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(
+            str(self.db_path), check_same_thread=False, timeout=10.0
+        )
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS tasks ("
+            " task_id TEXT PRIMARY KEY,"
+            " status TEXT NOT NULL,"
+            " stage TEXT,"
+            " manga_id TEXT,"
+            " chapter_id TEXT,"
+            " image_name TEXT,"
+            " payload TEXT NOT NULL,"
+            " created_at REAL NOT NULL,"
+            " started_at REAL,"
+            " stage_at REAL,"
+            " finished_at REAL,"
+            " updated_at REAL NOT NULL,"
+            " touched INTEGER NOT NULL)"
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_tasks_chapter ON tasks(manga_id, chapter_id)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_tasks_touched ON tasks(touched)")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_tasks_updated ON tasks(updated_at)")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS stage_events ("
+            " task_id TEXT NOT NULL,"
+            " stage TEXT NOT NULL,"
+            " at REAL NOT NULL,"
+            " duration_ms REAL)"
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_stage_events_task ON stage_events(task_id)"
+        )
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS stage_samples ("
+            " id INTEGER PRIMARY KEY AUTOINCREMENT,"
+            " stage TEXT NOT NULL,"
+            " duration_ms REAL NOT NULL)"
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_stage_samples_stage ON stage_samples(stage, id)"
+        )
+        self._conn.commit()
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+    # ---- writes ----------------------------------------------------------
+
+    def upsert_task(self, task: TaskContext, meta: Optional[dict] = None) -> None:
+        """Store the task snapshot; chapter membership is kept once known."""
+        meta = meta or {}
+        now = time.time()
+        status = task.status.value
+        with self._lock:
+            self._conn.execute(
+                "INSERT INTO tasks(task_id, status, manga_id, chapter_id, image_name, payload,"
+                " created_at, finished_at, updated_at, touched)"
+                " VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?,"
+                " (SELECT COALESCE(MAX(touched), 0) + 1 FROM tasks))"
+                " ON CONFLICT(task_id) DO UPDATE SET"
+                " status = excluded.status,"
+                " manga_id = COALESCE(excluded.manga_id, tasks.manga_id),"
+                " chapter_id = COALESCE(excluded.chapter_id, tasks.chapter_id),"
+                " image_name = COALESCE(excluded.image_name, tasks.image_name),"
+                " payload = excluded.payload,"
+                " finished_at = COALESCE(tasks.finished_at, excluded.finished_at),"
+                " updated_at = excluded.updated_at,"
+                " touched = excluded.touched",
+                (
+                    str(task.task_id),
+                    status,
+                    meta.get("manga_id"),
+                    meta.get("chapter_id"),
+                    meta.get("image_name"),
+                    task.model_dump_json(),
+                    task.created_at.timestamp(),
+                    now if status in _TERMINAL else None,
+                    now,
+                ),
+            )
+            self._conn.commit()
+
+    def record_stage(
+        self,
+        task_id: UUID,
+        stage: str,
+        status: TaskStatus,
+        meta: Optional[dict] = None,
+        at: Optional[float] = None,
+    ) -> None:
+        """Record a pipeline status callback (``stage`` has just finished)."""
+        at = time.time() if at is None else float(at)
+        key = str(task_id)
+        meta = meta or {}
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT started_at, stage_at FROM tasks WHERE task_id = ?", (key,)
+            ).fetchone()
+            if row is None:
+                self._conn.execute(
+                    "INSERT INTO tasks(task_id, status, manga_id, chapter_id, image_name,"
+                    " payload, created_at, updated_at, touched)"
+                    " VALUES (?, ?, ?, ?, ?, '{}', ?, ?,"
+                    " (SELECT COALESCE(MAX(touched), 0) + 1 FROM tasks))",
+                    (
+                        key,
+                        status.value,
+                        meta.get("manga_id"),
+                        meta.get("chapter_id"),
+                        meta.get("image_name"),
+                        at,
+                        at,
+                    ),
+                )
+                started_at = stage_at = None
+            else:
+                started_at, stage_at = row
+            duration_ms = None
+            update_stage = False
+            if stage == "init":
+                started_at, stage_at, update_stage = at, None, True
+            elif stage in PIPELINE_STAGES:
+                previous = stage_at or started_at
+                if previous is not None:
+                    duration_ms = max(0.0, (at - previous) * 1000)
+                    self._add_sample_locked(stage, duration_ms)
+                stage_at, update_stage = at, True
+            self._conn.execute(
+                "INSERT INTO stage_events(task_id, stage, at, duration_ms) VALUES (?, ?, ?, ?)",
+                (key, stage, at, duration_ms),
+            )
+            # complete/failed 不覆盖最后完成的阶段，失败时仍能算出已完成的比例
+            self._conn.execute(
+                "UPDATE tasks SET status = ?, started_at = ?, stage_at = ?,"
+                " stage = CASE WHEN ? THEN ? ELSE stage END,"
+                " finished_at = CASE WHEN ? THEN ? ELSE finished_at END,"
+                " updated_at = ? WHERE task_id = ?",
+                (
+                    status.value,
+                    started_at,
+                    stage_at,
+                    update_stage,
+                    stage if stage in PIPELINE_STAGES else None,
+                    status.value in _TERMINAL,
+                    at,
+                    at,
+                    key,
+                ),
+            )
+            self._conn.commit()
+
+    def _add_sample_locked(self, stage: str, duration_ms: float) -> None:
+        self._conn.execute(
+            "INSERT INTO stage_samples(stage, duration_ms) VALUES (?, ?)",
+            (stage, duration_ms),
+        )
+        # 按阶段保留最近 latency_window 个样本
+        self._conn.execute(
+            "DELETE FROM stage_samples WHERE stage = ? AND id <= ("
+            " SELECT id FROM stage_samples WHERE stage = ? ORDER BY id DESC LIMIT 1 OFFSET ?)",
+            (stage, stage, self.latency_window),
+        )
+
+    def mark_interrupted(self, stale_seconds: float) -> int:
+        """Fail unfinished tasks not updated for ``stale_seconds``; returns how many."""
+        now = time.time()
+        cutoff = now - max(0.0, float(stale_seconds))
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT task_id, payload FROM tasks"
+                " WHERE status NOT IN (?, ?) AND updated_at < ?",
+                (*sorted(_TERMINAL), cutoff),
+            ).fetchall()
+            for task_id, payload in rows:
+                try:
+                    data = json.loads(payload or "{}")
+                except ValueError:
+                    data = {}
+                data.update(
+                    status=TaskStatus.FAILED.value,
+                    error_code="interrupted",
+                    error_message="Task interrupted: the server restarted before it finished",
+                )
+                self._conn.execute(
+                    "UPDATE tasks SET status = ?, payload = ?, finished_at = ?, updated_at = ?"
+                    " WHERE task_id = ?",
+                    (TaskStatus.FAILED.value, json.dumps(data), now, now, task_id),
+                )
+            self._conn.commit()
+        return len(rows)
+
+    def maybe_prune(self, max_tasks: int, ttl_seconds: int) -> int:
+        """Write-path ``prune``: the TTL sweep runs once per ``_PRUNE_INTERVAL_SEC``.
+
+        In between only the ``max_tasks`` bound is checked (one index probe on
+        ``touched``), so the store never grows past it.
+        """
+        with self._lock:
+            if time.time() - self._last_prune < _PRUNE_INTERVAL_SEC:
+                over = self._conn.execute(
+                    "SELECT 1 FROM tasks ORDER BY touched DESC LIMIT 1 OFFSET ?",
+                    (max(0, int(max_tasks)),),
+                ).fetchone()
+                if over is None:
+                    return 0
+                ttl_seconds = 0
+        return self.prune(max_tasks, ttl_seconds)
+
+    def prune(self, max_tasks: int, ttl_seconds: int) -> int:
+        """Drop tasks idle longer than ``ttl_seconds`` and the oldest beyond ``max_tasks``."""
+        cutoff = time.time() - ttl_seconds if ttl_seconds > 0 else None
+        with self._lock:
+            if cutoff is not None:
+                self._last_prune = time.time()
+            removed = []
+            if cutoff is not None:
+                removed += [
+                    row[0]
+                    for row in self._conn.execute(
+                        "SELECT task_id FROM tasks WHERE updated_at < ?", (cutoff,)
+                    )
+                ]
+            removed += [
+                row[0]
+                for row in self._conn.execute(
+                    "SELECT task_id FROM tasks ORDER BY touched DESC LIMIT -1 OFFSET ?",
+                    (max(0, int(max_tasks)),),
+                )
+            ]
+            for task_id in set(removed):
+                self._conn.execute("DELETE FROM tasks WHERE task_id = ?", (task_id,))
+                self._conn.execute("DELETE FROM stage_events WHERE task_id = ?", (task_id,))
+            self._conn.commit()
+        return len(set(removed))
+
+    # ---- reads -----------------------------------------------------------
+
+    def stage_latency(self) -> dict[str, dict[str, float]]:
+        """Rolling p50/p90 latency (ms) and sample count per stage."""
+        with self._lock:
+            rows = self._conn.execute("SELECT stage, duration_ms FROM stage_samples").fetchall()
+        samples: dict[str, list[float]] = {}
+        for stage, duration_ms in rows:
+            samples.setdefault(stage, []).append(duration_ms)
+        return {
+            stage: {
+                "p50_ms": round(_percentile(values, 0.5), 1),
+                "p90_ms": round(_percentile(values, 0.9), 1),
+                "samples": len(values),
+            }
+            for stage, values in samples.items()
+        }
+
+    def _estimate(
+        self, row: dict, latency: dict[str, dict[str, float]], now: float
+    ) -> tuple[float, Optional[float]]:
+        status = row["status"]
+        if status == TaskStatus.COMPLETED.value:
+            return 1.0, 0.0
+        expected = {
+            stage: (latency.get(stage) or {}).get("p50_ms") for stage in PIPELINE_STAGES
+        }
+        known = [value for value in expected.values() if value]
+        # 没有样本的阶段按已知阶段的平均值计权；都没有则各阶段等权且不给 ETA
+        fallback = sum(known) / len(known) if known else 1.0
+        weights = {stage: expected[stage] or fallback for stage in PIPELINE_STAGES}
+        total = sum(weights.values())
+        if row["started_at"] is None:
+            return 0.0, (total / 1000.0 if known else None)
+        stage = row["stage"]
+
+        done_index = PIPELINE_STAGES.index(stage) + 1 if stage in PIPELINE_STAGES else 0
+        done = sum(weights[s] for s in PIPELINE_STAGES[:done_index])
+        if status == TaskStatus.FAILED.value or done_index >= len(PIPELINE_STAGES):
+            return min(1.0, done / total), None if status == TaskStatus.FAILED.value else 0.0
+        current = PIPELINE_STAGES[done_index]
+        last_at = row["stage_at"] or row["started_at"]
+        elapsed_ms = max(0.0, (now - last_at) * 1000)
+        running = min(elapsed_ms, weights[current] * _RUNNING_CAP)
+        progress = (done + running) / total
+        remaining_ms = max(0.0, weights[current] - elapsed_ms) + sum(
+            weights[s] for s in PIPELINE_STAGES[done_index + 1 :]
+        )
+        return min(0.99, progress), (remaining_ms / 1000.0 if known else None)
+
+    def _rows(self, where: str, params: Iterable[Any]) -> list[dict]:
+        with self._lock:
+            cursor = self._conn.execute(
+                "SELECT task_id, status, stage, manga_id, chapter_id, image_name, payload,"
+                f" created_at, started_at, stage_at, finished_at, updated_at FROM tasks {where}",
+                tuple(params),
+            )
+            names = [col[0] for col in cursor.description]
+            return [dict(zip(names, values)) for values in cursor.fetchall()]
+
+    def get(self, task_id: UUID) -> Optional[dict]:
+        """Task snapshot with ``progress`` (0-1), ``eta_seconds`` and stage timings."""
+        rows = self._rows("WHERE task_id = ?", (str(task_id),))
+        if not rows:
+            return None
+        row = rows[0]
+        progress, eta = self._estimate(row, self.stage_latency(), time.time())
+        with self._lock:
+            events = self._conn.execute(
+                "SELECT stage, duration_ms FROM stage_events"
+                " WHERE task_id = ? AND duration_ms IS NOT NULL ORDER BY at",
+                (row["task_id"],),
+            ).fetchall()
+        payload = json.loads(row.pop("payload") or "{}")
+        return {
+            **row,
+            "output_path": payload.get("output_path"),
+            "error_message": payload.get("error_message"),
+            "progress": round(progress, 4),
+            "eta_seconds": None if eta is None else round(eta, 1),
+            "stage_timings_ms": {stage: round(ms, 1) for stage, ms in events},
+        }
+
+    def chapter_progress(self, manga_id: str, chapter_id: str) -> Optional[dict]:
+        """Aggregate progress of the pages of one chapter (None if unknown)."""
+        rows = self._rows(
+            "WHERE manga_id = ? AND chapter_id = ? ORDER BY created_at",
+            (manga_id, chapter_id),
+        )
+        if not rows:
+            return None
+        latency = self.stage_latency()
+        now = time.time()
+        counts = {"completed": 0, "failed": 0, "processing": 0, "pending": 0}
+        progress_sum = 0.0
+        remaining = 0.0
+        eta_known = True
+        for row in rows:
+            progress, eta = self._estimate(row, latency, now)
+            progress_sum += progress
+            status = row["status"]
+            if status in counts:
+                counts[status] += 1
+            if status not in _TERMINAL:
+                if eta is None:
+                    eta_known = False
+                else:
+                    remaining += eta
+        # 页面并发执行：剩余工作量按当前在跑的页数摊开
+        parallel = max(1, counts["processing"])
+        return {
+            "manga_id": manga_id,
+            "chapter_id": chapter_id,
+            "total": len(rows),
+            **counts,
+            "progress": round(progress_sum / len(rows), 4),
+            "eta_seconds": round(remaining / parallel, 1) if eta_known else None,
+            "stage_latency": latency,
+        }
+
+
+_stores: dict[str, TaskStore] = {}
+_stores_lock = threading.Lock()
+
+
+def get_task_store() -> TaskStore:
+    """Shared store for ``TASK_STORE_PATH`` (one connection per process)."""
+    db_path = Path(os.getenv("TASK_STORE_PATH", "temp/task_store.sqlite3")).expanduser()
+    key = str(db_path)
+    with _stores_lock:
+        store = _stores.get(key)
+        if store is None:
+            store = TaskStore(db_path, read_env_int("TASK_STORE_LATENCY_WINDOW", 200))
+            _stores[key] = store
+        return store
+
+
+def interrupt_stale_tasks() -> int:
+    """Startup recovery: fail tasks a previous process left unfinished."""
+    return get_task_store().mark_interrupted(read_env_int("TASK_STORE_STALE_SECONDS", 600))
@@ -0,0 +1,207 @@
+"""Worker processes for ``TRANSLATE_WORKER_MODE=queue``.
+
+``python main.py worker -n 2`` starts a supervisor and N worker processes.
+Each worker builds its own pipeline, warms its models once (OCR / LaMa /
+upscaler, same as the API lifespan) and then claims page jobs from the job
+queue (``app/services/job_queue.py``), running up to ``WORKER_CONCURRENCY``
+pages at a time. Stage events go back through the queue; the API relays them.
+
+The supervisor restarts a worker that exits unexpectedly. The page a crashed
+worker was running is claimed again once its lease expires. SIGTERM / Ctrl+C
+stops claiming, lets running pages finish and then exits.
+
+Env:
+    WORKER_PROCESSES: worker processes started by ``main.py worker`` (default 2)
+    WORKER_CONCURRENCY: pages in flight per worker process (default 1)
+    WORKER_POLL_MS: queue poll interval, workers and API relay (default 250)
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import multiprocessing
+import os
+import signal
+import socket
+import time
+from contextlib import nullcontext
+from typing import Optional
+
+from core.models import PipelineResult, TaskContext
+from core.page_scheduler import use_schedule
+from core.pipeline import Pipeline
+from core.utils.env import read_env_int
+
+from .services.job_queue import Job, JobQueue, get_job_queue
+
+logger = logging.getLogger(__name__)
+
+# 同一个槽位两次重启之间至少间隔的秒数，避免启动即崩溃时疯狂重启
+_RESTART_BACKOFF_SEC = 5.0
+
+
+def poll_interval() -> float:
+    return read_env_int("WORKER_POLL_MS", 250) / 1000.0
+
+
+def _serialize_result(result: PipelineResult) -> str:
+    metrics = result.metrics
+    if metrics is not None and not isinstance(metrics, dict):
+        metrics = metrics.to_dict()
+    return result.model_copy(update={"metrics": metrics}).model_dump_json()
+
+
+async def _keep_lease(queue: JobQueue, job: Job, worker_id: str) -> None:
+    interval = max(0.5, queue.lease_seconds / 3)
+    while True:
+        await asyncio.sleep(interval)
+        if not await asyncio.to_thread(queue.heartbeat, job.id, worker_id):
+            logger.warning("[%s] lease on job %s lost", worker_id, job.id)
+            return
+
+
+async def process_job(queue: JobQueue, pipeline: Pipeline, job: Job, worker_id: str) -> bool:
+    """Run one page job; returns True when its result was stored."""
+    context = TaskContext.model_validate(job.payload["context"])
+
+    async def report(stage, status, task_id) -> None:
+        await asyncio.to_thread(queue.add_event, job.id, stage, status.value)
+
+    schedule = job.payload.get("schedule")
+    heartbeat = asyncio.create_task(_keep_lease(queue, job, worker_id))
+    try:
+        with use_schedule(**schedule) if schedule else nullcontext():
+            result = await pipeline.process(
+                context,
+                collect_metrics=job.payload.get("collect_metrics", True),
+                status_callback=report,
+            )
+        return await asyncio.to_thread(
+            queue.complete, job.id, worker_id, _serialize_result(result)
+        )
+    except Exception as exc:  # noqa: BLE001 - 交给队列决定重试还是失败
+        logger.exception("[%s] job %s (task %s) crashed", worker_id, job.id, job.task_id)
+        await asyncio.to_thread(queue.fail, job.id, worker_id, str(exc))
+        return False
+    finally:
+        heartbeat.cancel()
+
+
+async def run_worker(
+    queue: JobQueue,
+    pipeline: Pipeline,
+    worker_id: str,
+    concurrency: int = 1,
+    stop: Optional[asyncio.Event] = None,
+    poll_seconds: Optional[float] = None,
+) -> int:
+    """Claim and run jobs until ``stop`` is set; returns how many were processed."""
+    stop = stop or asyncio.Event()
+    poll_seconds = poll_interval() if poll_seconds is None else poll_seconds
+    slots = asyncio.Semaphore(max(1, int(concurrency)))
+    inflight: set[asyncio.Task] = set()
+    processed = 0
+
+    def done(task: asyncio.Task) -> None:
+        nonlocal processed
+        inflight.discard(task)
+        slots.release()
+        processed += 1
+
+    while not stop.is_set():
+        await slots.acquire()
+        job = None if stop.is_set() else await asyncio.to_thread(queue.claim, worker_id)
+        if job is None:
+            slots.release()
+            try:
+                await asyncio.wait_for(stop.wait(), poll_seconds)
+            except asyncio.TimeoutError:
+                pass
+            continue
+        task = asyncio.create_task(process_job(queue, pipeline, job, worker_id))
+        inflight.add(task)
+        task.add_done_callback(done)
+    if inflight:
+        await asyncio.gather(*inflight, return_exceptions=True)
+    return processed
+
+
+async def _serve(worker_id: str, concurrency: int) -> None:
+    from core.artifact_sink import get_artifact_sink
+    from core.model_setup import ModelRegistry, ModelWarmupService
+
+    from .deps import build_pipeline
+
+    pipeline = build_pipeline()
+    if os.getenv("AUTO_SETUP_MODELS", "on").lower() not in {"0", "false", "off"}:
+        await ModelWarmupService(ModelRegistry()).warmup()
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGTERM, signal.SIGINT):
+        try:
+            loop.add_signal_handler(sig, stop.set)
+        except (NotImplementedError, RuntimeError):
+            pass
+    logger.info("[%s] worker ready (concurrency=%s)", worker_id, concurrency)
+    processed = await run_worker(get_job_queue(), pipeline, worker_id, concurrency, stop)
+    await asyncio.to_thread(get_artifact_sink().flush, 10.0)
+    logger.info("[%s] worker stopped after %s jobs", worker_id, processed)
+
+
+def _worker_main(concurrency: int) -> None:
+    from core.logging_config import init_default_logging
+
+    init_default_logging()
+    worker_id = f"{socket.gethostname()}:{os.getpid()}"
+    asyncio.run(_serve(worker_id, concurrency))
+
+
+def run_supervisor(processes: int, concurrency: int) -> None:
+    """Keep ``processes`` workers alive until SIGTERM / Ctrl+C."""
+    mp = multiprocessing.get_context("spawn")
+    slots: list[Optional[multiprocessing.process.BaseProcess]] = [None] * processes
+    started_at = [0.0] * processes
+    stopping = False
+
+    def request_stop(signum, frame) -> None:
+        nonlocal stopping
+        stopping = True
+
+    signal.signal(signal.SIGTERM, request_stop)
+    signal.signal(signal.SIGINT, request_stop)
+    try:
+        while not stopping:
+            now = time.monotonic()
+            for index, proc in enumerate(slots):
+                if proc is not None and proc.is_alive():
+                    continue
+                if proc is not None:
+                    logger.warning("worker %s exited with %s", proc.pid, proc.exitcode)
+                    slots[index] = None
+                if now - started_at[index] < _RESTART_BACKOFF_SEC:
+                    continue
+                proc = mp.Process(
+                    target=_worker_main, args=(concurrency,), name=f"translate-worker-{index}"
+                )
+                proc.start()
+                slots[index], started_at[index] = proc, now
+                logger.info("started worker %s (pid %s)", index, proc.pid)
+            time.sleep(1.0)
+    finally:
+        # worker 收到 SIGTERM 后不再领新任务，等正在处理的页面完成
+        for proc in slots:
+            if proc is not None and proc.is_alive():
+                proc.terminate()
+        for proc in slots:
+            if proc is not None:
+                proc.join(timeout=60)
+                if proc.is_alive():
+                    proc.kill()
+
+
+def main(processes: Optional[int] = None, concurrency: Optional[int] = None) -> None:
+    processes = processes or read_env_int("WORKER_PROCESSES", 2)
+    concurrency = concurrency or read_env_int("WORKER_CONCURRENCY", 1)
+    print(f"启动 {processes} 个翻译 worker（每个并发 {concurrency}）: {get_job_queue().db_path}")
+    run_supervisor(processes, concurrency)
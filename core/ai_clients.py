@@ -0,0 +1,96 @@
+"""Shared native-async provider clients for AITranslator.
+
+The sync OpenAI / google-genai clients were driven through
+``loop.run_in_executor``, so every in-flight request pinned a default-executor
+thread (shared with OCR, LaMa and bubble detection) and a timeout could not
+cancel the underlying HTTP call. The async clients here run on the event loop
+with pooled keep-alive connections; cancelling the awaiting task aborts the
+request.
+
+Clients are cached per event loop (httpx connections are loop-bound) and per
+credentials, so the primary translator and its fallbacks share one pool.
+
+Env:
+    AI_TRANSLATE_ASYNC_CLIENT: 1/0 (default 1; 0 = previous executor path)
+    AI_TRANSLATE_HTTP_MAX_CONNECTIONS: pool size per provider (default 32)
+"""
+
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import os
+import threading
+import weakref
+from typing import Any
+
+
+def async_transport_enabled() -> bool:
+    return os.getenv("AI_TRANSLATE_ASYNC_CLIENT", "1") == "1"
+
+
+def _max_connections() -> int:
+    raw = os.getenv("AI_TRANSLATE_HTTP_MAX_CONNECTIONS")
+    try:
+        value = int(raw) if raw else 32
+    except ValueError:
+        value = 32
+    return max(1, value)
+
+
+_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, dict[tuple, Any]]" = (
+    weakref.WeakKeyDictionary()
+)
+_clients_lock = threading.Lock()
+
+
+def _cache_key(*parts: str) -> tuple:
+    # Never keep raw API keys in cache keys (they may show up in debug dumps).
+    return tuple(hashlib.sha1((p or "").encode("utf-8")).hexdigest()[:12] for p in parts)
+
+
+def _get_or_create(key: tuple, factory):
+    loop = asyncio.get_running_loop()
+    with _clients_lock:
+        per_loop = _clients.get(loop)
+        if per_loop is None:
+            per_loop = {}
+            _clients[loop] = per_loop
+        client = per_loop.get(key)
+        if client is None:
+            client = factory()
+            per_loop[key] = client
+        return client
+
+
+def get_async_openai_client(base_url: str, api_key: str):
+    """AsyncOpenAI client for the running loop (SDK retries disabled, as in the sync path)."""
+    from openai import AsyncOpenAI, DefaultAsyncHttpxClient
+    import httpx
+
+    def factory():
+        limit = _max_connections()
+        return AsyncOpenAI(
+            base_url=base_url,
+            api_key=api_key,
+            max_retries=0,
+            http_client=DefaultAsyncHttpxClient(
+                limits=httpx.Limits(
+                    max_connections=limit,
+                    max_keepalive_connections=limit,
+                )
+            ),
+        )
+
+    return _get_or_create(("openai",) + _cache_key(base_url, api_key), factory)
+
+
+def get_async_gemini_client(api_key: str):
+    """``genai.Client(...).aio`` for the running loop."""
+    from google import genai
+
+    def factory():
+        client = genai.Client(api_key=api_key, http_options={"api_version": "v1alpha"})
+        return client.aio
+
+    return _get_or_create(("gemini",) + _cache_key(api_key), factory)
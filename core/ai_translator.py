@@ -8,15 +8,30 @@ AI Translator - 支持多个 AI 提供商进行翻译。
 
 import os
 import asyncio
+import contextvars
 import logging
 import time
 import hashlib
+import re
+import sqlite3
 from typing import Optional
 
 from openai import OpenAI
 from dotenv import load_dotenv
 
 from .logging_config import setup_module_logger, get_log_level
+from .translation_memory import build_memory_key, get_translation_memory
+from .translation_batching import (
+    adaptive_batch_enabled,
+    estimate_tokens,
+    get_latency_model,
+    plan_batch,
+)
+from .ai_clients import (
+    async_transport_enabled,
+    get_async_gemini_client,
+    get_async_openai_client,
+)
 
 load_dotenv()
 
@@ -29,6 +44,8 @@ logger = setup_module_logger(
 )
 
 _FAILURE_MARKER = "[翻译失败]"
+# 修改批量翻译 prompt 时递增，使翻译记忆中的旧条目失效。
+_PROMPT_VERSION = "batch-v1"
 
 # 启用 OpenAI SDK 详细日志（显示重试原因）
 if os.getenv("DEBUG_OPENAI") == "1":
@@ -107,6 +124,12 @@ def _read_env_int(name: str, default: int) -> int:
 _GLOBAL_API_SEMAPHORE: asyncio.Semaphore | None = None
 _GLOBAL_API_SEMAPHORE_LIMIT: int | None = None
 
+# 最近一次 provider 调用本身的耗时（在全局信号量内计时，不含排队）；
+# 每个任务各自一份，供延迟模型采样。
+_provider_call_ms: contextvars.ContextVar[Optional[float]] = contextvars.ContextVar(
+    "ai_provider_call_ms", default=None
+)
+
 
 def _get_global_api_semaphore() -> asyncio.Semaphore | None:
     """
@@ -141,6 +164,100 @@ def _sanitize_log_text(text: str) -> str:
     return (text or "").replace("\n", "\\n")
 
 
+_NUMBERED_LINE_RE = re.compile(r"^(\d+)\s*[\.\)\）:\-、：]\s*(.+)$")
+
+
+def _stream_enabled() -> bool:
+    # 流式依赖原生异步客户端
+    return os.getenv("AI_TRANSLATE_STREAM", "0") == "1" and async_transport_enabled()
+
+
+class _NumberedStreamParser:
+    """Emit ``(n, text)`` for each numbered line as soon as the line is complete."""
+
+    def __init__(self, expected_count: int):
+        self.expected_count = expected_count
+        self._buffer = ""
+        self._seen: set[int] = set()
+
+    def _parse_line(self, line: str) -> list[tuple[int, str]]:
+        match = _NUMBERED_LINE_RE.match(line.strip())
+        if not match:
+            return []
+        idx = int(match.group(1))
+        if idx in self._seen or not (1 <= idx <= self.expected_count):
+            return []
+        self._seen.add(idx)
+        return [(idx, match.group(2).strip())]
+
+    def feed(self, delta: str) -> list[tuple[int, str]]:
+        self._buffer += delta or ""
+        items: list[tuple[int, str]] = []
+        while "\n" in self._buffer:
+            line, self._buffer = self._buffer.split("\n", 1)
+            items.extend(self._parse_line(line))
+        return items
+
+    def close(self) -> list[tuple[int, str]]:
+        line, self._buffer = self._buffer, ""
+        return self._parse_line(line)
+
+
+class _JsonObjectStreamParser:
+    """Emit ``(n, object_text)`` for each top-level JSON object once it closes.
+
+    Mirrors the final JSON parse (top-level ``{...}`` objects in order), so the
+    n-th streamed object is the n-th batch item.
+    """
+
+    def __init__(self, expected_count: int):
+        self.expected_count = expected_count
+        self._current: list[str] = []
+        self._depth = 0
+        self._in_str = False
+        self._escape = False
+        self._count = 0
+
+    def feed(self, delta: str) -> list[tuple[int, str]]:
+        items: list[tuple[int, str]] = []
+        for ch in delta or "":
+            if self._depth:
+                self._current.append(ch)
+            if self._in_str:
+                if self._escape:
+                    self._escape = False
+                elif ch == "\\":
+                    self._escape = True
+                elif ch == '"':
+                    self._in_str = False
+                continue
+            if ch == '"':
+                self._in_str = True
+            elif ch == "{":
+                if not self._depth:
+                    self._current = [ch]
+                self._depth += 1
+            elif ch == "}" and self._depth:
+                self._depth -= 1
+                if not self._depth:
+                    self._count += 1
+                    if self._count <= self.expected_count:
+                        items.append((self._count, "".join(self._current)))
+                    self._current = []
+        return items
+
+    def close(self) -> list[tuple[int, str]]:
+        # 未闭合的对象不完整，交给最终解析/重试处理
+        return []
+
+
+def _clean_batch_text(t: str) -> str:
+    if not t:
+        return ""
+    cleaned = re.sub(r'[\x00-\x08\x0b\x0c\x0e-\x1f\x7f-\x9f]', '', t)
+    return cleaned[:500] if len(cleaned) > 500 else cleaned
+
+
 def _estimate_batch_max_tokens(item_count: int, total_chars: int) -> int:
     """
     Estimate max output tokens for batch translation.
@@ -362,7 +479,9 @@ class AITranslator:
             chain.append(provider_fallback)
         return chain
 
-    async def _call_api_with_timeout(self, prompt: str, max_tokens: int) -> str:
+    async def _call_api_with_timeout(
+        self, prompt: str, max_tokens: int, on_text=None
+    ) -> str:
         """
         Call primary provider with optional timeout guard.
 
@@ -372,16 +491,22 @@ class AITranslator:
         timeout_ms = _read_env_int("AI_TRANSLATE_PRIMARY_TIMEOUT_MS", 12000)
         has_fallback = bool(self._fallback_translator_chain())
 
+        def _call():
+            if on_text is not None:
+                return self._call_api_stream(prompt, max_tokens=max_tokens, on_text=on_text)
+            return self._call_api(prompt, max_tokens=max_tokens)
+
         async def _do_call() -> str:
-            if timeout_ms <= 0 or not has_fallback:
-                return await self._call_api(prompt, max_tokens=max_tokens)
+            started = time.perf_counter()
             try:
-                return await asyncio.wait_for(
-                    self._call_api(prompt, max_tokens=max_tokens),
-                    timeout=timeout_ms / 1000.0,
-                )
-            except asyncio.TimeoutError as exc:
-                raise RuntimeError(f"primary timeout after {timeout_ms}ms") from exc
+                if timeout_ms <= 0 or not has_fallback:
+                    return await _call()
+                try:
+                    return await asyncio.wait_for(_call(), timeout=timeout_ms / 1000.0)
+                except asyncio.TimeoutError as exc:
+                    raise RuntimeError(f"primary timeout after {timeout_ms}ms") from exc
+            finally:
+                _provider_call_ms.set((time.perf_counter() - started) * 1000)
 
         sem = _get_global_api_semaphore()
         if sem is None:
@@ -423,8 +548,33 @@ class AITranslator:
                 logger.info(f'translate: out="{_sanitize_log_text(log_output)}"')
             return _FAILURE_MARKER
     
+    @staticmethod
+    def _response_text(text) -> str:
+        if text is None:
+            raise RuntimeError("empty response")
+        text = str(text).strip()
+        if not text:
+            raise RuntimeError("empty response")
+        return text
+
+    @staticmethod
+    def _log_openai_error(e: Exception) -> None:
+        # 记录详细错误信息
+        error_msg = f"{type(e).__name__}: {e}"
+        if hasattr(e, 'status_code'):
+            error_msg = f"HTTP {e.status_code}: {error_msg}"
+        if hasattr(e, 'response') and e.response:
+            try:
+                error_msg += f" | Response: {e.response.text[:200]}"
+            except:
+                pass
+        logger.error(f"OpenAI API error: {error_msg}")
+
     async def _call_api(self, prompt: str, max_tokens: int = 500) -> str:
         """统一的 API 调用方法。"""
+        if async_transport_enabled():
+            return await self._call_api_async(prompt, max_tokens=max_tokens)
+
         loop = asyncio.get_event_loop()
         
         if self.is_gemini:
@@ -439,13 +589,7 @@ class AITranslator:
                             temperature=0.3,  # Lower temp for faster, more consistent output
                         )
                     )
-                    text = getattr(response, "text", None)
-                    if text is None:
-                        raise RuntimeError("empty response")
-                    text = str(text).strip()
-                    if not text:
-                        raise RuntimeError("empty response")
-                    return text
+                    return self._response_text(getattr(response, "text", None))
                 except Exception as e:
                     logger.error(f"Gemini API error: {type(e).__name__}: {e}")
                     raise
@@ -461,45 +605,147 @@ class AITranslator:
                         max_tokens=max_tokens,
                         stream=False,
                     )
-                    content = response.choices[0].message.content
-                    if content is None:
-                        raise RuntimeError("empty response")
-                    content = str(content).strip()
-                    if not content:
-                        raise RuntimeError("empty response")
-                    return content
+                    return self._response_text(response.choices[0].message.content)
                 except Exception as e:
-                    # 记录详细错误信息
-                    error_msg = f"{type(e).__name__}: {e}"
-                    if hasattr(e, 'status_code'):
-                        error_msg = f"HTTP {e.status_code}: {error_msg}"
-                    if hasattr(e, 'response') and e.response:
-                        try:
-                            error_msg += f" | Response: {e.response.text[:200]}"
-                        except:
-                            pass
-                    logger.error(f"OpenAI API error: {error_msg}")
+                    self._log_openai_error(e)
                     raise
             
             return await loop.run_in_executor(None, call_openai)
-    
+
+    async def _call_api_async(self, prompt: str, max_tokens: int = 500) -> str:
+        """原生异步调用：不占用默认线程池，超时取消会真正中断 HTTP 请求。"""
+        if self.is_gemini:
+            from google.genai import types
+            client = get_async_gemini_client(self.api_key)
+            try:
+                response = await client.models.generate_content(
+                    model=self.model,
+                    contents=prompt,
+                    config=types.GenerateContentConfig(
+                        max_output_tokens=max_tokens,
+                        temperature=0.3,
+                    ),
+                )
+                return self._response_text(getattr(response, "text", None))
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Gemini API error: {type(e).__name__}: {e}")
+                raise
+
+        client = get_async_openai_client(self.base_url, self.api_key)
+        try:
+            response = await client.chat.completions.create(
+                model=self.model,
+                messages=[{"role": "user", "content": prompt}],
+                max_tokens=max_tokens,
+                stream=False,
+            )
+            return self._response_text(response.choices[0].message.content)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            self._log_openai_error(e)
+            raise
+
+    async def _call_api_stream(self, prompt: str, max_tokens: int, on_text) -> str:
+        """流式调用：每个增量文本片段交给 on_text，返回完整文本。"""
+        parts: list[str] = []
+
+        def _emit(delta) -> None:
+            if delta:
+                parts.append(delta)
+                on_text(delta)
+
+        if self.is_gemini:
+            from google.genai import types
+            client = get_async_gemini_client(self.api_key)
+            try:
+                stream = await client.models.generate_content_stream(
+                    model=self.model,
+                    contents=prompt,
+                    config=types.GenerateContentConfig(
+                        max_output_tokens=max_tokens,
+                        temperature=0.3,
+                    ),
+                )
+                async for chunk in stream:
+                    _emit(getattr(chunk, "text", None))
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Gemini API error: {type(e).__name__}: {e}")
+                raise
+            return self._response_text("".join(parts))
+
+        client = get_async_openai_client(self.base_url, self.api_key)
+        try:
+            stream = await client.chat.completions.create(
+                model=self.model,
+                messages=[{"role": "user", "content": prompt}],
+                max_tokens=max_tokens,
+                stream=True,
+            )
+            async for chunk in stream:
+                if chunk.choices:
+                    _emit(chunk.choices[0].delta.content)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            self._log_openai_error(e)
+            raise
+        return self._response_text("".join(parts))
+
+    def _memory_key(self, text: str, ctx: str, output_format: str) -> str:
+        return build_memory_key(
+            text,
+            ctx,
+            source_lang=self.source_lang,
+            target_lang=self.target_lang,
+            provider=self.provider,
+            model=self.model,
+            prompt_version=_PROMPT_VERSION,
+            output_format=output_format,
+        )
+
+    def forget_translations(
+        self,
+        texts: list[str],
+        contexts: Optional[list[str]] = None,
+        output_format: str = "numbered",
+    ) -> None:
+        """从翻译记忆中删除条目（下游判定结果不可用、需要重译时调用）。"""
+        memory = get_translation_memory()
+        if memory is None or not texts:
+            return
+        contexts = list(contexts or [])
+        contexts += [""] * (len(texts) - len(contexts))
+        keys = [
+            self._memory_key(_clean_batch_text(t), _clean_batch_text(c) if c else "", output_format)
+            for t, c in zip(texts, contexts)
+            if (t or "").strip()
+        ]
+        try:
+            memory.delete_many(keys)
+        except sqlite3.Error as exc:
+            logger.debug("translation memory delete failed: %s", exc)
+
     async def translate_batch(
         self,
         texts: list[str],
         output_format: str = "numbered",
         contexts: Optional[list[str]] = None,
+        on_item=None,
     ) -> list[str]:
-        """批量翻译多个文本。"""
+        """批量翻译多个文本。
+
+        on_item(index, translation): 流式模式下每条译文完成即回调（含翻译记忆命中）。
+        """
         if not texts:
             return []
         
         # 预处理文本
-        def clean_text(t: str) -> str:
-            if not t:
-                return ""
-            import re
-            cleaned = re.sub(r'[\x00-\x08\x0b\x0c\x0e-\x1f\x7f-\x9f]', '', t)
-            return cleaned[:500] if len(cleaned) > 500 else cleaned
+        clean_text = _clean_batch_text
 
         def _strip_code_fence(text: str) -> str:
             t = (text or "").strip()
@@ -590,8 +836,70 @@ class AITranslator:
             elif len(cleaned_contexts) > len(texts):
                 cleaned_contexts = cleaned_contexts[: len(texts)]
         valid_pairs = [(i, t) for i, t in enumerate(cleaned_texts) if t.strip()]
-        
-        if not valid_pairs:
+
+        # 翻译记忆：命中的条目直接回填，只把未命中的发给模型。
+        memory = get_translation_memory() if valid_pairs else None
+        memory_keys: dict[int, str] = {}
+        memory_hits: dict[int, str] = {}
+        if memory is not None:
+            memory_keys = {
+                idx: self._memory_key(text, cleaned_contexts[idx], output_format)
+                for idx, text in valid_pairs
+            }
+            try:
+                found = memory.get_many(memory_keys.values())
+            except sqlite3.Error as exc:
+                logger.debug("translation memory lookup failed: %s", exc)
+                found = {}
+            memory_hits = {idx: found[key] for idx, key in memory_keys.items() if key in found}
+        pending_pairs = [(i, t) for i, t in valid_pairs if i not in memory_hits]
+
+        streaming = _stream_enabled()
+        latency_model = get_latency_model(self.provider, self.model)
+        plan_metrics: dict = {}
+        stream_item_ms: list[float] = []
+        notified: set[int] = set()
+        notify_start = time.perf_counter()
+
+        def _notify(orig_idx: int, trans: str, streamed: bool = False) -> None:
+            if orig_idx in notified or not (trans or "").strip() or trans.startswith(_FAILURE_MARKER):
+                return
+            notified.add(orig_idx)
+            if streamed:
+                stream_item_ms.append((time.perf_counter() - notify_start) * 1000)
+            if on_item is None:
+                return
+            try:
+                on_item(orig_idx, trans)
+            except Exception as exc:
+                logger.debug("batch: on_item callback failed: %s", exc)
+
+        def _stream_metrics() -> dict:
+            if not streaming:
+                return {}
+            return {
+                "stream_items": len(stream_item_ms),
+                "stream_first_item_ms": round(min(stream_item_ms), 2) if stream_item_ms else None,
+                "stream_item_ms_avg": (
+                    round(sum(stream_item_ms) / len(stream_item_ms), 2) if stream_item_ms else None
+                ),
+            }
+
+        for orig_idx, trans in memory_hits.items():
+            _notify(orig_idx, trans)
+        memory_metrics = {
+            "stream": streaming,
+            "memory_enabled": memory is not None,
+            "memory_hits": len(memory_hits),
+            "memory_misses": len(pending_pairs) if memory is not None else 0,
+            "memory_hit_rate": (
+                round(len(memory_hits) / len(valid_pairs), 4)
+                if memory is not None and valid_pairs
+                else 0.0
+            ),
+        }
+
+        if not pending_pairs:
             self.last_metrics = {
                 "api_calls": 0,
                 "api_calls_fallback": 0,
@@ -600,14 +908,20 @@ class AITranslator:
                 "missing_number_retries": 0,
                 "slices": 0,
                 "items_total": len(texts),
-                "items_translated": 0,
+                "items_translated": len(valid_pairs),
                 "prompt_chars_total": 0,
                 "content_chars_total": 0,
                 "text_chars_total": 0,
                 "ctx_chars_total": 0,
                 "duration_ms": 0,
+                **memory_metrics,
+                **_stream_metrics(),
+                **plan_metrics,
             }
-            return ["" for _ in texts]
+            merged = ["" for _ in texts]
+            for orig_idx, trans in memory_hits.items():
+                merged[orig_idx] = trans
+            return merged
 
         log_mode, log_limit, log_ctx = _get_log_config()
         batch_start = time.perf_counter()
@@ -639,6 +953,38 @@ class AITranslator:
         # retry the same batch once with stricter formatting instructions and a larger max_tokens
         # headroom. This is usually faster/more stable than letting downstream mark them failed and
         # triggering per-item fallbacks.
+        _hangul_check = re.compile(r'[\uac00-\ud7a3]')
+        _cjk_check = re.compile(r"[\u4e00-\u9fff]")
+        target_is_zh = str(self.target_lang or "").lower().startswith("zh")
+
+        def _validate_item(orig_text: str, trans: str) -> str:
+            cleaned = _clean_ai_annotations(trans)
+            # Empty translation means AI skipped this number
+            if not cleaned.strip():
+                return _FAILURE_MARKER
+            # For zh targets, never let Hangul leak into output. If the provider
+            # returns Hangul (often alongside meta/analysis text), mark it as failed
+            # so upstream fallback can retry or keep original art/text.
+            if target_is_zh and _hangul_check.search(cleaned):
+                logger.warning("AI returned Hangul for zh target, marking as failed")
+                return _FAILURE_MARKER
+            # For zh targets, if the source contains Hangul but the output has no CJK,
+            # treat it as invalid (e.g. analysis/formatting noise) and mark as failed.
+            if (
+                target_is_zh
+                and _hangul_check.search(orig_text or "")
+                and not _cjk_check.search(cleaned)
+            ):
+                logger.warning(
+                    "AI returned non-CJK for Hangul source under zh target, marking as failed"
+                )
+                return _FAILURE_MARKER
+            # Detect Korean text returned unchanged (AI failed to translate names)
+            if _hangul_check.search(cleaned) and cleaned.strip() == orig_text.strip():
+                logger.warning(f"AI returned Korean unchanged: {orig_text}")
+                return _FAILURE_MARKER
+            return cleaned
+
         class _MissingNumberedItems(Exception):
             def __init__(self, missing: int):
                 super().__init__(f"missing numbered items: {missing}")
@@ -705,6 +1051,32 @@ class AITranslator:
                 f"batch: model={self.model} count={len(pairs)} total_len={len(numbered_texts)}{slice_note}"
             )
             force_strict_output = False
+            # 流式模式：已完成的条目（按 pairs 位置）；失败时只重试剩余条目。
+            stream_done: dict[int, str] = {}
+
+            def _on_stream_text(parser, delta: Optional[str]) -> None:
+                items = parser.feed(delta) if delta is not None else parser.close()
+                for n, trans in items:
+                    pos = n - 1
+                    if pos in stream_done:
+                        continue
+                    orig_idx, orig_text = pairs[pos]
+                    stream_done[pos] = _validate_item(orig_text, trans)
+                    _notify(orig_idx, stream_done[pos], streamed=True)
+
+            async def _retry_remaining(done: dict[int, str]) -> list[tuple[int, str]]:
+                nonlocal missing_number_retries
+                missing_number_retries += 1
+                remaining = [pair for pos, pair in enumerate(pairs) if pos not in done]
+                logger.warning(
+                    "batch: stream kept=%d retry remaining=%d%s",
+                    len(done),
+                    len(remaining),
+                    slice_note,
+                )
+                retried = await _translate_pairs(remaining, slice_idx, slice_total)
+                return [(pairs[pos][0], trans) for pos, trans in sorted(done.items())] + retried
+
             for attempt in range(max_retries + 1):
                 try:
                     start = time.perf_counter()
@@ -735,9 +1107,23 @@ class AITranslator:
                     text_chars_total += slice_text_chars
                     ctx_chars_total += slice_ctx_chars
                     api_calls_primary += 1
-                    result = await self._call_api_with_timeout(
-                        prompt_to_use, max_tokens=max_tokens
-                    )
+                    _provider_call_ms.set(None)
+                    if streaming:
+                        parser = (
+                            _JsonObjectStreamParser(len(pairs))
+                            if output_format == "json"
+                            else _NumberedStreamParser(len(pairs))
+                        )
+                        result = await self._call_api_with_timeout(
+                            prompt_to_use,
+                            max_tokens=max_tokens,
+                            on_text=lambda delta, _p=parser: _on_stream_text(_p, delta),
+                        )
+                        _on_stream_text(parser, None)
+                    else:
+                        result = await self._call_api_with_timeout(
+                            prompt_to_use, max_tokens=max_tokens
+                        )
                     # Defensive: some providers can return empty/None text without raising.
                     # Treat this as transient overload so fallback chain can take over.
                     if result is None:
@@ -748,6 +1134,12 @@ class AITranslator:
                     if not result:
                         raise RuntimeError("empty response")
                     duration_ms = (time.perf_counter() - start) * 1000
+                    # 只用 provider 调用本身的耗时训练延迟模型，信号量排队不计入
+                    call_ms = _provider_call_ms.get()
+                    latency_model.observe(
+                        estimate_tokens(numbered_texts),
+                        call_ms if call_ms is not None else duration_ms,
+                    )
 
                     # 解析结果
                     translations = []
@@ -768,6 +1160,14 @@ class AITranslator:
                     # as failures and trigger per-item fallback, which is slower and less stable.
                     if has_numbered:
                         missing = sum(1 for t in translations if not (t or "").strip())
+                        if missing and streaming and missing < len(pairs):
+                            # 截断/漏号：保留已完成条目，只重试缺失的条目。
+                            done = {
+                                pos: _validate_item(pairs[pos][1], t)
+                                for pos, t in enumerate(translations[: len(pairs)])
+                                if (t or "").strip()
+                            }
+                            return await _retry_remaining(done)
                         if missing:
                             raise _MissingNumberedItems(missing)
 
@@ -780,41 +1180,10 @@ class AITranslator:
                             if len(parts) == len(pairs):
                                 translations = parts
 
-                    slice_results: list[tuple[int, str]] = []
-                    import re as _re
-                    _hangul_check = _re.compile(r'[\uac00-\ud7a3]')
-                    _cjk_check = _re.compile(r"[\u4e00-\u9fff]")
-                    target_is_zh = str(self.target_lang or "").lower().startswith("zh")
-                    for (orig_idx, orig_text), trans in zip(pairs, translations):
-                        cleaned = _clean_ai_annotations(trans)
-                        # Empty translation means AI skipped this number
-                        if not cleaned.strip():
-                            slice_results.append((orig_idx, _FAILURE_MARKER))
-                        # For zh targets, never let Hangul leak into output. If the provider
-                        # returns Hangul (often alongside meta/analysis text), mark it as failed
-                        # so upstream fallback can retry or keep original art/text.
-                        elif target_is_zh and _hangul_check.search(cleaned):
-                            logger.warning(
-                                "AI returned Hangul for zh target, marking as failed"
-                            )
-                            slice_results.append((orig_idx, _FAILURE_MARKER))
-                        # For zh targets, if the source contains Hangul but the output has no CJK,
-                        # treat it as invalid (e.g. analysis/formatting noise) and mark as failed.
-                        elif (
-                            target_is_zh
-                            and _hangul_check.search(orig_text or "")
-                            and not _cjk_check.search(cleaned)
-                        ):
-                            logger.warning(
-                                "AI returned non-CJK for Hangul source under zh target, marking as failed"
-                            )
-                            slice_results.append((orig_idx, _FAILURE_MARKER))
-                        # Detect Korean text returned unchanged (AI failed to translate names)
-                        elif _hangul_check.search(cleaned) and cleaned.strip() == orig_text.strip():
-                            logger.warning(f"AI returned Korean unchanged: {orig_text}")
-                            slice_results.append((orig_idx, _FAILURE_MARKER))
-                        else:
-                            slice_results.append((orig_idx, cleaned))
+                    slice_results: list[tuple[int, str]] = [
+                        (orig_idx, _validate_item(orig_text, trans))
+                        for (orig_idx, orig_text), trans in zip(pairs, translations)
+                    ]
                     if len(translations) < len(pairs):
                         for i in range(len(translations), len(pairs)):
                             orig_idx, orig_text = pairs[i]
@@ -848,6 +1217,16 @@ class AITranslator:
                     return slice_results
 
                 except Exception as e:
+                    if (
+                        streaming
+                        and stream_done
+                        and len(stream_done) < len(pairs)
+                        and not isinstance(e, _MissingNumberedItems)
+                    ):
+                        # 流中断（超时/连接断开）：已解析的条目不丢弃。
+                        if "primary timeout after" in str(e).lower():
+                            timeouts_primary += 1
+                        return await _retry_remaining(dict(stream_done))
                     if isinstance(e, _MissingNumberedItems) and attempt < max_retries:
                         missing_number_retries += 1
                         logger.warning(
@@ -979,8 +1358,23 @@ class AITranslator:
 
         def _merge_results(result_pairs: list[tuple[int, str]]) -> list[str]:
             merged = ["" for _ in texts]
+            for orig_idx, trans in memory_hits.items():
+                merged[orig_idx] = trans
             for orig_idx, trans in result_pairs:
                 merged[orig_idx] = trans
+                _notify(orig_idx, trans)
+            if memory is not None:
+                fresh = {
+                    memory_keys[orig_idx]: trans
+                    for orig_idx, trans in result_pairs
+                    if orig_idx in memory_keys
+                    and (trans or "").strip()
+                    and not trans.startswith(_FAILURE_MARKER)
+                }
+                try:
+                    memory.put_many(fresh)
+                except sqlite3.Error as exc:
+                    logger.debug("translation memory write failed: %s", exc)
             return merged
 
         def _all_failed(result_pairs: list[tuple[int, str]]) -> bool:
@@ -1051,25 +1445,48 @@ class AITranslator:
         )
 
         # Build slices based on both item count and char budget (if enabled).
-        if len(valid_pairs) <= chunk_size and char_budget <= 0:
-            slices = [valid_pairs]
+        if adaptive_batch_enabled() and len(pending_pairs) > 1:
+            # 按估算 token 预先切分，切片数/并发由该 provider 的延迟模型决定。
+            plan = plan_batch(
+                pending_pairs,
+                [
+                    estimate_tokens(text) + estimate_tokens(cleaned_contexts[orig_idx])
+                    for orig_idx, text in pending_pairs
+                ],
+                latency_model,
+                max_items=chunk_size,
+                max_concurrency=concurrency,
+            )
+            slices = plan.slices
+            concurrency = plan.concurrency
+            plan_metrics = plan.to_metrics(latency_model)
+            logger.info(
+                "batch: adaptive plan slices=%d concurrency=%d tokens=%d predicted_ms=%.0f samples=%d",
+                len(slices),
+                concurrency,
+                plan.tokens_total,
+                plan.predicted_ms,
+                latency_model.samples,
+            )
+        elif len(pending_pairs) <= chunk_size and char_budget <= 0:
+            slices = [pending_pairs]
         else:
             slices = _split_pairs(
-                valid_pairs,
+                pending_pairs,
                 max_items=chunk_size,
                 max_chars=char_budget,
             )
 
         if len(slices) == 1:
             single_results = await _translate_pairs(slices[0])
-            should_fallback = len(valid_pairs) > 1 and _all_failed(single_results)
+            should_fallback = len(pending_pairs) > 1 and _all_failed(single_results)
             if should_fallback:
                 # If the configured fallback chunk size is >= current batch size (common for
                 # small pages), shrink it so we actually reduce prompt/output size and can
                 # recover from format/truncation failures.
                 effective_chunk_size = fallback_chunk_size
-                if effective_chunk_size >= len(valid_pairs):
-                    effective_chunk_size = max(1, len(valid_pairs) // 2)
+                if effective_chunk_size >= len(pending_pairs):
+                    effective_chunk_size = max(1, len(pending_pairs) // 2)
                 logger.warning(
                     "batch: full batch failed, fallback chunk_size=%d effective_chunk_size=%d concurrency=%d",
                     fallback_chunk_size,
@@ -1077,7 +1494,7 @@ class AITranslator:
                     concurrency,
                 )
                 fallback_slices = _split_pairs(
-                    valid_pairs,
+                    pending_pairs,
                     max_items=effective_chunk_size,
                     max_chars=char_budget,
                 )
@@ -1101,6 +1518,9 @@ class AITranslator:
                     "concurrency": concurrency,
                     "fallback_chunk_size": fallback_chunk_size,
                     "duration_ms": round(duration_ms, 2),
+                    **memory_metrics,
+                    **_stream_metrics(),
+                    **plan_metrics,
                 }
                 return _merge_results(chunked_results)
             duration_ms = (time.perf_counter() - batch_start) * 1000
@@ -1122,6 +1542,9 @@ class AITranslator:
                 "concurrency": concurrency,
                 "fallback_chunk_size": fallback_chunk_size,
                 "duration_ms": round(duration_ms, 2),
+                **memory_metrics,
+                **_stream_metrics(),
+                **plan_metrics,
             }
             return _merge_results(single_results)
 
@@ -1145,6 +1568,9 @@ class AITranslator:
             "concurrency": concurrency,
             "fallback_chunk_size": fallback_chunk_size,
             "duration_ms": round(duration_ms, 2),
+            **memory_metrics,
+            **_stream_metrics(),
+            **plan_metrics,
         }
         return _merge_results(chunked_results)
 
@@ -0,0 +1,253 @@
+"""Background writer for quality reports and debug artifacts.
+
+Report JSON, its index row and debug overlays (PNG encodes of full pages) used
+to be written inline on the event loop. ``ArtifactSink`` runs them on one
+daemon thread fed by a bounded queue:
+
+- jobs submitted with the same ``key`` while still queued are coalesced (the
+  newest arguments win; e.g. the inpainter writing the mask twice);
+- the worker drains up to ``batch_size`` jobs per wake-up and runs each job's
+  ``on_batch_end`` hook once per batch (the report index commits once per
+  batch instead of once per page);
+- when the queue is full, ``policy="drop"`` jobs (debug artifacts) are
+  discarded, and ``policy="degrade"`` jobs (reports) evict a queued droppable
+  job or, failing that, run inline in the caller (``submit_async`` runs them in
+  a worker thread instead, so the event loop is never blocked on a write).
+
+Env:
+    ARTIFACT_SINK_ASYNC: 1/0 (default 1; 0 = write inline like before)
+    ARTIFACT_SINK_QUEUE: max queued jobs (default 64)
+    ARTIFACT_SINK_BATCH: max jobs per worker batch (default 16)
+"""
+
+from __future__ import annotations
+
+import asyncio
+import atexit
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+from typing import Any, Callable, Hashable, Optional
+
+from .utils.env import read_env_int
+
+logger = logging.getLogger(__name__)
+
+
+def artifact_sink_enabled() -> bool:
+    return os.getenv("ARTIFACT_SINK_ASYNC", "1") == "1"
+
+
+class _Job:
+    __slots__ = ("fn", "args", "policy", "on_batch_end", "future")
+
+    def __init__(self, fn, args, policy, on_batch_end) -> None:
+        self.fn = fn
+        self.args = args
+        self.policy = policy
+        self.on_batch_end = on_batch_end
+        self.future: Future = Future()
+
+
+class ArtifactSink:
+    """Bounded, coalescing single-thread writer."""
+
+    def __init__(self, max_pending: int = 64, batch_size: int = 16) -> None:
+        self.max_pending = max(1, int(max_pending))
+        self.batch_size = max(1, int(batch_size))
+        self._pending: "OrderedDict[Hashable, _Job]" = OrderedDict()
+        self._cond = threading.Condition()
+        self._running = 0
+        self._closed = False
+        self._thread: Optional[threading.Thread] = None
+        self._seq = 0
+        self._counters = {
+            "submitted": 0,
+            "written": 0,
+            "coalesced": 0,
+            "dropped": 0,
+            "degraded": 0,
+            "errors": 0,
+            "batches": 0,
+            "max_depth": 0,
+        }
+        self.write_ms_last = 0.0
+
+    def submit(
+        self,
+        fn: Callable[..., Any],
+        *args: Any,
+        key: Optional[Hashable] = None,
+        policy: str = "drop",
+        on_batch_end: Optional[Callable[[], Any]] = None,
+    ) -> Optional[Future]:
+        """Queue ``fn(*args)``; returns its future, or None when dropped."""
+        future, inline = self._enqueue(fn, args, key, policy, on_batch_end)
+        if inline is not None:
+            # 队列已满且没有可丢弃的任务：在调用方线程内直接写（降级）
+            self._run_batch([inline])
+        return future
+
+    async def submit_async(
+        self,
+        fn: Callable[..., Any],
+        *args: Any,
+        key: Optional[Hashable] = None,
+        policy: str = "drop",
+        on_batch_end: Optional[Callable[[], Any]] = None,
+    ) -> Optional[Future]:
+        """``submit`` for coroutines: a degraded write runs via ``asyncio.to_thread``."""
+        future, inline = self._enqueue(fn, args, key, policy, on_batch_end)
+        if inline is not None:
+            await asyncio.to_thread(self._run_batch, [inline])
+        return future
+
+    def _enqueue(
+        self,
+        fn: Callable[..., Any],
+        args: tuple,
+        key: Optional[Hashable],
+        policy: str,
+        on_batch_end: Optional[Callable[[], Any]],
+    ) -> tuple[Optional[Future], Optional[_Job]]:
+        """Returns (future, job the caller must run itself when degraded)."""
+        with self._cond:
+            self._counters["submitted"] += 1
+            if self._closed:
+                self._counters["dropped"] += 1
+                return None, None
+            if key is not None and key in self._pending:
+                job = self._pending[key]
+                job.fn, job.args, job.on_batch_end = fn, args, on_batch_end
+                self._counters["coalesced"] += 1
+                return job.future, None
+            if len(self._pending) >= self.max_pending and not (
+                policy == "degrade" and self._evict_droppable_locked()
+            ):
+                if policy != "degrade":
+                    self._counters["dropped"] += 1
+                    return None, None
+                self._counters["degraded"] += 1
+                inline = _Job(fn, args, policy, on_batch_end)
+                return inline.future, inline
+            job = _Job(fn, args, policy, on_batch_end)
+            if key is None:
+                self._seq += 1
+                key = ("_anon", self._seq)
+            self._pending[key] = job
+            depth = len(self._pending)
+            if depth > self._counters["max_depth"]:
+                self._counters["max_depth"] = depth
+            self._ensure_thread_locked()
+            self._cond.notify()
+            return job.future, None
+
+    def _evict_droppable_locked(self) -> bool:
+        for key, job in self._pending.items():
+            if job.policy == "drop":
+                del self._pending[key]
+                job.future.set_result(None)
+                self._counters["dropped"] += 1
+                return True
+        return False
+
+    def _ensure_thread_locked(self) -> None:
+        if self._thread is None or not self._thread.is_alive():
+            self._thread = threading.Thread(
+                target=self._worker, name="artifact-sink", daemon=True
+            )
+            self._thread.start()
+
+    def _worker(self) -> None:
+        while True:
+            with self._cond:
+                while not self._pending and not self._closed:
+                    self._cond.wait()
+                if not self._pending:
+                    return
+                batch = []
+                while self._pending and len(batch) < self.batch_size:
+                    batch.append(self._pending.popitem(last=False)[1])
+                self._running += len(batch)
+            try:
+                self._run_batch(batch)
+            finally:
+                with self._cond:
+                    self._running -= len(batch)
+                    self._cond.notify_all()
+
+    def _run_batch(self, batch: list[_Job]) -> None:
+        started = time.perf_counter()
+        outcomes = []
+        hooks: list[Callable[[], Any]] = []
+        for job in batch:
+            try:
+                outcomes.append((job, job.fn(*job.args), None))
+            except BaseException as exc:  # noqa: BLE001 - 交给 future 的调用方处理
+                outcomes.append((job, None, exc))
+            if job.on_batch_end is not None and job.on_batch_end not in hooks:
+                hooks.append(job.on_batch_end)
+        for hook in hooks:
+            try:
+                hook()
+            except Exception as exc:  # noqa: BLE001
+                logger.warning("Artifact sink batch hook failed: %s", exc)
+        errors = 0
+        for job, result, exc in outcomes:
+            if exc is None:
+                job.future.set_result(result)
+            else:
+                errors += 1
+                logger.debug("Artifact write failed: %s", exc)
+                job.future.set_exception(exc)
+        with self._cond:
+            self._counters["written"] += len(batch) - errors
+            self._counters["errors"] += errors
+            self._counters["batches"] += 1
+        self.write_ms_last = (time.perf_counter() - started) * 1000
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """Block until every queued job has been written; False on timeout."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._cond:
+            while self._pending or self._running:
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return False
+                self._cond.wait(remaining)
+        return True
+
+    def close(self, timeout: Optional[float] = 10.0) -> None:
+        self.flush(timeout)
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+
+    def stats(self) -> dict[str, Any]:
+        with self._cond:
+            return {
+                **self._counters,
+                "queue_depth": len(self._pending),
+                "max_pending": self.max_pending,
+                "write_ms_last": round(self.write_ms_last, 2),
+            }
+
+
+_sink: Optional[ArtifactSink] = None
+_sink_lock = threading.Lock()
+
+
+def get_artifact_sink() -> ArtifactSink:
+    """Process-wide sink; pending writes are flushed at interpreter exit."""
+    global _sink
+    with _sink_lock:
+        if _sink is None:
+            _sink = ArtifactSink(
+                max_pending=read_env_int("ARTIFACT_SINK_QUEUE", 64),
+                batch_size=read_env_int("ARTIFACT_SINK_BATCH", 16),
+            )
+            atexit.register(_sink.flush, 10.0)
+        return _sink
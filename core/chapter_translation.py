@@ -0,0 +1,240 @@
+"""Chapter-level translation batching.
+
+Each page's ``TranslatorModule.process`` normally sends its own 5-15 groups to
+the LLM, so a 60-page chapter pays the request latency floor 60+ times. In
+chapter mode several pages translate concurrently and their ``translate_batch``
+calls are coalesced here into char-budgeted multi-page requests; results are
+fanned back to the calling page unchanged, so grouping, crosspage and carryover
+handling in the translator stay exactly as before.
+
+A page's requests are flushed when every active page is waiting on the batcher,
+when the pending text exceeds the char budget, or after a short linger window.
+
+Env:
+    TRANSLATE_CHAPTER_BATCH: 1/0 (default 0)
+    TRANSLATE_CHAPTER_BATCH_CHAR_BUDGET: max source chars per merged request
+        (default 3000; one page's request is never split)
+    TRANSLATE_CHAPTER_BATCH_LINGER_MS: max wait for other pages (default 150)
+"""
+
+from __future__ import annotations
+
+import asyncio
+import contextvars
+import logging
+import os
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Optional
+
+from .utils.env import read_env_int
+
+logger = logging.getLogger(__name__)
+
+# TranslatorModule._get_ai_translator 优先返回当前页的批处理句柄。
+current_page_translator: contextvars.ContextVar = contextvars.ContextVar(
+    "chapter_page_translator", default=None
+)
+
+
+def chapter_batch_enabled() -> bool:
+    return os.getenv("TRANSLATE_CHAPTER_BATCH", "0") == "1"
+
+
+class _PendingRequest:
+    __slots__ = ("handle", "texts", "contexts", "output_format", "future", "chars", "on_item")
+
+    def __init__(self, handle, texts, contexts, output_format, future, on_item=None):
+        self.handle = handle
+        self.on_item = on_item
+        self.texts = texts
+        self.contexts = contexts
+        self.output_format = output_format
+        self.future = future
+        self.chars = sum(len(t or "") for t in texts) + sum(len(c or "") for c in contexts)
+
+
+class _PageTranslator:
+    """Per-page stand-in for the AI translator; only translate_batch is coalesced."""
+
+    def __init__(self, batcher: "ChapterTranslationBatcher"):
+        self._batcher = batcher
+        self.last_metrics: Optional[dict] = None
+
+    def __getattr__(self, name):
+        return getattr(self._batcher.translator, name)
+
+    async def translate_batch(
+        self,
+        texts: list[str],
+        output_format: str = "numbered",
+        contexts: Optional[list[str]] = None,
+        on_item=None,
+    ) -> list[str]:
+        if not texts:
+            return []
+        return await self._batcher.submit(
+            self, list(texts), contexts, output_format, on_item=on_item
+        )
+
+
+class ChapterTranslationBatcher:
+    """Coalesce translate_batch calls from concurrently translating pages."""
+
+    def __init__(
+        self,
+        translator,
+        char_budget: Optional[int] = None,
+        linger_ms: Optional[int] = None,
+    ):
+        self.translator = translator
+        self.char_budget = (
+            char_budget
+            if char_budget is not None
+            else read_env_int("TRANSLATE_CHAPTER_BATCH_CHAR_BUDGET", 3000, minimum=0)
+        )
+        self.linger_s = (
+            linger_ms
+            if linger_ms is not None
+            else read_env_int("TRANSLATE_CHAPTER_BATCH_LINGER_MS", 150, minimum=0)
+        ) / 1000.0
+        self._active = 0
+        self._reserved = 0
+        self._pending: list[_PendingRequest] = []
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._flush_tasks: set[asyncio.Task] = set()
+        self.requests_in = 0
+        self.requests_out = 0
+
+    def expect(self, pages: int) -> None:
+        """Pre-register pages that are about to start, so early pages wait for them."""
+        self._active += max(0, pages)
+        self._reserved += max(0, pages)
+
+    @asynccontextmanager
+    async def page(self) -> AsyncIterator[_PageTranslator]:
+        """Register one translating page and route its AI calls through the batcher."""
+        handle = _PageTranslator(self)
+        if self._reserved:
+            self._reserved -= 1
+        else:
+            self._active += 1
+        token = current_page_translator.set(handle)
+        try:
+            yield handle
+        finally:
+            current_page_translator.reset(token)
+            self._active -= 1
+            self._maybe_flush()
+
+    async def submit(
+        self,
+        handle: _PageTranslator,
+        texts: list[str],
+        contexts: Optional[list[str]],
+        output_format: str,
+        on_item=None,
+    ) -> list[str]:
+        contexts = list(contexts or [])[: len(texts)]
+        contexts += [""] * (len(texts) - len(contexts))
+        future = asyncio.get_running_loop().create_future()
+        self._pending.append(
+            _PendingRequest(handle, texts, contexts, output_format, future, on_item)
+        )
+        self.requests_in += 1
+        self._maybe_flush()
+        return await future
+
+    def _maybe_flush(self) -> None:
+        if not self._pending:
+            return
+        waiting_pages = len({id(req.handle) for req in self._pending})
+        pending_chars = sum(req.chars for req in self._pending)
+        if waiting_pages >= self._active or (
+            self.char_budget and pending_chars >= self.char_budget
+        ):
+            self._flush()
+        elif self._timer is None:
+            self._timer = asyncio.get_running_loop().call_later(self.linger_s, self._flush)
+
+    def _flush(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        pending, self._pending = self._pending, []
+        for chunk in self._pack(pending):
+            task = asyncio.ensure_future(self._send(chunk))
+            self._flush_tasks.add(task)
+            task.add_done_callback(self._flush_tasks.discard)
+
+    def _pack(self, pending: list[_PendingRequest]) -> list[list[_PendingRequest]]:
+        by_format: dict[str, list[_PendingRequest]] = {}
+        for req in pending:
+            by_format.setdefault(req.output_format, []).append(req)
+        chunks: list[list[_PendingRequest]] = []
+        for reqs in by_format.values():
+            cur: list[_PendingRequest] = []
+            cur_chars = 0
+            for req in reqs:
+                if cur and self.char_budget and cur_chars + req.chars > self.char_budget:
+                    chunks.append(cur)
+                    cur, cur_chars = [], 0
+                cur.append(req)
+                cur_chars += req.chars
+            if cur:
+                chunks.append(cur)
+        return chunks
+
+    async def _send(self, chunk: list[_PendingRequest]) -> None:
+        texts = [t for req in chunk for t in req.texts]
+        contexts = [c for req in chunk for c in req.contexts]
+        self.requests_out += 1
+        payload = {"output_format": chunk[0].output_format, "contexts": contexts}
+        owners: list[tuple[_PendingRequest, int]] = [
+            (req, i) for req in chunk for i in range(len(req.texts))
+        ]
+        if any(req.on_item is not None for req in chunk):
+
+            def _dispatch(index: int, translation: str) -> None:
+                if 0 <= index < len(owners):
+                    req, local_index = owners[index]
+                    if req.on_item is not None:
+                        req.on_item(local_index, translation)
+
+            payload["on_item"] = _dispatch
+        try:
+            outputs = await self.translator.translate_batch(texts, **payload)
+            # 直接 await 后立即读取，避免被同一 translator 上的并发请求覆盖。
+            metrics = dict(getattr(self.translator, "last_metrics", None) or {})
+        except Exception as exc:
+            for req in chunk:
+                if not req.future.done():
+                    req.future.set_exception(exc)
+            return
+
+        outputs = list(outputs or [])
+        outputs += [""] * (len(texts) - len(outputs))
+        pages = len({id(req.handle) for req in chunk})
+        offset = 0
+        for position, req in enumerate(chunk):
+            part = outputs[offset : offset + len(req.texts)]
+            offset += len(req.texts)
+            if position == 0:
+                # 合并请求的计数只记到第一个页面，按页汇总时总数不变。
+                page_metrics = dict(metrics)
+            else:
+                page_metrics = {
+                    k: (0 if isinstance(v, int) and not isinstance(v, bool) else v)
+                    for k, v in metrics.items()
+                }
+            page_metrics["chapter_batch_pages"] = pages
+            page_metrics["chapter_batch_items"] = len(texts)
+            req.handle.last_metrics = page_metrics
+            if not req.future.done():
+                req.future.set_result(part)
+        logger.info(
+            "chapter batch: pages=%d items=%d chars=%d format=%s",
+            pages,
+            len(texts),
+            sum(req.chars for req in chunk),
+            chunk[0].output_format,
+        )
@@ -6,6 +6,7 @@ import cv2
 import numpy as np
 from PIL import Image, ImageDraw, ImageFont
 
+from .artifact_sink import artifact_sink_enabled, get_artifact_sink
 from .image_io import save_image
 
 
@@ -14,6 +15,28 @@ class DebugArtifactWriter:
         self.enabled = enabled if enabled is not None else os.getenv("DEBUG_ARTIFACTS") == "1"
         self.output_dir = Path(output_dir)
 
+    def submit(self, method: str, context, *args):
+        """Run ``self.<method>(snapshot, *args)`` on the artifact sink.
+
+        Overlays are drawn from a snapshot of the context so later stages can
+        keep mutating regions; a full sink queue drops the write.
+        """
+        if not self.enabled:
+            return None
+        snapshot = context.model_copy(
+            update={"regions": [r.model_copy(deep=True) for r in context.regions or []]}
+        )
+        write = getattr(self, method)
+        if not artifact_sink_enabled():
+            return write(snapshot, *args)
+        return get_artifact_sink().submit(
+            write,
+            snapshot,
+            *args,
+            key=("debug", str(context.task_id), method),
+            policy="drop",
+        )
+
     def _task_dir(self, task_id: str) -> Path:
         return self.output_dir / str(task_id)
 
@@ -14,3 +14,10 @@ class OCRNoTextError(PipelineStageError):
 
     def __init__(self, message: str = "OCR found no text regions"):
         super().__init__(message, error_code="ocr_no_text")
+
+
+class InpaintedImageMissingError(PipelineStageError):
+    """Raised when the inpainted background is gone before rendering."""
+
+    def __init__(self, message: str = "Inpainted image is no longer available"):
+        super().__init__(message, error_code="inpainted_missing")
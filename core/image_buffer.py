@@ -0,0 +1,189 @@
+"""
+Per-task decoded image buffer shared between pipeline stages.
+
+Without it every stage decodes the page again (OCR, bubble detection, mask
+building, inpainting, rendering) and the inpainted intermediate goes through a
+lossless WebP encode/decode round trip. The buffer keeps the decoded original
+and the inpainted result in memory, keyed by task_id, until the pipeline run
+finishes. ``Pipeline`` pins the buffer of every page it is running, so the LRU
+bound only evicts buffers nobody is running any more (standalone module use);
+the decoded original is shared between stages and marked read-only.
+
+Env:
+    PIPELINE_IMAGE_BUFFER: 1=enabled (default), 0=always go through disk
+    PIPELINE_IMAGE_BUFFER_SPILL: 1=also write inpainted/mask intermediates
+        to disk (debug / resume). Forced on when DEBUG_ARTIFACTS=1.
+    PIPELINE_IMAGE_BUFFER_MAX_TASKS: max unpinned task buffers (LRU, default 8)
+"""
+
+from __future__ import annotations
+
+import os
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Optional
+
+import cv2
+import numpy as np
+
+
+def image_buffer_enabled() -> bool:
+    return os.getenv("PIPELINE_IMAGE_BUFFER", "1") != "0"
+
+
+def image_buffer_spill_enabled() -> bool:
+    if os.getenv("DEBUG_ARTIFACTS") == "1":
+        return True
+    return os.getenv("PIPELINE_IMAGE_BUFFER_SPILL", "0") == "1"
+
+
+def _max_tasks() -> int:
+    raw = os.getenv("PIPELINE_IMAGE_BUFFER_MAX_TASKS", "8")
+    try:
+        value = int(raw)
+    except ValueError:
+        return 8
+    return value if value > 0 else 8
+
+
+def _path_key(image_path: str) -> str:
+    try:
+        return str(Path(image_path).resolve())
+    except Exception:
+        return str(image_path)
+
+
+@dataclass
+class TaskImageBuffer:
+    """Decoded images for one task. Arrays are BGR (mask: single channel)."""
+
+    task_id: str
+    image_path: str
+    original: Optional[np.ndarray] = None
+    inpainted: Optional[np.ndarray] = None
+    mask: Optional[np.ndarray] = None
+    # 渲染结果（仅在后面还有超分阶段时保留），rendered_path 为其落盘路径
+    rendered: Optional[np.ndarray] = None
+    rendered_path: Optional[str] = None
+
+
+class ImageBufferStore:
+    """LRU-bounded map task_id -> TaskImageBuffer, with a path index.
+
+    Pinned buffers (pages a pipeline is running) are never evicted and do not
+    count towards ``max_tasks``; they stay until ``release``.
+    """
+
+    def __init__(self, max_tasks: int = 8):
+        self.max_tasks = max(1, int(max_tasks))
+        self._buffers: "OrderedDict[str, TaskImageBuffer]" = OrderedDict()
+        # 同一文件可能同时属于多个任务（重复提交同一页），按任务记录，最新的在最后
+        self._by_path: dict[str, list[str]] = {}
+        self._pinned: set[str] = set()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._buffers)
+
+    def acquire(self, task_id, image_path: str, pin: bool = False) -> TaskImageBuffer:
+        """Return the buffer for task_id, creating it if needed."""
+        key = str(task_id)
+        with self._lock:
+            buffer = self._buffers.get(key)
+            if buffer is None:
+                buffer = TaskImageBuffer(task_id=key, image_path=image_path)
+                self._buffers[key] = buffer
+                self._by_path.setdefault(_path_key(image_path), []).append(key)
+            else:
+                self._buffers.move_to_end(key)
+            if pin:
+                self._pinned.add(key)
+            self._evict()
+            return buffer
+
+    def pin(self, task_id, image_path: str) -> TaskImageBuffer:
+        """Acquire and keep the buffer until ``release`` (live pipeline run)."""
+        return self.acquire(task_id, image_path, pin=True)
+
+    def is_pinned(self, task_id) -> bool:
+        with self._lock:
+            return str(task_id) in self._pinned
+
+    def get(self, task_id) -> Optional[TaskImageBuffer]:
+        with self._lock:
+            return self._buffers.get(str(task_id))
+
+    def find_by_path(self, image_path: str) -> Optional[TaskImageBuffer]:
+        with self._lock:
+            keys = self._by_path.get(_path_key(image_path))
+            return self._buffers.get(keys[-1]) if keys else None
+
+    def release(self, task_id) -> None:
+        key = str(task_id)
+        with self._lock:
+            self._pinned.discard(key)
+            buffer = self._buffers.pop(key, None)
+            if buffer is not None:
+                self._forget_path(buffer)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._buffers.clear()
+            self._by_path.clear()
+            self._pinned.clear()
+
+    def _evict(self) -> None:
+        unpinned = [key for key in self._buffers if key not in self._pinned]
+        for key in unpinned[: max(0, len(unpinned) - self.max_tasks)]:
+            self._forget_path(self._buffers.pop(key))
+
+    def _forget_path(self, buffer: TaskImageBuffer) -> None:
+        path_key = _path_key(buffer.image_path)
+        keys = self._by_path.get(path_key)
+        if not keys:
+            return
+        try:
+            keys.remove(buffer.task_id)
+        except ValueError:
+            pass
+        if not keys:
+            del self._by_path[path_key]
+
+
+_store: Optional[ImageBufferStore] = None
+_store_lock = threading.Lock()
+
+
+def get_image_buffer_store() -> ImageBufferStore:
+    global _store
+    with _store_lock:
+        if _store is None:
+            _store = ImageBufferStore(max_tasks=_max_tasks())
+        return _store
+
+
+def read_image(image_path: str) -> Optional[np.ndarray]:
+    """
+    Drop-in for cv2.imread(image_path).
+
+    If a live task buffer owns this path the decoded original is returned
+    (decoding it once on first use); otherwise falls back to cv2.imread.
+    The buffered array is shared between stages and tasks on the same file,
+    so it is marked read-only; callers that draw on it must copy first.
+    """
+    if not image_buffer_enabled():
+        return cv2.imread(image_path)
+    buffer = get_image_buffer_store().find_by_path(image_path)
+    if buffer is None:
+        return cv2.imread(image_path)
+    if buffer.original is None:
+        decoded = cv2.imread(image_path)
+        if decoded is None:
+            return None
+        decoded.setflags(write=False)
+        # Concurrent first readers may both decode; keep whichever landed first.
+        if buffer.original is None:
+            buffer.original = decoded
+    return buffer.original
@@ -31,6 +31,14 @@ class PipelineMetrics:
     """Complete metrics for a pipeline run."""
     total_duration_ms: float = 0.0
     stages: list[StageMetrics] = field(default_factory=list)
+    # Staged batch mode only: time this page spent waiting in each stage's input queue.
+    stage_queue_wait_ms: dict = field(default_factory=dict)
+    # Staged batch mode only: busy ratio of each stage's worker pool over the batch.
+    stage_occupancy: dict = field(default_factory=dict)
+    # Time from task creation to the start of this run (semaphores, page scheduler).
+    queue_wait_ms: float = 0.0
+    # Page scheduler priority class the wait was spent in (interactive/head/bulk).
+    queue_class: Optional[str] = None
     
     def add_stage(self, metrics: StageMetrics):
         self.stages.append(metrics)
@@ -53,10 +61,22 @@ class PipelineMetrics:
         return "\n".join(lines)
     
     def to_dict(self) -> dict:
-        return {
+        data = {
             "total_duration_ms": round(self.total_duration_ms, 2),
             "stages": [s.to_dict() for s in self.stages],
+            "queue_wait_ms": round(self.queue_wait_ms, 2),
         }
+        if self.queue_class:
+            data["queue_class"] = self.queue_class
+        if self.stage_queue_wait_ms:
+            data["stage_queue_wait_ms"] = {
+                k: round(v, 2) for k, v in self.stage_queue_wait_ms.items()
+            }
+        if self.stage_occupancy:
+            data["stage_occupancy"] = {
+                k: round(v, 3) for k, v in self.stage_occupancy.items()
+            }
+        return data
 
 
 class Timer:
@@ -1,5 +1,6 @@
 """Model registry and warmup helpers for OCR/Inpainting."""
 
+import asyncio
 from dataclasses import dataclass
 from inspect import isawaitable
 from typing import Dict, Optional
@@ -8,6 +9,7 @@ import os
 
 from core.vision.ocr.cache import get_cached_ocr
 from core.vision.inpainter import create_inpainter
+from core.modules.upscaler import warmup_upscaler
 
 
 @dataclass
@@ -23,6 +25,7 @@ class ModelRegistry:
             "ppocr_det": ModelState(name="ppocr_det"),
             "ppocr_rec": ModelState(name="ppocr_rec"),
             "lama": ModelState(name="lama"),
+            "upscaler": ModelState(name="upscaler"),
         }
 
     def set_status(self, name: str, status: str, error: Optional[str] = None):
@@ -72,3 +75,10 @@ class ModelWarmupService:
             self.registry.set_status("lama", "ready")
         except Exception as exc:
             self.registry.set_status("lama", "failed", str(exc))
+
+        try:
+            # 仅在启用超分且使用 pytorch 后端时预加载；否则保持 missing
+            if await asyncio.to_thread(warmup_upscaler):
+                self.registry.set_status("upscaler", "ready")
+        except Exception as exc:
+            self.registry.set_status("upscaler", "failed", str(exc))
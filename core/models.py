@@ -119,6 +119,7 @@ class TaskContext(BaseModel):
     image_path: str = Field(..., description="Path to source image")
     output_path: Optional[str] = Field(default=None, description="Path to output image")
     inpainted_path: Optional[str] = Field(default=None, description="Path to inpainted intermediate image")
+    inpainted_buffered: bool = Field(default=False, description="Inpainted image is held in the task image buffer")
     mask_path: Optional[str] = Field(default=None, description="Path to combined inpaint mask")
     regions: list[RegionData] = Field(default_factory=list, description="Detected text regions")
     status: TaskStatus = Field(default=TaskStatus.PENDING, description="Current task status")
@@ -215,3 +216,9 @@ class TaskStatusResponse(BaseModel):
     progress: float = Field(default=0.0, ge=0.0, le=1.0, description="Progress 0-1")
     output_path: Optional[str] = None
     error_message: Optional[str] = None
+    stage: Optional[str] = Field(default=None, description="Last completed pipeline stage")
+    eta_seconds: Optional[float] = Field(default=None, description="Estimated seconds left")
+    stage_timings_ms: dict[str, float] = Field(default_factory=dict)
+    manga_id: Optional[str] = None
+    chapter_id: Optional[str] = None
+    image_name: Optional[str] = None
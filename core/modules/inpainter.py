@@ -13,6 +13,13 @@ from ..models import RegionData, TaskContext
 from ..modules.base import BaseModule
 from ..vision import Inpainter, create_inpainter
 from ..debug_artifacts import DebugArtifactWriter
+from ..image_buffer import (
+    get_image_buffer_store,
+    image_buffer_enabled,
+    image_buffer_spill_enabled,
+    read_image,
+)
+from ..image_io import save_image
 
 # 配置日志
 logger = logging.getLogger(__name__)
@@ -64,6 +71,7 @@ class InpainterModule(BaseModule):
                 self.output_dir = fallback_base
             self.output_dir.mkdir(parents=True, exist_ok=True)
         self.dilation = dilation
+        self.last_metrics: Optional[dict] = None
 
     async def process(self, context: TaskContext) -> TaskContext:
         """
@@ -84,14 +92,21 @@ class InpainterModule(BaseModule):
         import time
         start_time = time.perf_counter()
 
+        buffer = None
+        if image_buffer_enabled() and hasattr(self.inpainter, "inpaint_regions_array"):
+            buffer = get_image_buffer_store().acquire(context.task_id, context.image_path)
+
         image_height = None
-        try:
-            from PIL import Image
+        if buffer is not None and buffer.original is not None:
+            image_height = buffer.original.shape[0]
+        else:
+            try:
+                from PIL import Image
 
-            with Image.open(context.image_path) as img:
-                image_height = img.height
-        except Exception:
-            image_height = None
+                with Image.open(context.image_path) as img:
+                    image_height = img.height
+            except Exception:
+                image_height = None
 
         def _should_inpaint(region) -> bool:
             if getattr(region, "inpaint_mode", "replace") == "erase":
@@ -130,6 +145,11 @@ class InpainterModule(BaseModule):
         # 生成中间文件路径（擦除后的图片）
         inpainted_path = self.output_dir / f"inpainted_{context.task_id}.png"
 
+        if buffer is not None:
+            return await self._process_buffered(
+                context, buffer, regions_to_inpaint, inpainted_path, start_time
+            )
+
         # Run inpainting - 只处理有翻译的区域
         result = await self.inpainter.inpaint_regions(
             context.image_path,
@@ -138,10 +158,14 @@ class InpainterModule(BaseModule):
             str(self.output_dir),
             dilation=self.dilation,
         )
+        metrics = None
         if isinstance(result, tuple):
-            inpainted_path_str, mask_path = result
+            # (path, mask) 或 (path, mask, 本次调用的路由/分批统计)
+            inpainted_path_str, mask_path, *rest = result
+            metrics = rest[0] if rest else None
         else:
             inpainted_path_str, mask_path = result, None
+        self.last_metrics = dict(metrics) if isinstance(metrics, dict) else None
         inpainted_path = Path(inpainted_path_str)
 
         duration_ms = (time.perf_counter() - start_time) * 1000
@@ -153,8 +177,62 @@ class InpainterModule(BaseModule):
             context.mask_path = mask_path
         try:
             writer = DebugArtifactWriter()
-            writer.write_mask(context)
-            writer.write_inpainted(context)
+            writer.submit("write_mask", context)
+            writer.submit("write_inpainted", context)
+        except Exception as exc:
+            logger.debug(f"[{context.task_id}] Debug artifacts (Inpainter) skipped: {exc}")
+        return context
+
+    async def _process_buffered(
+        self,
+        context: TaskContext,
+        buffer,
+        regions_to_inpaint: list[RegionData],
+        inpainted_path: Path,
+        start_time: float,
+    ) -> TaskContext:
+        """In-memory path: keep the inpainted result in the task image buffer."""
+        import asyncio
+        import time
+
+        loop = asyncio.get_event_loop()
+        original = await loop.run_in_executor(None, read_image, context.image_path)
+        if original is None:
+            raise FileNotFoundError(f"Cannot read image: {context.image_path}")
+
+        # 统计随本次调用返回：共享 inpainter 的 last_metrics 可能已被并发页面覆盖
+        result, mask, metrics = await self.inpainter.inpaint_regions_array(
+            original,
+            regions_to_inpaint,
+            dilation=self.dilation,
+        )
+        self.last_metrics = dict(metrics) if isinstance(metrics, dict) else None
+        buffer.inpainted = result
+        buffer.mask = mask
+        context.inpainted_buffered = True
+
+        # 仅在调试/断点续跑时落盘中间图，默认省掉一次无损 WebP 编码
+        if image_buffer_spill_enabled():
+            context.inpainted_path = save_image(
+                result, str(inpainted_path), purpose="intermediate"
+            )
+            context.mask_path = save_image(
+                mask,
+                str(self.output_dir / f"combined_mask_{Path(context.image_path).stem}.png"),
+                purpose="intermediate",
+            )
+        else:
+            context.inpainted_path = None
+            context.mask_path = None
+
+        duration_ms = (time.perf_counter() - start_time) * 1000
+        logger.info(
+            f"[{context.task_id}] Inpainter 完成: 内存缓冲 (spill={context.inpainted_path is not None}), 耗时 {duration_ms:.0f}ms"
+        )
+        try:
+            writer = DebugArtifactWriter()
+            writer.submit("write_mask", context)
+            writer.submit("write_inpainted", context)
         except Exception as exc:
             logger.debug(f"[{context.task_id}] Debug artifacts (Inpainter) skipped: {exc}")
         return context
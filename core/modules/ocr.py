@@ -6,7 +6,6 @@ Replaces mock implementation with PaddleOCREngine.
 
 import asyncio
 import hashlib
-import json
 import logging
 import os
 import time
@@ -20,7 +19,9 @@ from ..vision import OCREngine, PaddleOCREngine, MockOCREngine
 from ..ocr_postprocessor import OCRPostProcessor
 from ..watermark_detector import WatermarkDetector
 from ..debug_artifacts import DebugArtifactWriter
+from ..image_buffer import get_image_buffer_store, image_buffer_enabled
 from ..errors import OCRNoTextError
+from ..vision.ocr.result_store import build_content_key, get_ocr_result_store
 from ..vision.ocr.postprocessing import build_edge_box, match_crosspage_regions, filter_noise_regions
 from PIL import Image
 
@@ -140,44 +141,43 @@ class OCRModule(BaseModule):
         return Path(raw).expanduser().resolve()
 
     @staticmethod
-    def _build_cache_key(image_path: str, lang: str) -> str:
-        path = Path(image_path).expanduser().resolve()
-        try:
-            st = path.stat()
-            stat_sig = f"{st.st_size}:{st.st_mtime_ns}"
-        except OSError:
-            stat_sig = "missing"
-        digest = hashlib.sha1(f"{path}:{lang}:{stat_sig}:v1".encode("utf-8")).hexdigest()
-        return digest
-
-    def _load_cached_regions(self, image_path: str, lang: str) -> Optional[list[RegionData]]:
+    def _build_cache_key(image_path: str, lang: str) -> Optional[str]:
+        # 内容寻址：图片字节哈希 + 引擎/模型/切片配置签名（路径/mtime 变化不影响命中）
+        return build_content_key(image_path, lang)
+
+    def _load_cached_regions(
+        self, image_path: str, lang: str, cache_key: Optional[str] = None
+    ) -> Optional[list[RegionData]]:
         if not self._cache_enabled():
             return None
-        cache_file = self._cache_dir() / f"{self._build_cache_key(image_path, lang)}.json"
-        if not cache_file.exists():
+        key = cache_key or self._build_cache_key(image_path, lang)
+        if key is None:
             return None
         try:
-            payload = json.loads(cache_file.read_text(encoding="utf-8"))
-            return [RegionData.model_validate(item) for item in payload.get("regions", [])]
+            return get_ocr_result_store(self._cache_dir()).get(key)
         except Exception as exc:
             logger.debug("OCR cache read failed: %s", exc)
             return None
 
-    def _save_cached_regions(self, image_path: str, lang: str, regions: list[RegionData]) -> None:
+    def _save_cached_regions(
+        self,
+        image_path: str,
+        lang: str,
+        regions: list[RegionData],
+        cache_key: Optional[str] = None,
+    ) -> None:
         if not self._cache_enabled():
             return
         if (not regions) and (not self._cache_empty_results_enabled()):
             logger.info("OCR cache skip empty result: %s (%s)", image_path, lang)
             return
-        cache_dir = self._cache_dir()
-        cache_dir.mkdir(parents=True, exist_ok=True)
-        cache_file = cache_dir / f"{self._build_cache_key(image_path, lang)}.json"
-        payload = {
-            "image_path": str(Path(image_path).expanduser().resolve()),
-            "lang": lang,
-            "regions": [r.model_dump(mode="json") for r in regions],
-        }
-        cache_file.write_text(json.dumps(payload, ensure_ascii=False), encoding="utf-8")
+        key = cache_key or self._build_cache_key(image_path, lang)
+        if key is None:
+            return
+        try:
+            get_ocr_result_store(self._cache_dir()).put(key, regions)
+        except Exception as exc:
+            logger.debug("OCR cache write failed: %s", exc)
 
     async def process(self, context: TaskContext) -> TaskContext:
         """
@@ -204,6 +204,9 @@ class OCRModule(BaseModule):
 
         logger.info(f"[{context.task_id}] OCR 开始: {context.image_path}")
         start_time = time.perf_counter()
+        if image_buffer_enabled():
+            # 注册本任务的图像缓冲：后续阶段（气泡检测/擦除/渲染）复用同一份解码结果
+            get_image_buffer_store().acquire(context.task_id, context.image_path)
         
         # 读取图像尺寸（用于边界带判断）
         try:
@@ -214,8 +217,14 @@ class OCRModule(BaseModule):
             image_height = 0
             image_width = 0
 
-        cache_key = self._build_cache_key(context.image_path, target_lang)
-        cached_regions = self._load_cached_regions(context.image_path, target_lang)
+        cache_key = (
+            self._build_cache_key(context.image_path, target_lang)
+            if self._cache_enabled()
+            else None
+        )
+        cached_regions = self._load_cached_regions(
+            context.image_path, target_lang, cache_key=cache_key
+        )
         cache_hit = cached_regions is not None
         logger.info(
             "[%s] OCR runtime: lang=%s size=%sx%s cache_enabled=%s cache_hit=%s cache_key=%s",
@@ -260,7 +269,9 @@ class OCRModule(BaseModule):
                 gate.release()
             # Post-process OCR text (normalize + SFX detection + locale fixes)
             OCRPostProcessor().process_regions(context.regions, lang=target_lang)
-            self._save_cached_regions(context.image_path, target_lang, context.regions)
+            self._save_cached_regions(
+                context.image_path, target_lang, context.regions, cache_key=cache_key
+            )
 
         if len(context.regions) == 0 and self._fail_on_empty():
             msg = (
@@ -427,7 +438,7 @@ class OCRModule(BaseModule):
         if os.getenv("DISABLE_WATERMARK") != "1":
             WatermarkDetector().detect(context.regions, image_shape=image_shape)
         try:
-            DebugArtifactWriter().write_ocr(context, context.image_path)
+            DebugArtifactWriter().submit("write_ocr", context, context.image_path)
         except Exception as exc:
             logger.debug(f"[{context.task_id}] Debug artifacts (OCR) skipped: {exc}")
         
@@ -449,6 +460,8 @@ class OCRModule(BaseModule):
             tile_avg_ms = getattr(self.engine, "last_tile_avg_ms", None)
             if tile_avg_ms is not None:
                 self.last_metrics["tile_avg_ms"] = round(tile_avg_ms, 2)
+        if hasattr(self.engine, "last_pool_size"):
+            self.last_metrics["pool_size"] = getattr(self.engine, "last_pool_size", 1)
         if hasattr(self.engine, "last_edge_tile_count"):
             self.last_metrics["edge_tile_count"] = getattr(self.engine, "last_edge_tile_count", None)
         if hasattr(self.engine, "last_edge_tile_avg_ms"):
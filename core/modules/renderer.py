@@ -19,6 +19,8 @@ from ..renderer import TextRenderer
 from .base import BaseModule
 from ..debug_artifacts import DebugArtifactWriter
 from ..image_io import save_image
+from ..errors import InpaintedImageMissingError
+from ..image_buffer import get_image_buffer_store, image_buffer_enabled
 
 # 配置日志
 logger = logging.getLogger(__name__)
@@ -75,6 +77,22 @@ class RendererModule(BaseModule):
             default_font_size=default_font_size,
         )
 
+    @staticmethod
+    def _source_image(context: TaskContext) -> str:
+        """Inpainted background on disk; the original only if nothing was erased."""
+        if context.inpainted_path:
+            if not Path(context.inpainted_path).exists():
+                raise InpaintedImageMissingError(
+                    f"Inpainted image missing: {context.inpainted_path}"
+                )
+            return context.inpainted_path
+        if context.inpainted_buffered:
+            # 擦除结果只在内存缓冲里且已被释放：不能退回原图渲染（会画在未擦除的原文上）
+            raise InpaintedImageMissingError(
+                f"Inpainted buffer for task {context.task_id} is no longer available"
+            )
+        return context.image_path
+
     async def process(self, context: TaskContext) -> TaskContext:
         """
         Render translated text onto image.
@@ -133,20 +151,28 @@ class RendererModule(BaseModule):
             output_filename = f"translated_{context.task_id}.png"
             final_path = self.output_dir / output_filename
 
+        # 擦除结果优先从内存缓冲读取（见 core/image_buffer.py）
+        buffered_inpainted = None
+        if image_buffer_enabled():
+            buffer = get_image_buffer_store().get(context.task_id)
+            if buffer is not None:
+                buffered_inpainted = buffer.inpainted
+
         # 如果没有需要渲染的区域，直接复制原图到输出
         if not regions_to_render:
-            source = (
-                context.inpainted_path
-                if context.inpainted_path and Path(context.inpainted_path).exists()
-                else context.image_path
-            )
-            from PIL import Image
-
-            saved_path = save_image(
-                Image.open(source).convert("RGB"),
-                str(final_path),
-                purpose=save_purpose,
-            )
+            if buffered_inpainted is not None:
+                saved_path = save_image(
+                    buffered_inpainted, str(final_path), purpose=save_purpose
+                )
+            else:
+                source = self._source_image(context)
+                from PIL import Image
+
+                saved_path = save_image(
+                    Image.open(source).convert("RGB"),
+                    str(final_path),
+                    purpose=save_purpose,
+                )
             context.output_path = saved_path
             logger.debug(f"[{context.task_id}] Renderer: 无区域需要渲染，复制原图")
             return context
@@ -157,14 +183,29 @@ class RendererModule(BaseModule):
         start_time = time.perf_counter()
 
         # Use TextRenderer for full-featured rendering
-        # 优先使用擦除后的图片，如果没有则使用原图
-        source_image = context.inpainted_path if context.inpainted_path and Path(context.inpainted_path).exists() else context.image_path
+        # 优先使用擦除后的图片；只有没跑过擦除时才用原图
+        if buffered_inpainted is not None:
+            source_image = context.inpainted_path or context.image_path
+        else:
+            source_image = self._source_image(context)
+        on_rendered = None
+        if save_purpose == "intermediate" and image_buffer_enabled():
+            # 后面还有超分阶段：把渲染结果留在内存里，超分直接取用，避免再解码一次
+            task_buffer = get_image_buffer_store().get(context.task_id)
+            if task_buffer is not None:
+
+                def on_rendered(path: str, rendered) -> None:
+                    task_buffer.rendered = rendered
+                    task_buffer.rendered_path = path
+
         saved_path = await self.renderer.render(
             image_path=source_image,
             regions=regions_to_render,
             output_path=str(final_path),
             original_image_path=context.image_path,
             purpose=save_purpose,
+            image=buffered_inpainted,
+            on_rendered=on_rendered,
         )
 
         duration_ms = (time.perf_counter() - start_time) * 1000
@@ -173,8 +214,8 @@ class RendererModule(BaseModule):
         context.output_path = saved_path
         try:
             writer = DebugArtifactWriter()
-            writer.write_layout(context, source_image)
-            writer.write_final(context)
+            writer.submit("write_layout", context, source_image)
+            writer.submit("write_final", context)
         except Exception as exc:
             logger.debug(f"[{context.task_id}] Debug artifacts (Renderer) skipped: {exc}")
         return context
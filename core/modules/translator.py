@@ -21,6 +21,7 @@ from core.logging_config import setup_module_logger, get_log_level
 from .base import BaseModule
 from ..debug_artifacts import DebugArtifactWriter
 from ..sfx_dict import translate_sfx
+from ..chapter_translation import current_page_translator
 
 # 配置日志
 logger = setup_module_logger(
@@ -608,6 +609,10 @@ class TranslatorModule(BaseModule):
     
     def _get_ai_translator(self):
         """获取 AI 翻译器，支持动态模型切换。"""
+        # 章节批量模式下返回当前页的合并句柄（translate_batch 会与其他页合并发送）
+        page_translator = current_page_translator.get()
+        if page_translator is not None:
+            return page_translator
         # 获取当前选择的模型
         try:
             from app.routes.settings import get_current_model
@@ -775,11 +780,17 @@ class TranslatorModule(BaseModule):
         timeouts_primary = 0
         fallback_provider_calls = 0
         missing_number_retries = 0
+        memory_hits = 0
+        memory_misses = 0
+        # 流式翻译：每条译文从请求发出到解析完成的耗时
+        stream_enabled = os.getenv("AI_TRANSLATE_STREAM", "0") == "1"
+        stream_item_ms: list[float] = []
 
         def _accumulate_ai_calls(translator) -> None:
             nonlocal ai_calls_primary_total, ai_calls_fallback_total
             nonlocal prompt_chars_total, content_chars_total, text_chars_total, ctx_chars_total
             nonlocal timeouts_primary, fallback_provider_calls, missing_number_retries
+            nonlocal memory_hits, memory_misses
             metrics = getattr(translator, "last_metrics", None) or {}
             primary = metrics.get("api_calls")
             fallback = metrics.get("api_calls_fallback")
@@ -808,6 +819,72 @@ class TranslatorModule(BaseModule):
             value = metrics.get("missing_number_retries")
             if isinstance(value, int) and value >= 0:
                 missing_number_retries += value
+            value = metrics.get("memory_hits")
+            if isinstance(value, int) and value >= 0:
+                memory_hits += value
+            value = metrics.get("memory_misses")
+            if isinstance(value, int) and value >= 0:
+                memory_misses += value
+
+        def _forget_rejected(translator, texts, contexts, output_format="numbered") -> None:
+            # 下游判定为不可用的译文不能留在翻译记忆里，否则重译会直接命中旧结果。
+            forget = getattr(translator, "forget_translations", None)
+            if forget is None:
+                return
+            try:
+                forget(texts, contexts, output_format=output_format)
+            except Exception as exc:
+                logger.debug("[%s] translation memory forget failed: %s", context.task_id, exc)
+
+        def _stream_fill(indices, started, filled):
+            # 流式回调：每条译文完成即写入所属区域的 target_text（提前预览）。
+            # 最终解析结果会覆盖；重试或跨页 JSON 解析不出 top 时撤回（filled 记录原值）。
+            from ..translation_splitter import parse_top_bottom
+
+            def _on_item(i, translation):
+                stream_item_ms.append((time.perf_counter() - started) * 1000)
+                if not 0 <= i < len(indices):
+                    return
+                req_idx = indices[i]
+                meta = crosspage_meta[req_idx]
+                if meta and getattr(self, "_carryover_store", None):
+                    region = meta.get("region")
+                    try:
+                        text, _bottom = parse_top_bottom(translation)
+                    except Exception:
+                        text = ""
+                    if (self.target_lang or "").startswith("zh") and _has_hangul(text):
+                        text = ""
+                else:
+                    # 与最终分配一致：单区域直接写，多区域只写最大的非跳过区域
+                    group = groups_to_translate[req_idx]
+                    if len(group) == 1:
+                        region = group[0]
+                    else:
+                        skip_ids = skip_region_ids_list[req_idx]
+                        non_skip = [r for r in group if r.region_id not in skip_ids and r.box_2d]
+                        region = max(
+                            non_skip,
+                            key=lambda r: r.box_2d.width * r.box_2d.height,
+                            default=None,
+                        )
+                    text = translation
+                if region is None:
+                    return
+                if not text:
+                    if region.region_id in filled:
+                        previous = filled.pop(region.region_id)[1]
+                        region.target_text = previous
+                    return
+                filled.setdefault(region.region_id, (region, region.target_text))
+                region.target_text = text
+
+            return _on_item
+
+        def _drop_stream_fill(filled) -> None:
+            for region, previous in filled.values():
+                region.target_text = previous
+            filled.clear()
 
         if os.getenv("POST_REC") == "1" and context.image_path:
             try:
@@ -1040,17 +1117,33 @@ class TranslatorModule(BaseModule):
                 elif self.use_ai:
                     ai_translator = self._get_ai_translator()
                     if ai_translator:
-                        async def _batch_translate(texts, output_format=None, contexts=None):
+                        async def _batch_translate(
+                            texts, indices, output_format=None, contexts=None
+                        ):
                             payload = {}
                             if output_format is not None:
                                 payload["output_format"] = output_format
                             if contexts is not None:
                                 payload["contexts"] = contexts
+                            filled: dict = {}
+                            if stream_enabled:
+                                payload["on_item"] = _stream_fill(
+                                    indices, time.perf_counter(), filled
+                                )
                             try:
                                 return await ai_translator.translate_batch(texts, **payload)
                             except TypeError:
+                                _drop_stream_fill(filled)
+                                if payload.pop("on_item", None) is not None:
+                                    try:
+                                        return await ai_translator.translate_batch(texts, **payload)
+                                    except TypeError:
+                                        pass
                                 payload.pop("contexts", None)
                                 return await ai_translator.translate_batch(texts, **payload)
+                            except BaseException:
+                                _drop_stream_fill(filled)
+                                raise
 
                         translations = [None] * len(texts_to_translate)
                         crosspage_indices = [
@@ -1079,6 +1172,7 @@ class TranslatorModule(BaseModule):
                             start = time.perf_counter()
                             crosspage_translations = await _batch_translate(
                                 crosspage_texts,
+                                crosspage_indices,
                                 output_format="json",
                                 contexts=crosspage_contexts,
                             )
@@ -1092,6 +1186,7 @@ class TranslatorModule(BaseModule):
                             start = time.perf_counter()
                             normal_translations = await _batch_translate(
                                 normal_texts,
+                                normal_indices,
                                 contexts=normal_contexts,
                             )
                             _accumulate_ai_calls(ai_translator)
@@ -1171,6 +1266,11 @@ class TranslatorModule(BaseModule):
                                     )
                                 continue
 
+                            _forget_rejected(
+                                ai_translator,
+                                [src_text],
+                                [contexts_to_translate[i] if i < len(contexts_to_translate) else ""],
+                            )
                             fallback_input = src_text or ""
                             fallback_source = "src"
                             if translation and not translation.strip().startswith("[翻译失败]"):
@@ -1381,6 +1481,7 @@ class TranslatorModule(BaseModule):
                                     if i < len(contexts_to_translate)
                                     else ""
                                 )
+                                _forget_rejected(ai_translator, [src_text], [retry_ctx])
                                 try:
                                     start = time.perf_counter()
                                     try:
@@ -1445,6 +1546,9 @@ class TranslatorModule(BaseModule):
                                 retry_top = (crosspage_region.source_text or "").strip()
                                 retry_bottom = (crosspage_extra or "").strip()
                                 retry_text = f"TOP: {retry_top}\nBOTTOM: {retry_bottom}"
+                                _forget_rejected(
+                                    ai_translator, [retry_text], [retry_ctx], output_format="json"
+                                )
                                 start = time.perf_counter()
                                 retry_out = None
                                 try:
@@ -1617,6 +1721,19 @@ class TranslatorModule(BaseModule):
             "timeouts_primary": timeouts_primary,
             "fallback_provider_calls": fallback_provider_calls,
             "missing_number_retries": missing_number_retries,
+            "memory_hits": memory_hits,
+            "memory_misses": memory_misses,
+            "memory_hit_rate": (
+                round(memory_hits / (memory_hits + memory_misses), 4)
+                if (memory_hits + memory_misses)
+                else 0.0
+            ),
+            "stream_items": len(stream_item_ms),
+            "stream_first_item_ms": round(min(stream_item_ms), 2) if stream_item_ms else None,
+            "stream_item_ms_avg": (
+                round(sum(stream_item_ms) / len(stream_item_ms), 2) if stream_item_ms else None
+            ),
+            "stream_item_ms_max": round(max(stream_item_ms), 2) if stream_item_ms else None,
             "total_ms": round(total_translate_ms, 2),
             "avg_ms": round(total_translate_ms / len(texts_to_translate), 2) if texts_to_translate else 0,
             "sfx_skipped": sfx_count,
@@ -1634,8 +1751,8 @@ class TranslatorModule(BaseModule):
 
         try:
             writer = DebugArtifactWriter()
-            writer.write_grouping(context, context.image_path)
-            writer.write_translation(context, context.image_path)
+            writer.submit("write_grouping", context, context.image_path)
+            writer.submit("write_translation", context, context.image_path)
         except Exception as exc:
             logger.debug(f"[{context.task_id}] Debug artifacts (Translator) skipped: {exc}")
 
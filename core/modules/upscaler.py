@@ -3,6 +3,7 @@ import logging
 import os
 import subprocess
 import sys
+import threading
 import time
 import types
 import importlib.util
@@ -13,6 +14,7 @@ import cv2
 from .base import BaseModule
 from ..models import TaskContext
 from ..image_io import save_image
+from ..image_buffer import get_image_buffer_store, image_buffer_enabled
 
 logger = logging.getLogger(__name__)
 
@@ -144,6 +146,109 @@ def crop_and_merge(stripes: list, overlap_px: int, scale: int):
     return np.concatenate(trimmed, axis=0)
 
 
+class PytorchUpscalerService:
+    """Long-lived RealESRGANer: weights load once, pages/stripes reuse the model.
+
+    RealESRGANer keeps per-call state on the instance (img/output), so inference
+    is serialized with a lock; callers run it from worker threads.
+    """
+
+    def __init__(self, model_path: Path, device_name: str, tile: int):
+        self.model_path = Path(model_path)
+        self.device_name = device_name
+        self.tile = tile
+        self.load_ms: float | None = None
+        self.calls = 0
+        self._upsampler = None
+        self._load_lock = threading.Lock()
+        self._infer_lock = threading.Lock()
+
+    @property
+    def loaded(self) -> bool:
+        return self._upsampler is not None
+
+    def load(self) -> None:
+        if self._upsampler is not None:
+            return
+        with self._load_lock:
+            if self._upsampler is not None:
+                return
+            _ensure_torchvision_functional_tensor()
+            try:
+                import torch
+                from basicsr.archs.rrdbnet_arch import RRDBNet
+                from realesrgan import RealESRGANer
+            except Exception as exc:
+                raise ImportError(
+                    "Missing PyTorch upscale deps. Install with: pip install torch torchvision realesrgan basicsr"
+                ) from exc
+
+            # monotonic: perf_counter is reserved for the per-page timing/timeout path
+            load_start = time.monotonic()
+            model = RRDBNet(num_in_ch=3, num_out_ch=3, num_feat=64, num_block=23, num_grow_ch=32, scale=4)
+            self._upsampler = RealESRGANer(
+                scale=4,
+                model_path=str(self.model_path),
+                model=model,
+                tile=self.tile,
+                tile_pad=10,
+                pre_pad=0,
+                half=False,
+                device=torch.device(self.device_name),
+            )
+            self.load_ms = (time.monotonic() - load_start) * 1000
+            logger.info(
+                "Upscaler model loaded: model=%s device=%s tile=%s ms=%.0f",
+                self.model_path.name,
+                self.device_name,
+                self.tile,
+                self.load_ms,
+            )
+
+    def enhance(self, image, outscale: int):
+        self.load()
+        with self._infer_lock:
+            self.calls += 1
+            return self._upsampler.enhance(image, outscale=outscale)
+
+
+_service: PytorchUpscalerService | None = None
+_service_key: tuple | None = None
+_service_lock = threading.Lock()
+
+
+def get_pytorch_upscaler(model_path: Path, device_name: str, tile: int) -> PytorchUpscalerService:
+    """Process-wide upscaler; replaced (old weights dropped) when model/device/tile change."""
+    global _service, _service_key
+    key = (str(Path(model_path).resolve()), device_name, int(tile))
+    with _service_lock:
+        if _service is None or _service_key != key:
+            _service = PytorchUpscalerService(Path(model_path), device_name, int(tile))
+            _service_key = key
+        return _service
+
+
+def _upscale_enabled() -> bool:
+    override = _override_upscale_enable()
+    if override is not None:
+        return override
+    return os.getenv("UPSCALE_ENABLE", "0").strip().lower() in {"1", "true", "yes", "on"}
+
+
+def warmup_upscaler() -> bool:
+    """Preload the PyTorch upscaler when it will be used; False when skipped."""
+    if not _upscale_enabled():
+        return False
+    if os.getenv("UPSCALE_BACKEND", DEFAULT_BACKEND).strip().lower() != "pytorch":
+        return False
+    model_path = Path(os.getenv("UPSCALE_MODEL_PATH", DEFAULT_PYTORCH_MODEL))
+    if not model_path.exists():
+        raise FileNotFoundError(f"Upscale model not found: {model_path}")
+    tile = int(os.getenv("UPSCALE_TILE", str(DEFAULT_TILE)))
+    get_pytorch_upscaler(model_path, _resolve_torch_device_name(), tile).load()
+    return True
+
+
 class UpscaleModule(BaseModule):
     def __init__(self, binary_path: str | None = None):
         super().__init__(name="Upscaler")
@@ -151,10 +256,7 @@ class UpscaleModule(BaseModule):
         self.last_metrics: dict | None = None
 
     def _enabled(self) -> bool:
-        override = _override_upscale_enable()
-        if override is not None:
-            return override
-        return os.getenv("UPSCALE_ENABLE", "0").strip().lower() in {"1", "true", "yes", "on"}
+        return _upscale_enabled()
 
     def _resolve_binary(self) -> Path:
         if self.binary_path:
@@ -307,6 +409,21 @@ class UpscaleModule(BaseModule):
         context.output_path = str(output_path)
         return context
 
+    @staticmethod
+    def _take_rendered(context: TaskContext, output_path: Path):
+        """Rendered page kept in memory by the renderer (see core/image_buffer.py)."""
+        if not image_buffer_enabled():
+            return None
+        buffer = get_image_buffer_store().get(context.task_id)
+        if buffer is None or buffer.rendered is None:
+            return None
+        image, path = buffer.rendered, buffer.rendered_path
+        buffer.rendered = None
+        buffer.rendered_path = None
+        if path and Path(path).resolve() != output_path.resolve():
+            return None
+        return image
+
     def _run_pytorch(self, context: TaskContext, output_path: Path) -> TaskContext:
         model_path = self._resolve_pytorch_model()
         if not model_path.exists():
@@ -314,17 +431,6 @@ class UpscaleModule(BaseModule):
                 f"Upscale model not found: {model_path}. Provide UPSCALE_MODEL_PATH or run scripts/setup_local.sh."
             )
 
-        _ensure_torchvision_functional_tensor()
-        try:
-            import torch
-            import cv2
-            from basicsr.archs.rrdbnet_arch import RRDBNet
-            from realesrgan import RealESRGANer
-        except Exception as exc:
-            raise ImportError(
-                "Missing PyTorch upscale deps. Install with: pip install torch torchvision realesrgan basicsr"
-            ) from exc
-
         scale = _override_upscale_scale() or int(os.getenv("UPSCALE_SCALE", str(DEFAULT_SCALE)))
         timeout = int(os.getenv("UPSCALE_TIMEOUT", str(DEFAULT_TIMEOUT)))
         tile = int(os.getenv("UPSCALE_TILE", str(DEFAULT_TILE)))
@@ -335,19 +441,11 @@ class UpscaleModule(BaseModule):
         if tmp_path.exists():
             tmp_path.unlink()
 
-        model = RRDBNet(num_in_ch=3, num_out_ch=3, num_feat=64, num_block=23, num_grow_ch=32, scale=4)
         device_name = _resolve_torch_device_name()
-        device = torch.device(device_name)
-        upsampler = RealESRGANer(
-            scale=4,
-            model_path=str(model_path),
-            model=model,
-            tile=tile,
-            tile_pad=10,
-            pre_pad=0,
-            half=False,
-            device=device,
-        )
+        upsampler = get_pytorch_upscaler(model_path, device_name, tile)
+        cold_start = not upsampler.loaded
+        # 首次使用时加载权重（正常情况下已由 ModelWarmupService 预热）
+        upsampler.load()
 
         logger.info(
             "[%s] Upscaler start (pytorch): model=%s scale=%s tile=%s device=%s",
@@ -359,7 +457,9 @@ class UpscaleModule(BaseModule):
         )
         overall_start = time.perf_counter()
         try:
-            image = cv2.imread(str(output_path), cv2.IMREAD_COLOR)
+            image = self._take_rendered(context, output_path)
+            if image is None:
+                image = cv2.imread(str(output_path), cv2.IMREAD_COLOR)
             if image is None:
                 raise RuntimeError(f"Failed to read image: {output_path}")
             stripe_enable = os.getenv("UPSCALE_STRIPE_ENABLE", DEFAULT_STRIPE_ENABLE) == "1"
@@ -420,6 +520,9 @@ class UpscaleModule(BaseModule):
             "model": model_path.name,
             "scale": scale,
             "backend": "pytorch",
+            "device": device_name,
+            "model_cold_start": cold_start,
+            "model_load_ms": round(upsampler.load_ms or 0.0, 2) if cold_start else 0.0,
         }
         context.output_path = str(output_path)
         return context
@@ -0,0 +1,255 @@
+"""Priority / fair-share admission of pages into the pipeline.
+
+Without a scheduler every page that reaches ``Pipeline.process`` competes for
+the same OCR gate, translator semaphores and LaMa lock, so one retranslated
+page waits behind whatever a 100-page chapter already has in flight.
+``PageScheduler`` caps the pages running in the process (``slots``) and hands
+each free slot to the next page by:
+
+1. priority class, strictly: ``interactive`` (single page / image requests)
+   before ``head`` (the first pages of a chapter, so a new chapter shows
+   results quickly) before ``bulk`` (the rest of the backlog);
+2. within a class, weighted fair share between groups (chapters): stride
+   scheduling, each grant advances the group's pass by ``1 / weight`` and the
+   group with the lowest pass goes next. A group that starts waiting joins at
+   the class's current pass, so it does not get a burst for time it was idle.
+
+Running pages are never interrupted; preemption happens at page granularity
+(the next free slot). Staged batches (``PIPELINE_STAGED_BATCH=1``) take a slot
+per page when it is fed to their stage pools and return it when the page leaves
+the last stage; since each staged batch spins up its own pools, chapter routes
+still keep their chapter semaphore for them (``_chapter_gate``). Callers tag
+their pages with ``use_schedule``; ``Pipeline.process_batch`` /
+``process_stream`` (staged or not) promote the first
+``PAGE_SCHEDULER_HEAD_PAGES`` pages of a bulk batch to ``head``. The wait of
+each page is recorded in ``PipelineMetrics.queue_wait_ms`` together with its
+class (``queue_class``), and per-class wait percentiles are in ``stats()``.
+
+Env:
+    PAGE_SCHEDULER_ENABLE: 1/0 (default 0; 0 = no page gate, chapters are
+        serialized by TRANSLATE_CHAPTER_MAX_CONCURRENT_JOBS as before; staged
+        batches stay serialized by it either way)
+    PAGE_SCHEDULER_SLOTS: pages running at once in this process (default 2)
+    PAGE_SCHEDULER_HEAD_PAGES: leading pages of a chapter scheduled as head (default 3)
+"""
+
+from __future__ import annotations
+
+import asyncio
+import contextvars
+import os
+import threading
+import time
+import weakref
+from collections import deque
+from contextlib import asynccontextmanager, contextmanager
+from dataclasses import dataclass, replace
+from typing import AsyncIterator, Iterator, Optional
+
+from .utils.env import read_env_int
+
+PRIORITY_CLASSES = ("interactive", "head", "bulk")
+_WAIT_SAMPLES = 200
+
+
+def page_scheduler_enabled() -> bool:
+    return os.getenv("PAGE_SCHEDULER_ENABLE", "0") == "1"
+
+
+@dataclass(frozen=True)
+class ScheduleTag:
+    priority: str = "bulk"
+    group: str = "default"
+    weight: float = 1.0
+
+
+schedule_tag: contextvars.ContextVar[Optional[ScheduleTag]] = contextvars.ContextVar(
+    "page_schedule_tag", default=None
+)
+
+
+@contextmanager
+def use_schedule(priority: str, group: Optional[str] = None, weight: float = 1.0) -> Iterator[ScheduleTag]:
+    """Schedule pages processed in this context as ``priority`` within ``group``."""
+    if priority not in PRIORITY_CLASSES:
+        raise ValueError(f"unknown priority class: {priority}")
+    tag = ScheduleTag(priority=priority, group=group or priority, weight=max(0.01, float(weight)))
+    token = schedule_tag.set(tag)
+    try:
+        yield tag
+    finally:
+        schedule_tag.reset(token)
+
+
+@contextmanager
+def use_page_index(index: int) -> Iterator[None]:
+    """Promote the leading pages of a bulk batch to the ``head`` class."""
+    tag = schedule_tag.get()
+    if (
+        tag is None
+        or tag.priority != "bulk"
+        or index >= read_env_int("PAGE_SCHEDULER_HEAD_PAGES", 3, minimum=0)
+    ):
+        yield
+        return
+    token = schedule_tag.set(replace(tag, priority="head"))
+    try:
+        yield
+    finally:
+        schedule_tag.reset(token)
+
+
+class _Group:
+    __slots__ = ("pass_", "weight", "waiters")
+
+    def __init__(self, pass_: float, weight: float) -> None:
+        self.pass_ = pass_
+        self.weight = weight
+        self.waiters: deque[asyncio.Future] = deque()
+
+
+class PageScheduler:
+    """Slot gate with strict priority classes and stride fair share per class."""
+
+    def __init__(self, slots: int = 2) -> None:
+        self.slots = max(1, int(slots))
+        self._running = 0
+        self._groups: dict[str, dict[str, _Group]] = {name: {} for name in PRIORITY_CLASSES}
+        self._vtime = {name: 0.0 for name in PRIORITY_CLASSES}
+        self._granted = {name: 0 for name in PRIORITY_CLASSES}
+        self._waits: dict[str, deque[float]] = {
+            name: deque(maxlen=_WAIT_SAMPLES) for name in PRIORITY_CLASSES
+        }
+
+    def _waiting(self, priority: Optional[str] = None) -> int:
+        classes = PRIORITY_CLASSES if priority is None else (priority,)
+        return sum(
+            len(group.waiters) for name in classes for group in self._groups[name].values()
+        )
+
+    async def acquire(self, tag: ScheduleTag) -> float:
+        """Wait for a slot; returns the wait in ms. Pair with ``release``."""
+        started = time.perf_counter()
+        if self._running < self.slots and not self._waiting():
+            self._running += 1
+            self._record(tag.priority, 0.0)
+            return 0.0
+        groups = self._groups[tag.priority]
+        group = groups.get(tag.group)
+        if group is None:
+            group = groups[tag.group] = _Group(self._vtime[tag.priority], tag.weight)
+        group.weight = tag.weight
+        future = asyncio.get_running_loop().create_future()
+        group.waiters.append(future)
+        try:
+            await future
+        except asyncio.CancelledError:
+            if future.done() and not future.cancelled():
+                # 已分到槽位但调用方被取消：把槽位还回去
+                self.release()
+            else:
+                self._discard(tag, future)
+            raise
+        waited = (time.perf_counter() - started) * 1000
+        self._record(tag.priority, waited)
+        return waited
+
+    def release(self) -> None:
+        self._running = max(0, self._running - 1)
+        self._dispatch()
+
+    @asynccontextmanager
+    async def slot(self, tag: ScheduleTag) -> AsyncIterator[float]:
+        waited = await self.acquire(tag)
+        try:
+            yield waited
+        finally:
+            self.release()
+
+    def _discard(self, tag: ScheduleTag, future: asyncio.Future) -> None:
+        group = self._groups[tag.priority].get(tag.group)
+        if group is None:
+            return
+        try:
+            group.waiters.remove(future)
+        except ValueError:
+            pass
+        if not group.waiters:
+            self._groups[tag.priority].pop(tag.group, None)
+
+    def _next_waiter(self) -> Optional[asyncio.Future]:
+        for name in PRIORITY_CLASSES:
+            groups = self._groups[name]
+            if not groups:
+                continue
+            # dict 保持插入顺序：pass 相同时先来的章节优先
+            key, group = min(groups.items(), key=lambda item: item[1].pass_)
+            future = group.waiters.popleft()
+            self._vtime[name] = group.pass_
+            group.pass_ += 1.0 / group.weight
+            if not group.waiters:
+                del groups[key]
+            return future
+        return None
+
+    def _dispatch(self) -> None:
+        while self._running < self.slots:
+            future = self._next_waiter()
+            if future is None:
+                return
+            if future.done():
+                continue
+            self._running += 1
+            future.set_result(None)
+
+    def _record(self, priority: str, waited_ms: float) -> None:
+        self._granted[priority] += 1
+        self._waits[priority].append(waited_ms)
+
+    def stats(self) -> dict:
+        classes = {}
+        for name in PRIORITY_CLASSES:
+            waits = sorted(self._waits[name])
+            classes[name] = {
+                "granted": self._granted[name],
+                "waiting": self._waiting(name),
+                "wait_p50_ms": round(waits[len(waits) // 2], 1) if waits else 0.0,
+                "wait_p90_ms": round(waits[int(len(waits) * 0.9)], 1) if waits else 0.0,
+                "wait_max_ms": round(waits[-1], 1) if waits else 0.0,
+            }
+        return {"slots": self.slots, "running": self._running, "classes": classes}
+
+
+_schedulers: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, PageScheduler]" = (
+    weakref.WeakKeyDictionary()
+)
+_schedulers_lock = threading.Lock()
+
+
+def get_page_scheduler() -> PageScheduler:
+    """Scheduler of the running event loop (futures are loop-bound)."""
+    loop = asyncio.get_running_loop()
+    with _schedulers_lock:
+        scheduler = _schedulers.get(loop)
+        if scheduler is None:
+            scheduler = PageScheduler(read_env_int("PAGE_SCHEDULER_SLOTS", 2))
+            _schedulers[loop] = scheduler
+        return scheduler
+
+
+def scheduler_stats() -> list[dict]:
+    """Stats of every live scheduler (one per event loop)."""
+    with _schedulers_lock:
+        schedulers = list(_schedulers.values())
+    return [scheduler.stats() for scheduler in schedulers]
+
+
+@asynccontextmanager
+async def page_slot() -> AsyncIterator[Optional[ScheduleTag]]:
+    """Hold a pipeline slot for one page; yields its tag (None when disabled)."""
+    if not page_scheduler_enabled():
+        yield None
+        return
+    tag = schedule_tag.get() or ScheduleTag()
+    async with get_page_scheduler().slot(tag):
+        yield tag
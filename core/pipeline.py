@@ -12,13 +12,24 @@ import logging
 import os
 import time
 from pathlib import Path
-from typing import Optional
+from typing import AsyncIterable, AsyncIterator, Callable, Iterable, Optional, Union
 
 from .models import PipelineResult, TaskContext, TaskStatus
 from .metrics import PipelineMetrics, StageMetrics, Timer, start_metrics
-from .quality_report import write_quality_report
+from .quality_report import write_quality_report_async
 from .crosspage_processor import apply_crosspage_split
+from .chapter_translation import ChapterTranslationBatcher, chapter_batch_enabled
+from .image_buffer import get_image_buffer_store, image_buffer_enabled
+from .page_scheduler import (
+    ScheduleTag,
+    get_page_scheduler,
+    page_scheduler_enabled,
+    page_slot,
+    schedule_tag,
+    use_page_index,
+)
 from .utils.stderr_suppressor import suppress_native_stderr
+from .utils.env import read_env_int
 from .modules import (
     BaseModule,
     InpainterModule,
@@ -33,6 +44,53 @@ from .crosspage_carryover import CrosspageCarryOverStore
 logger = logging.getLogger(__name__)
 
 
+def staged_batch_enabled() -> bool:
+    return os.getenv("PIPELINE_STAGED_BATCH", "0") == "1"
+
+
+async def _iter_contexts(
+    contexts: Union[Iterable[TaskContext], AsyncIterable[TaskContext]],
+) -> AsyncIterator[TaskContext]:
+    if hasattr(contexts, "__aiter__"):
+        async for ctx in contexts:  # type: ignore[union-attr]
+            yield ctx
+    else:
+        for ctx in contexts:  # type: ignore[union-attr]
+            yield ctx
+
+
+class _PageRun:
+    """Per-page bookkeeping shared by the sequential and staged executors."""
+
+    def __init__(
+        self,
+        context: TaskContext,
+        collect_metrics: bool = True,
+        queue_class: Optional[str] = None,
+    ):
+        self.context = context
+        self.start_time = time.time()
+        self.stages_completed: list[str] = []
+        self.metrics = PipelineMetrics() if collect_metrics else None
+        # 分阶段批处理在 feed 时领取的页面槽位，页面结束时归还
+        self.slot_release: Optional[Callable[[], None]] = None
+        # Queue wait is the time from task creation to the moment this pipeline run starts.
+        # This is usually ~0 for CLI single-image runs, but can be significant in API/chapter
+        # workloads when tasks wait behind concurrency semaphores.
+        try:
+            queue_wait_ms = max(0.0, (self.start_time - context.created_at.timestamp()) * 1000)
+        except Exception:
+            queue_wait_ms = 0.0
+        if self.metrics is not None:
+            self.metrics.queue_wait_ms = queue_wait_ms
+            self.metrics.queue_class = queue_class
+
+    def release_slot(self) -> None:
+        release, self.slot_release = self.slot_release, None
+        if release is not None:
+            release()
+
+
 class Pipeline:
     """
     Translation pipeline manager.
@@ -97,122 +155,132 @@ class Pipeline:
         Returns:
             PipelineResult with success status and final context
         """
-        start_time = time.time()
-        # Queue wait is the time from task creation to the moment this pipeline run starts.
-        # This is usually ~0 for CLI single-image runs, but can be significant in API/chapter
-        # workloads when tasks wait behind concurrency semaphores.
+        # PAGE_SCHEDULER_ENABLE=1 时按优先级/章节公平份额排队领取页面槽位
+        async with page_slot() as tag:
+            run = _PageRun(context, collect_metrics, tag.priority if tag else None)
+            try:
+                await self._begin_run(run, status_callback)
+                for stage_name, module in self.stages:
+                    await self._run_stage(run, stage_name, module, status_callback)
+                return await self._complete_run(run, status_callback)
+            except Exception as e:
+                return await self._fail_run(run, e, status_callback)
+
+    async def _begin_run(self, run: "_PageRun", status_callback) -> None:
+        logger.info(f"[{run.context.task_id}] Pipeline 开始: {run.context.image_path}")
+        run.context.update_status(TaskStatus.PROCESSING)
+        if image_buffer_enabled():
+            # 运行中的页面不参与 LRU 淘汰，由 _complete_run/_fail_run 释放
+            get_image_buffer_store().pin(run.context.task_id, run.context.image_path)
+        if status_callback:
+            await status_callback("init", TaskStatus.PROCESSING, run.context.task_id)
+
+    async def _run_stage(
+        self,
+        run: "_PageRun",
+        stage_name: str,
+        module: BaseModule,
+        status_callback,
+    ) -> float:
+        stage_start = time.perf_counter()
+
         try:
-            queue_wait_ms = max(0.0, (start_time - context.created_at.timestamp()) * 1000)
-        except Exception:
-            queue_wait_ms = 0.0
-        stages_completed = []
-        
-        # Initialize metrics
-        metrics = PipelineMetrics() if collect_metrics else None
-        stage_timings = {}
-        if metrics is not None:
-            # PipelineMetrics is a dataclass; we attach this attribute without changing public APIs.
-            metrics.queue_wait_ms = queue_wait_ms
+            # 使用 stderr 抑制器消除 NSLog 输出
+            with suppress_native_stderr():
+                run.context = await module.process(run.context)
+        except Exception as stage_error:
+            logger.error(f"[{run.context.task_id}] {stage_name} 阶段失败: {stage_error}")
+            raise
+
+        stage_duration = (time.perf_counter() - stage_start) * 1000
+        run.stages_completed.append(stage_name)
+
+        if status_callback:
+            await status_callback(stage_name, TaskStatus.PROCESSING, run.context.task_id)
+
+        if run.metrics:
+            # Get sub-metrics from module if available
+            sub_metrics = {}
+            if hasattr(module, 'last_metrics'):
+                sub_metrics = module.last_metrics or {}
+
+            run.metrics.add_stage(StageMetrics(
+                name=stage_name,
+                duration_ms=stage_duration,
+                items_processed=len(run.context.regions) if run.context.regions else 0,
+                sub_metrics=sub_metrics,
+            ))
+        return stage_duration
 
-        logger.info(f"[{context.task_id}] Pipeline 开始: {context.image_path}")
+    async def _complete_run(self, run: "_PageRun", status_callback) -> PipelineResult:
+        context = run.context
+        get_image_buffer_store().release(context.task_id)
+        context.update_status(TaskStatus.COMPLETED)
+        if status_callback:
+            await status_callback("complete", TaskStatus.COMPLETED, context.task_id)
+
+        total_time = (time.time() - run.start_time) * 1000
+        if run.metrics:
+            run.metrics.total_duration_ms = total_time
+
+        logger.info(f"[{context.task_id}] Pipeline 完成: 耗时 {total_time:.0f}ms, 输出 {context.output_path}")
+
+        result = PipelineResult(
+            success=True,
+            task=context,
+            processing_time_ms=total_time,
+            stages_completed=run.stages_completed,
+        )
+
+        # Attach metrics to result
+        if run.metrics:
+            result.metrics = run.metrics
 
         try:
-            context.update_status(TaskStatus.PROCESSING)
-            if status_callback:
-                await status_callback("init", TaskStatus.PROCESSING, context.task_id)
+            await write_quality_report_async(result)
+        except Exception:
+            logger.exception(f"[{context.task_id}] Quality report write failed")
 
-            for stage_name, module in self.stages:
-                stage_start = time.perf_counter()
-                
-                try:
-                    # 使用 stderr 抑制器消除 NSLog 输出
-                    with suppress_native_stderr():
-                        context = await module.process(context)
-                except Exception as stage_error:
-                    logger.error(f"[{context.task_id}] {stage_name} 阶段失败: {stage_error}")
-                    raise
-                
-                stage_duration = (time.perf_counter() - stage_start) * 1000
-                stage_timings[stage_name] = stage_duration
-                stages_completed.append(stage_name)
-                
-                if status_callback:
-                    await status_callback(stage_name, TaskStatus.PROCESSING, context.task_id)
-
-                if metrics:
-                    # Get sub-metrics from module if available
-                    sub_metrics = {}
-                    if hasattr(module, 'last_metrics'):
-                        sub_metrics = module.last_metrics or {}
-                    
-                    metrics.add_stage(StageMetrics(
-                        name=stage_name,
-                        duration_ms=stage_duration,
-                        items_processed=len(context.regions) if context.regions else 0,
-                        sub_metrics=sub_metrics,
-                    ))
-
-            context.update_status(TaskStatus.COMPLETED)
-            if status_callback:
-                await status_callback("complete", TaskStatus.COMPLETED, context.task_id)
-            
-            total_time = (time.time() - start_time) * 1000
-            if metrics:
-                metrics.total_duration_ms = total_time
-            
-            logger.info(f"[{context.task_id}] Pipeline 完成: 耗时 {total_time:.0f}ms, 输出 {context.output_path}")
-            
-            result = PipelineResult(
-                success=True,
-                task=context,
-                processing_time_ms=total_time,
-                stages_completed=stages_completed,
-            )
-            
-            # Attach metrics to result
-            if metrics:
-                result.metrics = metrics
+        return result
 
-            try:
-                write_quality_report(result)
-            except Exception:
-                logger.exception(f"[{context.task_id}] Quality report write failed")
-
-            return result
-
-        except Exception as e:
-            logger.error(f"[{context.task_id}] Pipeline 失败: {e}")
-            error_code = getattr(e, "error_code", None) or context.error_code
-            context.update_status(TaskStatus.FAILED, error=str(e), error_code=error_code)
-            if status_callback:
-                await status_callback("failed", TaskStatus.FAILED, context.task_id)
-            
-            total_time = (time.time() - start_time) * 1000
-            if metrics:
-                metrics.total_duration_ms = total_time
-            
-            result = PipelineResult(
-                success=False,
-                task=context,
-                processing_time_ms=total_time,
-                stages_completed=stages_completed,
-            )
-            
-            if metrics:
-                result.metrics = metrics
+    async def _fail_run(
+        self, run: "_PageRun", error: Exception, status_callback
+    ) -> PipelineResult:
+        context = run.context
+        get_image_buffer_store().release(context.task_id)
+        logger.error(f"[{context.task_id}] Pipeline 失败: {error}")
+        error_code = getattr(error, "error_code", None) or context.error_code
+        context.update_status(TaskStatus.FAILED, error=str(error), error_code=error_code)
+        if status_callback:
+            await status_callback("failed", TaskStatus.FAILED, context.task_id)
 
-            try:
-                write_quality_report(result)
-            except Exception:
-                logger.exception(f"[{context.task_id}] Quality report write failed")
+        total_time = (time.time() - run.start_time) * 1000
+        if run.metrics:
+            run.metrics.total_duration_ms = total_time
 
-            return result
+        result = PipelineResult(
+            success=False,
+            task=context,
+            processing_time_ms=total_time,
+            stages_completed=run.stages_completed,
+        )
+
+        if run.metrics:
+            result.metrics = run.metrics
+
+        try:
+            await write_quality_report_async(result)
+        except Exception:
+            logger.exception(f"[{context.task_id}] Quality report write failed")
+
+        return result
 
     async def process_batch(
         self,
         contexts: list[TaskContext],
         max_concurrent: int = 5,
         status_callback: Optional[callable] = None,
+        staged: Optional[bool] = None,
     ) -> list[PipelineResult]:
         """
         Process multiple images concurrently.
@@ -220,40 +288,288 @@ class Pipeline:
         Args:
             contexts: List of task contexts to process
             max_concurrent: Maximum concurrent tasks
+            staged: Use the stage-overlapped executor (default: env PIPELINE_STAGED_BATCH=1)
             
         Returns:
             List of pipeline results
         """
+        if staged is None:
+            staged = staged_batch_enabled()
+        if staged:
+            return await self._process_batch_staged(
+                contexts, max_concurrent=max_concurrent, status_callback=status_callback
+            )
+
         semaphore = asyncio.Semaphore(max_concurrent)
 
-        async def process_with_semaphore(ctx: TaskContext) -> PipelineResult:
+        async def process_with_semaphore(index: int, ctx: TaskContext) -> PipelineResult:
             async with semaphore:
-                return await self.process(ctx, status_callback=status_callback)
+                with use_page_index(index):
+                    return await self.process(ctx, status_callback=status_callback)
 
-        tasks = [process_with_semaphore(ctx) for ctx in contexts]
+        tasks = [process_with_semaphore(index, ctx) for index, ctx in enumerate(contexts)]
         return await asyncio.gather(*tasks)
 
+    async def process_stream(
+        self,
+        contexts: AsyncIterable[TaskContext],
+        max_concurrent: int = 5,
+        status_callback: Optional[callable] = None,
+        staged: Optional[bool] = None,
+    ) -> list[PipelineResult]:
+        """
+        Like process_batch, but pages are started as they arrive.
+
+        Used when the page list is still growing (e.g. pages handed over by the
+        downloader one by one). Results come back in arrival order.
+        """
+        if staged is None:
+            staged = staged_batch_enabled()
+        if staged:
+            return await self._process_batch_staged(
+                contexts, max_concurrent=max_concurrent, status_callback=status_callback
+            )
+
+        semaphore = asyncio.Semaphore(max_concurrent)
+
+        async def process_with_semaphore(index: int, ctx: TaskContext) -> PipelineResult:
+            async with semaphore:
+                with use_page_index(index):
+                    return await self.process(ctx, status_callback=status_callback)
+
+        tasks: list[asyncio.Task] = []
+        try:
+            async for ctx in contexts:
+                tasks.append(asyncio.create_task(process_with_semaphore(len(tasks), ctx)))
+        except BaseException:
+            for task in tasks:
+                task.cancel()
+            raise
+        return list(await asyncio.gather(*tasks))
+
+    def _stage_worker_count(self, stage_name: str, max_concurrent: int) -> int:
+        # 翻译阶段是网络等待为主，默认沿用 max_concurrent；其余阶段是 CPU/GPU 密集，默认 1。
+        default = max_concurrent if stage_name == "translator" else 1
+        return read_env_int(
+            f"PIPELINE_STAGE_{stage_name.upper()}_WORKERS", max(1, default)
+        )
+
+    async def _process_batch_staged(
+        self,
+        contexts: Union[list[TaskContext], AsyncIterable[TaskContext]],
+        max_concurrent: int = 5,
+        status_callback: Optional[callable] = None,
+    ) -> list[PipelineResult]:
+        """
+        Stage-overlapped batch execution.
+
+        Each stage owns a worker pool fed by a bounded queue, so page N+1 can be
+        in OCR while page N waits on the translator and page N-1 is inpainting.
+        Chapter wall time tends toward the slowest stage rather than the sum.
+
+        Env:
+            PIPELINE_STAGE_<NAME>_WORKERS: workers per stage (translator defaults
+                to max_concurrent, the others to 1)
+            PIPELINE_STAGE_QUEUE_DEPTH: max pages waiting in front of each stage
+            PAGE_SCHEDULER_ENABLE: pages take a scheduler slot when fed and
+                hold it until they leave the last stage
+            TRANSLATE_CHAPTER_BATCH: coalesce concurrent translator workers'
+                requests into multi-page LLM calls
+        """
+        if isinstance(contexts, list) and not contexts:
+            return []
+
+        queue_depth = read_env_int("PIPELINE_STAGE_QUEUE_DEPTH", 2)
+        worker_counts = [
+            self._stage_worker_count(name, max_concurrent) for name, _ in self.stages
+        ]
+        queues: list[asyncio.Queue] = [
+            asyncio.Queue(maxsize=queue_depth) for _ in self.stages
+        ]
+        busy_ms = {name: 0.0 for name, _ in self.stages}
+        results: list[Optional[PipelineResult]] = []
+        runs: list[_PageRun] = []
+        sentinel = object()
+        batch_start = time.perf_counter()
+        # TRANSLATE_CHAPTER_BATCH=1 时，并发的翻译 worker 合并请求。
+        batcher = self._chapter_batcher()
+
+        scheduler = get_page_scheduler() if page_scheduler_enabled() else None
+
+        async def feed() -> None:
+            index = -1
+            async for ctx in _iter_contexts(contexts):
+                index += 1
+                results.append(None)
+                tag = None
+                if scheduler is not None:
+                    # 与 process() 一样按优先级/章节公平份额领取槽位，页面结束时归还
+                    with use_page_index(index):
+                        tag = schedule_tag.get() or ScheduleTag()
+                    await scheduler.acquire(tag)
+                run = _PageRun(ctx, collect_metrics=True, queue_class=tag.priority if tag else None)
+                if scheduler is not None:
+                    run.slot_release = scheduler.release
+                runs.append(run)
+                try:
+                    await self._begin_run(run, status_callback)
+                except Exception as e:
+                    results[index] = await self._fail_run(run, e, status_callback)
+                    run.release_slot()
+                    continue
+                await queues[0].put((index, run, time.perf_counter()))
+
+        async def work(stage_index: int) -> None:
+            stage_name, module = self.stages[stage_index]
+            queue = queues[stage_index]
+            is_last = stage_index == len(self.stages) - 1
+            while True:
+                item = await queue.get()
+                if item is sentinel:
+                    return
+                index, run, enqueued_at = item
+                started = time.perf_counter()
+                run.metrics.stage_queue_wait_ms[stage_name] = (started - enqueued_at) * 1000
+                try:
+                    if batcher is not None and stage_name == "translator":
+                        async with batcher.page():
+                            await self._run_stage(run, stage_name, module, status_callback)
+                    else:
+                        await self._run_stage(run, stage_name, module, status_callback)
+                except Exception as e:
+                    busy_ms[stage_name] += (time.perf_counter() - started) * 1000
+                    results[index] = await self._fail_run(run, e, status_callback)
+                    run.release_slot()
+                    continue
+                busy_ms[stage_name] += (time.perf_counter() - started) * 1000
+                if is_last:
+                    results[index] = await self._complete_run(run, status_callback)
+                    run.release_slot()
+                else:
+                    await queues[stage_index + 1].put((index, run, time.perf_counter()))
+
+        pools = [
+            [asyncio.create_task(work(i)) for _ in range(count)]
+            for i, count in enumerate(worker_counts)
+        ]
+
+        async def drain() -> None:
+            await feed()
+            # 逐级关闭：上一级全部退出后，下一级才会收到哨兵，保证不丢页。
+            for queue, pool in zip(queues, pools):
+                for _ in pool:
+                    await queue.put(sentinel)
+                await asyncio.gather(*pool)
+
+        all_tasks = [task for pool in pools for task in pool]
+        try:
+            await asyncio.gather(drain(), *all_tasks)
+        except BaseException:
+            for task in all_tasks:
+                task.cancel()
+            for run in runs:
+                run.release_slot()
+            raise
+
+        wall_ms = (time.perf_counter() - batch_start) * 1000
+        occupancy = {
+            name: (busy_ms[name] / (wall_ms * count)) if wall_ms > 0 else 0.0
+            for (name, _), count in zip(self.stages, worker_counts)
+        }
+        for run in runs:
+            if run.metrics is not None:
+                run.metrics.stage_occupancy = dict(occupancy)
+        logger.info(
+            "Staged batch 完成: pages=%d wall=%.0fms occupancy=%s",
+            len(results),
+            wall_ms,
+            {k: round(v, 2) for k, v in occupancy.items()},
+        )
+        return results
+
+    def _chapter_batcher(self) -> Optional[ChapterTranslationBatcher]:
+        """Batcher for TRANSLATE_CHAPTER_BATCH=1, or None if the translator has no AI backend."""
+        if not chapter_batch_enabled():
+            return None
+        if not getattr(self.translator, "use_ai", False):
+            return None
+        get_ai = getattr(self.translator, "_get_ai_translator", None)
+        ai_translator = get_ai() if get_ai else None
+        if ai_translator is None:
+            return None
+        return ChapterTranslationBatcher(ai_translator)
+
+    async def _translate_chapter_batched(
+        self, contexts: list[TaskContext], batcher: ChapterTranslationBatcher
+    ) -> list[TaskContext]:
+        # 页面并发翻译，translate_batch 在 batcher 里合并成多页请求。
+        # 需要消费上一页 carryover 的页面先等上一页翻译完成，保持跨页语义不变。
+        done = [asyncio.Event() for _ in contexts]
+
+        def consumes_carryover(ctx: TaskContext) -> bool:
+            return any(
+                getattr(r, "crosspage_role", None) == "next_top"
+                and getattr(r, "crosspage_pair_id", None)
+                for r in ctx.regions or []
+            )
+
+        waits = [i > 0 and consumes_carryover(ctx) for i, ctx in enumerate(contexts)]
+        batcher.expect(waits.count(False))
+
+        async def translate_page(index: int, ctx: TaskContext) -> TaskContext:
+            try:
+                if waits[index]:
+                    await done[index - 1].wait()
+                async with batcher.page():
+                    return await self.translator.process(ctx)
+            finally:
+                done[index].set()
+
+        translated = await asyncio.gather(
+            *[translate_page(i, ctx) for i, ctx in enumerate(contexts)]
+        )
+        logger.info(
+            "Chapter translate batch: pages=%d page_requests=%d merged_requests=%d",
+            len(contexts),
+            batcher.requests_in,
+            batcher.requests_out,
+        )
+        return list(translated)
+
     async def process_batch_crosspage(
         self,
         contexts: list[TaskContext],
         status_callback: Optional[callable] = None,
     ) -> list[TaskContext]:
-        for ctx in contexts:
-            ctx = await self.ocr.process(ctx)
+        store = get_image_buffer_store()
+        if image_buffer_enabled():
+            for ctx in contexts:
+                store.pin(ctx.task_id, ctx.image_path)
+        try:
+            for ctx in contexts:
+                ctx = await self.ocr.process(ctx)
 
-        for i in range(len(contexts) - 1):
-            await apply_crosspage_split(self.translator, contexts[i], contexts[i + 1])
+            for i in range(len(contexts) - 1):
+                await apply_crosspage_split(self.translator, contexts[i], contexts[i + 1])
 
-        for ctx in contexts:
-            ctx = await self.translator.process(ctx)
+            batcher = self._chapter_batcher()
+            if batcher is None:
+                for ctx in contexts:
+                    ctx = await self.translator.process(ctx)
+            else:
+                contexts = await self._translate_chapter_batched(contexts, batcher)
 
-        results = []
-        for ctx in contexts:
-            ctx = await self.inpainter.process(ctx)
-            ctx = await self.renderer.process(ctx)
-            ctx = await self.upscaler.process(ctx)
-            results.append(ctx)
-        return results
+            results = []
+            for ctx in contexts:
+                ctx = await self.inpainter.process(ctx)
+                ctx = await self.renderer.process(ctx)
+                ctx = await self.upscaler.process(ctx)
+                store.release(ctx.task_id)
+                results.append(ctx)
+            return results
+        finally:
+            for ctx in contexts:
+                store.release(ctx.task_id)
 
 
 # Convenience function
@@ -0,0 +1,365 @@
+"""SQLite index over the per-run quality report JSON files.
+
+``write_quality_report`` still writes one JSON file per run (tools and tests read
+them), but every report is also recorded here keyed by page
+(``manga__chapter__page`` slug, the same one used in the file name) and
+creation time. The latest report of each page is kept pre-aggregated (region
+count, retranslate / low-OCR counts, quality scores), so the chapter view reads
+one row per page instead of globbing and parsing JSON files.
+
+Retention: only the newest ``QUALITY_REPORT_KEEP_PER_PAGE`` reports of a page are
+kept, and older-than-``QUALITY_REPORT_RETENTION_DAYS`` reports are pruned
+(the latest report of a page is never pruned). Pruned rows delete their JSON
+file too. JSON files written before the index existed are imported once when
+the index is first opened; they are only swept right away when
+``QUALITY_REPORT_PRUNE_ON_OPEN=1``, otherwise retention reaches them through
+the regular per-page / hourly pruning. Every sweep logs how many files it deleted.
+
+Env:
+    QUALITY_REPORT_INDEX: 1/0 (default 1; 0 = chapter view globs JSON files)
+    QUALITY_REPORT_KEEP_PER_PAGE: reports kept per page (default 5, 0 = unbounded)
+    QUALITY_REPORT_RETENTION_DAYS: max age of non-latest reports (default 30, 0 = forever)
+    QUALITY_REPORT_PRUNE_ON_OPEN: 1/0 (default 0; 1 = apply retention to the whole
+        directory when the index is first created)
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Iterable, Optional
+
+from .utils.env import read_env_int
+
+logger = logging.getLogger(__name__)
+
+_DB_NAME = "_index.sqlite3"
+_PRUNE_INTERVAL_SEC = 3600.0
+_LOW_OCR_CONFIDENCE = 0.6
+
+
+def quality_index_enabled() -> bool:
+    return os.getenv("QUALITY_REPORT_INDEX", "1") == "1"
+
+
+def _prune_on_open() -> bool:
+    return os.getenv("QUALITY_REPORT_PRUNE_ON_OPEN", "0") == "1"
+
+
+def page_key_for(image_path: str) -> str:
+    """Page key of an image (the slug in its report file names)."""
+    from .quality_report import _source_slug
+
+    return _source_slug(str(image_path))
+
+
+def summarize_report(data: Any) -> Optional[dict]:
+    """Pre-aggregated view of a report for page status; None if unreadable."""
+    if not isinstance(data, dict) or not data:
+        return None
+    regions = data.get("regions") or []
+    retranslate = 0
+    low_ocr = 0
+    scores: list[float] = []
+    for region in regions:
+        if "retranslate" in (region.get("recommendations") or []):
+            retranslate += 1
+        score = region.get("quality_score")
+        if score is not None:
+            scores.append(score)
+        confidence = region.get("confidence")
+        if confidence is not None and confidence < _LOW_OCR_CONFIDENCE:
+            low_ocr += 1
+    return {
+        "regions": len(regions),
+        "retranslate": retranslate,
+        "low_ocr": low_ocr,
+        "quality_scores": scores,
+    }
+
+
+def _split_page_key(page_key: str) -> tuple[Optional[str], Optional[str], str]:
+    parts = page_key.split("__")
+    if len(parts) >= 3:
+        return "__".join(parts[:-2]), parts[-2], parts[-1]
+    return None, None, page_key
+
+
+class QualityReportIndex:
+    """Report rows per page plus a pre-aggregated latest-report table."""
+
+    def __init__(
+        self, db_path: Path, keep_per_page: int = 5, retention_days: float = 30
+    ) -> None:
+        self.db_path = Path(db_path)
+        self.keep_per_page = max(0, int(keep_per_page))
+        self.retention_days = max(0.0, float(retention_days))
+        self._lock = threading.Lock()
+        # 按小时的过期清理从打开索引一个周期后开始，不在第一次写报告时全量删除
+        self._last_prune = time.time()
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(str(self.db_path), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS reports ("
+            " id INTEGER PRIMARY KEY AUTOINCREMENT,"
+            " page_key TEXT NOT NULL,"
+            " manga TEXT,"
+            " chapter TEXT,"
+            " page TEXT NOT NULL,"
+            " task_id TEXT,"
+            " path TEXT NOT NULL UNIQUE,"
+            " created_at REAL NOT NULL)"
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_reports_page ON reports(page_key, created_at)"
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_reports_chapter"
+            " ON reports(manga, chapter, page, created_at)"
+        )
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS latest ("
+            " page_key TEXT PRIMARY KEY,"
+            " report_id INTEGER NOT NULL,"
+            " path TEXT NOT NULL,"
+            " created_at REAL NOT NULL,"
+            " summary TEXT)"
+        )
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS meta (name TEXT PRIMARY KEY, value TEXT NOT NULL)"
+        )
+        self._conn.commit()
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+    def record(
+        self,
+        report_path: str | Path,
+        data: Any,
+        page_key: Optional[str] = None,
+        created_at: Optional[float] = None,
+        commit: bool = True,
+    ) -> None:
+        """Index one report file (``data`` is its parsed JSON, None if invalid).
+
+        ``commit=False`` leaves the row in the open transaction so a batch of
+        reports commits once (see ``commit_all``).
+        """
+        path = Path(report_path).resolve()
+        if page_key is None:
+            page_key = path.stem.rsplit("__", 1)[0]
+        task_id = path.stem.rsplit("__", 1)[-1]
+        created = time.time() if created_at is None else float(created_at)
+        with self._lock:
+            self._insert_locked(page_key, task_id, str(path), created, data)
+            self._prune_page_locked(page_key)
+            if time.time() - self._last_prune >= _PRUNE_INTERVAL_SEC:
+                self._prune_expired_locked()
+            if commit:
+                self._conn.commit()
+
+    def commit(self) -> None:
+        with self._lock:
+            self._conn.commit()
+
+    def _insert_locked(
+        self, page_key: str, task_id: str, path: str, created: float, data: Any
+    ) -> bool:
+        manga, chapter, page = _split_page_key(page_key)
+        cursor = self._conn.execute(
+            "INSERT OR IGNORE INTO reports(page_key, manga, chapter, page, task_id, path, created_at)"
+            " VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (page_key, manga, chapter, page, task_id, path, created),
+        )
+        if not cursor.rowcount:
+            return False
+        summary = summarize_report(data)
+        self._conn.execute(
+            "INSERT INTO latest(page_key, report_id, path, created_at, summary)"
+            " VALUES (?, ?, ?, ?, ?)"
+            " ON CONFLICT(page_key) DO UPDATE SET"
+            " report_id = excluded.report_id, path = excluded.path,"
+            " created_at = excluded.created_at, summary = excluded.summary"
+            " WHERE excluded.created_at >= latest.created_at",
+            (
+                page_key,
+                cursor.lastrowid,
+                path,
+                created,
+                json.dumps(summary, separators=(",", ":")) if summary else None,
+            ),
+        )
+        return True
+
+    def latest_many(self, page_keys: Iterable[str]) -> dict[str, dict]:
+        """Latest report per page: ``{page_key: {path, created_at, summary}}``.
+
+        ``summary`` is None when the latest report could not be parsed.
+        """
+        keys = list(dict.fromkeys(page_keys))
+        found: dict[str, dict] = {}
+        with self._lock:
+            # SQLite 变量上限保守按 500 分批
+            for start in range(0, len(keys), 500):
+                chunk = keys[start : start + 500]
+                marks = ",".join("?" * len(chunk))
+                rows = self._conn.execute(
+                    "SELECT page_key, path, created_at, summary FROM latest"
+                    f" WHERE page_key IN ({marks})",
+                    chunk,
+                ).fetchall()
+                for page_key, path, created_at, summary in rows:
+                    found[page_key] = {
+                        "path": path,
+                        "created_at": created_at,
+                        "summary": json.loads(summary) if summary else None,
+                    }
+        return found
+
+    def _delete_rows_locked(self, rows: list[tuple[int, str]]) -> int:
+        for report_id, path in rows:
+            try:
+                Path(path).unlink(missing_ok=True)
+            except OSError as exc:
+                logger.debug("Quality report prune failed for %s: %s", path, exc)
+            self._conn.execute("DELETE FROM reports WHERE id = ?", (report_id,))
+        return len(rows)
+
+    def _prune_page_locked(self, page_key: str) -> int:
+        if self.keep_per_page <= 0:
+            return 0
+        rows = self._conn.execute(
+            "SELECT id, path FROM reports WHERE page_key = ?"
+            " ORDER BY created_at DESC, id DESC LIMIT -1 OFFSET ?",
+            (page_key, self.keep_per_page),
+        ).fetchall()
+        return self._delete_rows_locked(rows)
+
+    def _prune_expired_locked(self) -> int:
+        self._last_prune = time.time()
+        if self.retention_days <= 0:
+            return 0
+        cutoff = time.time() - self.retention_days * 86400
+        rows = self._conn.execute(
+            "SELECT id, path FROM reports WHERE created_at < ?"
+            " AND id NOT IN (SELECT report_id FROM latest)",
+            (cutoff,),
+        ).fetchall()
+        removed = self._delete_rows_locked(rows)
+        if removed:
+            logger.info(
+                "Pruned %d quality reports older than %s days in %s",
+                removed,
+                self.retention_days,
+                self.db_path.parent,
+            )
+        return removed
+
+    def prune(self) -> int:
+        """Apply the retention policy to every page; returns reports removed."""
+        with self._lock:
+            removed = 0
+            if self.keep_per_page > 0:
+                keys = self._conn.execute(
+                    "SELECT page_key FROM reports GROUP BY page_key HAVING COUNT(*) > ?",
+                    (self.keep_per_page,),
+                ).fetchall()
+                for (page_key,) in keys:
+                    removed += self._prune_page_locked(page_key)
+            removed += self._prune_expired_locked()
+            self._conn.commit()
+        return removed
+
+    def import_json_reports(self, report_dir: Path) -> int:
+        """Index report JSON files already on disk; returns how many were added."""
+        imported = 0
+        with self._lock:
+            known = {
+                row[0] for row in self._conn.execute("SELECT path FROM reports")
+            }
+            for path in Path(report_dir).resolve().glob("*.json"):
+                if str(path) in known or "__" not in path.stem:
+                    continue
+                try:
+                    created = path.stat().st_mtime
+                    data = json.loads(path.read_text(encoding="utf-8"))
+                except FileNotFoundError:
+                    continue
+                except (OSError, ValueError):
+                    data = None
+                    created = time.time()
+                page_key = path.stem.rsplit("__", 1)[0]
+                task_id = path.stem.rsplit("__", 1)[-1]
+                if self._insert_locked(page_key, task_id, str(path), created, data):
+                    imported += 1
+            self._conn.execute(
+                "INSERT OR REPLACE INTO meta(name, value) VALUES ('json_imported', ?)",
+                (str(time.time()),),
+            )
+            self._conn.commit()
+        return imported
+
+    def needs_import(self) -> bool:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value FROM meta WHERE name = 'json_imported'"
+            ).fetchone()
+        return row is None
+
+    def stats(self) -> dict:
+        with self._lock:
+            reports, pages = self._conn.execute(
+                "SELECT COUNT(*), COUNT(DISTINCT page_key) FROM reports"
+            ).fetchone()
+        return {
+            "reports": int(reports),
+            "pages": int(pages),
+            "keep_per_page": self.keep_per_page,
+            "retention_days": self.retention_days,
+        }
+
+
+_indexes: dict[str, QualityReportIndex] = {}
+_indexes_lock = threading.Lock()
+
+
+def commit_all() -> None:
+    """Commit every open index (batch end hook of the artifact sink)."""
+    with _indexes_lock:
+        indexes = list(_indexes.values())
+    for index in indexes:
+        index.commit()
+
+
+def get_quality_index(report_dir: Path) -> QualityReportIndex:
+    """Shared index for ``report_dir``; imports legacy JSON reports on first open."""
+    db_path = Path(report_dir) / _DB_NAME
+    key = str(db_path.resolve())
+    with _indexes_lock:
+        index = _indexes.get(key)
+        if index is None:
+            index = QualityReportIndex(
+                db_path,
+                keep_per_page=read_env_int("QUALITY_REPORT_KEEP_PER_PAGE", 5, minimum=0),
+                retention_days=read_env_int("QUALITY_REPORT_RETENTION_DAYS", 30, minimum=0),
+            )
+            if index.needs_import():
+                count = index.import_json_reports(Path(report_dir))
+                if count:
+                    logger.info("Indexed %d existing quality reports in %s", count, report_dir)
+                if _prune_on_open():
+                    removed = index.prune()
+                    logger.info(
+                        "Pruned %d quality report files in %s on first open", removed, report_dir
+                    )
+            _indexes[key] = index
+        return index
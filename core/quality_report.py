@@ -1,10 +1,17 @@
+import asyncio
 import json
+import logging
 import os
 import re
 import resource
 import sys
 from pathlib import Path
-from typing import Any, Dict, List
+from typing import Any, Dict, List, Optional
+
+from .artifact_sink import artifact_sink_enabled, get_artifact_sink
+from .quality_index import commit_all, get_quality_index, quality_index_enabled
+
+logger = logging.getLogger(__name__)
 
 
 def _resolve_output_dir() -> Path:
@@ -39,6 +46,8 @@ _TRANSLATOR_COUNTER_KEYS = (
     "timeouts_primary",
     "fallback_provider_calls",
     "missing_number_retries",
+    "memory_hits",
+    "memory_misses",
 )
 
 
@@ -76,7 +85,29 @@ _RUN_CONFIG_KEYS = [
     "AI_TRANSLATE_BATCH_CONCURRENCY",
     "AI_TRANSLATE_MAX_INFLIGHT_CALLS",
     "AI_TRANSLATE_FASTFAIL",
+    "AI_TRANSLATE_ASYNC_CLIENT",
+    "AI_TRANSLATE_STREAM",
+    "AI_TRANSLATE_ADAPTIVE_BATCH",
+    "AI_TRANSLATE_BATCH_TOKEN_BUDGET",
+    "TRANSLATION_MEMORY_ENABLE",
+    "TRANSLATE_CHAPTER_BATCH",
+    "TRANSLATE_CHAPTER_BATCH_CHAR_BUDGET",
+    # Pipeline knobs
+    "PIPELINE_STAGED_BATCH",
+    "PIPELINE_STAGE_QUEUE_DEPTH",
+    "ARTIFACT_SINK_ASYNC",
+    "TRANSLATE_WORKER_MODE",
+    "WORKER_CONCURRENCY",
+    "PAGE_SCHEDULER_ENABLE",
+    "PAGE_SCHEDULER_SLOTS",
+    # Inpainter knobs
+    "LAMA_BATCH_ENABLE",
+    "LAMA_BATCH_SIZE",
+    "INPAINT_HYBRID",
     # OCR knobs
+    "OCR_POOL_SIZE",
+    "OCR_PREDICT_BATCH_SIZE",
+    "OCR_MAX_CONCURRENCY",
     "OCR_TILE_HEIGHT",
     "OCR_TILE_OVERLAP_RATIO",
     "OCR_EDGE_TILE_MODE",
@@ -126,6 +157,12 @@ def _queue_wait_ms_from_metrics(metrics: Any) -> float:
     return max(0.0, value)
 
 
+def _queue_class_from_metrics(metrics: Any) -> Optional[str]:
+    if isinstance(metrics, dict):
+        return metrics.get("queue_class")
+    return getattr(metrics, "queue_class", None)
+
+
 def _sanitize_component(text: str) -> str:
     text = text.strip().lower()
     text = re.sub(r"[^a-z0-9_-]+", "_", text)
@@ -203,7 +240,8 @@ def _evaluate_region_quality(region) -> Dict[str, object]:
     }
 
 
-def write_quality_report(result) -> str:
+def build_quality_report(result) -> tuple[Path, str, Dict[str, Any]]:
+    """Snapshot ``result`` into ``(report_path, page slug, report data)``."""
     ctx = result.task
     output_dir = _resolve_output_dir()
     slug = _source_slug(ctx.image_path)
@@ -221,6 +259,7 @@ def write_quality_report(result) -> str:
         "timings_ms": _timings_from_metrics(result.metrics),
         "translator_counters": _translator_counters_from_metrics(result.metrics),
         "queue_wait_ms": _queue_wait_ms_from_metrics(result.metrics),
+        "queue_class": _queue_class_from_metrics(result.metrics),
         "run_config": _collect_run_config(),
         "process": _collect_process_metrics(),
         "regions": [],
@@ -259,5 +298,44 @@ def write_quality_report(result) -> str:
             }
         )
 
-    report_path.write_text(json.dumps(data, ensure_ascii=False, indent=2))
+    return report_path, slug, data
+
+
+def _store_quality_report(
+    report_path: Path, slug: str, data: Dict[str, Any], commit: bool = True
+) -> str:
+    # 紧凑 JSON（不缩进）：报告按页累积，体积与序列化耗时都明显更小
+    report_path.write_text(json.dumps(data, ensure_ascii=False))
+    if quality_index_enabled():
+        try:
+            get_quality_index(report_path.parent).record(
+                report_path, data, page_key=slug, commit=commit
+            )
+        except Exception as exc:  # noqa: BLE001 - 索引失败不影响报告本身
+            logger.warning("Quality report index update failed: %s", exc)
     return str(report_path)
+
+
+def write_quality_report(result) -> str:
+    return _store_quality_report(*build_quality_report(result))
+
+
+async def write_quality_report_async(result) -> str:
+    """Write the report on the artifact sink thread without blocking the loop."""
+    report_path, slug, data = build_quality_report(result)
+    if not artifact_sink_enabled():
+        return _store_quality_report(report_path, slug, data)
+    future = await get_artifact_sink().submit_async(
+        _store_quality_report,
+        report_path,
+        slug,
+        data,
+        False,
+        key=("report", str(report_path)),
+        policy="degrade",
+        on_batch_end=commit_all,
+    )
+    if future is None:
+        # sink 已关闭（进程退出中）：仍然不在事件循环里写
+        return await asyncio.to_thread(_store_quality_report, report_path, slug, data)
+    return await asyncio.wrap_future(future)
@@ -11,13 +11,17 @@ Features:
 import asyncio
 import math
 import re
+import weakref
+from dataclasses import dataclass
+from functools import lru_cache
 from pathlib import Path
-from typing import Literal, Optional, Tuple
+from typing import Callable, Literal, Optional, Tuple
 
 import cv2
 import numpy as np
 from PIL import Image, ImageDraw, ImageFont
 
+from .image_buffer import read_image
 from .image_io import save_image
 from .models import Box2D, FontStyleParams, RegionData
 from .style_config import load_style_config
@@ -27,6 +31,76 @@ from .style_config import load_style_config
 FORBIDDEN_LINE_START = ".,;:?!，。；：？！）】》、"
 FORBIDDEN_LINE_END = "（【《"
 
+# 字号二分/放宽循环会反复探测同一批 (字体, 字号)，进程内共享缓存避免重复 truetype 加载。
+_FONT_CACHE_SIZE = 256
+
+
+@lru_cache(maxsize=_FONT_CACHE_SIZE)
+def load_font(font_path: Optional[str], size: int) -> ImageFont.FreeTypeFont:
+    """Load (and cache) a font; falls back to PIL's default font."""
+    try:
+        if font_path:
+            return ImageFont.truetype(font_path, size)
+    except Exception:
+        pass
+    return ImageFont.load_default()
+
+
+class GlyphAdvanceTable:
+    """Per-font char -> advance width (px); each glyph is measured once."""
+
+    def __init__(self, font: ImageFont.FreeTypeFont):
+        self._font = font
+        self._advances: dict[str, float] = {}
+
+    def advance(self, char: str) -> float:
+        width = self._advances.get(char)
+        if width is None:
+            try:
+                width = float(self._font.getlength(char))
+            except Exception:
+                width = 20.0  # Fallback estimate
+            self._advances[char] = width
+        return width
+
+    def __len__(self) -> int:
+        return len(self._advances)
+
+
+_glyph_tables: "weakref.WeakKeyDictionary[ImageFont.FreeTypeFont, GlyphAdvanceTable]" = (
+    weakref.WeakKeyDictionary()
+)
+
+
+def glyph_advances(font: ImageFont.FreeTypeFont) -> GlyphAdvanceTable:
+    """Shared advance table for ``font`` (lives as long as the font object)."""
+    try:
+        table = _glyph_tables.get(font)
+        if table is None:
+            table = GlyphAdvanceTable(font)
+            _glyph_tables[font] = table
+        return table
+    except TypeError:
+        return GlyphAdvanceTable(font)
+
+
+@dataclass
+class RegionStyle:
+    """Per-region style estimate from :meth:`StyleEstimator.estimate_styles`."""
+
+    text_color: str
+    needs_stroke: bool
+    font_size: Optional[int] = None
+
+
+def _quantized_mode_bgr(pixels: np.ndarray) -> tuple[int, int, int]:
+    """Most common colour after //16 quantization (ties -> first seen, like Counter)."""
+    q = (pixels // 16).astype(np.uint16)
+    codes = (q[:, 0] << 8) | (q[:, 1] << 4) | q[:, 2]
+    counts = np.bincount(codes, minlength=4096)
+    top = counts == counts.max()
+    code = int(codes[np.argmax(top[codes])])
+    return ((code >> 8) & 0xF) * 16, ((code >> 4) & 0xF) * 16, (code & 0xF) * 16
 
 
 class StyleEstimator:
@@ -76,44 +150,32 @@ class StyleEstimator:
 
             # Convert to grayscale for analysis
             gray = cv2.cvtColor(roi, cv2.COLOR_BGR2GRAY)
-            
-            # Determine background brightness
-            mean_brightness = gray.mean()
-            
-            # For manga: detect text pixels based on background
-            if mean_brightness > 127:
-                # Light background -> dark text
-                mask = gray < 100  # Stricter threshold for text
-            else:
-                # Dark background -> light text
-                mask = gray > 180
-            
-            if not mask.any():
-                return self.default_color
+            return self._text_color_from_roi(roi, gray, gray.mean())
 
-            # Get text pixels
-            text_pixels = roi[mask]
-            if len(text_pixels) == 0:
-                return self.default_color
+        except Exception:
+            return self.default_color
 
-            # Use mode (most common color) instead of mean
-            # Quantize to reduce color space for mode calculation
-            quantized = (text_pixels // 16) * 16
-            # Find the most common color
-            from collections import Counter
-            pixel_tuples = [tuple(p) for p in quantized]
-            if not pixel_tuples:
-                return self.default_color
-            
-            mode_color = Counter(pixel_tuples).most_common(1)[0][0]
-            # BGR to RGB
-            b, g, r = mode_color
-            
-            return f"#{r:02x}{g:02x}{b:02x}"
+    def _text_color_from_roi(
+        self, roi: np.ndarray, gray: np.ndarray, mean_brightness: float
+    ) -> str:
+        # For manga: detect text pixels based on background
+        if mean_brightness > 127:
+            # Light background -> dark text
+            mask = gray < 100  # Stricter threshold for text
+        else:
+            # Dark background -> light text
+            mask = gray > 180
 
-        except Exception:
+        # Get text pixels
+        text_pixels = roi[mask]
+        if len(text_pixels) == 0:
             return self.default_color
 
+        # Use mode (most common color) instead of mean; quantize to reduce color space
+        b, g, r = _quantized_mode_bgr(text_pixels)
+        # BGR to RGB
+        return f"#{r:02x}{g:02x}{b:02x}"
+
     def estimate_font_size(
         self,
         box: Box2D,
@@ -215,6 +277,59 @@ class StyleEstimator:
         except Exception:
             return False
 
+    def estimate_styles(
+        self,
+        image: np.ndarray,
+        style_boxes: list[Box2D],
+        size_boxes: Optional[list[Optional[Box2D]]] = None,
+        text_lengths: Optional[list[int]] = None,
+        stroke_threshold: int = 180,
+        **font_size_kwargs,
+    ) -> list[RegionStyle]:
+        """
+        Estimate colour, stroke need and font size for all regions of one page.
+
+        The page is converted to grayscale once; each region only slices it.
+        ``font_size`` is filled for regions with ``text_lengths[i] > 0`` (sized
+        on ``size_boxes[i]``, defaulting to the style box).
+
+        Args:
+            image: Source image (BGR format)
+            style_boxes: Boxes to sample colour/background from
+            size_boxes: Layout boxes for font size estimation
+            text_lengths: Source text lengths (0/None = no font size estimate)
+            stroke_threshold: Background brightness threshold for stroke
+            **font_size_kwargs: Passed to estimate_font_size
+
+        Returns:
+            One RegionStyle per style box
+        """
+        try:
+            page_gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
+        except Exception:
+            page_gray = None
+
+        styles: list[RegionStyle] = []
+        for i, box in enumerate(style_boxes):
+            text_color, stroke = self.default_color, False
+            try:
+                roi = image[box.y1:box.y2, box.x1:box.x2]
+                if page_gray is not None and roi.size:
+                    gray = page_gray[box.y1:box.y2, box.x1:box.x2]
+                    mean_brightness = gray.mean()
+                    text_color = self._text_color_from_roi(roi, gray, mean_brightness)
+                    stroke = bool(mean_brightness < stroke_threshold)
+            except Exception:
+                text_color, stroke = self.default_color, False
+
+            font_size = None
+            length = text_lengths[i] if text_lengths and i < len(text_lengths) else 0
+            if length:
+                size_box = (size_boxes[i] if size_boxes and i < len(size_boxes) else None) or box
+                font_size = self.estimate_font_size(size_box, length, **font_size_kwargs)
+            styles.append(RegionStyle(text_color, stroke, font_size))
+        return styles
+
 
 class TextRenderer:
     """
@@ -276,12 +391,7 @@ class TextRenderer:
 
     def _get_font(self, size: int) -> ImageFont.FreeTypeFont:
         """Get font with specified size."""
-        try:
-            if self.font_path:
-                return ImageFont.truetype(self.font_path, size)
-        except Exception:
-            pass
-        return ImageFont.load_default()
+        return load_font(self.font_path, size)
 
     def wrap_text(
         self,
@@ -311,31 +421,32 @@ class TextRenderer:
                 or 0xFF00 <= code <= 0xFFEF
             )
 
+        advances = glyph_advances(font)
+        size = getattr(font, "size", self.default_font_size)
+
+        def measure(line: str) -> tuple[float, float, bool]:
+            # (字形宽度累加, CJK 估算宽度累加, 是否含 CJK)
+            glyphs = sum(advances.advance(c) for c in line)
+            estimate = sum(size if is_cjk(c) else size * 0.6 for c in line)
+            return glyphs, estimate, any(is_cjk(c) for c in line)
+
         lines = []
         current_line = ""
+        line_glyphs, line_estimate, line_has_cjk = 0.0, 0.0, False
 
         for char in text:
-            test_line = current_line + char
-            
-            # Get text width
-            try:
-                bbox = font.getbbox(test_line)
-                width = bbox[2] - bbox[0]
-            except Exception:
-                width = len(test_line) * 20  # Fallback estimate
-
-            if any(is_cjk(c) for c in test_line):
-                size = getattr(font, "size", self.default_font_size)
-                estimated_width = 0.0
-                for c in test_line:
-                    if is_cjk(c):
-                        estimated_width += size
-                    else:
-                        estimated_width += size * 0.6
-                width = max(width, estimated_width)
+            # 行宽由逐字 advance 累加得到，不再对每个前缀重新 getbbox（O(n^2)）。
+            char_cjk = is_cjk(char)
+            glyphs = line_glyphs + advances.advance(char)
+            estimate = line_estimate + (size if char_cjk else size * 0.6)
+            width = glyphs
+            if line_has_cjk or char_cjk:
+                width = max(width, estimate)
 
             if width <= max_width:
-                current_line = test_line
+                current_line += char
+                line_glyphs, line_estimate = glyphs, estimate
+                line_has_cjk = line_has_cjk or char_cjk
             else:
                 # Need to wrap
                 if current_line:
@@ -349,6 +460,7 @@ class TextRenderer:
                         current_line = char
                 else:
                     current_line = char
+                line_glyphs, line_estimate, line_has_cjk = measure(current_line)
 
         # Add remaining text
         if current_line:
@@ -470,6 +582,8 @@ class TextRenderer:
         output_path: str,
         original_image_path: Optional[str] = None,
         purpose: Literal["final", "intermediate"] = "final",
+        image: Optional[np.ndarray] = None,
+        on_rendered: Optional[Callable[[str, np.ndarray], None]] = None,
     ) -> str:
         """
         Render translated text onto image.
@@ -479,6 +593,9 @@ class TextRenderer:
             regions: Regions with target_text
             output_path: Path to save result
             original_image_path: Original image for style estimation
+            image: Already-decoded BGR background; skips reading image_path
+            on_rendered: Called with (saved_path, rendered BGR array) so later
+                stages can reuse the result without re-decoding the saved file
             
         Returns:
             Path to rendered image
@@ -492,6 +609,8 @@ class TextRenderer:
             output_path,
             original_image_path,
             purpose,
+            image,
+            on_rendered,
         )
 
     def _render_sync(
@@ -501,17 +620,22 @@ class TextRenderer:
         output_path: str,
         original_image_path: Optional[str] = None,
         purpose: Literal["final", "intermediate"] = "final",
+        image_bgr: Optional[np.ndarray] = None,
+        on_rendered: Optional[Callable[[str, np.ndarray], None]] = None,
     ) -> str:
         """Synchronous rendering implementation."""
         # Load images
-        image = Image.open(image_path).convert("RGB")
+        if image_bgr is not None:
+            image = Image.fromarray(cv2.cvtColor(image_bgr, cv2.COLOR_BGR2RGB))
+        else:
+            image = Image.open(image_path).convert("RGB")
         draw = ImageDraw.Draw(image)
 
-        # Load original for style estimation
+        # Load original for style estimation (decoded once per task via the image buffer)
         if original_image_path:
-            original_cv = cv2.imread(original_image_path)
+            original_cv = read_image(original_image_path)
         else:
-            original_cv = cv2.imread(image_path)
+            original_cv = read_image(image_path)
 
         # Normalize font size within the same bubble (if bubble_id available)
         try:
@@ -565,12 +689,11 @@ class TextRenderer:
                     r.font_size_source = "override"
                     r.font_size_ref = ref_size
 
+        default_font = FontStyleParams().font_size
+        to_render: list[tuple[RegionData, bool]] = []
         for region in regions:
             if not region.target_text or not region.box_2d:
                 continue
-
-            layout_box = region.render_box_2d or region.box_2d
-            style_box = region.box_2d
             text = region.target_text
 
             # Skip SFX markers
@@ -585,34 +708,44 @@ class TextRenderer:
             if text.startswith("[翻译失败]"):
                 continue
 
-            # Estimate style from original
-            text_color = self.style_estimator.estimate_text_color(
-                original_cv, style_box
-            )
-            needs_stroke = self.style_estimator.needs_stroke(original_cv, style_box)
-
-            # Fit text to box with reference size
-            ref_size = None
-            ref_source = "estimate"
-            default_font = FontStyleParams().font_size
-            if (
+            has_override = bool(
                 region.font_style_params
                 and (
                     region.font_style_params.font_size != default_font
                     or region.font_size_source == "override"
                 )
-            ):
+            )
+            to_render.append((region, has_override))
+
+        # Estimate style from original: one grayscale pass for the whole page
+        styles = self.style_estimator.estimate_styles(
+            original_cv,
+            [region.box_2d for region, _ in to_render],
+            size_boxes=[region.render_box_2d or region.box_2d for region, _ in to_render],
+            text_lengths=[
+                0 if has_override else len(region.source_text or "")
+                for region, has_override in to_render
+            ],
+            line_spacing=self.line_spacing,
+            line_spacing_compact=self.line_spacing_compact,
+            compact_threshold=self.line_spacing_compact_threshold,
+            bias=self.style_config.font_size_estimate_bias,
+        )
+
+        for (region, has_override), style in zip(to_render, styles):
+            layout_box = region.render_box_2d or region.box_2d
+            text = region.target_text
+            text_color = style.text_color
+            needs_stroke = style.needs_stroke
+
+            # Fit text to box with reference size
+            ref_size = None
+            ref_source = "estimate"
+            if has_override:
                 ref_size = region.font_style_params.font_size
                 ref_source = "override"
-            elif region.source_text:
-                ref_size = self.style_estimator.estimate_font_size(
-                    layout_box,
-                    len(region.source_text),
-                    line_spacing=self.line_spacing,
-                    line_spacing_compact=self.line_spacing_compact,
-                    compact_threshold=self.line_spacing_compact_threshold,
-                    bias=self.style_config.font_size_estimate_bias,
-                )
+            elif style.font_size is not None:
+                ref_size = style.font_size
                 ref_source = "estimate"
 
             font_size, lines, meta = self.fit_text_to_box_with_reference(
@@ -661,7 +794,10 @@ class TextRenderer:
                     draw.text((x, y), line, font=font, fill=text_color)
 
         # Save result
-        return save_image(image, output_path, purpose=purpose)
+        saved_path = save_image(image, output_path, purpose=purpose)
+        if on_rendered is not None:
+            on_rendered(saved_path, cv2.cvtColor(np.asarray(image), cv2.COLOR_RGB2BGR))
+        return saved_path
 
 
 # Convenience function
@@ -0,0 +1,195 @@
+"""Adaptive batch planning for AITranslator.translate_batch.
+
+translate_batch used to send the whole page as one request and only split
+into chunks after that request failed, which drives translator p95 on
+text-heavy pages (output tokens are generated serially, so one big request is
+slower than two half-size requests running in parallel).
+
+The planner pre-splits by estimated tokens and item count. It keeps a small
+per-(provider, model) latency model ``latency_ms ~= base + per_token * tokens``
+fitted on recent successful calls, and picks the slice count whose expected
+wall time (waves x slowest slice + per-extra-request penalty) is lowest.
+
+Env:
+    AI_TRANSLATE_ADAPTIVE_BATCH: 1/0 (default 0)
+    AI_TRANSLATE_BATCH_TOKEN_BUDGET: max estimated tokens per slice (default 2400)
+    AI_TRANSLATE_ADAPTIVE_SLICE_PENALTY_MS: cost charged per extra request (default 600)
+"""
+
+from __future__ import annotations
+
+import math
+import os
+import re
+import threading
+from collections import deque
+from dataclasses import dataclass
+from typing import Optional
+
+from .utils.env import read_env_int
+
+_WIDE_RE = re.compile(r"[\u1100-\u11ff\u3040-\u30ff\u3130-\u318f\u3400-\u9fff\uac00-\ud7af\uf900-\ufaff]")
+
+# 冷启动先验：约 1.5s 固定开销 + 每 token 10ms（输出与输入 token 数量级相同）。
+_PRIOR_BASE_MS = 1500.0
+_PRIOR_MS_PER_TOKEN = 10.0
+_WINDOW = 64
+_MIN_SAMPLES = 6
+
+
+def adaptive_batch_enabled() -> bool:
+    return os.getenv("AI_TRANSLATE_ADAPTIVE_BATCH", "0") == "1"
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token estimate: one per CJK/Hangul/kana char, ~4 chars per token otherwise."""
+    if not text:
+        return 0
+    wide = len(_WIDE_RE.findall(text))
+    return wide + math.ceil((len(text) - wide) / 4)
+
+
+class LatencyModel:
+    """Windowed least-squares fit of request latency against estimated tokens."""
+
+    def __init__(self, window: int = _WINDOW):
+        self._samples: deque[tuple[float, float]] = deque(maxlen=window)
+        self._lock = threading.Lock()
+        self.base_ms = _PRIOR_BASE_MS
+        self.ms_per_token = _PRIOR_MS_PER_TOKEN
+
+    @property
+    def samples(self) -> int:
+        return len(self._samples)
+
+    def observe(self, tokens: int, latency_ms: float) -> None:
+        if tokens <= 0 or latency_ms <= 0:
+            return
+        with self._lock:
+            self._samples.append((float(tokens), float(latency_ms)))
+            self._refit()
+
+    def _refit(self) -> None:
+        n = len(self._samples)
+        if n < _MIN_SAMPLES:
+            return
+        xs = [x for x, _ in self._samples]
+        ys = [y for _, y in self._samples]
+        mean_x = sum(xs) / n
+        mean_y = sum(ys) / n
+        var_x = sum((x - mean_x) ** 2 for x in xs)
+        if var_x <= 1e-9:
+            # 样本 token 数都一样，只能按先验斜率更新截距。
+            self.base_ms = max(0.0, mean_y - self.ms_per_token * mean_x)
+            return
+        slope = sum((x - mean_x) * (y - mean_y) for x, y in zip(xs, ys)) / var_x
+        slope = max(0.0, slope)
+        self.ms_per_token = slope
+        self.base_ms = max(0.0, mean_y - slope * mean_x)
+
+    def predict(self, tokens: int) -> float:
+        return self.base_ms + self.ms_per_token * max(0, tokens)
+
+
+_models: dict[tuple[str, str], LatencyModel] = {}
+_models_lock = threading.Lock()
+
+
+def get_latency_model(provider: str, model: str) -> LatencyModel:
+    key = (provider or "", model or "")
+    with _models_lock:
+        latency_model = _models.get(key)
+        if latency_model is None:
+            latency_model = LatencyModel()
+            _models[key] = latency_model
+        return latency_model
+
+
+@dataclass
+class BatchPlan:
+    slices: list[list[tuple[int, str]]]
+    concurrency: int
+    predicted_ms: float
+    tokens_total: int
+
+    def to_metrics(self, latency_model: LatencyModel) -> dict:
+        return {
+            "batch_plan_slices": len(self.slices),
+            "batch_plan_concurrency": self.concurrency,
+            "batch_plan_predicted_ms": round(self.predicted_ms, 1),
+            "batch_plan_tokens": self.tokens_total,
+            "latency_model_base_ms": round(latency_model.base_ms, 1),
+            "latency_model_ms_per_token": round(latency_model.ms_per_token, 3),
+            "latency_model_samples": latency_model.samples,
+        }
+
+
+def _split_balanced(
+    pairs: list[tuple[int, str]], tokens: list[int], count: int
+) -> list[list[tuple[int, str]]]:
+    """Split into ``count`` contiguous slices with roughly equal token totals."""
+    total = sum(tokens)
+    target = total / count
+    slices: list[list[tuple[int, str]]] = []
+    cur: list[tuple[int, str]] = []
+    acc = 0
+    for i, (pair, tok) in enumerate(zip(pairs, tokens)):
+        slices_left = count - len(slices)
+        items_left = len(pairs) - i
+        boundary = target * (len(slices) + 1)
+        if cur and slices_left > 1 and (acc + tok / 2 > boundary or items_left < slices_left):
+            slices.append(cur)
+            cur = []
+        cur.append(pair)
+        acc += tok
+    if cur:
+        slices.append(cur)
+    return slices
+
+
+def plan_batch(
+    pairs: list[tuple[int, str]],
+    item_tokens: list[int],
+    latency_model: LatencyModel,
+    *,
+    max_items: int,
+    max_concurrency: int,
+    token_budget: Optional[int] = None,
+    slice_penalty_ms: Optional[float] = None,
+) -> BatchPlan:
+    """Choose the slice count/concurrency with the lowest expected wall time."""
+    token_budget = token_budget or read_env_int("AI_TRANSLATE_BATCH_TOKEN_BUDGET", 2400)
+    if slice_penalty_ms is None:
+        slice_penalty_ms = float(read_env_int("AI_TRANSLATE_ADAPTIVE_SLICE_PENALTY_MS", 600, minimum=0))
+    max_concurrency = max(1, max_concurrency)
+    max_items = max(1, max_items)
+    total = sum(item_tokens)
+    n = len(pairs)
+    if n <= 1:
+        return BatchPlan([list(pairs)] if pairs else [], 1, latency_model.predict(total), total)
+
+    min_count = max(1, math.ceil(n / max_items), math.ceil(total / token_budget))
+    # 超过 并发数×2 的切分不会再缩短墙钟时间，只会增加请求数。
+    max_count = min(n, max(min_count, max_concurrency * 2))
+
+    best: Optional[BatchPlan] = None
+    for count in range(min_count, max_count + 1):
+        slices = _split_balanced(pairs, item_tokens, count)
+        if any(len(s) > max_items for s in slices):
+            continue
+        slice_tokens = []
+        pos = 0
+        for s in slices:
+            slice_tokens.append(sum(item_tokens[pos : pos + len(s)]))
+            pos += len(s)
+        concurrency = min(len(slices), max_concurrency)
+        waves = math.ceil(len(slices) / concurrency)
+        expected = waves * latency_model.predict(max(slice_tokens))
+        expected += slice_penalty_ms * (len(slices) - 1)
+        if best is None or expected < best.predicted_ms:
+            best = BatchPlan(slices, concurrency, expected, total)
+    if best is None:
+        slices = [pairs[i : i + max_items] for i in range(0, n, max_items)]
+        concurrency = min(len(slices), max_concurrency)
+        best = BatchPlan(slices, concurrency, latency_model.predict(total), total)
+    return best
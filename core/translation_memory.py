@@ -0,0 +1,210 @@
+"""Persistent translation memory for AITranslator.translate_batch.
+
+Webtoon chapters repeat many lines (names, "...", stock exclamations) and pages
+are often re-run through retranslation. The memory maps
+(normalized source text, context hash, source/target lang, provider/model,
+prompt version, output format) -> translation, so only misses are sent to the
+LLM. Stored in one SQLite file with TTL expiry and LRU eviction by entry count.
+
+Env:
+    TRANSLATION_MEMORY_ENABLE: 1/0 (default 1)
+    TRANSLATION_MEMORY_PATH: SQLite file (default temp/translation_memory.sqlite3)
+    TRANSLATION_MEMORY_TTL_DAYS: entry lifetime in days (default 30, 0 = never expire)
+    TRANSLATION_MEMORY_MAX_ENTRIES: LRU bound (default 50000, 0 = unbounded)
+"""
+
+from __future__ import annotations
+
+import hashlib
+import logging
+import os
+import re
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Iterable, Optional
+
+from .utils.env import read_env_int
+
+logger = logging.getLogger(__name__)
+
+_WS_RE = re.compile(r"\s+")
+
+
+def translation_memory_enabled() -> bool:
+    return os.getenv("TRANSLATION_MEMORY_ENABLE", "1") == "1"
+
+
+def _memory_path() -> Path:
+    raw = os.getenv("TRANSLATION_MEMORY_PATH", "temp/translation_memory.sqlite3")
+    return Path(raw).expanduser()
+
+
+def _read_float(name: str, default: float) -> float:
+    raw = (os.getenv(name) or "").strip()
+    if not raw:
+        return default
+    try:
+        return max(0.0, float(raw))
+    except ValueError:
+        return default
+
+
+def normalize_source_text(text: str) -> str:
+    return _WS_RE.sub(" ", (text or "").strip())
+
+
+def build_memory_key(
+    text: str,
+    context: str,
+    *,
+    source_lang: str,
+    target_lang: str,
+    provider: str,
+    model: str,
+    prompt_version: str,
+    output_format: str = "numbered",
+) -> str:
+    ctx_hash = hashlib.sha1(normalize_source_text(context).encode("utf-8")).hexdigest()[:16]
+    raw = "\x1f".join(
+        [
+            prompt_version,
+            output_format,
+            source_lang or "",
+            target_lang or "",
+            provider or "",
+            model or "",
+            ctx_hash,
+            normalize_source_text(text),
+        ]
+    )
+    return hashlib.sha1(raw.encode("utf-8")).hexdigest()
+
+
+class TranslationMemory:
+    """SQLite-backed key -> translation map with TTL and LRU eviction."""
+
+    def __init__(self, db_path: Path, ttl_seconds: float, max_entries: int):
+        self.db_path = Path(db_path)
+        self.ttl_seconds = max(0.0, float(ttl_seconds))
+        self.max_entries = max(0, int(max_entries))
+        self._lock = threading.Lock()
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(str(self.db_path), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS memory ("
+            " key TEXT PRIMARY KEY,"
+            " translation TEXT NOT NULL,"
+            " created REAL NOT NULL,"
+            " last_access REAL NOT NULL)"
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_memory_last_access ON memory(last_access)"
+        )
+        self._conn.commit()
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+    def get_many(self, keys: Iterable[str]) -> dict[str, str]:
+        unique = list(dict.fromkeys(keys))
+        if not unique:
+            return {}
+        now = time.time()
+        found: dict[str, str] = {}
+        expired: list[str] = []
+        with self._lock:
+            for start in range(0, len(unique), 500):
+                part = unique[start : start + 500]
+                placeholders = ",".join("?" for _ in part)
+                rows = self._conn.execute(
+                    f"SELECT key, translation, created FROM memory WHERE key IN ({placeholders})",
+                    part,
+                ).fetchall()
+                for key, translation, created in rows:
+                    if self.ttl_seconds and now - created > self.ttl_seconds:
+                        expired.append(key)
+                    else:
+                        found[key] = translation
+            if found:
+                self._conn.executemany(
+                    "UPDATE memory SET last_access = ? WHERE key = ?",
+                    [(now, key) for key in found],
+                )
+            if expired:
+                self._conn.executemany("DELETE FROM memory WHERE key = ?", [(k,) for k in expired])
+            if found or expired:
+                self._conn.commit()
+        return found
+
+    def put_many(self, items: dict[str, str]) -> None:
+        if not items:
+            return
+        now = time.time()
+        with self._lock:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO memory(key, translation, created, last_access) "
+                "VALUES (?, ?, ?, ?)",
+                [(key, value, now, now) for key, value in items.items()],
+            )
+            self._evict_locked(now)
+            self._conn.commit()
+
+    def delete_many(self, keys: Iterable[str]) -> None:
+        rows = [(key,) for key in dict.fromkeys(keys)]
+        if not rows:
+            return
+        with self._lock:
+            self._conn.executemany("DELETE FROM memory WHERE key = ?", rows)
+            self._conn.commit()
+
+    def _evict_locked(self, now: float) -> None:
+        if self.ttl_seconds:
+            self._conn.execute(
+                "DELETE FROM memory WHERE created < ?", (now - self.ttl_seconds,)
+            )
+        if not self.max_entries:
+            return
+        count = self._conn.execute("SELECT COUNT(*) FROM memory").fetchone()[0]
+        overflow = count - self.max_entries
+        if overflow > 0:
+            self._conn.execute(
+                "DELETE FROM memory WHERE key IN ("
+                " SELECT key FROM memory ORDER BY last_access ASC LIMIT ?)",
+                (overflow,),
+            )
+
+    def __len__(self) -> int:
+        with self._lock:
+            return int(self._conn.execute("SELECT COUNT(*) FROM memory").fetchone()[0])
+
+
+_memories: dict[str, TranslationMemory] = {}
+_memories_lock = threading.Lock()
+
+
+def get_translation_memory() -> Optional[TranslationMemory]:
+    """Shared memory for TRANSLATION_MEMORY_PATH, or None when disabled/unavailable."""
+    if not translation_memory_enabled():
+        return None
+    db_path = _memory_path()
+    key = str(db_path)
+    ttl_seconds = _read_float("TRANSLATION_MEMORY_TTL_DAYS", 30.0) * 86400
+    max_entries = read_env_int("TRANSLATION_MEMORY_MAX_ENTRIES", 50000, minimum=0)
+    with _memories_lock:
+        memory = _memories.get(key)
+        if memory is None:
+            try:
+                memory = TranslationMemory(db_path, ttl_seconds, max_entries)
+            except (OSError, sqlite3.Error) as exc:
+                logger.warning("Translation memory unavailable (%s): %s", db_path, exc)
+                return None
+            _memories[key] = memory
+        else:
+            memory.ttl_seconds = ttl_seconds
+            memory.max_entries = max_entries
+        return memory
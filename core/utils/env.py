@@ -0,0 +1,16 @@
+"""Environment knob parsing shared by the pipeline, services and scraper."""
+
+from __future__ import annotations
+
+import os
+
+
+def read_env_int(name: str, default: int, minimum: int = 1) -> int:
+    """Integer env knob: empty or unparsable values fall back to ``default``,
+    anything below ``minimum`` is raised to it."""
+    raw = (os.getenv(name) or "").strip()
+    try:
+        value = int(raw) if raw else default
+    except ValueError:
+        value = default
+    return max(minimum, value)
@@ -5,6 +5,14 @@ from __future__ import annotations
 import contextlib
 import os
 import sys
+import threading
+
+# 并发的页面/阶段会交错进入和退出该上下文；只有最外层负责重定向与恢复，
+# 否则乱序恢复会把 stderr 永久留在 /dev/null 上。
+_lock = threading.Lock()
+_depth = 0
+_saved_stderr: int | None = None
+_stderr_fd: int | None = None
 
 
 @contextlib.contextmanager
@@ -17,41 +25,66 @@ def suppress_native_stderr():
         # Backward compatibility for legacy env name
         yield
         return
+    with _lock:
+        acquired = _acquire()
+    if not acquired:
+        yield
+        return
+    try:
+        yield
+    finally:
+        # Never yield again in cleanup path; otherwise contextlib may raise
+        # "generator didn't stop after throw()" and mask the real exception.
+        _release()
+
+
+def _acquire() -> bool:
+    """Take one reference; the first holder redirects stderr. Caller holds _lock."""
+    global _depth, _saved_stderr, _stderr_fd
+    if _depth > 0:
+        _depth += 1
+        return True
     try:
         stderr_fd = sys.stderr.fileno()
     except Exception:
-        yield
-        return
+        return False
     try:
         saved_stderr = os.dup(stderr_fd)
     except (ValueError, OSError):
-        yield
-        return
-
-    redirected = False
+        return False
     try:
         devnull = os.open(os.devnull, os.O_WRONLY)
         os.dup2(devnull, stderr_fd)
         os.close(devnull)
-        redirected = True
     except (ValueError, OSError):
         try:
             os.close(saved_stderr)
         except OSError:
             pass
-        yield
-        return
+        return False
+    _depth = 1
+    _saved_stderr = saved_stderr
+    _stderr_fd = stderr_fd
+    return True
 
-    try:
-        yield
-    finally:
-        # Never yield again in cleanup path; otherwise contextlib may raise
-        # "generator didn't stop after throw()" and mask the real exception.
-        if redirected:
-            try:
-                os.dup2(saved_stderr, stderr_fd)
-            except OSError:
-                pass
+
+def _release() -> None:
+    """Drop one reference; the last holder restores the original stderr."""
+    global _depth, _saved_stderr, _stderr_fd
+    with _lock:
+        _depth -= 1
+        if _depth > 0:
+            return
+        saved_stderr, stderr_fd = _saved_stderr, _stderr_fd
+        _saved_stderr = None
+        _stderr_fd = None
+        if saved_stderr is None or stderr_fd is None:
+            return
+        # 恢复必须在锁内完成：否则并发的 _acquire 会把仍指向 /dev/null 的 fd 当作原始 stderr 保存
+        try:
+            os.dup2(saved_stderr, stderr_fd)
+        except OSError:
+            pass
         try:
             os.close(saved_stderr)
         except OSError:
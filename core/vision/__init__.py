@@ -2,7 +2,13 @@
 
 from .text_detector import TextDetector, ContourDetector, YOLODetector
 from .ocr import OCREngine, PaddleOCREngine, MockOCREngine
-from .inpainter import Inpainter, LamaInpainter, OpenCVInpainter, create_inpainter
+from .inpainter import (
+    HybridInpainter,
+    Inpainter,
+    LamaInpainter,
+    OpenCVInpainter,
+    create_inpainter,
+)
 
 __all__ = [
     "TextDetector",
@@ -13,6 +19,7 @@ __all__ = [
     "MockOCREngine",
     "Inpainter",
     "LamaInpainter",
+    "HybridInpainter",
     "OpenCVInpainter",
     "create_inpainter",
 ]
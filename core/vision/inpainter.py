@@ -7,7 +7,11 @@ Provides two implementations:
 """
 
 import asyncio
+import logging
+import math
 import os
+import tempfile
+import time
 from abc import ABC, abstractmethod
 from pathlib import Path
 from typing import Optional
@@ -16,8 +20,11 @@ import cv2
 import numpy as np
 
 from ..models import RegionData
+from ..image_buffer import read_image
 from ..image_io import save_image
 
+logger = logging.getLogger(__name__)
+
 
 def mask_params_for_region(
     region: RegionData,
@@ -76,7 +83,7 @@ class Inpainter(ABC):
         output_path: str,
         temp_dir: str = "./temp",
         dilation: int = 4,  # Reduced to avoid mask merging across bubbles
-    ) -> tuple[str, str]:
+    ) -> tuple[str, str, Optional[dict]]:
         """
         Inpaint all regions in an image.
         
@@ -88,13 +95,86 @@ class Inpainter(ABC):
             dilation: Mask dilation in pixels
             
         Returns:
-            Path to inpainted image
+            (inpainted image path, combined mask path, metrics of this call or None)
         """
         # Create combined mask
-        image = cv2.imread(image_path)
+        image = read_image(image_path)
         if image is None:
             raise FileNotFoundError(f"Cannot read image: {image_path}")
 
+        combined_mask = self.build_regions_mask(image, regions, dilation=dilation)
+
+        # Save combined mask
+        Path(temp_dir).mkdir(parents=True, exist_ok=True)
+        mask_path = Path(temp_dir) / f"combined_mask_{Path(image_path).stem}.png"
+        mask_path = Path(
+            save_image(combined_mask, str(mask_path), purpose="intermediate")
+        )
+
+        # Inpaint
+        result_path, metrics = await self.inpaint_with_metrics(
+            image_path, str(mask_path), output_path
+        )
+        return result_path, str(mask_path), metrics
+
+    async def inpaint_regions_array(
+        self,
+        image: np.ndarray,
+        regions: list[RegionData],
+        dilation: int = 4,
+    ) -> tuple[np.ndarray, np.ndarray, Optional[dict]]:
+        """
+        In-memory variant of inpaint_regions (no intermediate files).
+
+        Args:
+            image: Decoded BGR image (treated as read-only)
+            regions: Regions with box_2d to inpaint
+            dilation: Mask dilation in pixels
+
+        Returns:
+            (inpainted BGR image, combined mask, metrics of this call or None)
+        """
+        combined_mask = self.build_regions_mask(image, regions, dilation=dilation)
+        result, metrics = await self.inpaint_array_with_metrics(image, combined_mask)
+        return result, combined_mask, metrics
+
+    async def inpaint_with_metrics(
+        self, image_path: str, mask_path: str, output_path: str
+    ) -> tuple[str, Optional[dict]]:
+        """inpaint() plus the routing/batching metrics of this call (None if not tracked)."""
+        return await self.inpaint(image_path, mask_path, output_path), None
+
+    async def inpaint_array_with_metrics(
+        self, image: np.ndarray, mask: np.ndarray
+    ) -> tuple[np.ndarray, Optional[dict]]:
+        """inpaint_array() plus the routing/batching metrics of this call (None if not tracked)."""
+        return await self.inpaint_array(image, mask), None
+
+    async def inpaint_array(self, image: np.ndarray, mask: np.ndarray) -> np.ndarray:
+        """
+        Inpaint a decoded BGR image with a single-channel mask.
+
+        Default implementation round-trips through temp files so subclasses that
+        only implement inpaint() keep working; built-in inpainters override it.
+        """
+        with tempfile.TemporaryDirectory(prefix="inpaint_") as tmp_dir:
+            image_path = save_image(image, str(Path(tmp_dir) / "image.png"))
+            mask_path = save_image(mask, str(Path(tmp_dir) / "mask.png"))
+            result_path = await self.inpaint(
+                image_path, mask_path, str(Path(tmp_dir) / "result.png")
+            )
+            result = cv2.imread(result_path)
+        if result is None:
+            raise FileNotFoundError(f"Cannot read inpaint result: {result_path}")
+        return result
+
+    def build_regions_mask(
+        self,
+        image: np.ndarray,
+        regions: list[RegionData],
+        dilation: int = 4,
+    ) -> np.ndarray:
+        """Build the combined inpaint mask (white = erase) for all regions."""
         height, width = image.shape[:2]
         combined_mask = np.zeros((height, width), dtype=np.uint8)
 
@@ -171,17 +251,7 @@ class Inpainter(ABC):
             base_expand=10,
             base_dilation=dilation,
         )
-
-        # Save combined mask
-        Path(temp_dir).mkdir(parents=True, exist_ok=True)
-        mask_path = Path(temp_dir) / f"combined_mask_{Path(image_path).stem}.png"
-        mask_path = Path(
-            save_image(combined_mask, str(mask_path), purpose="intermediate")
-        )
-
-        # Inpaint
-        result_path = await self.inpaint(image_path, str(mask_path), output_path)
-        return result_path, str(mask_path)
+        return combined_mask
     
     def _fill_vertical_gaps(
         self, 
@@ -264,11 +334,19 @@ class LamaInpainter(Inpainter):
     
     Features:
     - Smart chunking: processes only regions containing text
-    - Memory efficient: releases memory after each chunk
+    - Batched chunks: chunks are padded to shape buckets and run as one tensor
+      batch per bucket, bounded by a pixel budget
+
+    Env:
+        LAMA_BATCH_ENABLE: 1/0 (default 1; 0 = one model call per chunk)
+        LAMA_BATCH_SIZE: max chunks per forward pass (default 4)
+        LAMA_BATCH_BUCKET_PX: chunk sizes are rounded up to this multiple (default 64)
+        LAMA_BATCH_MAX_PIXELS: max padded pixels per forward pass (default 2048*2048)
     """
 
     # Maximum chunk size to prevent OOM
     MAX_CHUNK_SIZE = 2048  # pixels
+    CHUNK_PAD = 50
 
     def __init__(self, device: str = "cpu"):
         """
@@ -287,6 +365,7 @@ class LamaInpainter(Inpainter):
                 pass
         self.device = device
         self._model = None
+        self.last_metrics: Optional[dict] = None
 
     def _init_model(self):
         """Lazy initialization of LaMa model."""
@@ -313,12 +392,60 @@ class LamaInpainter(Inpainter):
             None, self._inpaint_sync, image_path, mask_path, output_path
         )
 
+    async def inpaint_array(self, image: np.ndarray, mask: np.ndarray) -> np.ndarray:
+        """Inpaint a decoded BGR image in memory using LaMa."""
+        loop = asyncio.get_event_loop()
+        return await loop.run_in_executor(None, self._inpaint_array_sync, image, mask)
+
+    async def inpaint_with_metrics(
+        self, image_path: str, mask_path: str, output_path: str
+    ) -> tuple[str, Optional[dict]]:
+        loop = asyncio.get_event_loop()
+        return await loop.run_in_executor(
+            None, self._inpaint_file_with_metrics, image_path, mask_path, output_path
+        )
+
+    async def inpaint_array_with_metrics(
+        self, image: np.ndarray, mask: np.ndarray
+    ) -> tuple[np.ndarray, Optional[dict]]:
+        loop = asyncio.get_event_loop()
+        return await loop.run_in_executor(None, self._inpaint_array_with_metrics, image, mask)
+
     def _inpaint_sync(
         self,
         image_path: str,
         mask_path: str,
         output_path: str,
     ) -> str:
+        """Synchronous LaMa inpainting from/to files."""
+        result_path, self.last_metrics = self._inpaint_file_with_metrics(
+            image_path, mask_path, output_path
+        )
+        return result_path
+
+    def _inpaint_file_with_metrics(
+        self,
+        image_path: str,
+        mask_path: str,
+        output_path: str,
+    ) -> tuple[str, Optional[dict]]:
+        image = read_image(image_path)
+        if image is None:
+            raise FileNotFoundError(f"Cannot read image: {image_path}")
+        mask = cv2.imread(mask_path, cv2.IMREAD_GRAYSCALE)
+        if mask is None:
+            raise FileNotFoundError(f"Cannot read mask: {mask_path}")
+        result, metrics = self._inpaint_array_with_metrics(image, mask)
+        return save_image(result, output_path, purpose="intermediate"), metrics
+
+    def _inpaint_array_sync(self, image_bgr: np.ndarray, mask_np: np.ndarray) -> np.ndarray:
+        # last_metrics 只反映最近一次调用；并发页面请用 *_with_metrics 的返回值
+        result, self.last_metrics = self._inpaint_array_with_metrics(image_bgr, mask_np)
+        return result
+
+    def _inpaint_array_with_metrics(
+        self, image_bgr: np.ndarray, mask_np: np.ndarray
+    ) -> tuple[np.ndarray, Optional[dict]]:
         """
         Synchronous LaMa inpainting with smart chunking.
         
@@ -326,75 +453,207 @@ class LamaInpainter(Inpainter):
         to reduce memory usage.
         """
         from PIL import Image
-        import gc
-        
+
         model = self._init_model()
-        
-        # Load images
-        image = Image.open(image_path).convert("RGB")
-        mask = Image.open(mask_path).convert("L")
-        
-        width, height = image.size
-        
+        height, width = image_bgr.shape[:2]
+
+        def _pil_inputs():
+            # LaMa's PIL interface works on RGB images
+            return (
+                Image.fromarray(cv2.cvtColor(image_bgr, cv2.COLOR_BGR2RGB)),
+                Image.fromarray(mask_np).convert("L"),
+            )
+
         # If image is small enough, process directly
         if height <= self.MAX_CHUNK_SIZE and width <= self.MAX_CHUNK_SIZE:
+            image, mask = _pil_inputs()
             result = model(image, mask)
-            return save_image(result, output_path, purpose="intermediate")
-        
+            metrics = {"mode": "whole", "chunks": 1, "batches": 1}
+            return cv2.cvtColor(np.array(result.convert("RGB")), cv2.COLOR_RGB2BGR), metrics
+
         # Find regions that need inpainting
-        mask_np = np.array(mask)
         chunks = self._find_mask_chunks(mask_np)
-        
+
         if not chunks:
-            # No mask regions, save original
-            return save_image(image, output_path, purpose="intermediate")
-        
-        # Process each chunk
-        result_np = np.array(image)
-        
+            # No mask regions, return original
+            return image_bgr.copy(), {"mode": "empty", "chunks": 0, "batches": 0}
+
+        windows = self._chunk_windows(chunks, height, width)
+        result = image_bgr.copy()
+        metrics = self._inpaint_windows(model, image_bgr, mask_np, windows, result)
+        return result, metrics
+
+    def _inpaint_windows(self, model, image_bgr, mask_np, windows, result) -> dict:
+        """Run LaMa on chunk windows, writing into ``result``; returns metrics."""
+        if os.getenv("LAMA_BATCH_ENABLE", "1") != "0" and hasattr(model, "model"):
+            try:
+                batches, buckets = self._inpaint_windows_batched(
+                    model, image_bgr, mask_np, windows, result
+                )
+                return {
+                    "mode": "batched",
+                    "chunks": len(windows),
+                    "batches": batches,
+                    "buckets": buckets,
+                }
+            except Exception as exc:
+                logger.warning("Batched LaMa failed, falling back to per-chunk: %s", exc)
+        self._inpaint_windows_per_chunk(model, image_bgr, mask_np, windows, result)
+        return {"mode": "per_chunk", "chunks": len(windows), "batches": len(windows)}
+
+    def _chunk_windows(
+        self, chunks: list[tuple[int, int, int, int]], height: int, width: int
+    ) -> list[tuple[tuple[int, int, int, int], tuple[int, int, int, int]]]:
+        """(padded window, chunk) pairs; padding gives LaMa context around the mask."""
+        pad = self.CHUNK_PAD
+        windows = []
         for chunk_y1, chunk_y2, chunk_x1, chunk_x2 in chunks:
-            # Add padding for better inpainting
-            pad = 50
-            y1 = max(0, chunk_y1 - pad)
-            y2 = min(height, chunk_y2 + pad)
-            x1 = max(0, chunk_x1 - pad)
-            x2 = min(width, chunk_x2 + pad)
-            
-            # Extract chunk
-            chunk_img = image.crop((x1, y1, x2, y2))
-            chunk_mask = mask.crop((x1, y1, x2, y2))
-            
-            # Process chunk
+            window = (
+                max(0, chunk_y1 - pad),
+                min(height, chunk_y2 + pad),
+                max(0, chunk_x1 - pad),
+                min(width, chunk_x2 + pad),
+            )
+            windows.append((window, (chunk_y1, chunk_y2, chunk_x1, chunk_x2)))
+        return windows
+
+    def _inpaint_windows_per_chunk(self, model, image_bgr, mask_np, windows, result) -> None:
+        """One model call per chunk through SimpleLama's PIL interface."""
+        from PIL import Image
+
+        for (y1, y2, x1, x2), (chunk_y1, chunk_y2, chunk_x1, chunk_x2) in windows:
             try:
-                chunk_result = model(chunk_img, chunk_mask)
-                chunk_result_np = np.array(chunk_result)
-                
+                chunk_img = Image.fromarray(
+                    cv2.cvtColor(image_bgr[y1:y2, x1:x2], cv2.COLOR_BGR2RGB)
+                )
+                chunk_mask = Image.fromarray(mask_np[y1:y2, x1:x2]).convert("L")
+                chunk_result_np = np.array(model(chunk_img, chunk_mask).convert("RGB"))
                 # Place result back (without padding overlap issues)
                 inner_y1 = chunk_y1 - y1
-                inner_y2 = inner_y1 + (chunk_y2 - chunk_y1)
                 inner_x1 = chunk_x1 - x1
-                inner_x2 = inner_x1 + (chunk_x2 - chunk_x1)
-                
-                result_np[chunk_y1:chunk_y2, chunk_x1:chunk_x2] = \
-                    chunk_result_np[inner_y1:inner_y2, inner_x1:inner_x2]
-                
+                result[chunk_y1:chunk_y2, chunk_x1:chunk_x2] = cv2.cvtColor(
+                    chunk_result_np[
+                        inner_y1 : inner_y1 + (chunk_y2 - chunk_y1),
+                        inner_x1 : inner_x1 + (chunk_x2 - chunk_x1),
+                    ],
+                    cv2.COLOR_RGB2BGR,
+                )
             except Exception as e:
-                print(f"Chunk inpaint failed: {e}")
+                logger.warning("Chunk inpaint failed: %s", e)
                 continue
-            finally:
-                # Release memory
-                del chunk_img, chunk_mask
-                gc.collect()
-        
-        # Save result
-        result = Image.fromarray(result_np)
-        output_path = save_image(result, output_path, purpose="intermediate")
-        
-        # Cleanup
-        del result_np
-        gc.collect()
-        
-        return output_path
+
+    @staticmethod
+    def _batch_buffers(
+        arena: tuple[np.ndarray, np.ndarray], batch: int, height: int, width: int
+    ) -> tuple[np.ndarray, np.ndarray]:
+        """(batch, 3|1, height, width) views over the call's flat float32 arena."""
+        img_flat, mask_flat = arena
+        pixels = batch * height * width
+        return (
+            img_flat[: 3 * pixels].reshape(batch, 3, height, width),
+            mask_flat[:pixels].reshape(batch, 1, height, width),
+        )
+
+    @staticmethod
+    def _pad_symmetric(arr: np.ndarray, height: int, width: int) -> None:
+        """Fill arr[..., height:, :] / arr[..., :, width:] by symmetric reflection, in place."""
+        full_h, full_w = arr.shape[-2:]
+        if width < full_w:
+            k = np.arange(full_w - width) % (2 * width)
+            cols = np.where(k < width, width - 1 - k, k - width)
+            arr[..., :height, width:] = arr[..., :height, cols]
+        if height < full_h:
+            k = np.arange(full_h - height) % (2 * height)
+            rows = np.where(k < height, height - 1 - k, k - height)
+            arr[..., height:, :] = arr[..., rows, :]
+
+    def _inpaint_windows_batched(
+        self, model, image_bgr: np.ndarray, mask_np: np.ndarray, windows, result: np.ndarray
+    ) -> tuple[int, int]:
+        """
+        Run chunks as batched tensors grouped by padded shape.
+
+        Mirrors SimpleLama's preprocessing (RGB/255, mask > 0, symmetric pad to
+        a multiple of 8) but fills preallocated float buffers straight from the
+        BGR page and writes results into ``result`` in place.
+
+        Returns:
+            (forward passes, shape buckets)
+        """
+        import torch
+
+        bucket = max(8, self._read_env_int("LAMA_BATCH_BUCKET_PX", 64))
+        bucket = int(math.ceil(bucket / 8) * 8)
+        max_batch = max(1, self._read_env_int("LAMA_BATCH_SIZE", 4))
+        max_pixels = max(1, self._read_env_int("LAMA_BATCH_MAX_PIXELS", 2048 * 2048))
+        device = getattr(model, "device", None) or torch.device(self.device)
+
+        groups: dict[tuple[int, int], list] = {}
+        for window, chunk in windows:
+            y1, y2, x1, x2 = window
+            shape = (
+                int(math.ceil((y2 - y1) / bucket) * bucket),
+                int(math.ceil((x2 - x1) / bucket) * bucket),
+            )
+            groups.setdefault(shape, []).append((window, chunk))
+
+        per_batch_by_shape = {
+            (bucket_h, bucket_w): max(
+                1, min(max_batch, len(items), max_pixels // (bucket_h * bucket_w))
+            )
+            for (bucket_h, bucket_w), items in groups.items()
+        }
+        # 一次调用只分配一块输入缓冲，按最大的分组取视图复用，调用结束即释放
+        arena_pixels = max(
+            (n * h * w for (h, w), n in per_batch_by_shape.items()), default=0
+        )
+        arena = (
+            np.empty(3 * arena_pixels, dtype=np.float32),
+            np.empty(arena_pixels, dtype=np.float32),
+        )
+
+        batches = 0
+        for (bucket_h, bucket_w), items in groups.items():
+            per_batch = per_batch_by_shape[(bucket_h, bucket_w)]
+            img_buf, mask_buf = self._batch_buffers(arena, per_batch, bucket_h, bucket_w)
+            for start in range(0, len(items), per_batch):
+                batch = items[start : start + per_batch]
+                count = len(batch)
+                for i, ((y1, y2, x1, x2), _) in enumerate(batch):
+                    h, w = y2 - y1, x2 - x1
+                    np.multiply(
+                        image_bgr[y1:y2, x1:x2, ::-1].transpose(2, 0, 1),
+                        np.float32(1.0 / 255.0),
+                        out=img_buf[i, :, :h, :w],
+                        casting="unsafe",
+                    )
+                    np.greater(mask_np[y1:y2, x1:x2], 0, out=mask_buf[i, 0, :h, :w], casting="unsafe")
+                    self._pad_symmetric(img_buf[i], h, w)
+                    self._pad_symmetric(mask_buf[i], h, w)
+
+                with torch.inference_mode():
+                    output = model.model(
+                        torch.from_numpy(img_buf[:count]).to(device),
+                        torch.from_numpy(mask_buf[:count]).to(device),
+                    )
+                    output_np = output.detach().cpu().numpy()
+                batches += 1
+
+                for i, ((y1, _, x1, _), (chunk_y1, chunk_y2, chunk_x1, chunk_x2)) in enumerate(batch):
+                    inner_y1 = chunk_y1 - y1
+                    inner_x1 = chunk_x1 - x1
+                    patch = output_np[
+                        i,
+                        ::-1,
+                        inner_y1 : inner_y1 + (chunk_y2 - chunk_y1),
+                        inner_x1 : inner_x1 + (chunk_x2 - chunk_x1),
+                    ]
+                    # float -> uint8 assignment truncates, same as SimpleLama's astype
+                    result[chunk_y1:chunk_y2, chunk_x1:chunk_x2] = np.clip(
+                        patch.transpose(1, 2, 0) * 255, 0, 255
+                    )
+
+        return batches, len(groups)
 
     def _find_mask_chunks(self, mask_np: np.ndarray) -> list[tuple[int, int, int, int]]:
         """
@@ -474,6 +733,147 @@ class LamaInpainter(Inpainter):
         return final_chunks
 
 
+class HybridInpainter(LamaInpainter):
+    """
+    Routes each mask chunk to the cheapest backend that looks the same.
+
+    Chunks come from ``_find_mask_chunks``. The ring of pixels just outside
+    the chunk's mask decides the route:
+    - flat: ring colour is uniform (plain bubble interior) -> fill with its median
+    - telea: small masked area on textured background -> cv2.inpaint (Telea)
+    - lama: everything else -> batched LaMa (Telea when LaMa is unavailable)
+
+    Env:
+        INPAINT_HYBRID: 1/0 (default 0), see create_inpainter
+        INPAINT_HYBRID_FLAT_STD: max per-channel std of the ring for flat fill (default 6)
+        INPAINT_HYBRID_TELEA_MAX_AREA: max masked pixels routed to Telea (default 3000)
+    """
+
+    RING_PX = 6
+    TELEA_RADIUS = 3
+
+    def __init__(self, device: str = "cpu", use_lama: bool = True):
+        super().__init__(device=device)
+        self.use_lama = use_lama
+
+    def _init_model(self):
+        if not self.use_lama:
+            return None
+        return super()._init_model()
+
+    def _classify(
+        self, crop: np.ndarray, crop_mask: np.ndarray, flat_std: float, telea_max_area: int
+    ) -> tuple[str, Optional[np.ndarray]]:
+        """(route, fill colour for the flat route)."""
+        kernel = cv2.getStructuringElement(
+            cv2.MORPH_ELLIPSE, (self.RING_PX * 2 + 1, self.RING_PX * 2 + 1)
+        )
+        ring = (cv2.dilate(crop_mask, kernel) > 0) & (crop_mask == 0)
+        if np.count_nonzero(ring) >= 16:
+            ring_pixels = crop[ring]
+            if float(ring_pixels.std(axis=0).max()) <= flat_std:
+                return "flat", np.median(ring_pixels, axis=0).astype(np.uint8)
+        area = int(np.count_nonzero(crop_mask))
+        return ("telea" if area <= telea_max_area else "lama"), None
+
+    def _inpaint_array_with_metrics(
+        self, image_bgr: np.ndarray, mask_np: np.ndarray
+    ) -> tuple[np.ndarray, Optional[dict]]:
+        try:
+            flat_std = float(os.getenv("INPAINT_HYBRID_FLAT_STD", "") or 6)
+        except ValueError:
+            flat_std = 6.0
+        telea_max_area = self._read_env_int("INPAINT_HYBRID_TELEA_MAX_AREA", 3000)
+
+        height, width = image_bgr.shape[:2]
+        _, binary = cv2.threshold(mask_np, 127, 255, cv2.THRESH_BINARY)
+        result = image_bgr.copy()
+        windows = self._chunk_windows(self._find_mask_chunks(binary), height, width)
+
+        routes: dict[str, list] = {"flat": [], "telea": [], "lama": []}
+        timings = {name: 0.0 for name in routes}
+        covered = np.zeros_like(binary)
+        start = time.perf_counter()
+        fill_colors: dict[int, np.ndarray] = {}
+        for window, chunk in windows:
+            y1, y2, x1, x2 = window
+            route, color = self._classify(
+                image_bgr[y1:y2, x1:x2], binary[y1:y2, x1:x2], flat_std, telea_max_area
+            )
+            if color is not None:
+                fill_colors[len(routes[route])] = color
+            routes[route].append((window, chunk))
+            chunk_y1, chunk_y2, chunk_x1, chunk_x2 = chunk
+            covered[chunk_y1:chunk_y2, chunk_x1:chunk_x2] = 255
+        classify_ms = (time.perf_counter() - start) * 1000
+
+        model = None
+        if routes["lama"]:
+            try:
+                model = self._init_model()
+            except ImportError as exc:
+                logger.warning("LaMa unavailable, routing large chunks to Telea: %s", exc)
+            if model is None:
+                routes["telea"].extend(routes["lama"])
+                routes["lama"] = []
+
+        start = time.perf_counter()
+        for index, (_, chunk) in enumerate(routes["flat"]):
+            self._write_masked(result, binary, chunk, fill_colors[index])
+        timings["flat"] = (time.perf_counter() - start) * 1000
+
+        start = time.perf_counter()
+        for (y1, y2, x1, x2), chunk in routes["telea"]:
+            inpainted = cv2.inpaint(
+                image_bgr[y1:y2, x1:x2], binary[y1:y2, x1:x2], self.TELEA_RADIUS, cv2.INPAINT_TELEA
+            )
+            chunk_y1, _, chunk_x1, _ = chunk
+            self._write_masked(
+                result, binary, chunk, inpainted, offset=(chunk_y1 - y1, chunk_x1 - x1)
+            )
+        timings["telea"] = (time.perf_counter() - start) * 1000
+
+        lama_metrics: dict = {}
+        start = time.perf_counter()
+        if routes["lama"]:
+            lama_metrics = self._inpaint_windows(model, image_bgr, binary, routes["lama"], result)
+        timings["lama"] = (time.perf_counter() - start) * 1000
+
+        # _find_mask_chunks 会丢掉极小的连通域，这部分直接用 Telea 补上
+        residual = cv2.bitwise_and(binary, cv2.bitwise_not(covered))
+        residual_px = int(np.count_nonzero(residual))
+        if residual_px:
+            inpainted = cv2.inpaint(result, residual, self.TELEA_RADIUS, cv2.INPAINT_TELEA)
+            np.copyto(result, inpainted, where=(residual > 0)[..., None])
+
+        metrics = {
+            "mode": "hybrid",
+            "chunks": len(windows),
+            "classify_ms": round(classify_ms, 2),
+            "residual_px": residual_px,
+        }
+        for name in routes:
+            metrics[f"route_{name}"] = len(routes[name])
+            metrics[f"route_{name}_ms"] = round(timings[name], 2)
+        if lama_metrics:
+            metrics["lama_mode"] = lama_metrics.get("mode")
+            metrics["lama_batches"] = lama_metrics.get("batches", 0)
+        return result, metrics
+
+    @staticmethod
+    def _write_masked(result, binary, chunk, source, offset=None) -> None:
+        """Copy masked pixels of ``chunk`` from ``source`` (array or colour) into result."""
+        chunk_y1, chunk_y2, chunk_x1, chunk_x2 = chunk
+        where = binary[chunk_y1:chunk_y2, chunk_x1:chunk_x2] > 0
+        dest = result[chunk_y1:chunk_y2, chunk_x1:chunk_x2]
+        if offset is None:
+            dest[where] = source
+            return
+        oy, ox = offset
+        patch = source[oy : oy + (chunk_y2 - chunk_y1), ox : ox + (chunk_x2 - chunk_x1)]
+        dest[where] = patch[where]
+
+
 class OpenCVInpainter(Inpainter):
     """
     Fallback inpainting using OpenCV classical algorithms.
@@ -512,6 +912,11 @@ class OpenCVInpainter(Inpainter):
             None, self._inpaint_sync, image_path, mask_path, output_path
         )
 
+    async def inpaint_array(self, image: np.ndarray, mask: np.ndarray) -> np.ndarray:
+        """Inpaint a decoded BGR image in memory using OpenCV."""
+        loop = asyncio.get_event_loop()
+        return await loop.run_in_executor(None, self._inpaint_array_sync, image, mask)
+
     def _inpaint_sync(
         self,
         image_path: str,
@@ -520,7 +925,7 @@ class OpenCVInpainter(Inpainter):
     ) -> str:
         """Synchronous OpenCV inpainting."""
         # Read images
-        image = cv2.imread(image_path)
+        image = read_image(image_path)
         mask = cv2.imread(mask_path, cv2.IMREAD_GRAYSCALE)
 
         if image is None:
@@ -528,14 +933,17 @@ class OpenCVInpainter(Inpainter):
         if mask is None:
             raise FileNotFoundError(f"Cannot read mask: {mask_path}")
 
+        result = self._inpaint_array_sync(image, mask)
+
+        # Save result
+        return save_image(result, output_path, purpose="intermediate")
+
+    def _inpaint_array_sync(self, image: np.ndarray, mask: np.ndarray) -> np.ndarray:
         # Ensure mask is binary
         _, mask = cv2.threshold(mask, 127, 255, cv2.THRESH_BINARY)
 
         # Inpaint
-        result = cv2.inpaint(image, mask, self.radius, self.flags)
-
-        # Save result
-        return save_image(result, output_path, purpose="intermediate")
+        return cv2.inpaint(image, mask, self.radius, self.flags)
 
 
 def create_inpainter(prefer_lama: bool = True, device: str = "cpu") -> Inpainter:
@@ -549,6 +957,16 @@ def create_inpainter(prefer_lama: bool = True, device: str = "cpu") -> Inpainter
     Returns:
         Inpainter instance
     """
+    if os.getenv("INPAINT_HYBRID", "0") == "1":
+        inpainter = HybridInpainter(device=device, use_lama=prefer_lama)
+        if prefer_lama:
+            try:
+                inpainter._init_model()
+            except Exception as e:
+                print(f"LaMa not available ({e}), hybrid inpainter uses OpenCV only")
+                inpainter.use_lama = False
+        return inpainter
+
     if prefer_lama:
         try:
             inpainter = LamaInpainter(device=device)
@@ -4,11 +4,14 @@ from .base import OCREngine
 from .cache import get_cached_ocr
 from ...utils.stderr_suppressor import suppress_native_stderr
 from .paddle_engine import PaddleOCREngine, MockOCREngine
+from .pool import OCRInstancePool, get_ocr_pool
 
 __all__ = [
     "OCREngine",
     "PaddleOCREngine",
     "MockOCREngine",
     "get_cached_ocr",
+    "get_ocr_pool",
+    "OCRInstancePool",
     "suppress_native_stderr",
 ]
@@ -29,6 +29,39 @@ def normalize_ocr_lang(lang: str) -> str:
     return alias_map.get(value, value)
 
 
+def _rec_model_for_lang(lang_norm: str) -> str:
+    rec_model_map = {
+        "en": "en_PP-OCRv5_mobile_rec",
+        "korean": "korean_PP-OCRv5_mobile_rec",
+    }
+    return rec_model_map.get(lang_norm, "en_PP-OCRv5_mobile_rec")
+
+
+def create_ocr(lang: str = "en"):
+    """Build a fresh (uncached) PaddleOCR instance for ``lang``."""
+    lang_norm = normalize_ocr_lang(lang)
+    with suppress_native_stderr():
+        from paddleocr import PaddleOCR
+
+        kwargs = {
+            "lang": lang_norm,
+            "show_log": False,
+            "use_doc_orientation_classify": False,
+            "use_doc_unwarping": False,
+            "use_textline_orientation": False,
+            "text_detection_model_name": "PP-OCRv5_mobile_det",
+            "text_recognition_model_name": _rec_model_for_lang(lang_norm),
+        }
+        try:
+            return PaddleOCR(**kwargs)
+        except Exception as exc:
+            # PaddleOCR 3.x removed `show_log`; retry without it for compatibility.
+            if "Unknown argument: show_log" not in str(exc):
+                raise
+            kwargs.pop("show_log", None)
+            return PaddleOCR(**kwargs)
+
+
 def get_cached_ocr(lang: str = "en"):
     """
     Get or create cached PaddleOCR instance.
@@ -40,34 +73,10 @@ def get_cached_ocr(lang: str = "en"):
     global _ocr_cache
 
     lang_norm = normalize_ocr_lang(lang)
-    rec_model_map = {
-        "en": "en_PP-OCRv5_mobile_rec",
-        "korean": "korean_PP-OCRv5_mobile_rec",
-    }
-    rec_model = rec_model_map.get(lang_norm, "en_PP-OCRv5_mobile_rec")
 
     if lang_norm not in _ocr_cache:
         with _ocr_lock:
             if lang_norm not in _ocr_cache:
-                with suppress_native_stderr():
-                    from paddleocr import PaddleOCR
-
-                    kwargs = {
-                        "lang": lang_norm,
-                        "show_log": False,
-                        "use_doc_orientation_classify": False,
-                        "use_doc_unwarping": False,
-                        "use_textline_orientation": False,
-                        "text_detection_model_name": "PP-OCRv5_mobile_det",
-                        "text_recognition_model_name": rec_model,
-                    }
-                    try:
-                        _ocr_cache[lang_norm] = PaddleOCR(**kwargs)
-                    except Exception as exc:
-                        # PaddleOCR 3.x removed `show_log`; retry without it for compatibility.
-                        if "Unknown argument: show_log" not in str(exc):
-                            raise
-                        kwargs.pop("show_log", None)
-                        _ocr_cache[lang_norm] = PaddleOCR(**kwargs)
+                _ocr_cache[lang_norm] = create_ocr(lang_norm)
 
     return _ocr_cache[lang_norm]
@@ -3,15 +3,18 @@
 import asyncio
 import os
 import time
+from contextlib import contextmanager
 from uuid import uuid4
 
 import cv2
 import numpy as np
 
+from ...image_buffer import read_image
 from ...models import Box2D, RegionData
 from ..tiling import get_tiling_manager
 from .base import OCREngine
 from .cache import get_cached_ocr
+from .pool import OCRInstancePool, get_ocr_pool, ocr_pool_size
 from .postprocessing import (
     filter_noise_regions,
     geometric_cluster_dedup,
@@ -38,6 +41,7 @@ class PaddleOCREngine(OCREngine):
         self.last_tile_avg_ms = None
         self.last_edge_tile_count = None
         self.last_edge_tile_avg_ms = None
+        self.last_pool_size = 1
 
     @staticmethod
     def _small_image_scale_mode() -> str:
@@ -104,6 +108,109 @@ class PaddleOCREngine(OCREngine):
             self._ocr = get_cached_ocr(self.lang)
         return self._ocr
 
+    def _ocr_pool(self) -> OCRInstancePool | None:
+        """Instance pool when OCR_POOL_SIZE > 1, else None (single cached instance)."""
+        if ocr_pool_size() <= 1:
+            return None
+        return get_ocr_pool(self.lang)
+
+    @contextmanager
+    def _lease_ocr(self, pool: OCRInstancePool | None):
+        if pool is None:
+            yield self._init_ocr()
+            return
+        with pool.lease() as ocr:
+            yield ocr
+
+    def _run_chunks(
+        self,
+        ocr,
+        pool: OCRInstancePool | None,
+        chunks: list[np.ndarray],
+        **kwargs,
+    ) -> list[tuple[list[RegionData], float]]:
+        """
+        Run _process_chunk over chunks; returns [(regions, elapsed_ms)] in input order.
+
+        With a pool, chunks fan out across its threads, each leasing its own instance.
+        """
+
+        batch_size = self._predict_batch_size()
+        batches = [
+            chunks[start : start + batch_size]
+            for start in range(0, len(chunks), batch_size)
+        ]
+
+        def run(batch, instance):
+            start = time.perf_counter()
+            regions_per_chunk = self._process_chunk_batch(instance, batch, **kwargs)
+            # Per-tile time is the batch wall time split evenly across its tiles.
+            elapsed = (time.perf_counter() - start) * 1000 / max(1, len(batch))
+            return [(regions, elapsed) for regions in regions_per_chunk]
+
+        if pool is None:
+            batch_results = [run(batch, ocr) for batch in batches]
+        elif len(batches) <= 1:
+            with pool.lease() as instance:
+                batch_results = [run(batch, instance) for batch in batches]
+        else:
+
+            def run_leased(batch):
+                with pool.lease() as instance:
+                    return run(batch, instance)
+
+            batch_results = list(pool.executor().map(run_leased, batches))
+        return [item for batch_result in batch_results for item in batch_result]
+
+    @staticmethod
+    def _predict_batch_size() -> int:
+        """Tiles per predict() call (OCR_PREDICT_BATCH_SIZE, default 1 = one call per tile)."""
+        raw = (os.getenv("OCR_PREDICT_BATCH_SIZE") or "").strip()
+        if not raw:
+            return 1
+        try:
+            value = int(raw)
+        except ValueError:
+            return 1
+        return max(1, min(16, value))
+
+    def _process_chunk_batch(
+        self,
+        ocr,
+        chunks: list[np.ndarray],
+        min_score: float = 0.5,
+        min_len: int = 2,
+    ) -> list[list[RegionData]]:
+        """
+        Run several chunks through a single predict() call and split results per chunk.
+
+        Falls back to one call per chunk if the batched call fails or its output
+        cannot be mapped 1:1 back onto the inputs.
+        """
+        if len(chunks) == 1:
+            return [self._process_chunk(ocr, chunks[0], 0, min_score=min_score, min_len=min_len)]
+
+        per_chunk: list | None = None
+        try:
+            batched = ocr.predict(list(chunks))
+            batched = list(batched) if batched is not None else []
+            if len(batched) == len(chunks):
+                per_chunk = [[item] for item in batched]
+        except Exception:
+            per_chunk = None
+
+        return [
+            self._process_chunk(
+                ocr,
+                chunk,
+                0,
+                min_score=min_score,
+                min_len=min_len,
+                prefetched=per_chunk[idx] if per_chunk is not None else None,
+            )
+            for idx, chunk in enumerate(chunks)
+        ]
+
     @staticmethod
     def _edge_tiles_mode() -> str:
         """
@@ -197,7 +304,7 @@ class PaddleOCREngine(OCREngine):
         regions: list[RegionData],
     ) -> list[RegionData]:
         ocr = self._init_ocr()
-        image = cv2.imread(image_path)
+        image = read_image(image_path)
         if image is None:
             raise FileNotFoundError(f"Cannot read image: {image_path}")
 
@@ -259,8 +366,10 @@ class PaddleOCREngine(OCREngine):
         )
 
     def _detect_and_recognize_sync(self, image_path: str) -> list[RegionData]:
-        ocr = self._init_ocr()
-        image = cv2.imread(image_path)
+        pool = self._ocr_pool()
+        ocr = self._init_ocr() if pool is None else None
+        self.last_pool_size = pool.size if pool is not None else 1
+        image = read_image(image_path)
         if image is None:
             raise FileNotFoundError(f"Cannot read image: {image_path}")
 
@@ -275,18 +384,15 @@ class PaddleOCREngine(OCREngine):
 
         if tiling_manager.should_tile(height):
             tiles = tiling_manager.create_tiles(processed_image)
-            tile_times = []
-            edge_tile_times = []
             self.last_edge_tile_count = 0
             self.last_edge_tile_avg_ms = 0
 
-            # 串行处理切片，避免并发导致 OCR 结果不稳定
-            for tile in tiles:
-                start = time.perf_counter()
-                tile_regions = self._process_chunk(
-                    ocr, tile.image, 0, min_len=min_len
-                )
-                tile_times.append((time.perf_counter() - start) * 1000)
+            # 单实例时串行处理切片（共享实例并发不安全）；OCR_POOL_SIZE>1 时每个切片独占一个实例并行
+            tile_results = self._run_chunks(
+                ocr, pool, [tile.image for tile in tiles], min_len=min_len
+            )
+            tile_times = [elapsed for _, elapsed in tile_results]
+            for tile, (tile_regions, _) in zip(tiles, tile_results):
                 remapped = tiling_manager.remap_regions(tile_regions, tile)
                 all_regions.extend(remapped)
 
@@ -310,12 +416,15 @@ class PaddleOCREngine(OCREngine):
 
             if should_run_edge:
                 edge_tiles = tiling_manager.create_edge_tiles(processed_image)
-                for edge_tile in edge_tiles:
-                    start = time.perf_counter()
-                    edge_regions = self._process_chunk(
-                        ocr, edge_tile.image, 0, min_score=0.4, min_len=1
-                    )
-                    edge_tile_times.append((time.perf_counter() - start) * 1000)
+                edge_results = self._run_chunks(
+                    ocr,
+                    pool,
+                    [edge_tile.image for edge_tile in edge_tiles],
+                    min_score=0.4,
+                    min_len=1,
+                )
+                edge_tile_times = [elapsed for _, elapsed in edge_results]
+                for edge_tile, (edge_regions, _) in zip(edge_tiles, edge_results):
                     remapped = tiling_manager.remap_regions(edge_regions, edge_tile)
                     all_regions.extend(remapped)
                 all_regions = tiling_manager.merge_regions(all_regions, iou_threshold=0.5)
@@ -324,41 +433,42 @@ class PaddleOCREngine(OCREngine):
                     sum(edge_tile_times) / len(edge_tile_times) if edge_tile_times else 0
                 )
         else:
-            all_regions = self._process_chunk(
-                ocr, processed_image, 0, min_len=min_len
-            )
-            if width < 1200 and height < 2000 and self._should_run_small_image_scale(all_regions):
-                scale = self._small_image_scale_factor()
-                scaled_image = cv2.resize(
-                    processed_image,
-                    None,
-                    fx=scale,
-                    fy=scale,
-                    interpolation=cv2.INTER_CUBIC,
-                )
-                scaled_regions = self._process_chunk(
-                    ocr, scaled_image, 0, min_len=min_len
-                )
-                for r in scaled_regions:
-                    if r.box_2d:
-                        r.box_2d = Box2D(
-                            x1=int(r.box_2d.x1 / scale),
-                            y1=int(r.box_2d.y1 / scale),
-                            x2=int(r.box_2d.x2 / scale),
-                            y2=int(r.box_2d.y2 / scale),
-                        )
-                all_regions.extend(scaled_regions)
-                all_regions = tiling_manager.merge_regions(
-                    all_regions, iou_threshold=0.5
+            with self._lease_ocr(pool) as ocr:
+                all_regions = self._process_chunk(
+                    ocr, processed_image, 0, min_len=min_len
                 )
+                if width < 1200 and height < 2000 and self._should_run_small_image_scale(all_regions):
+                    scale = self._small_image_scale_factor()
+                    scaled_image = cv2.resize(
+                        processed_image,
+                        None,
+                        fx=scale,
+                        fy=scale,
+                        interpolation=cv2.INTER_CUBIC,
+                    )
+                    scaled_regions = self._process_chunk(
+                        ocr, scaled_image, 0, min_len=min_len
+                    )
+                    for r in scaled_regions:
+                        if r.box_2d:
+                            r.box_2d = Box2D(
+                                x1=int(r.box_2d.x1 / scale),
+                                y1=int(r.box_2d.y1 / scale),
+                                x2=int(r.box_2d.x2 / scale),
+                                y2=int(r.box_2d.y2 / scale),
+                            )
+                    all_regions.extend(scaled_regions)
+                    all_regions = tiling_manager.merge_regions(
+                        all_regions, iou_threshold=0.5
+                    )
 
-            # 简化：移除多次重复 OCR 尝试，只在区域为 0 时尝试一次 fallback
-            if len(all_regions) == 0:
-                # 只尝试一次：使用原始图像
-                raw_regions = self._process_chunk(
-                    ocr, image, 0, min_score=0.3, min_len=1
-                )
-                all_regions = raw_regions
+                # 简化：移除多次重复 OCR 尝试，只在区域为 0 时尝试一次 fallback
+                if len(all_regions) == 0:
+                    # 只尝试一次：使用原始图像
+                    raw_regions = self._process_chunk(
+                        ocr, image, 0, min_score=0.3, min_len=1
+                    )
+                    all_regions = raw_regions
 
             self.last_tile_count = 1
             self.last_tile_avg_ms = 0
@@ -386,8 +496,8 @@ class PaddleOCREngine(OCREngine):
         edge: str,
         band_height: int,
     ) -> list[RegionData]:
-        ocr = self._init_ocr()
-        image = cv2.imread(image_path)
+        pool = self._ocr_pool()
+        image = read_image(image_path)
         if image is None:
             raise FileNotFoundError(f"Cannot read image: {image_path}")
 
@@ -401,7 +511,8 @@ class PaddleOCREngine(OCREngine):
         else:
             raise ValueError(f"Unsupported edge: {edge}")
 
-        return self._process_chunk(ocr, band, 0, min_score=0.3, min_len=1)
+        with self._lease_ocr(pool) as ocr:
+            return self._process_chunk(ocr, band, 0, min_score=0.3, min_len=1)
 
     def _process_chunk(
         self,
@@ -410,7 +521,12 @@ class PaddleOCREngine(OCREngine):
         y_offset: int,
         min_score: float = 0.5,
         min_len: int = 2,
+        prefetched: list | None = None,
     ) -> list[RegionData]:
+        """
+        OCR one chunk. ``prefetched`` is this chunk's slice of a batched predict()
+        result; when given, predict() is not called again.
+        """
         regions: list[RegionData] = []
         predict_error: Exception | None = None
 
@@ -441,11 +557,14 @@ class PaddleOCREngine(OCREngine):
                 )
             )
 
-        try:
-            result = ocr.predict(chunk)
-        except Exception as exc:
-            predict_error = exc
-            result = None
+        if prefetched is not None:
+            result = prefetched
+        else:
+            try:
+                result = ocr.predict(chunk)
+            except Exception as exc:
+                predict_error = exc
+                result = None
 
         if result:
             for item in result:
@@ -0,0 +1,111 @@
+"""PaddleOCR instance pool for parallel tile/page OCR.
+
+A single PaddleOCR object is not safe to call concurrently, so tiles used to run
+strictly serially. The pool holds up to N independent instances per language;
+each instance is leased by exactly one thread at a time. Paddle inference
+releases the GIL, so threads give real parallelism without the model reload and
+IPC cost of subprocess workers.
+
+Env:
+    OCR_POOL_SIZE: instances per language (default 1 = previous serial behaviour,
+        clamped to 1-8). Instances are created lazily under contention.
+"""
+
+from __future__ import annotations
+
+import os
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from typing import Callable, Iterator, Optional
+
+from .cache import create_ocr, get_cached_ocr, normalize_ocr_lang
+
+_pools: dict[tuple[str, int], "OCRInstancePool"] = {}
+_pools_lock = threading.Lock()
+
+
+def ocr_pool_size() -> int:
+    raw = (os.getenv("OCR_POOL_SIZE") or "").strip()
+    size = 1
+    if raw:
+        try:
+            size = int(raw)
+        except ValueError:
+            size = 1
+    # Each instance holds its own det/rec models; clamp to keep memory predictable.
+    return max(1, min(8, size))
+
+
+class OCRInstancePool:
+    """Lazily grown pool of up to ``size`` OCR instances for one language."""
+
+    def __init__(
+        self,
+        lang: str,
+        size: int,
+        factory: Optional[Callable[[str], object]] = None,
+        primary_factory: Optional[Callable[[str], object]] = None,
+    ):
+        self.lang = normalize_ocr_lang(lang)
+        self.size = max(1, int(size))
+        self._factory = factory or create_ocr
+        # The first slot reuses the process-wide cached instance (shared with warmup).
+        self._primary_factory = primary_factory or get_cached_ocr
+        self._idle: "queue.Queue[object]" = queue.Queue()
+        self._created = 0
+        self._lock = threading.Lock()
+        self._executor: Optional[ThreadPoolExecutor] = None
+
+    @property
+    def created(self) -> int:
+        return self._created
+
+    def _try_grow(self) -> Optional[object]:
+        with self._lock:
+            if self._created >= self.size:
+                return None
+            primary = self._created == 0
+            self._created += 1
+        try:
+            return self._primary_factory(self.lang) if primary else self._factory(self.lang)
+        except Exception:
+            with self._lock:
+                self._created -= 1
+            raise
+
+    @contextmanager
+    def lease(self) -> Iterator[object]:
+        """Borrow one instance exclusively for the duration of the block."""
+        try:
+            instance = self._idle.get_nowait()
+        except queue.Empty:
+            instance = self._try_grow()
+            if instance is None:
+                instance = self._idle.get()
+        try:
+            yield instance
+        finally:
+            self._idle.put(instance)
+
+    def executor(self) -> ThreadPoolExecutor:
+        """Thread pool sized to the instance pool, used to fan out tiles."""
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.size,
+                    thread_name_prefix=f"ocr-{self.lang}",
+                )
+            return self._executor
+
+
+def get_ocr_pool(lang: str = "en") -> OCRInstancePool:
+    """Return the shared pool for ``lang`` sized by OCR_POOL_SIZE."""
+    key = (normalize_ocr_lang(lang), ocr_pool_size())
+    with _pools_lock:
+        pool = _pools.get(key)
+        if pool is None:
+            pool = OCRInstancePool(key[0], key[1])
+            _pools[key] = pool
+        return pool
@@ -0,0 +1,282 @@
+"""Content-addressed OCR result cache backed by a single SQLite file.
+
+Keys are derived from the image *bytes* plus an engine/config signature
+(language, det/rec model names, tiling knobs, result-affecting OCR knobs), so
+re-downloading a chapter or moving the data directory still hits, while changing
+any OCR_TILE_* knob invalidates naturally. Entries are zlib-compressed compact
+JSON; the store is size-bounded with LRU eviction and keeps hit/miss/eviction
+counters.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+import zlib
+from pathlib import Path
+from typing import Optional
+
+from pydantic import TypeAdapter
+
+from ...models import RegionData
+from ..tiling import tiling_config_signature
+from .cache import _rec_model_for_lang, normalize_ocr_lang
+
+logger = logging.getLogger(__name__)
+
+_SCHEMA_VERSION = "v2"
+_DB_NAME = "ocr_results.sqlite3"
+_regions_adapter = TypeAdapter(list[RegionData])
+
+# Env knobs that change OCR output (not just speed); part of the key signature.
+_RESULT_AFFECTING_ENV = (
+    "OCR_EDGE_TILE_MODE",
+    "OCR_EDGE_TILE_ENABLE",
+    "OCR_EDGE_TILE_TOUCH_PX",
+    "OCR_SMALL_IMAGE_SCALE_MODE",
+    "OCR_SMALL_IMAGE_SCALE_FACTOR",
+    "OCR_SMALL_IMAGE_SCALE_MIN_REGIONS",
+    "OCR_SMALL_IMAGE_SCALE_MIN_CONF",
+)
+
+
+def engine_signature(lang: str) -> str:
+    lang_norm = normalize_ocr_lang(lang)
+    parts = [
+        _SCHEMA_VERSION,
+        lang_norm,
+        "PP-OCRv5_mobile_det",
+        _rec_model_for_lang(lang_norm),
+        repr(tiling_config_signature()),
+    ]
+    parts.extend(f"{name}={os.getenv(name, '')}" for name in _RESULT_AFFECTING_ENV)
+    return "|".join(parts)
+
+
+def hash_image_file(image_path: str) -> Optional[str]:
+    digest = hashlib.blake2b(digest_size=20)
+    try:
+        with open(image_path, "rb") as fh:
+            for block in iter(lambda: fh.read(1 << 20), b""):
+                digest.update(block)
+    except OSError:
+        return None
+    return digest.hexdigest()
+
+
+def build_content_key(image_path: str, lang: str) -> Optional[str]:
+    content_hash = hash_image_file(image_path)
+    if content_hash is None:
+        return None
+    sig = hashlib.sha1(engine_signature(lang).encode("utf-8")).hexdigest()[:16]
+    return f"{content_hash}:{sig}"
+
+
+class OCRResultStore:
+    """Single-file LRU store: key -> compressed regions payload.
+
+    The byte total is kept in memory (seeded once from the table) so a put does
+    not scan the table, and hits only record their ``last_access`` / counters in
+    memory; they are written back in one transaction on the next put, on
+    ``stats()`` / ``close()``, or once ``_TOUCH_FLUSH_COUNT`` hits or
+    ``_TOUCH_FLUSH_SEC`` have accumulated.
+    """
+
+    _TOUCH_FLUSH_COUNT = 64
+    _TOUCH_FLUSH_SEC = 5.0
+    _EVICT_BATCH = 16
+
+    def __init__(self, db_path: Path, max_bytes: int):
+        self.db_path = Path(db_path)
+        self.max_bytes = max(0, int(max_bytes))
+        self._lock = threading.Lock()
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(str(self.db_path), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS entries ("
+            " key TEXT PRIMARY KEY,"
+            " payload BLOB NOT NULL,"
+            " size INTEGER NOT NULL,"
+            " last_access REAL NOT NULL)"
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_entries_last_access ON entries(last_access)"
+        )
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS counters (name TEXT PRIMARY KEY, value INTEGER NOT NULL)"
+        )
+        self._conn.commit()
+        self._total_bytes = int(
+            self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()[0]
+        )
+        self._pending_touch: dict[str, float] = {}
+        self._pending_counts: dict[str, int] = {}
+        self._last_flush = time.monotonic()
+
+    def close(self) -> None:
+        with self._lock:
+            self._flush_locked()
+            self._conn.commit()
+            self._conn.close()
+
+    def _bump(self, name: str, amount: int = 1) -> None:
+        self._conn.execute(
+            "INSERT INTO counters(name, value) VALUES (?, ?) "
+            "ON CONFLICT(name) DO UPDATE SET value = value + excluded.value",
+            (name, amount),
+        )
+
+    def _defer(self, name: str, key: Optional[str] = None) -> None:
+        self._pending_counts[name] = self._pending_counts.get(name, 0) + 1
+        if key is not None:
+            self._pending_touch[key] = time.time()
+        if (
+            len(self._pending_touch) + sum(self._pending_counts.values()) >= self._TOUCH_FLUSH_COUNT
+            or time.monotonic() - self._last_flush >= self._TOUCH_FLUSH_SEC
+        ):
+            self._flush_locked()
+            self._conn.commit()
+
+    def _flush_locked(self) -> None:
+        """Write deferred last_access touches and counters (caller commits)."""
+        if self._pending_touch:
+            self._conn.executemany(
+                "UPDATE entries SET last_access = MAX(last_access, ?) WHERE key = ?",
+                [(ts, key) for key, ts in self._pending_touch.items()],
+            )
+            self._pending_touch.clear()
+        for name, amount in self._pending_counts.items():
+            self._bump(name, amount)
+        self._pending_counts.clear()
+        self._last_flush = time.monotonic()
+
+    def get(self, key: str) -> Optional[list[RegionData]]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT payload FROM entries WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                self._defer("misses")
+                return None
+            self._defer("hits", key)
+        try:
+            return _regions_adapter.validate_json(zlib.decompress(row[0]))
+        except Exception as exc:
+            logger.debug("OCR result cache decode failed: %s", exc)
+            self.delete(key)
+            return None
+
+    def put(self, key: str, regions: list[RegionData]) -> None:
+        payload = zlib.compress(
+            json.dumps(
+                [r.model_dump(mode="json", exclude_defaults=True) for r in regions],
+                ensure_ascii=False,
+                separators=(",", ":"),
+            ).encode("utf-8")
+        )
+        with self._lock:
+            # 先落盘延迟的访问时间，淘汰顺序才是真实的 LRU
+            self._flush_locked()
+            self._total_bytes -= self._size_locked(key)
+            self._conn.execute(
+                "INSERT OR REPLACE INTO entries(key, payload, size, last_access) "
+                "VALUES (?, ?, ?, ?)",
+                (key, payload, len(payload), time.time()),
+            )
+            self._total_bytes += len(payload)
+            self._evict_locked()
+            self._conn.commit()
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            self._total_bytes -= self._size_locked(key)
+            self._pending_touch.pop(key, None)
+            self._conn.execute("DELETE FROM entries WHERE key = ?", (key,))
+            self._conn.commit()
+
+    def _size_locked(self, key: str) -> int:
+        row = self._conn.execute("SELECT size FROM entries WHERE key = ?", (key,)).fetchone()
+        return int(row[0]) if row else 0
+
+    def _evict_locked(self) -> None:
+        if self.max_bytes <= 0:
+            return
+        evicted = 0
+        while self._total_bytes > self.max_bytes:
+            rows = self._conn.execute(
+                "SELECT key, size FROM entries ORDER BY last_access ASC LIMIT ?",
+                (self._EVICT_BATCH,),
+            ).fetchall()
+            if not rows:
+                # 表已空（例如其他进程清理过）：重置计数
+                self._total_bytes = 0
+                break
+            for key, size in rows:
+                if self._total_bytes <= self.max_bytes:
+                    break
+                self._conn.execute("DELETE FROM entries WHERE key = ?", (key,))
+                self._total_bytes -= int(size)
+                evicted += 1
+        if evicted:
+            self._bump("evictions", evicted)
+
+    def stats(self) -> dict:
+        with self._lock:
+            self._flush_locked()
+            self._conn.commit()
+            counters = dict(self._conn.execute("SELECT name, value FROM counters").fetchall())
+            entries = self._conn.execute("SELECT COUNT(*) FROM entries").fetchone()[0]
+            total = self._total_bytes
+        hits = int(counters.get("hits", 0))
+        misses = int(counters.get("misses", 0))
+        lookups = hits + misses
+        return {
+            "entries": int(entries),
+            "bytes": int(total),
+            "max_bytes": self.max_bytes,
+            "hits": hits,
+            "misses": misses,
+            "evictions": int(counters.get("evictions", 0)),
+            "hit_rate": round(hits / lookups, 4) if lookups else 0.0,
+        }
+
+
+_stores: dict[str, OCRResultStore] = {}
+_stores_lock = threading.Lock()
+
+
+def _max_bytes() -> int:
+    raw = (os.getenv("OCR_RESULT_CACHE_MAX_MB") or "").strip()
+    try:
+        value = float(raw) if raw else 256.0
+    except ValueError:
+        value = 256.0
+    return int(max(0.0, value) * 1024 * 1024)
+
+
+def get_ocr_result_store(cache_dir: Path) -> OCRResultStore:
+    """Shared store for ``cache_dir`` (one SQLite file per directory)."""
+    db_path = Path(cache_dir) / _DB_NAME
+    key = str(db_path)
+    with _stores_lock:
+        store = _stores.get(key)
+        if store is None:
+            store = OCRResultStore(db_path, _max_bytes())
+            _stores[key] = store
+        else:
+            store.max_bytes = _max_bytes()
+        return store
+
+
+def result_store_stats() -> dict[str, dict]:
+    """Stats of every store opened in this process, keyed by SQLite path."""
+    with _stores_lock:
+        stores = dict(_stores)
+    return {path: store.stats() for path, store in stores.items()}
@@ -15,6 +15,7 @@ from uuid import uuid4
 import cv2
 import numpy as np
 
+from ..image_buffer import read_image
 from ..models import Box2D, RegionData
 from ..image_io import save_image
 
@@ -74,7 +75,7 @@ class ContourDetector(TextDetector):
     def _detect_sync(self, image_path: str) -> list[RegionData]:
         """Synchronous detection implementation."""
         # Read image
-        image = cv2.imread(image_path)
+        image = read_image(image_path)
         if image is None:
             raise FileNotFoundError(f"Cannot read image: {image_path}")
 
@@ -320,9 +320,8 @@ def _read_env_float(name: str, default: float) -> float:
         return default
 
 
-def get_tiling_manager() -> TilingManager:
-    """Get or create the global tiling manager instance."""
-    global _tiling_manager, _tiling_manager_sig
+def tiling_config_signature() -> tuple:
+    """Effective (clamped) tiling config read from env; changes whenever OCR_TILE_* knobs do."""
     # Keep defaults unchanged, but allow A/B tuning via env for performance experiments.
     tile_height = _read_env_int("OCR_TILE_HEIGHT", 1024)
     overlap_ratio = _read_env_float("OCR_TILE_OVERLAP_RATIO", 0.5)
@@ -341,7 +340,7 @@ def get_tiling_manager() -> TilingManager:
     edge_band_ratio = max(0.05, min(0.5, edge_band_ratio))
     edge_band_min_height = max(32, min(2048, edge_band_min_height))
 
-    sig = (
+    return (
         tile_height,
         round(overlap_ratio, 4),
         min_tile_height,
@@ -349,7 +348,21 @@ def get_tiling_manager() -> TilingManager:
         round(edge_band_ratio, 4),
         edge_band_min_height,
     )
+
+
+def get_tiling_manager() -> TilingManager:
+    """Get or create the global tiling manager instance."""
+    global _tiling_manager, _tiling_manager_sig
+    sig = tiling_config_signature()
     if _tiling_manager is None or _tiling_manager_sig != sig:
+        (
+            tile_height,
+            overlap_ratio,
+            min_tile_height,
+            edge_padding,
+            edge_band_ratio,
+            edge_band_min_height,
+        ) = sig
         _tiling_manager = TilingManager(
             tile_height=tile_height,
             overlap_ratio=overlap_ratio,
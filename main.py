@@ -105,6 +105,13 @@ def server_cmd(args):
     uvicorn.run(app, host=host, port=port)
 
 
+def worker_cmd(args):
+    """启动翻译 worker 进程（TRANSLATE_WORKER_MODE=queue 时由它们处理页面）"""
+    from app.worker import main as run_workers
+
+    run_workers(processes=args.workers, concurrency=args.concurrency)
+
+
 def main():
     parser = argparse.ArgumentParser(
         description="漫画翻译器 - 自动翻译漫画中的文字",
@@ -115,6 +122,7 @@ def main():
   python main.py image test.jpg -o output/         # 指定输出目录
   python main.py chapter input/ output/ -w 3       # 并行翻译整章
   python main.py server --port 8000                # 启动 Web 服务
+  python main.py worker -n 2                       # 启动 2 个翻译 worker 进程
         """
     )
     
@@ -142,6 +150,12 @@ def main():
     server_parser.add_argument("-p", "--port", type=int, default=8000, help="端口号 (默认: 8000)")
     server_parser.set_defaults(func=server_cmd)
     
+    # worker 子命令
+    worker_parser = subparsers.add_parser("worker", help="启动翻译 worker 进程（队列模式）")
+    worker_parser.add_argument("-n", "--workers", type=int, default=None, help="进程数 (默认: WORKER_PROCESSES 或 2)")
+    worker_parser.add_argument("-c", "--concurrency", type=int, default=None, help="每个进程的并发页数 (默认: WORKER_CONCURRENCY 或 1)")
+    worker_parser.set_defaults(func=worker_cmd)
+    
     args = parser.parse_args()
     
     if not args.command:
@@ -0,0 +1,508 @@
+"""Process-wide Playwright browser pool shared by scrapers and the scraper API.
+
+Every ``search_manga`` / ``get_chapters`` / ``download_images`` call used to
+start its own Playwright driver and Chromium (or persistent profile), which
+costs seconds per call. The pool keeps one driver and one browser per
+(headless, channel) alive and hands out warm browser contexts keyed by their
+site settings (storage state file, user agent, headers, cookies), so repeated
+API requests for the same site reuse an already-initialised context.
+
+- A lease owns its context exclusively; concurrent leases of the same spec get
+  separate contexts on the shared browser.
+- On release all pages are closed and the storage state is saved (when asked),
+  then the context goes back to the idle list. If the storage state file was
+  changed by someone else (e.g. ``/scraper/upload-state``), the idle context
+  is discarded instead of being reused with stale cookies.
+- Persistent profiles (``user_data_dir``) can only be opened once by Chromium,
+  so they are kept one per directory and leased under a lock.
+- Idle contexts and browsers are closed after ``SCRAPER_BROWSER_IDLE_SEC``;
+  the driver stops once nothing is left.
+
+Pools are cached per event loop, like the AI clients (Playwright objects are
+loop-bound).
+
+Env:
+    SCRAPER_BROWSER_POOL: 1/0 (default 1; 0 = close everything after each lease)
+    SCRAPER_BROWSER_POOL_SIZE: idle contexts kept warm (default 4)
+    SCRAPER_BROWSER_IDLE_SEC: close idle contexts/browsers after N seconds (default 300)
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import os
+import threading
+import time
+import weakref
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, AsyncIterator, Callable, Mapping, Sequence
+
+from playwright.async_api import async_playwright
+
+from core.utils.env import read_env_int
+
+logger = logging.getLogger(__name__)
+
+
+def browser_pool_enabled() -> bool:
+    return os.getenv("SCRAPER_BROWSER_POOL", "1") == "1"
+
+
+@dataclass(frozen=True)
+class ContextSpec:
+    """Everything that makes two browser contexts interchangeable."""
+
+    headless: bool = True
+    channel: str | None = None
+    launch_args: tuple[str, ...] = ()
+    user_data_dir: str | None = None
+    storage_state_path: str | None = None
+    save_storage_state: bool = False
+    user_agent: str | None = None
+    # True 时 user_agent 由 lease 的 user_agent_factory 随机挑选，复用时不比较
+    rotate_user_agent: bool = False
+    extra_headers: tuple[tuple[str, str], ...] = ()
+    cookies: tuple[tuple[tuple[str, str], ...], ...] = ()
+    init_script: str | None = None
+    timeout_ms: int | None = None
+
+    @classmethod
+    def build(
+        cls,
+        *,
+        extra_headers: Mapping[str, str] | None = None,
+        cookies: Sequence[Mapping[str, str]] | None = None,
+        launch_args: Sequence[str] = (),
+        **kwargs: Any,
+    ) -> "ContextSpec":
+        return cls(
+            extra_headers=tuple(sorted((extra_headers or {}).items())),
+            cookies=tuple(tuple(sorted(cookie.items())) for cookie in cookies or ()),
+            launch_args=tuple(launch_args),
+            **kwargs,
+        )
+
+    @property
+    def browser_key(self) -> tuple:
+        return (self.headless, self.channel, self.launch_args)
+
+
+def _storage_mtime(path: str | None) -> int | None:
+    if not path:
+        return None
+    try:
+        return Path(path).stat().st_mtime_ns
+    except OSError:
+        return None
+
+
+@dataclass
+class _PooledContext:
+    spec: ContextSpec
+    context: Any
+    browser_key: tuple | None
+    storage_mtime: int | None
+    last_used: float = field(default_factory=time.monotonic)
+    closed: bool = False
+
+    def alive(self) -> bool:
+        if self.closed:
+            return False
+        browser = getattr(self.context, "browser", None)
+        if browser is not None and not browser.is_connected():
+            return False
+        return True
+
+
+class BrowserPool:
+    """Leases warm Playwright contexts; one instance per event loop."""
+
+    def __init__(
+        self,
+        max_idle: int | None = None,
+        idle_sec: float | None = None,
+        enabled: bool | None = None,
+    ) -> None:
+        self.enabled = browser_pool_enabled() if enabled is None else enabled
+        self.max_idle = (
+            read_env_int("SCRAPER_BROWSER_POOL_SIZE", 4, minimum=0) if max_idle is None else max_idle
+        )
+        self.idle_sec = (
+            float(read_env_int("SCRAPER_BROWSER_IDLE_SEC", 300, minimum=0))
+            if idle_sec is None
+            else idle_sec
+        )
+        if not self.enabled:
+            self.max_idle = 0
+            self.idle_sec = 0.0
+        self._playwright: Any = None
+        self._browsers: dict[tuple, Any] = {}
+        self._browser_last_used: dict[tuple, float] = {}
+        self._idle: dict[ContextSpec, list[_PooledContext]] = {}
+        self._in_use: dict[tuple, int] = {}
+        self._persistent: dict[str, _PooledContext] = {}
+        self._persistent_locks: dict[str, asyncio.Lock] = {}
+        self._launch_lock = asyncio.Lock()
+        self._reaper: asyncio.Task | None = None
+        self._stats: dict[str, float] = {
+            "hits": 0,
+            "misses": 0,
+            "stale": 0,
+            "evicted": 0,
+            "browser_launches": 0,
+            "launch_ms_total": 0.0,
+            "launch_ms_last": 0.0,
+            "context_ms_last": 0.0,
+        }
+
+    # ---- public API -------------------------------------------------------
+
+    @asynccontextmanager
+    async def lease(
+        self,
+        spec: ContextSpec,
+        user_agent_factory: Callable[[], str | None] | None = None,
+    ) -> AsyncIterator[Any]:
+        if spec.user_data_dir:
+            async with self._lease_persistent(spec, user_agent_factory) as context:
+                yield context
+            return
+
+        entry = await self._take_idle(spec)
+        if entry is None:
+            entry = await self._new_context(spec, user_agent_factory)
+        key = spec.browser_key
+        self._in_use[key] = self._in_use.get(key, 0) + 1
+        try:
+            yield entry.context
+        finally:
+            self._in_use[key] -= 1
+            await self._release(entry)
+
+    def stats(self) -> dict[str, Any]:
+        launches = int(self._stats["browser_launches"])
+        hits = int(self._stats["hits"])
+        misses = int(self._stats["misses"])
+        return {
+            "enabled": self.enabled,
+            "max_idle": self.max_idle,
+            "idle_sec": self.idle_sec,
+            "hits": hits,
+            "misses": misses,
+            "hit_rate": round(hits / (hits + misses), 3) if hits + misses else 0.0,
+            "stale": int(self._stats["stale"]),
+            "evicted": int(self._stats["evicted"]),
+            "browser_launches": launches,
+            "launch_ms_last": round(self._stats["launch_ms_last"], 2),
+            "launch_ms_avg": (
+                round(self._stats["launch_ms_total"] / launches, 2) if launches else 0.0
+            ),
+            "context_ms_last": round(self._stats["context_ms_last"], 2),
+            "browsers": len(self._browsers),
+            "idle_contexts": sum(len(items) for items in self._idle.values()),
+            "persistent_contexts": len(self._persistent),
+            "in_use": sum(self._in_use.values()),
+        }
+
+    async def reap(self, now: float | None = None) -> None:
+        """Close contexts/browsers idle longer than ``idle_sec``."""
+        now = time.monotonic() if now is None else now
+        for spec, items in list(self._idle.items()):
+            keep = []
+            for entry in items:
+                if now - entry.last_used >= self.idle_sec or not entry.alive():
+                    await self._close_entry(entry)
+                else:
+                    keep.append(entry)
+            if keep:
+                self._idle[spec] = keep
+            else:
+                self._idle.pop(spec, None)
+        for user_data_dir, entry in list(self._persistent.items()):
+            lock = self._persistent_locks.get(user_data_dir)
+            if lock is not None and lock.locked():
+                continue
+            if now - entry.last_used >= self.idle_sec or not entry.alive():
+                self._persistent.pop(user_data_dir, None)
+                await self._close_entry(entry)
+        for key, browser in list(self._browsers.items()):
+            if self._in_use.get(key, 0) or any(
+                entry.browser_key == key for items in self._idle.values() for entry in items
+            ):
+                continue
+            if now - self._browser_last_used.get(key, 0.0) >= self.idle_sec:
+                self._browsers.pop(key, None)
+                self._browser_last_used.pop(key, None)
+                try:
+                    await browser.close()
+                except Exception:  # noqa: BLE001
+                    pass
+        await self._maybe_stop_driver()
+
+    async def aclose(self) -> None:
+        if self._reaper is not None and not self._reaper.done():
+            self._reaper.cancel()
+        self._reaper = None
+        for items in self._idle.values():
+            for entry in items:
+                await self._close_entry(entry)
+        self._idle.clear()
+        for entry in self._persistent.values():
+            await self._close_entry(entry)
+        self._persistent.clear()
+        for browser in self._browsers.values():
+            try:
+                await browser.close()
+            except Exception:  # noqa: BLE001
+                pass
+        self._browsers.clear()
+        self._browser_last_used.clear()
+        await self._maybe_stop_driver()
+
+    # ---- internals --------------------------------------------------------
+
+    async def _take_idle(self, spec: ContextSpec) -> _PooledContext | None:
+        items = self._idle.get(spec)
+        while items:
+            entry = items.pop()
+            if entry.alive() and entry.storage_mtime == _storage_mtime(
+                spec.storage_state_path
+            ):
+                self._stats["hits"] += 1
+                return entry
+            self._stats["stale"] += 1
+            await self._close_entry(entry)
+        self._idle.pop(spec, None)
+        self._stats["misses"] += 1
+        return None
+
+    @asynccontextmanager
+    async def _lease_persistent(
+        self,
+        spec: ContextSpec,
+        user_agent_factory: Callable[[], str | None] | None,
+    ) -> AsyncIterator[Any]:
+        user_data_dir = str(spec.user_data_dir)
+        lock = self._persistent_locks.setdefault(user_data_dir, asyncio.Lock())
+        async with lock:
+            entry = self._persistent.get(user_data_dir)
+            if entry is not None and (entry.spec != spec or not entry.alive()):
+                self._persistent.pop(user_data_dir, None)
+                self._stats["stale"] += 1
+                await self._close_entry(entry)
+                entry = None
+            if entry is None:
+                self._stats["misses"] += 1
+                entry = await self._new_persistent(spec, user_agent_factory)
+                self._persistent[user_data_dir] = entry
+            else:
+                self._stats["hits"] += 1
+            try:
+                yield entry.context
+            finally:
+                reusable = await self._reset(entry)
+                if not self.enabled or not reusable:
+                    self._persistent.pop(user_data_dir, None)
+                    await self._close_entry(entry)
+                    await self._maybe_stop_driver()
+                else:
+                    self._schedule_reaper()
+
+    async def _driver(self) -> Any:
+        if self._playwright is None:
+            self._playwright = await async_playwright().start()
+        return self._playwright
+
+    async def _maybe_stop_driver(self) -> None:
+        if self._playwright is None:
+            return
+        if self._browsers or self._persistent or any(self._in_use.values()):
+            return
+        playwright, self._playwright = self._playwright, None
+        try:
+            await playwright.stop()
+        except Exception:  # noqa: BLE001
+            pass
+
+    def _record_launch(self, started: float, what: str) -> None:
+        elapsed = (time.perf_counter() - started) * 1000
+        self._stats["browser_launches"] += 1
+        self._stats["launch_ms_total"] += elapsed
+        self._stats["launch_ms_last"] = elapsed
+        logger.info("browser pool launch | %s | %.0fms", what, elapsed)
+
+    async def _get_browser(self, spec: ContextSpec) -> Any:
+        key = spec.browser_key
+        async with self._launch_lock:
+            browser = self._browsers.get(key)
+            if browser is not None and browser.is_connected():
+                return browser
+            playwright = await self._driver()
+            started = time.perf_counter()
+            browser = await playwright.chromium.launch(
+                headless=spec.headless,
+                args=list(spec.launch_args),
+                channel=spec.channel,
+            )
+            self._record_launch(started, f"chromium channel={spec.channel}")
+            self._browsers[key] = browser
+            return browser
+
+    def _context_options(
+        self,
+        spec: ContextSpec,
+        user_agent_factory: Callable[[], str | None] | None,
+    ) -> dict[str, Any]:
+        options: dict[str, Any] = {"extra_http_headers": dict(spec.extra_headers)}
+        user_agent = spec.user_agent
+        if user_agent is None and spec.rotate_user_agent and user_agent_factory:
+            user_agent = user_agent_factory()
+        if user_agent:
+            options["user_agent"] = user_agent
+        return options
+
+    async def _prepare(self, entry: _PooledContext) -> None:
+        context, spec = entry.context, entry.spec
+
+        def _mark_closed(*_args: Any) -> None:
+            entry.closed = True
+
+        on = getattr(context, "on", None)
+        if on is not None:
+            on("close", _mark_closed)
+        if spec.init_script:
+            await context.add_init_script(spec.init_script)
+        if spec.timeout_ms:
+            context.set_default_timeout(spec.timeout_ms)
+        if spec.cookies:
+            await context.add_cookies([dict(cookie) for cookie in spec.cookies])
+
+    async def _new_context(
+        self,
+        spec: ContextSpec,
+        user_agent_factory: Callable[[], str | None] | None,
+    ) -> _PooledContext:
+        browser = await self._get_browser(spec)
+        options = self._context_options(spec, user_agent_factory)
+        storage_mtime = _storage_mtime(spec.storage_state_path)
+        if storage_mtime is not None:
+            options["storage_state"] = str(spec.storage_state_path)
+        started = time.perf_counter()
+        context = await browser.new_context(**options)
+        entry = _PooledContext(spec, context, spec.browser_key, storage_mtime)
+        await self._prepare(entry)
+        self._stats["context_ms_last"] = (time.perf_counter() - started) * 1000
+        return entry
+
+    async def _new_persistent(
+        self,
+        spec: ContextSpec,
+        user_agent_factory: Callable[[], str | None] | None,
+    ) -> _PooledContext:
+        playwright = await self._driver()
+        user_data_dir = Path(str(spec.user_data_dir))
+        user_data_dir.mkdir(parents=True, exist_ok=True)
+        options = self._context_options(spec, user_agent_factory)
+        started = time.perf_counter()
+        context = await playwright.chromium.launch_persistent_context(
+            user_data_dir=str(user_data_dir),
+            headless=spec.headless,
+            args=list(spec.launch_args),
+            channel=spec.channel,
+            **options,
+        )
+        self._record_launch(started, f"persistent dir={user_data_dir}")
+        entry = _PooledContext(
+            spec, context, None, _storage_mtime(spec.storage_state_path)
+        )
+        await self._prepare(entry)
+        return entry
+
+    async def _reset(self, entry: _PooledContext) -> bool:
+        """Close leftover pages and persist storage; False if the context is unusable."""
+        entry.last_used = time.monotonic()
+        try:
+            for page in list(getattr(entry.context, "pages", [])):
+                await page.close()
+            if entry.spec.save_storage_state and entry.spec.storage_state_path:
+                path = Path(entry.spec.storage_state_path)
+                path.parent.mkdir(parents=True, exist_ok=True)
+                await entry.context.storage_state(path=str(path))
+            entry.storage_mtime = _storage_mtime(entry.spec.storage_state_path)
+        except Exception:  # noqa: BLE001
+            entry.closed = True
+        return entry.alive()
+
+    async def _release(self, entry: _PooledContext) -> None:
+        reusable = await self._reset(entry)
+        if entry.browser_key is not None:
+            self._browser_last_used[entry.browser_key] = entry.last_used
+        if not reusable:
+            await self._close_entry(entry)
+        else:
+            self._idle.setdefault(entry.spec, []).append(entry)
+            await self._evict_over_capacity()
+        if not self.enabled:
+            await self.reap()
+        else:
+            self._schedule_reaper()
+
+    async def _evict_over_capacity(self) -> None:
+        idle = [entry for items in self._idle.values() for entry in items]
+        overflow = len(idle) - self.max_idle
+        if overflow <= 0:
+            return
+        idle.sort(key=lambda entry: entry.last_used)
+        for entry in idle[:overflow]:
+            items = self._idle.get(entry.spec, [])
+            items.remove(entry)
+            if not items:
+                self._idle.pop(entry.spec, None)
+            self._stats["evicted"] += 1
+            await self._close_entry(entry)
+
+    async def _close_entry(self, entry: _PooledContext) -> None:
+        entry.closed = True
+        try:
+            await entry.context.close()
+        except Exception:  # noqa: BLE001
+            pass
+
+    def _schedule_reaper(self) -> None:
+        if self._reaper is not None and not self._reaper.done():
+            return
+        self._reaper = asyncio.get_running_loop().create_task(self._reap_loop())
+
+    async def _reap_loop(self) -> None:
+        interval = max(1.0, min(self.idle_sec / 2, 30.0))
+        while self._playwright is not None:
+            await asyncio.sleep(interval)
+            await self.reap()
+
+
+_pools: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, BrowserPool]" = (
+    weakref.WeakKeyDictionary()
+)
+_pools_lock = threading.Lock()
+
+
+def get_browser_pool() -> BrowserPool:
+    """Browser pool bound to the running event loop."""
+    loop = asyncio.get_running_loop()
+    with _pools_lock:
+        pool = _pools.get(loop)
+        if pool is None:
+            pool = BrowserPool()
+            _pools[loop] = pool
+        return pool
+
+
+async def close_browser_pool() -> None:
+    loop = asyncio.get_running_loop()
+    with _pools_lock:
+        pool = _pools.pop(loop, None)
+    if pool is not None:
+        await pool.aclose()
@@ -1,18 +1,60 @@
 from __future__ import annotations
 
 import asyncio
+import contextvars
 import json
 import logging
+import os
 import random
+from contextlib import contextmanager
 from dataclasses import dataclass
 from datetime import datetime, timezone
 from pathlib import Path
-from typing import Awaitable, Callable, Iterable
+from typing import Awaitable, Callable, Iterable, Iterator
 
 import aiohttp
 
 from .base import Chapter, Manga, UserAgentPool
-from .rate_limit import RequestRateLimiter
+from .rate_limit import (
+    HostRateLimiters,
+    RequestRateLimiter,
+    get_host_limiters,
+    host_of,
+    parse_retry_after,
+)
+
+
+# 整部漫画下载时多个章节共用的连接预算；未设置时每次 download_all 使用自己的并发上限。
+connection_budget: contextvars.ContextVar[asyncio.Semaphore | None] = (
+    contextvars.ContextVar("scraper_connection_budget", default=None)
+)
+
+
+# 每页落盘（或确认已存在/失败）后回调，供边下边翻译的任务按页取用。
+page_listener: contextvars.ContextVar[Callable[["PageRecord"], None] | None] = (
+    contextvars.ContextVar("scraper_page_listener", default=None)
+)
+
+
+@contextmanager
+def use_page_listener(callback: Callable[["PageRecord"], None]) -> Iterator[None]:
+    """Call ``callback(record)`` as each page of downloads started here settles."""
+    token = page_listener.set(callback)
+    try:
+        yield
+    finally:
+        page_listener.reset(token)
+
+
+@contextmanager
+def use_connection_budget(max_connections: int) -> Iterator[asyncio.Semaphore]:
+    """Cap in-flight image fetches across every download started in this context."""
+    budget = asyncio.Semaphore(max(1, int(max_connections)))
+    token = connection_budget.set(budget)
+    try:
+        yield budget
+    finally:
+        connection_budget.reset(token)
 
 
 @dataclass(frozen=True)
@@ -33,6 +75,10 @@ class DownloadConfig:
     backoff_max: float = 10.0
     queue_maxsize: int = 120
     rate_limit_rps: float = 2.0
+    # 流式写盘的分块大小；每个连接只占用一个分块的内存
+    chunk_size: int = 64 * 1024
+    # 校验图片文件头/结尾，拦截 Cloudflare HTML 页与被截断的图片
+    verify_images: bool = True
 
 
 @dataclass
@@ -62,9 +108,102 @@ class DownloadReport:
 
 
 class TransientHttpError(RuntimeError):
-    def __init__(self, status: int) -> None:
+    def __init__(self, status: int, retry_after: float | None = None) -> None:
         super().__init__(f"Transient HTTP status {status}")
         self.status = status
+        self.retry_after = retry_after
+
+
+class IncompleteDownloadError(RuntimeError):
+    """Body shorter/longer than Content-Length; the .part file is kept for Range resume."""
+
+
+def _validator_path(part_path: Path) -> Path:
+    # .part 旁边记录服务器给的 ETag / Last-Modified，续传时作为 If-Range
+    return part_path.with_name(part_path.name + ".validator")
+
+
+def _response_validator(response: aiohttp.ClientResponse) -> str | None:
+    etag = (response.headers.get("ETag") or "").strip()
+    # If-Range 只能用强 ETag；弱 ETag 时退回 Last-Modified
+    if etag and not etag.startswith("W/"):
+        return etag
+    return (response.headers.get("Last-Modified") or "").strip() or None
+
+
+class InvalidImageError(RuntimeError):
+    """Payload is a truncated image or an HTML (challenge/error) page."""
+
+
+_IMAGE_SIGNATURES = (
+    (b"\xff\xd8\xff", "jpeg"),
+    (b"\x89PNG\r\n\x1a\n", "png"),
+    (b"GIF87a", "gif"),
+    (b"GIF89a", "gif"),
+    (b"BM", "bmp"),
+)
+
+
+def sniff_image_type(head: bytes) -> str | None:
+    for signature, kind in _IMAGE_SIGNATURES:
+        if head.startswith(signature):
+            return kind
+    if head[:4] == b"RIFF" and head[8:12] == b"WEBP":
+        return "webp"
+    if head[4:8] == b"ftyp" and head[8:12] in {b"avif", b"avis", b"heic", b"mif1"}:
+        return "avif"
+    return None
+
+
+# 结束标记之后常见填充字节/附加数据，所以在整个尾部窗口里找
+_TAIL_WINDOW = 1024
+_MARKUP_PREFIXES = (b"<!doctype", b"<html", b"<head", b"<body", b"<?xml")
+
+
+def looks_like_markup(head: bytes) -> bool:
+    """HTML/XML payload (challenge or error page) served in place of an image."""
+    text = head.lstrip(b"\xef\xbb\xbf \t\r\n").lower()
+    return text.startswith(_MARKUP_PREFIXES) or b"<html" in text
+
+
+def is_complete_image(path: Path) -> bool:
+    """Cheap integrity check: the format's end marker for known formats.
+
+    Unknown formats pass unless the payload is HTML; only a known header with
+    a missing end marker (a truncated download) or markup counts as invalid.
+    """
+    try:
+        size = path.stat().st_size
+        if size <= 0:
+            return False
+        with path.open("rb") as handle:
+            head = handle.read(512)
+            handle.seek(max(0, size - _TAIL_WINDOW))
+            tail = handle.read(_TAIL_WINDOW)
+    except OSError:
+        return False
+    kind = sniff_image_type(head)
+    if kind == "jpeg":
+        return b"\xff\xd9" in tail
+    if kind == "png":
+        return b"IEND" in tail
+    if kind == "gif":
+        return tail.rstrip(b"\x00").endswith(b";")
+    if kind == "webp":
+        return int.from_bytes(head[4:8], "little") + 8 <= size
+    return kind is not None or not looks_like_markup(head)
+
+
+def _parse_content_range(value: str | None) -> tuple[int, int | None] | None:
+    # "bytes 100-199/1234" -> (100, 1234)；总长为 * 时返回 None
+    if not value or not value.startswith("bytes "):
+        return None
+    try:
+        span, _, total = value[6:].partition("/")
+        start = int(span.split("-", 1)[0])
+        return start, (int(total) if total and total != "*" else None)
+    except ValueError:
+        return None
 
 
 class AsyncDownloader:
@@ -73,12 +212,15 @@ class AsyncDownloader:
         config: DownloadConfig | None = None,
         user_agent_pool: UserAgentPool | None = None,
         request_limiter: RequestRateLimiter | None = None,
+        host_limiters: HostRateLimiters | None = None,
     ) -> None:
         self.config = config or DownloadConfig()
         self.user_agent_pool = user_agent_pool or UserAgentPool()
         self.request_limiter = request_limiter or RequestRateLimiter(
             self.config.rate_limit_rps
         )
+        # 图片 CDN 等其他 host 走进程级的按 host 限速器
+        self.host_limiters = host_limiters or get_host_limiters()
         self.logger = logging.getLogger(__name__)
 
     async def download_all(
@@ -124,7 +266,9 @@ class AsyncDownloader:
         queue: asyncio.Queue[DownloadItem | object] = asyncio.Queue(
             maxsize=self.config.queue_maxsize
         )
-        semaphore = asyncio.Semaphore(self.config.concurrency)
+        semaphore = connection_budget.get() or asyncio.Semaphore(
+            self.config.concurrency
+        )
         results: list[PageRecord] = []
         sentinel = object()
 
@@ -177,6 +321,9 @@ class AsyncDownloader:
                 item, session, semaphore, output_dir, headers
             )
             results.append(record)
+            listener = page_listener.get()
+            if listener is not None:
+                listener(record)
             queue.task_done()
 
     async def _download_item(
@@ -191,15 +338,16 @@ class AsyncDownloader:
             file_name = item.filename or f"{item.index}.jpg"
             file_path = output_dir / file_name
             try:
-                if file_path.exists() and file_path.stat().st_size > 0:
+                if self._is_done(file_path):
                     return PageRecord(
                         index=item.index,
                         url=item.url,
                         path=str(file_path),
                         ok=True,
                     )
-                data = await self._fetch_bytes(session, item.url, headers, item.referer)
-                file_path.write_bytes(data)
+                await self._fetch_to_file(
+                    session, item.url, headers, item.referer, file_path
+                )
                 return PageRecord(
                     index=item.index, url=item.url, path=str(file_path), ok=True
                 )
@@ -217,35 +365,143 @@ class AsyncDownloader:
                     error=str(exc),
                 )
 
-    async def _fetch_bytes(
+    def _is_done(self, file_path: Path) -> bool:
+        if not file_path.exists() or file_path.stat().st_size <= 0:
+            return False
+        if not self.config.verify_images or is_complete_image(file_path):
+            return True
+        # 旧版本被中断时留下的截断文件：保留原页，重新下载到 .part，
+        # 只有新副本通过校验才会替换它
+        self.logger.warning("re-fetching incomplete image | path=%s", file_path)
+        return False
+
+    async def _fetch_to_file(
         self,
         session: aiohttp.ClientSession,
         url: str,
         headers: dict[str, str] | None,
         referer: str | None,
-    ) -> bytes:
+        file_path: Path,
+    ) -> int:
+        """Stream ``url`` into ``<file>.part`` then atomically rename it.
+
+        A leftover ``.part`` (from a failed attempt or a killed run) is resumed
+        with an HTTP Range request; servers that ignore Range get a full rewrite.
+        The ETag / Last-Modified of the response that started the ``.part`` is
+        sent as ``If-Range``, so a changed page comes back whole instead of
+        being appended to the old bytes.
+        """
+        part_path = file_path.with_name(file_path.name + ".part")
+        validator_path = _validator_path(part_path)
+        limiter = self._limiter_for(url)
         for attempt in range(self.config.max_retries + 1):
             request_headers = dict(headers or {})
             request_headers.setdefault("User-Agent", self.user_agent_pool.pick())
             if referer:
                 request_headers["Referer"] = referer
+            offset = part_path.stat().st_size if part_path.exists() else 0
+            if offset:
+                request_headers["Range"] = f"bytes={offset}-"
+                validator = self._read_validator(validator_path)
+                if validator:
+                    request_headers["If-Range"] = validator
             try:
-                await self.request_limiter.acquire()
+                await limiter.acquire()
                 async with session.get(url, headers=request_headers) as response:
-                    if response.status in {403, 429}:
-                        raise TransientHttpError(response.status)
+                    retry_after = parse_retry_after(response.headers.get("Retry-After"))
+                    limiter.on_status(response.status, retry_after)
+                    if response.status == 416:
+                        # 已有的部分数据与服务器不一致，从头下载
+                        self._discard_part(part_path)
+                        raise IncompleteDownloadError("Range not satisfiable")
+                    if response.status in {403, 429, 503}:
+                        raise TransientHttpError(response.status, retry_after)
                     response.raise_for_status()
-                    return await response.read()
+                    try:
+                        expected = self._expected_size(response, offset)
+                    except IncompleteDownloadError:
+                        # 返回的区间接不上本地数据：丢掉 .part，下次从头下载
+                        self._discard_part(part_path)
+                        raise
+                    if response.status != 206:
+                        offset = 0
+                        self._write_validator(validator_path, _response_validator(response))
+                    written = await self._stream_body(response, part_path, offset)
+                if expected is not None and written != expected:
+                    raise IncompleteDownloadError(
+                        f"Incomplete body: got {written} of {expected} bytes"
+                    )
+                if self.config.verify_images and not is_complete_image(part_path):
+                    self._discard_part(part_path)
+                    raise InvalidImageError("Response is not a complete image")
+                os.replace(part_path, file_path)
+                validator_path.unlink(missing_ok=True)
+                return written
             except (
                 aiohttp.ClientError,
                 asyncio.TimeoutError,
                 TransientHttpError,
+                IncompleteDownloadError,
+                InvalidImageError,
             ) as exc:
                 if attempt >= self.config.max_retries:
                     raise exc
                 await asyncio.sleep(self._compute_backoff(attempt))
         raise RuntimeError("Exhausted retries")
 
+    def _limiter_for(self, url: str) -> RequestRateLimiter:
+        # 未绑定 host 的限速器沿用旧行为：所有请求共用
+        host = host_of(url)
+        if self.request_limiter.host is None or not host:
+            return self.request_limiter
+        if host == self.request_limiter.host:
+            return self.request_limiter
+        return self.host_limiters.for_url(url)
+
+    @staticmethod
+    def _discard_part(part_path: Path) -> None:
+        part_path.unlink(missing_ok=True)
+        _validator_path(part_path).unlink(missing_ok=True)
+
+    @staticmethod
+    def _read_validator(validator_path: Path) -> str | None:
+        try:
+            return validator_path.read_text(encoding="utf-8").strip() or None
+        except OSError:
+            return None
+
+    @staticmethod
+    def _write_validator(validator_path: Path, validator: str | None) -> None:
+        if validator:
+            validator_path.write_text(validator, encoding="utf-8")
+        else:
+            validator_path.unlink(missing_ok=True)
+
+    @staticmethod
+    def _expected_size(response: aiohttp.ClientResponse, offset: int) -> int | None:
+        if response.status == 206:
+            content_range = _parse_content_range(response.headers.get("Content-Range"))
+            if content_range is None or content_range[0] != offset:
+                raise IncompleteDownloadError("Unexpected Content-Range")
+            if content_range[1] is not None:
+                return content_range[1]
+            length = response.content_length
+            return offset + length if length is not None else None
+        if response.headers.get("Content-Encoding", "identity") not in {"", "identity"}:
+            # aiohttp 会自动解压，Content-Length 是压缩后的长度
+            return None
+        return response.content_length
+
+    async def _stream_body(
+        self, response: aiohttp.ClientResponse, part_path: Path, offset: int
+    ) -> int:
+        written = offset
+        with part_path.open("ab" if offset else "wb") as handle:
+            async for chunk in response.content.iter_chunked(self.config.chunk_size):
+                handle.write(chunk)
+                written += len(chunk)
+        return written
+
     def _compute_backoff(self, attempt: int) -> float:
         base = self.config.backoff_base * (self.config.backoff_factor**attempt)
         delay = min(self.config.backoff_max, base)
@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+import asyncio
 import logging
 from typing import Sequence, cast
 from dataclasses import dataclass
@@ -10,11 +11,19 @@ from urllib.robotparser import RobotFileParser
 import aiohttp
 
 from .base import BaseScraper, Chapter, Manga, safe_name
+from .downloader import DownloadReport, use_connection_budget
+from .journal import JOURNAL_NAME, DownloadJournal, chapter_key
 
 
 @dataclass
 class EngineConfig:
     output_root: Path = Path("data/raw")
+    # download_manga: 同时处理的章节数（URL 收集与图片下载在章节之间重叠）
+    chapter_concurrency: int = 3
+    # download_manga: 所有章节共享的图片连接上限
+    max_connections: int = 8
+    # download_manga: 写入/读取断点续传日志
+    journal: bool = True
 
 
 class ScraperEngine:
@@ -68,10 +77,11 @@ class ScraperEngine:
         self.logger.info("catalog done | page=%s count=%s", page, count)
         return items, has_more
 
+    def _manga_dir(self, manga: Manga) -> Path:
+        return self.config.output_root / safe_name(manga.id or manga.title)
+
     async def download_chapter(self, manga: Manga, chapter: Chapter):
-        manga_dir = safe_name(manga.id or manga.title)
-        chapter_dir = safe_name(chapter.id or chapter.title)
-        output_root = self.config.output_root / manga_dir / chapter_dir
+        output_root = self._manga_dir(manga) / chapter_key(chapter)
         self.logger.info(
             "download start | manga=%s chapter=%s output=%s",
             manga.title or manga.id,
@@ -98,18 +108,100 @@ class ScraperEngine:
         )
         return report
 
-    async def download_manga(self, manga: Manga):
-        self.logger.info("download manga | manga=%s", manga.title or manga.id)
-        chapters = await self.list_chapters(manga)
-        reports = []
-        for chapter in chapters:
-            reports.append(await self.download_chapter(manga, chapter))
+    async def download_manga(self, manga: Manga) -> list[DownloadReport]:
+        """Download every chapter, several at a time, resuming from the journal.
+
+        Chapters finished in a previous run are skipped and not included in
+        the returned reports. Unfinished chapters from the journal start
+        downloading while the chapter list is fetched again. A failing chapter
+        does not stop the others; the first error is re-raised at the end.
+        """
+        name = manga.title or manga.id
+        self.logger.info("download manga | manga=%s", name)
+        journal = (
+            DownloadJournal.load(self._manga_dir(manga) / JOURNAL_NAME, manga)
+            if self.config.journal
+            else None
+        )
+        workers_count = max(1, self.config.chapter_concurrency)
+        queue: asyncio.Queue[Chapter | None] = asyncio.Queue()
+        seen: set[str] = set()
+        order: list[str] = []
+        reports: dict[str, DownloadReport] = {}
+        errors: list[BaseException] = []
+        skipped = 0
+
+        def enqueue(chapters: Sequence[Chapter]) -> None:
+            nonlocal skipped
+            for chapter in chapters:
+                key = chapter_key(chapter)
+                if key in seen:
+                    continue
+                seen.add(key)
+                order.append(key)
+                if journal is not None and journal.is_done(chapter):
+                    skipped += 1
+                    continue
+                queue.put_nowait(chapter)
+
+        async def lister() -> None:
+            try:
+                chapters = await self.list_chapters(manga)
+            except Exception as exc:  # noqa: BLE001
+                if not seen:
+                    raise
+                # 已有日志时用上次的章节列表继续
+                self.logger.warning(
+                    "list chapters failed, resuming from journal | manga=%s error=%s",
+                    name,
+                    exc,
+                )
+            else:
+                if journal is not None:
+                    journal.record_chapters(chapters)
+                enqueue(chapters)
+            finally:
+                for _ in range(workers_count):
+                    queue.put_nowait(None)
+
+        async def worker() -> None:
+            while True:
+                chapter = await queue.get()
+                if chapter is None:
+                    return
+                try:
+                    report = await self.download_chapter(manga, chapter)
+                except Exception as exc:  # noqa: BLE001
+                    errors.append(exc)
+                    if journal is not None:
+                        journal.mark_failed(chapter, exc)
+                    continue
+                reports[chapter_key(chapter)] = report
+                if journal is not None:
+                    journal.mark_report(chapter, report)
+
+        if journal is not None:
+            enqueue(journal.known_chapters())
+        with use_connection_budget(self.config.max_connections):
+            workers = [asyncio.create_task(worker()) for _ in range(workers_count)]
+            try:
+                await asyncio.gather(lister(), *workers)
+            except BaseException:
+                for task in workers:
+                    task.cancel()
+                await asyncio.gather(*workers, return_exceptions=True)
+                raise
+
         self.logger.info(
-            "download manga done | manga=%s chapters=%s",
-            manga.title or manga.id,
+            "download manga done | manga=%s chapters=%s skipped=%s failed=%s",
+            name,
             len(reports),
+            skipped,
+            len(errors),
         )
-        return reports
+        if errors:
+            raise errors[0]
+        return [reports[key] for key in order if key in reports]
 
     async def advise_robots(self, path: str = "/", user_agent: str = "*") -> bool:
         robots_url = urljoin(self.scraper.config.base_url, "/robots.txt")
@@ -10,12 +10,13 @@ from typing import Any, AsyncIterator, cast
 from urllib.parse import quote, urlparse, urljoin
 
 from bs4 import BeautifulSoup
-from playwright.async_api import BrowserContext, async_playwright
+from playwright.async_api import BrowserContext
 
 from ..base import BaseScraper, Chapter, Manga, ScraperConfig, normalize_url
+from ..browser_pool import ContextSpec, get_browser_pool
 from ..challenge import looks_like_challenge
 from ..downloader import AsyncDownloader, DownloadConfig, DownloadItem, DownloadReport
-from ..rate_limit import RequestRateLimiter
+from ..rate_limit import get_host_limiters, parse_retry_after
 
 
 class GenericPlaywrightScraper(BaseScraper):
@@ -41,8 +42,8 @@ class GenericPlaywrightScraper(BaseScraper):
         }
         if selectors:
             self.selectors.update(selectors)
-        self.request_limiter = config.request_limiter or RequestRateLimiter(
-            config.rate_limit_rps
+        self.request_limiter = config.request_limiter or get_host_limiters().configure(
+            config.base_url, config.rate_limit_rps
         )
         self.downloader = downloader or AsyncDownloader(
             DownloadConfig(concurrency=6, rate_limit_rps=config.rate_limit_rps),
@@ -298,6 +299,12 @@ class GenericPlaywrightScraper(BaseScraper):
     async def _acquire_rate_slot(self) -> None:
         await self.request_limiter.acquire()
 
+    def _note_response_status(self, response) -> None:
+        # 429/503 让站点限速器减速并遵守 Retry-After
+        self.request_limiter.on_status(
+            response.status, parse_retry_after(response.headers.get("Retry-After"))
+        )
+
     async def _auto_scroll(self, page) -> None:
         last_height = 0
         last_images = 0
@@ -360,83 +367,26 @@ class GenericPlaywrightScraper(BaseScraper):
 
     @asynccontextmanager
     async def _browser_context(self) -> AsyncIterator[BrowserContext]:
-        async with async_playwright() as playwright:
-            launch_args = ["--disable-blink-features=AutomationControlled"]
-
-            storage_state_path = (
-                Path(self.config.storage_state_path)
-                if self.config.storage_state_path
-                else None
-            )
-
-            browser = None
-            user_agent = self._pick_user_agent()
-
-            if self.config.user_data_dir:
-                user_data_dir = Path(self.config.user_data_dir)
-                user_data_dir.mkdir(parents=True, exist_ok=True)
-                if user_agent:
-                    context = await playwright.chromium.launch_persistent_context(
-                        user_data_dir=str(user_data_dir),
-                        headless=self.config.headless,
-                        args=launch_args,
-                        channel=self.config.browser_channel,
-                        user_agent=user_agent,
-                        extra_http_headers=self.config.extra_headers,
-                    )
-                else:
-                    context = await playwright.chromium.launch_persistent_context(
-                        user_data_dir=str(user_data_dir),
-                        headless=self.config.headless,
-                        args=launch_args,
-                        channel=self.config.browser_channel,
-                        extra_http_headers=self.config.extra_headers,
-                    )
-            else:
-                browser = await playwright.chromium.launch(
-                    headless=self.config.headless,
-                    args=launch_args,
-                    channel=self.config.browser_channel,
-                )
-                storage_state = (
-                    str(storage_state_path)
-                    if storage_state_path and storage_state_path.exists()
-                    else None
-                )
-                if user_agent and storage_state:
-                    context = await browser.new_context(
-                        user_agent=user_agent,
-                        extra_http_headers=self.config.extra_headers,
-                        storage_state=storage_state,
-                    )
-                elif user_agent:
-                    context = await browser.new_context(
-                        user_agent=user_agent,
-                        extra_http_headers=self.config.extra_headers,
-                    )
-                elif storage_state:
-                    context = await browser.new_context(
-                        extra_http_headers=self.config.extra_headers,
-                        storage_state=storage_state,
-                    )
-                else:
-                    context = await browser.new_context(
-                        extra_http_headers=self.config.extra_headers,
-                    )
-
-            await context.add_init_script(self._stealth_script())
-            context.set_default_timeout(self.config.timeout_ms)
-            if self.config.cookies:
-                await context.add_cookies(cast("list[Any]", self._format_cookies()))
-            try:
-                yield context
-            finally:
-                if storage_state_path:
-                    storage_state_path.parent.mkdir(parents=True, exist_ok=True)
-                    await context.storage_state(path=str(storage_state_path))
-                await context.close()
-                if browser:
-                    await browser.close()
+        # 从进程级浏览器池租用上下文，避免每次调用都启动 Chromium
+        spec = ContextSpec.build(
+            headless=self.config.headless,
+            channel=self.config.browser_channel,
+            launch_args=["--disable-blink-features=AutomationControlled"],
+            user_data_dir=self.config.user_data_dir,
+            storage_state_path=self.config.storage_state_path,
+            save_storage_state=bool(self.config.storage_state_path),
+            user_agent=self.config.user_agent if self.config.override_user_agent else None,
+            rotate_user_agent=self.config.override_user_agent
+            and not self.config.user_agent,
+            extra_headers=self.config.extra_headers,
+            cookies=self._format_cookies() if self.config.cookies else None,
+            init_script=self._stealth_script(),
+            timeout_ms=self.config.timeout_ms,
+        )
+        async with get_browser_pool().lease(
+            spec, user_agent_factory=self._pick_user_agent
+        ) as context:
+            yield cast(BrowserContext, context)
 
     def _format_cookies(self) -> list[dict[str, str]]:
         parsed = urlparse(self.config.base_url)
@@ -128,6 +128,7 @@ class MangaForFreeScraper(GenericPlaywrightScraper):
         async with aiohttp.ClientSession(timeout=timeout, cookies=cookies) as session:
             await self._acquire_rate_slot()
             async with session.get(url, headers=headers) as response:
+                self._note_response_status(response)
                 response.raise_for_status()
                 html = await response.text()
         if self._looks_like_challenge(html):
@@ -154,6 +155,7 @@ class MangaForFreeScraper(GenericPlaywrightScraper):
                 headers=headers,
                 data=data,
             ) as response:
+                self._note_response_status(response)
                 response.raise_for_status()
                 return await response.text()
 
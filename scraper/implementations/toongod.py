@@ -178,6 +178,7 @@ class ToonGodScraper(GenericPlaywrightScraper):
         async with aiohttp.ClientSession(timeout=timeout, cookies=cookies) as session:
             await self._acquire_rate_slot()
             async with session.get(url, headers=headers) as response:
+                self._note_response_status(response)
                 response.raise_for_status()
                 html = await response.text()
         if self._looks_like_challenge(html):
@@ -0,0 +1,118 @@
+"""Resumable progress journal for whole-manga downloads.
+
+One JSON file per manga directory records the chapter list and the outcome of
+every chapter. ``ScraperEngine.download_manga`` skips chapters already marked
+``done`` and can start on the remaining ones before the chapter list has been
+fetched again.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Iterable
+
+from .base import Chapter, Manga, safe_name
+from .downloader import DownloadReport
+
+JOURNAL_NAME = "download_journal.json"
+
+
+def chapter_key(chapter: Chapter) -> str:
+    return safe_name(chapter.id or chapter.title)
+
+
+class DownloadJournal:
+    def __init__(self, path: Path, manga: Manga) -> None:
+        self.path = path
+        self.manga = manga
+        self.chapters: dict[str, dict[str, object]] = {}
+
+    @classmethod
+    def load(cls, path: Path, manga: Manga) -> "DownloadJournal":
+        journal = cls(path, manga)
+        try:
+            payload = json.loads(path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return journal
+        chapters = payload.get("chapters") if isinstance(payload, dict) else None
+        if isinstance(chapters, dict):
+            journal.chapters = {
+                str(key): dict(value)
+                for key, value in chapters.items()
+                if isinstance(value, dict)
+            }
+        return journal
+
+    def known_chapters(self) -> list[Chapter]:
+        """Chapters from the previous run, in listing order."""
+        entries = sorted(
+            self.chapters.values(), key=lambda entry: int(entry.get("order", 0))
+        )
+        return [
+            Chapter(
+                id=str(entry.get("id") or ""),
+                title=str(entry.get("title") or entry.get("id") or ""),
+                url=entry.get("url") or None,  # type: ignore[arg-type]
+                index=entry.get("index"),  # type: ignore[arg-type]
+            )
+            for entry in entries
+        ]
+
+    def is_done(self, chapter: Chapter) -> bool:
+        entry = self.chapters.get(chapter_key(chapter))
+        return bool(entry and entry.get("status") == "done")
+
+    def record_chapters(self, chapters: Iterable[Chapter]) -> None:
+        for order, chapter in enumerate(chapters):
+            entry = self.chapters.setdefault(chapter_key(chapter), {"status": "pending"})
+            entry.update(
+                id=chapter.id,
+                title=chapter.title,
+                url=chapter.url,
+                index=chapter.index,
+                order=order,
+            )
+        self.save()
+
+    def mark_report(self, chapter: Chapter, report: DownloadReport) -> None:
+        # 有失败页的章节保持 pending，下次只补下缺失的图片
+        self._update(
+            chapter,
+            status="done" if report.failed_count == 0 else "pending",
+            success=report.success_count,
+            failed=report.failed_count,
+            error=None,
+        )
+
+    def mark_failed(self, chapter: Chapter, error: BaseException) -> None:
+        self._update(chapter, status="failed", error=str(error) or type(error).__name__)
+
+    def _update(self, chapter: Chapter, **fields: object) -> None:
+        entry = self.chapters.setdefault(
+            chapter_key(chapter),
+            {
+                "id": chapter.id,
+                "title": chapter.title,
+                "url": chapter.url,
+                "index": chapter.index,
+                "order": len(self.chapters),
+            },
+        )
+        entry.update(fields)
+        entry["updated_at"] = datetime.now(timezone.utc).isoformat()
+        self.save()
+
+    def save(self) -> None:
+        payload = {
+            "manga_id": self.manga.id,
+            "manga_title": self.manga.title,
+            "updated_at": datetime.now(timezone.utc).isoformat(),
+            "chapters": self.chapters,
+        }
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_name(self.path.name + ".tmp")
+        tmp_path.write_text(json.dumps(payload, ensure_ascii=False, indent=2))
+        os.replace(tmp_path, self.path)
@@ -1,23 +1,181 @@
+"""Request pacing for scrapers, downloads and the image proxy.
+
+``RequestRateLimiter`` is a token bucket (GCRA-style virtual scheduling):
+callers reserve a slot and sleep outside any lock, so concurrent callers no
+longer queue behind one another's sleeps. ``burst=1`` keeps the previous
+fixed-interval behaviour.
+
+Limiters adapt to the server (AIMD): a 429/503 halves the rate and honours
+``Retry-After``; every success adds back a tenth of the configured rate.
+
+``HostRateLimiters`` hands out one limiter per host, process-wide. The site
+host is configured with the user's polite ``rate_limit_rps``; other hosts
+(image CDNs) get ``SCRAPER_CDN_RPS`` / ``SCRAPER_CDN_BURST``.
+
+Env:
+    SCRAPER_CDN_RPS: default rate for hosts without explicit config (default 8)
+    SCRAPER_CDN_BURST: burst size for those hosts (default 16)
+"""
+
 from __future__ import annotations
 
 import asyncio
+import os
+import threading
 import time
+from email.utils import parsedate_to_datetime
+from typing import Any
+from urllib.parse import urlparse
+
+_MIN_RATE_FACTOR = 0.05
+_INCREASE_FACTOR = 0.1
+THROTTLE_STATUSES = frozenset({429, 503})
+
+
+def _read_env_float(name: str, default: float) -> float:
+    raw = os.getenv(name)
+    try:
+        value = float(raw) if raw else default
+    except ValueError:
+        value = default
+    return value if value > 0 else default
+
+
+def parse_retry_after(value: str | None) -> float | None:
+    """Retry-After as seconds (delta-seconds or HTTP-date)."""
+    if not value:
+        return None
+    value = value.strip()
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        target = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if target is None:
+        return None
+    return max(0.0, target.timestamp() - time.time())
 
 
 class RequestRateLimiter:
-    """Simple async pace limiter based on requests-per-second."""
+    """Async token-bucket pacer with AIMD back-off."""
+
+    def __init__(
+        self, rate_limit_rps: float, burst: int = 1, host: str | None = None
+    ) -> None:
+        self.host = host
+        self._base_rps = max(float(rate_limit_rps), 0.001)
+        self._rate_rps = self._base_rps
+        self._burst = max(1, int(burst))
+        # 理论到达时间：下一个令牌在此时刻之后才可用（减去突发容差）
+        self._tat = 0.0
+        self._paused_until = 0.0
+        self.throttled = 0
+
+    @property
+    def rate_rps(self) -> float:
+        return self._rate_rps
 
-    def __init__(self, rate_limit_rps: float) -> None:
-        self._rate_limit_rps = max(float(rate_limit_rps), 0.001)
-        self._interval_sec = 1.0 / self._rate_limit_rps
-        self._next_allowed_at = 0.0
-        self._lock = asyncio.Lock()
+    def configure(self, rate_limit_rps: float, burst: int | None = None) -> None:
+        backing_off = self._rate_rps < self._base_rps
+        self._base_rps = max(float(rate_limit_rps), 0.001)
+        self._rate_rps = (
+            min(self._rate_rps, self._base_rps) if backing_off else self._base_rps
+        )
+        if burst is not None:
+            self._burst = max(1, int(burst))
+
+    def _reserve(self) -> float:
+        now = time.monotonic()
+        interval = 1.0 / self._rate_rps
+        tolerance = (self._burst - 1) * interval
+        allowed_at = max(now, self._tat - tolerance, self._paused_until)
+        self._tat = max(self._tat, allowed_at) + interval
+        return allowed_at - now
 
     async def acquire(self) -> None:
-        async with self._lock:
-            now = time.monotonic()
-            wait_sec = self._next_allowed_at - now
-            if wait_sec > 0:
-                await asyncio.sleep(wait_sec)
-                now = time.monotonic()
-            self._next_allowed_at = max(self._next_allowed_at, now) + self._interval_sec
+        wait_sec = self._reserve()
+        if wait_sec > 0:
+            await asyncio.sleep(wait_sec)
+
+    def on_success(self) -> None:
+        if self._rate_rps < self._base_rps:
+            self._rate_rps = min(
+                self._base_rps, self._rate_rps + self._base_rps * _INCREASE_FACTOR
+            )
+
+    def on_throttle(self, retry_after: float | None = None) -> None:
+        self.throttled += 1
+        self._rate_rps = max(self._base_rps * _MIN_RATE_FACTOR, self._rate_rps / 2)
+        now = time.monotonic()
+        if retry_after:
+            self._paused_until = max(self._paused_until, now + retry_after)
+        # 清空突发额度，之后按新速率逐个放行
+        self._tat = max(now, self._paused_until) + (self._burst - 1) / self._rate_rps
+
+    def on_status(self, status: int, retry_after: float | None = None) -> None:
+        if status in THROTTLE_STATUSES:
+            self.on_throttle(retry_after)
+        elif status < 400:
+            self.on_success()
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "rate_rps": round(self._rate_rps, 3),
+            "base_rps": round(self._base_rps, 3),
+            "burst": self._burst,
+            "throttled": self.throttled,
+            "paused_sec": round(max(0.0, self._paused_until - time.monotonic()), 2),
+        }
+
+
+def host_of(url: str) -> str:
+    return (urlparse(url).hostname or "").lower()
+
+
+class HostRateLimiters:
+    """Process-wide per-host limiter registry."""
+
+    def __init__(self) -> None:
+        self._limiters: dict[str, RequestRateLimiter] = {}
+        self._lock = threading.Lock()
+
+    def configure(
+        self, host_or_url: str, rate_limit_rps: float, burst: int = 1
+    ) -> RequestRateLimiter:
+        """Explicit (polite) pacing for a host; returns its shared limiter."""
+        host = host_of(host_or_url) if "://" in host_or_url else host_or_url.lower()
+        with self._lock:
+            limiter = self._limiters.get(host)
+            if limiter is None:
+                limiter = RequestRateLimiter(rate_limit_rps, burst=burst, host=host)
+                self._limiters[host] = limiter
+            else:
+                limiter.configure(rate_limit_rps, burst)
+            return limiter
+
+    def for_url(self, url: str) -> RequestRateLimiter:
+        host = host_of(url)
+        with self._lock:
+            limiter = self._limiters.get(host)
+            if limiter is None:
+                limiter = RequestRateLimiter(
+                    _read_env_float("SCRAPER_CDN_RPS", 8.0),
+                    burst=int(_read_env_float("SCRAPER_CDN_BURST", 16)),
+                    host=host,
+                )
+                self._limiters[host] = limiter
+            return limiter
+
+    def stats(self) -> dict[str, dict[str, Any]]:
+        with self._lock:
+            return {host: limiter.stats() for host, limiter in self._limiters.items()}
+
+
+_host_limiters = HostRateLimiters()
+
+
+def get_host_limiters() -> HostRateLimiters:
+    return _host_limiters
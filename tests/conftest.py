@@ -28,6 +28,30 @@ def _reset_settings_overrides():
         pass
 
 
+@pytest.fixture(autouse=True)
+def _disable_translation_memory(monkeypatch):
+    """Keep the persistent translation memory out of tests unless a test opts in."""
+    monkeypatch.setenv("TRANSLATION_MEMORY_ENABLE", "0")
+
+
+@pytest.fixture(autouse=True)
+def _isolate_task_store(monkeypatch, tmp_path):
+    """Keep the durable task store in a per-test SQLite file."""
+    monkeypatch.setenv("TASK_STORE_PATH", str(tmp_path / "task_store.sqlite3"))
+
+
+@pytest.fixture(autouse=True)
+def _isolate_ocr_cache(monkeypatch, tmp_path):
+    """Keep the content-addressed OCR result cache out of the repo's temp/."""
+    monkeypatch.setenv("OCR_RESULT_CACHE_DIR", str(tmp_path / "ocr_cache"))
+
+
+@pytest.fixture(autouse=True)
+def _isolate_quality_reports(monkeypatch, tmp_path):
+    """Write quality reports (and their SQLite index) under tmp_path, not output/."""
+    monkeypatch.setenv("QUALITY_REPORT_DIR", str(tmp_path / "quality_reports"))
+
+
 def pytest_pyfunc_call(pyfuncitem):
     """Run async tests marked with pytest.mark.asyncio without external plugins."""
     if "asyncio" not in pyfuncitem.keywords:
@@ -0,0 +1,77 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+from core import ai_clients
+
+
+def _make_translator(monkeypatch):
+    monkeypatch.setenv("AI_PROVIDER", "ppio")
+    monkeypatch.setenv("PPIO_API_KEY", "dummy")
+    from core.ai_translator import AITranslator
+
+    return AITranslator(model="glm-4-flash-250414", source_lang="ko", target_lang="zh")
+
+
+def test_async_openai_client_is_pooled_per_loop():
+    async def grab():
+        a = ai_clients.get_async_openai_client("https://example.invalid/v1", "k1")
+        b = ai_clients.get_async_openai_client("https://example.invalid/v1", "k1")
+        c = ai_clients.get_async_openai_client("https://example.invalid/v1", "k2")
+        return a, b, c
+
+    first, same, other_key = asyncio.run(grab())
+    assert first is same
+    assert first is not other_key
+    assert first.max_retries == 0
+
+    second_loop, _, _ = asyncio.run(grab())
+    assert second_loop is not first
+
+
+def test_call_api_uses_async_client_and_cancels_on_timeout(monkeypatch):
+    monkeypatch.setenv("AI_TRANSLATE_ASYNC_CLIENT", "1")
+    translator = _make_translator(monkeypatch)
+    state = {"cancelled": False}
+
+    async def create(**kwargs):
+        try:
+            await asyncio.sleep(5)
+        except asyncio.CancelledError:
+            state["cancelled"] = True
+            raise
+        return None
+
+    fake_client = SimpleNamespace(chat=SimpleNamespace(completions=SimpleNamespace(create=create)))
+    monkeypatch.setattr(
+        "core.ai_translator.get_async_openai_client", lambda base_url, api_key: fake_client
+    )
+
+    def _no_executor(*_a, **_k):
+        raise AssertionError("executor path must not be used")
+
+    async def main():
+        loop = asyncio.get_running_loop()
+        monkeypatch.setattr(loop, "run_in_executor", _no_executor)
+        with pytest.raises(asyncio.TimeoutError):
+            await asyncio.wait_for(translator._call_api("hi", max_tokens=10), timeout=0.05)
+
+    asyncio.run(main())
+    assert state["cancelled"] is True
+
+
+def test_call_api_async_returns_stripped_content(monkeypatch):
+    translator = _make_translator(monkeypatch)
+
+    async def create(**kwargs):
+        assert kwargs["max_tokens"] == 10
+        message = SimpleNamespace(content="  1. 你好 \n")
+        return SimpleNamespace(choices=[SimpleNamespace(message=message)])
+
+    fake_client = SimpleNamespace(chat=SimpleNamespace(completions=SimpleNamespace(create=create)))
+    monkeypatch.setattr(
+        "core.ai_translator.get_async_openai_client", lambda base_url, api_key: fake_client
+    )
+
+    assert asyncio.run(translator._call_api("hi", max_tokens=10)) == "1. 你好"
@@ -0,0 +1,138 @@
+import asyncio
+import threading
+from pathlib import Path
+
+from PIL import Image
+
+from core import quality_report
+from core.artifact_sink import ArtifactSink
+from core.debug_artifacts import DebugArtifactWriter
+from core.metrics import PipelineMetrics
+from core.models import Box2D, PipelineResult, RegionData, TaskContext
+
+
+def _blocked_sink(**kwargs):
+    sink = ArtifactSink(**kwargs)
+    gate = threading.Event()
+    started = threading.Event()
+
+    def blocker():
+        started.set()
+        gate.wait(5)
+
+    sink.submit(blocker, key="blocker")
+    assert started.wait(5)
+    return sink, gate
+
+
+def test_queued_jobs_with_same_key_are_coalesced_and_batched():
+    sink, gate = _blocked_sink(batch_size=8)
+    written = []
+    hooks = []
+
+    futures = [
+        sink.submit(written.append, value, key="k", on_batch_end=lambda: hooks.append(1))
+        for value in ("old", "new")
+    ]
+    sink.submit(written.append, "other")
+    gate.set()
+    assert sink.flush(5)
+
+    assert futures[0] is futures[1]
+    assert written == ["new", "other"]
+    assert hooks == [1]
+    stats = sink.stats()
+    assert stats["coalesced"] == 1
+    assert stats["written"] == 3
+
+
+def test_full_queue_drops_debug_and_degrades_reports():
+    sink, gate = _blocked_sink(max_pending=2)
+    written = []
+
+    sink.submit(written.append, "debug-1", policy="drop")
+    sink.submit(written.append, "report-1", policy="degrade")
+    assert sink.submit(written.append, "debug-2", policy="drop") is None
+    # 报告挤掉排队中的调试写入
+    sink.submit(written.append, "report-2", policy="degrade")
+    # 队列里只剩报告：新报告在调用方线程内直接写
+    inline = sink.submit(written.append, "report-3", policy="degrade")
+    assert inline.done()
+    assert written == ["report-3"]
+
+    gate.set()
+    assert sink.flush(5)
+    assert written == ["report-3", "report-1", "report-2"]
+    stats = sink.stats()
+    assert stats["dropped"] == 2
+    assert stats["degraded"] == 1
+
+
+def test_degraded_async_submit_does_not_write_on_the_loop_thread():
+    sink, gate = _blocked_sink(max_pending=1)
+    sink.submit(lambda: None, policy="degrade")
+    threads = []
+
+    async def submit():
+        future = await sink.submit_async(
+            lambda: threads.append(threading.current_thread()), policy="degrade"
+        )
+        return await asyncio.wrap_future(future)
+
+    asyncio.run(submit())
+    gate.set()
+    assert sink.flush(5)
+
+    assert threads and threads[0] is not threading.main_thread()
+    assert sink.stats()["degraded"] == 1
+
+
+def test_pipeline_report_is_written_off_the_event_loop(tmp_path, monkeypatch):
+    monkeypatch.setenv("QUALITY_REPORT_DIR", str(tmp_path))
+    threads = []
+    store = quality_report._store_quality_report
+
+    def tracking_store(*args):
+        threads.append(threading.current_thread())
+        return store(*args)
+
+    monkeypatch.setattr(quality_report, "_store_quality_report", tracking_store)
+    result = PipelineResult(
+        success=True,
+        task=TaskContext(image_path="/tmp/data/raw/m/c/1.jpg", target_language="zh"),
+        processing_time_ms=1,
+        metrics=PipelineMetrics(total_duration_ms=1).to_dict(),
+    )
+
+    path = asyncio.run(quality_report.write_quality_report_async(result))
+
+    assert threads and threads[0] is not threading.main_thread()
+    text = Path(path).read_text(encoding="utf-8")
+    assert "\n" not in text  # compact JSON
+    assert '"success": true' in text
+
+
+def test_debug_submit_draws_from_a_snapshot(tmp_path, monkeypatch):
+    monkeypatch.setenv("OUTPUT_FORMAT", "png")
+    img_path = tmp_path / "blank.png"
+    Image.new("RGB", (200, 100), "white").save(img_path)
+    ctx = TaskContext(image_path=str(img_path))
+    ctx.regions = [RegionData(box_2d=Box2D(x1=10, y1=10, x2=80, y2=40), source_text="A")]
+    writer = DebugArtifactWriter(output_dir=tmp_path / "debug", enabled=True)
+    seen = []
+    draw = writer._draw_regions
+
+    def spy(image_path, regions, *args, **kwargs):
+        seen.append([r.source_text for r in regions])
+        return draw(image_path, regions, *args, **kwargs)
+
+    writer._draw_regions = spy
+    sink, gate = _blocked_sink()
+    monkeypatch.setattr("core.debug_artifacts.get_artifact_sink", lambda: sink)
+
+    future = writer.submit("write_ocr", ctx, str(img_path))
+    ctx.regions[0].source_text = "changed later"
+    gate.set()
+
+    assert Path(future.result(5)).exists()
+    assert seen == [["A"]]
@@ -0,0 +1,101 @@
+import asyncio
+
+from core.chapter_translation import ChapterTranslationBatcher, current_page_translator
+from core.models import Box2D, RegionData, TaskContext
+from core.modules.translator import TranslatorModule
+from core.pipeline import Pipeline
+
+
+class _FakeAI:
+    model = "mock"
+
+    def __init__(self):
+        self.calls = []
+        self.last_metrics = None
+
+    async def translate_batch(self, texts, output_format="numbered", contexts=None):
+        self.calls.append((list(texts), list(contexts or [])))
+        await asyncio.sleep(0)
+        self.last_metrics = {"api_calls": 1, "api_calls_fallback": 0}
+        return [f"译{t}" for t in texts]
+
+
+def test_batcher_merges_pages_into_one_request():
+    ai = _FakeAI()
+    batcher = ChapterTranslationBatcher(ai, char_budget=10_000, linger_ms=5_000)
+
+    async def page(texts):
+        async with batcher.page():
+            handle = current_page_translator.get()
+            out = await handle.translate_batch(texts, contexts=["c"] * len(texts))
+            return out, handle.last_metrics
+
+    async def main():
+        batcher.expect(3)
+        return await asyncio.gather(page(["a", "b"]), page(["c"]), page(["d", "e", "f"]))
+
+    results = asyncio.run(main())
+
+    assert [out for out, _ in results] == [["译a", "译b"], ["译c"], ["译d", "译e", "译f"]]
+    assert len(ai.calls) == 1
+    assert ai.calls[0][0] == ["a", "b", "c", "d", "e", "f"]
+    assert sum(m["api_calls"] for _, m in results) == 1
+    assert all(m["chapter_batch_pages"] == 3 for _, m in results)
+
+
+def test_batcher_respects_char_budget():
+    ai = _FakeAI()
+    batcher = ChapterTranslationBatcher(ai, char_budget=8, linger_ms=5_000)
+
+    async def page(text):
+        async with batcher.page():
+            return await current_page_translator.get().translate_batch([text])
+
+    async def main():
+        batcher.expect(3)
+        return await asyncio.gather(page("aaaa"), page("bbbb"), page("cccc"))
+
+    assert asyncio.run(main()) == [["译aaaa"], ["译bbbb"], ["译cccc"]]
+    assert [texts for texts, _ in ai.calls] == [["aaaa", "bbbb"], ["cccc"]]
+
+
+class _Passthrough:
+    async def process(self, ctx):
+        return ctx
+
+
+def test_process_batch_crosspage_chapter_mode_sends_one_request(monkeypatch):
+    monkeypatch.setenv("TRANSLATE_CHAPTER_BATCH", "1")
+    monkeypatch.setenv("BUBBLE_GROUPING", "0")
+    ai = _FakeAI()
+    translator = TranslatorModule(source_lang="en", target_lang="en", use_ai=True)
+    translator._ai_translator = ai
+
+    contexts = []
+    for page, y in enumerate((100, 400, 700)):
+        ctx = TaskContext(image_path=f"/tmp/p{page}.png", source_language="en", target_language="en")
+        ctx.image_height = 2000
+        ctx.image_width = 800
+        ctx.regions = [
+            RegionData(
+                box_2d=Box2D(x1=100, y1=y, x2=400, y2=y + 60),
+                source_text=f"Hello there page {page}",
+                confidence=0.9,
+            )
+        ]
+        contexts.append(ctx)
+
+    pipeline = Pipeline(
+        ocr=_Passthrough(),
+        translator=translator,
+        inpainter=_Passthrough(),
+        renderer=_Passthrough(),
+        upscaler=_Passthrough(),
+    )
+    results = asyncio.run(pipeline.process_batch_crosspage(contexts))
+
+    assert len(ai.calls) == 1
+    assert len(ai.calls[0][0]) == 3
+    assert [r.regions[0].target_text for r in results] == [
+        f"译Hello there page {i}" for i in range(3)
+    ]
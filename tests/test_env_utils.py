@@ -0,0 +1,17 @@
+from core.utils.env import read_env_int
+
+
+def test_read_env_int_defaults_and_clamps(monkeypatch):
+    monkeypatch.delenv("X_KNOB", raising=False)
+    assert read_env_int("X_KNOB", 5) == 5
+
+    monkeypatch.setenv("X_KNOB", " ")
+    assert read_env_int("X_KNOB", 5) == 5
+    monkeypatch.setenv("X_KNOB", "abc")
+    assert read_env_int("X_KNOB", 5) == 5
+
+    monkeypatch.setenv("X_KNOB", " 7 ")
+    assert read_env_int("X_KNOB", 5) == 7
+    monkeypatch.setenv("X_KNOB", "0")
+    assert read_env_int("X_KNOB", 5) == 1
+    assert read_env_int("X_KNOB", 5, minimum=0) == 0
@@ -0,0 +1,111 @@
+import asyncio
+from pathlib import Path
+
+import pytest
+
+from app.services.fetch_translate import OrderedPageFeed, fetch_and_translate
+from core.models import TaskContext
+from core.modules.base import BaseModule
+from core.pipeline import Pipeline
+from scraper.base import Chapter, Manga
+from scraper.downloader import DownloadReport, PageRecord, page_listener
+
+
+def _record(index, ok=True):
+    return PageRecord(index=index, url=f"u{index}", path=f"/tmp/{index}.jpg", ok=ok)
+
+
+@pytest.mark.asyncio
+async def test_feed_releases_in_order_once_next_neighbour_settles():
+    feed = OrderedPageFeed()
+    released = []
+
+    async def consume():
+        async for record in feed:
+            released.append(record.index)
+
+    consumer = asyncio.create_task(consume())
+    for index in (2, 3):
+        feed.add(_record(index))
+    await asyncio.sleep(0)
+    assert released == []  # page 1 not settled yet
+
+    feed.add(_record(1))
+    await asyncio.sleep(0)
+    assert released == [1, 2]  # page 3 waits for page 4
+
+    feed.add(_record(4, ok=False))
+    await asyncio.sleep(0)
+    assert released == [1, 2, 3]  # failed page settles but is not yielded
+
+    feed.add(_record(6))
+    feed.close()
+    await consumer
+    assert released == [1, 2, 3, 6]
+
+
+class _FakeEngine:
+    def __init__(self, delays):
+        self.delays = delays
+        self.finished = False
+
+    async def download_chapter(self, manga, chapter):
+        listener = page_listener.get()
+        pages = []
+        for index, delay in self.delays:
+            await asyncio.sleep(delay)
+            record = _record(index)
+            pages.append(record)
+            listener(record)
+        self.finished = True
+        return DownloadReport(
+            manga_id=manga.id,
+            chapter_id=chapter.id,
+            output_dir=Path("/tmp"),
+            manifest_path=Path("/tmp/manifest.json"),
+            pages=pages,
+        )
+
+
+class _LogModule(BaseModule):
+    def __init__(self, name, engine, log):
+        super().__init__(name)
+        self.engine = engine
+        self.log = log
+
+    async def process(self, context):
+        if self.name == "ocr":
+            self.log.append((Path(context.image_path).stem, self.engine.finished))
+        return context
+
+
+@pytest.mark.asyncio
+async def test_pages_are_translated_while_chapter_downloads(tmp_path, monkeypatch):
+    monkeypatch.setenv("QUALITY_REPORT_DIR", str(tmp_path / "reports"))
+    engine = _FakeEngine([(2, 0.0), (1, 0.01), (3, 0.05), (4, 0.05), (5, 0.05)])
+    log = []
+    pipeline = Pipeline(
+        **{
+            name: _LogModule(name, engine, log)
+            for name in ("ocr", "translator", "inpainter", "renderer", "upscaler")
+        }
+    )
+    seen = []
+
+    report, results, timings = await fetch_and_translate(
+        engine,
+        Manga(id="m", title="m"),
+        Chapter(id="c", title="c"),
+        pipeline,
+        lambda path: TaskContext(image_path=str(path)),
+        max_concurrent=1,
+        staged=False,
+        on_context=seen.append,
+    )
+
+    assert [stem for stem, _ in log] == ["1", "2", "3", "4", "5"]
+    # 第一页在整章下载完成之前就已进入 OCR
+    assert log[0] == ("1", False)
+    assert timings["first_page_ms"] < timings["download_ms"]
+    assert all(result.success for result in results)
+    assert len(seen) == report.success_count == 5
@@ -0,0 +1,101 @@
+import numpy as np
+
+from core.vision.inpainter import HybridInpainter, OpenCVInpainter, create_inpainter
+
+
+class _FakeLama:
+    """Stands in for SimpleLama: no batched tensor path, fills masked pixels with 0."""
+
+    def __init__(self):
+        self.calls = 0
+
+    def __call__(self, image, mask):
+        from PIL import Image
+
+        self.calls += 1
+        img = np.asarray(image).copy()
+        img[np.asarray(mask) > 0] = 0
+        return Image.fromarray(img)
+
+
+def _page():
+    rng = np.random.default_rng(1)
+    image = np.full((900, 400, 3), 250, dtype=np.uint8)
+    # 纹理背景区域
+    image[400:900] = rng.integers(0, 255, size=(500, 400, 3), dtype=np.uint8)
+    mask = np.zeros((900, 400), dtype=np.uint8)
+    mask[60:100, 80:300] = 255  # 白底气泡里的文字 -> flat
+    image[70:90, 100:280] = 20
+    mask[450:480, 50:110] = 255  # 纹理上的小块 -> telea
+    mask[650:850, 60:340] = 255  # 纹理上的大块 -> lama
+    mask[300:303, 10:13] = 255  # 过小的连通域，会被 _find_mask_chunks 丢弃
+    return image, mask
+
+
+def test_hybrid_routes_chunks_by_background_and_area():
+    image, mask = _page()
+    inpainter = HybridInpainter()
+    fake = _FakeLama()
+    inpainter._model = fake
+
+    result = inpainter._inpaint_array_sync(image, mask)
+    metrics = inpainter.last_metrics
+
+    assert metrics["mode"] == "hybrid"
+    assert (metrics["route_flat"], metrics["route_telea"], metrics["route_lama"]) == (1, 1, 1)
+    assert fake.calls == 1
+    assert metrics["lama_mode"] == "per_chunk"
+    assert all(f"route_{name}_ms" in metrics for name in ("flat", "telea", "lama"))
+    # flat fill uses the bubble's own colour
+    assert np.all(result[60:100, 80:300] == 250)
+    # LaMa chunk came from the model
+    assert np.all(result[650:850, 60:340] == 0)
+    # telea and residual pixels changed only inside the mask
+    assert metrics["residual_px"] == 9
+    untouched = mask == 0
+    untouched[640:860, 50:350] = False  # LaMa rewrites its whole chunk rect
+    assert np.array_equal(result[untouched], image[untouched])
+
+
+def test_hybrid_without_lama_uses_telea_for_large_chunks():
+    image, mask = _page()
+    inpainter = HybridInpainter(use_lama=False)
+
+    result = inpainter._inpaint_array_sync(image, mask)
+
+    assert inpainter.last_metrics["route_lama"] == 0
+    assert inpainter.last_metrics["route_telea"] == 2
+    assert result.shape == image.shape
+
+
+def test_create_inpainter_hybrid_env(monkeypatch):
+    monkeypatch.setenv("INPAINT_HYBRID", "1")
+    inpainter = create_inpainter(prefer_lama=False)
+    assert isinstance(inpainter, HybridInpainter)
+    assert inpainter.use_lama is False
+
+    monkeypatch.setenv("INPAINT_HYBRID", "0")
+    assert isinstance(create_inpainter(prefer_lama=False), OpenCVInpainter)
+
+
+def test_inpaint_regions_array_returns_per_call_metrics():
+    import asyncio
+
+    from core.models import Box2D, RegionData
+
+    inpainter = HybridInpainter(use_lama=False)
+    image = np.full((400, 300, 3), 250, dtype=np.uint8)
+    one = [RegionData(box_2d=Box2D(x1=20, y1=20, x2=120, y2=60))]
+    two = one + [RegionData(box_2d=Box2D(x1=20, y1=250, x2=120, y2=290))]
+
+    async def run():
+        return await asyncio.gather(
+            inpainter.inpaint_regions_array(image, one, dilation=0),
+            inpainter.inpaint_regions_array(image, two, dilation=0),
+        )
+
+    (_, _, first), (_, _, second) = asyncio.run(run())
+
+    # 并发调用各自拿到自己的统计，不依赖共享的 last_metrics
+    assert first["mode"] == second["mode"] == "hybrid"
+    assert (first["chunks"], second["chunks"]) == (1, 2)
@@ -0,0 +1,137 @@
+import asyncio
+
+import cv2
+import numpy as np
+import pytest
+
+from core.errors import InpaintedImageMissingError
+from core.image_buffer import ImageBufferStore, get_image_buffer_store, read_image
+from core.models import Box2D, RegionData, TaskContext
+from core.modules.inpainter import InpainterModule
+from core.modules.renderer import RendererModule
+from core.vision.inpainter import OpenCVInpainter
+
+
+def test_image_buffer_store_evicts_lru_and_forgets_path(tmp_path):
+    store = ImageBufferStore(max_tasks=2)
+    store.acquire("a", str(tmp_path / "a.png"))
+    store.acquire("b", str(tmp_path / "b.png"))
+    store.acquire("a", str(tmp_path / "a.png"))
+    store.acquire("c", str(tmp_path / "c.png"))
+
+    assert store.get("b") is None
+    assert store.find_by_path(str(tmp_path / "b.png")) is None
+    assert store.get("a") is not None
+    assert len(store) == 2
+
+    store.release("a")
+    assert store.find_by_path(str(tmp_path / "a.png")) is None
+
+
+def test_read_image_decodes_once_for_buffered_task(tmp_path, monkeypatch):
+    image_path = tmp_path / "page.png"
+    cv2.imwrite(str(image_path), np.full((8, 8, 3), 200, dtype=np.uint8))
+    store = get_image_buffer_store()
+    store.acquire("task-read", str(image_path))
+
+    calls = {"n": 0}
+    real_imread = cv2.imread
+
+    def counting_imread(*args, **kwargs):
+        calls["n"] += 1
+        return real_imread(*args, **kwargs)
+
+    monkeypatch.setattr(cv2, "imread", counting_imread)
+    try:
+        first = read_image(str(image_path))
+        second = read_image(str(image_path))
+    finally:
+        store.release("task-read")
+
+    assert first is second
+    assert calls["n"] == 1
+    assert not first.flags.writeable
+
+
+def test_pinned_buffers_survive_lru_eviction(tmp_path):
+    store = ImageBufferStore(max_tasks=1)
+    pinned = store.pin("live", str(tmp_path / "live.png"))
+    store.acquire("x", str(tmp_path / "x.png"))
+    store.acquire("y", str(tmp_path / "y.png"))
+
+    assert store.get("live") is pinned
+    assert store.get("x") is None
+    assert store.get("y") is not None
+
+    store.release("live")
+    assert store.get("live") is None
+    assert not store.is_pinned("live")
+
+
+def test_tasks_on_the_same_file_keep_their_own_path_mapping(tmp_path):
+    store = ImageBufferStore()
+    path = str(tmp_path / "same.png")
+    first = store.acquire("one", path)
+    second = store.acquire("two", path)
+
+    assert store.find_by_path(path) is second
+    store.release("two")
+    assert store.find_by_path(path) is first
+    store.release("one")
+    assert store.find_by_path(path) is None
+
+
+def test_inpainter_module_keeps_result_in_buffer_without_spill(tmp_path, monkeypatch):
+    monkeypatch.delenv("PIPELINE_IMAGE_BUFFER_SPILL", raising=False)
+    monkeypatch.delenv("DEBUG_ARTIFACTS", raising=False)
+    image_path = tmp_path / "page.png"
+    image = np.full((40, 40, 3), 255, dtype=np.uint8)
+    cv2.putText(image, "A", (10, 25), cv2.FONT_HERSHEY_SIMPLEX, 0.6, (0, 0, 0), 2)
+    cv2.imwrite(str(image_path), image)
+
+    module = InpainterModule(
+        inpainter=OpenCVInpainter(), output_dir=str(tmp_path / "work"), use_time_subdir=False
+    )
+    ctx = TaskContext(
+        image_path=str(image_path),
+        regions=[
+            RegionData(
+                box_2d=Box2D(x1=8, y1=8, x2=30, y2=30),
+                source_text="A",
+                target_text="甲",
+            )
+        ],
+    )
+
+    ctx = asyncio.run(module.process(ctx))
+
+    buffer = get_image_buffer_store().get(ctx.task_id)
+    try:
+        assert buffer is not None
+        assert buffer.inpainted is not None
+        assert buffer.inpainted.shape == image.shape
+        assert buffer.mask is not None
+        assert ctx.inpainted_path is None
+        assert not list((tmp_path / "work").glob("inpainted_*"))
+    finally:
+        get_image_buffer_store().release(ctx.task_id)
+
+
+def test_renderer_refuses_to_draw_on_original_when_inpainted_buffer_is_gone(tmp_path):
+    image_path = tmp_path / "page.png"
+    cv2.imwrite(str(image_path), np.full((40, 40, 3), 255, dtype=np.uint8))
+    ctx = TaskContext(
+        image_path=str(image_path),
+        inpainted_buffered=True,
+        regions=[
+            RegionData(
+                box_2d=Box2D(x1=8, y1=8, x2=30, y2=30),
+                source_text="A",
+                target_text="甲",
+            )
+        ],
+    )
+    module = RendererModule(output_dir=str(tmp_path / "out"))
+
+    with pytest.raises(InpaintedImageMissingError):
+        asyncio.run(module.process(ctx))
@@ -15,9 +15,10 @@ def test_inpaint_regions_returns_mask_path(tmp_path: Path):
     inp = OpenCVInpainter()
     out_path = tmp_path / "out.png"
 
-    result_path, mask_path = asyncio.run(
+    result_path, mask_path, metrics = asyncio.run(
         inp.inpaint_regions(str(img_path), regions, str(out_path), str(tmp_path))
     )
 
     assert Path(result_path).exists()
     assert Path(mask_path).exists()
+    assert metrics is None
@@ -0,0 +1,160 @@
+import asyncio
+import time
+
+import pytest
+
+from app.services.job_queue import JobQueue
+from app.services.queued_pipeline import QueuedPipeline
+from app.services.task_store import stage_event_at
+from app.worker import run_worker
+from core.metrics import PipelineMetrics
+from core.models import PipelineResult, RegionData, TaskContext, TaskStatus
+
+
+class _FakePipeline:
+    def __init__(self, crash_first: bool = False):
+        self.crash_first = crash_first
+        self.calls = 0
+
+    async def process(self, context, collect_metrics=True, status_callback=None):
+        self.calls += 1
+        if self.crash_first and self.calls == 1:
+            raise RuntimeError("boom")
+        await status_callback("init", TaskStatus.PROCESSING, context.task_id)
+        await status_callback("ocr", TaskStatus.PROCESSING, context.task_id)
+        context.regions = [RegionData(source_text="Hi", target_text="嗨")]
+        context.update_status(TaskStatus.COMPLETED)
+        await status_callback("complete", TaskStatus.COMPLETED, context.task_id)
+        result = PipelineResult(success=True, task=context, stages_completed=["ocr"])
+        # 与真实 Pipeline 一样挂的是 PipelineMetrics 对象
+        result.metrics = PipelineMetrics(total_duration_ms=5)
+        return result
+
+
+def test_claim_is_exclusive_and_expired_lease_is_reclaimed(tmp_path):
+    queue = JobQueue(tmp_path / "jobs.sqlite3", lease_seconds=1, max_attempts=2)
+    other = JobQueue(tmp_path / "jobs.sqlite3", lease_seconds=1, max_attempts=2)
+    job_id = queue.enqueue("t1", {"context": {}})
+
+    job = queue.claim("w1")
+    assert job.id == job_id and job.attempts == 1
+    assert other.claim("w2") is None
+
+    # w1 崩溃：租约过期后由 w2 接手，w1 迟到的结果不再生效
+    queue._conn.execute("UPDATE jobs SET lease_until = ?", (time.time() - 1,))
+    again = other.claim("w2")
+    assert again.id == job_id and again.attempts == 2
+    assert not queue.complete(job_id, "w1", "{}")
+    assert not queue.heartbeat(job_id, "w1")
+
+    # 第二次也丢失租约：重试次数用尽，任务失败
+    queue._conn.execute("UPDATE jobs SET lease_until = ?", (time.time() - 1,))
+    assert queue.claim("w3") is None
+    _, row = queue.poll(job_id)
+    assert row["status"] == "failed"
+    assert "lease expired" in row["error"]
+
+
+def test_fail_requeues_until_attempts_are_used(tmp_path):
+    queue = JobQueue(tmp_path / "jobs.sqlite3", max_attempts=2)
+    job_id = queue.enqueue("t1", {})
+    queue.claim("w1")
+    assert queue.fail(job_id, "w1", "oops")
+    assert queue.stats()["queued"] == 1
+    queue.claim("w1")
+    queue.fail(job_id, "w1", "oops again")
+    _, row = queue.poll(job_id)
+    assert (row["status"], row["error"]) == ("failed", "oops again")
+    assert queue.cancel([job_id]) == 0
+
+
+@pytest.mark.asyncio
+async def test_queued_pipeline_relays_worker_events_and_result(tmp_path):
+    queue = JobQueue(tmp_path / "jobs.sqlite3")
+    worker_queue = JobQueue(tmp_path / "jobs.sqlite3")
+    fake = _FakePipeline(crash_first=True)
+    stop = asyncio.Event()
+    worker = asyncio.create_task(
+        run_worker(worker_queue, fake, "w1", concurrency=2, stop=stop, poll_seconds=0.01)
+    )
+    events = []
+
+    async def callback(stage, status, task_id):
+        events.append((stage, status, task_id, stage_event_at.get()))
+
+    contexts = [TaskContext(image_path=f"{i}.jpg") for i in range(3)]
+    try:
+        results = await asyncio.wait_for(
+            QueuedPipeline(queue, poll_interval=0.01).process_batch(
+                contexts, status_callback=callback
+            ),
+            timeout=10,
+        )
+    finally:
+        stop.set()
+        processed = await worker
+
+    assert processed == 4  # 第一次运行抛异常后任务重新入队
+    assert [r.task.task_id for r in results] == [c.task_id for c in contexts]
+    assert all(r.success and r.task.regions[0].target_text == "嗨" for r in results)
+    assert results[0].metrics["total_duration_ms"] == 5
+    for ctx in contexts:
+        stages = [stage for stage, _, task_id, _ in events if task_id == ctx.task_id]
+        assert stages == ["init", "ocr", "complete"]
+    # 转发的事件带着 worker 端记录的时间
+    assert all(at is not None for *_, at in events)
+    assert queue.stats()["done"] == 3
+
+
+@pytest.mark.asyncio
+async def test_queued_pipeline_reports_jobs_that_exhaust_retries(tmp_path):
+    queue = JobQueue(tmp_path / "jobs.sqlite3", max_attempts=1)
+    context = TaskContext(image_path="1.jpg")
+    pipeline = QueuedPipeline(queue, poll_interval=0.01)
+    waiter = asyncio.create_task(pipeline.process(context))
+    await asyncio.sleep(0.05)
+    job = queue.claim("w1")
+    queue.fail(job.id, "w1", "CUDA out of memory")
+
+    result = await asyncio.wait_for(waiter, timeout=5)
+    assert not result.success
+    assert result.task.status == TaskStatus.FAILED
+    assert result.task.error_code == "worker_failed"
+    assert result.task.error_message == "CUDA out of memory"
+
+
+def test_poll_many_splits_events_per_job(tmp_path):
+    queue = JobQueue(tmp_path / "jobs.sqlite3")
+    first, second = queue.enqueue_many([("t1", {}), ("t2", {})])
+    queue.add_event(first, "init", "processing", at=1.0)
+    queue.add_event(second, "init", "processing", at=2.0)
+    queue.add_event(first, "ocr", "processing", at=3.0)
+
+    polled = queue.poll_many({first: 0, second: 0})
+    assert [e["stage"] for e in polled[first][0]] == ["init", "ocr"]
+    assert [e["at"] for e in polled[second][0]] == [2.0]
+
+    cursor = polled[first][0][0]["id"]
+    again = queue.poll_many({first: cursor, second: polled[second][0][-1]["id"]})
+    assert [e["stage"] for e in again[first][0]] == ["ocr"]
+    assert again[second][0] == []
+    assert again[first][1]["status"] == "queued"
+
+
+@pytest.mark.asyncio
+async def test_cancelled_batch_drops_unclaimed_jobs(tmp_path):
+    queue = JobQueue(tmp_path / "jobs.sqlite3")
+    pipeline = QueuedPipeline(queue, poll_interval=0.01)
+    waiter = asyncio.create_task(
+        pipeline.process_batch([TaskContext(image_path=f"{i}.jpg") for i in range(2)])
+    )
+    await asyncio.sleep(0.05)
+    waiter.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await waiter
+
+    for _ in range(100):
+        if queue.stats()["queued"] == 0:
+            break
+        await asyncio.sleep(0.01)
+    assert queue.stats()["queued"] == 0
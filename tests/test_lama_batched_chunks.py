@@ -0,0 +1,137 @@
+import sys
+import types
+from contextlib import nullcontext
+
+import numpy as np
+import pytest
+from PIL import Image
+
+from core.vision.inpainter import LamaInpainter
+
+
+class _Tensor:
+    def __init__(self, array):
+        self.array = array
+
+    def to(self, device):
+        return self
+
+    def detach(self):
+        return self
+
+    def cpu(self):
+        return self
+
+    def numpy(self):
+        return self.array
+
+
+def _fill_net(calls):
+    """Fake LaMa: masked pixels -> 0.5 grey, others unchanged (NCHW float)."""
+
+    def net(image, mask):
+        calls.append(image.array.shape)
+        out = image.array.copy()
+        out[np.broadcast_to(mask.array > 0, out.shape)] = 0.5
+        return _Tensor(out)
+
+    return net
+
+
+class _FakeSimpleLama:
+    def __init__(self, calls):
+        self.device = "cpu"
+        self.model = _fill_net(calls)
+        self.pil_calls = 0
+
+    def __call__(self, image, mask):
+        self.pil_calls += 1
+        img = np.asarray(image).astype(np.float32) / 255
+        m = np.asarray(mask) > 0
+        img[m] = 0.5
+        return Image.fromarray(np.clip(img * 255, 0, 255).astype(np.uint8))
+
+
+@pytest.fixture
+def fake_torch(monkeypatch):
+    torch = types.ModuleType("torch")
+    torch.from_numpy = _Tensor
+    torch.inference_mode = nullcontext
+    torch.device = lambda name: name
+    monkeypatch.setitem(sys.modules, "torch", torch)
+    return torch
+
+
+def _tall_page():
+    rng = np.random.default_rng(0)
+    image = rng.integers(0, 255, size=(3000, 400, 3), dtype=np.uint8)
+    mask = np.zeros((3000, 400), dtype=np.uint8)
+    for y in range(100, 2900, 300):
+        mask[y : y + 40, 60:220] = 255
+    return image, mask
+
+
+def _make_inpainter(calls):
+    inpainter = LamaInpainter(device="cpu")
+    inpainter._model = _FakeSimpleLama(calls)
+    return inpainter
+
+
+def test_pad_symmetric_matches_numpy():
+    base = np.arange(2 * 5 * 3, dtype=np.float32).reshape(2, 5, 3)
+    buf = np.zeros((2, 16, 8), dtype=np.float32)
+    buf[:, :5, :3] = base
+    LamaInpainter._pad_symmetric(buf, 5, 3)
+    expected = np.pad(base, ((0, 0), (0, 11), (0, 5)), mode="symmetric")
+    assert np.array_equal(buf, expected)
+
+
+def test_batched_chunks_match_per_chunk_path(fake_torch, monkeypatch):
+    image, mask = _tall_page()
+
+    batched_calls = []
+    batched = _make_inpainter(batched_calls)
+    out_batched = batched._inpaint_array_sync(image, mask)
+    metrics = batched.last_metrics
+
+    monkeypatch.setenv("LAMA_BATCH_ENABLE", "0")
+    per_chunk = _make_inpainter([])
+    out_single = per_chunk._inpaint_array_sync(image, mask)
+
+    assert metrics["mode"] == "batched"
+    assert metrics["batches"] < metrics["chunks"] == per_chunk.last_metrics["chunks"]
+    assert batched._model.pil_calls == 0
+    assert len(batched_calls) == metrics["batches"]
+    assert all(shape[2] % 64 == 0 and shape[3] % 64 == 0 for shape in batched_calls)
+    assert np.array_equal(out_batched, out_single)
+    assert np.all(out_batched[mask > 0] == 127)
+    untouched = np.ones(mask.shape, dtype=bool)
+    for y1, y2, x1, x2 in batched._find_mask_chunks(mask):
+        untouched[y1:y2, x1:x2] = False
+    assert np.array_equal(out_batched[untouched], image[untouched])
+
+
+def test_batch_pixel_budget_limits_batch_size(fake_torch, monkeypatch):
+    monkeypatch.setenv("LAMA_BATCH_MAX_PIXELS", str(256 * 320))
+    image, mask = _tall_page()
+    calls = []
+    inpainter = _make_inpainter(calls)
+
+    inpainter._inpaint_array_sync(image, mask)
+
+    assert all(shape[0] * shape[2] * shape[3] <= 256 * 320 or shape[0] == 1 for shape in calls)
+
+
+def test_batched_failure_falls_back_to_per_chunk(fake_torch):
+    image, mask = _tall_page()
+    inpainter = _make_inpainter([])
+
+    def _boom(image, mask):
+        raise RuntimeError("out of memory")
+
+    inpainter._model.model = _boom
+    result = inpainter._inpaint_array_sync(image, mask)
+
+    assert inpainter.last_metrics["mode"] == "per_chunk"
+    assert inpainter._model.pil_calls == inpainter.last_metrics["chunks"]
+    assert np.all(result[mask > 0] == 127)
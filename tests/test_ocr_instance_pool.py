@@ -0,0 +1,83 @@
+import threading
+import time
+
+import numpy as np
+
+from core.models import Box2D, RegionData
+from core.vision.ocr.pool import OCRInstancePool
+
+
+def test_pool_grows_lazily_and_leases_exclusively():
+    created = []
+
+    def factory(lang):
+        created.append(lang)
+        return object()
+
+    pool = OCRInstancePool("ko", 2, factory=factory, primary_factory=factory)
+    assert pool.lang == "korean"
+
+    with pool.lease() as first:
+        assert pool.created == 1
+        with pool.lease() as second:
+            assert second is not first
+            assert pool.created == 2
+    with pool.lease() as again:
+        assert again in (first, second)
+    assert pool.created == 2
+
+
+def test_tiles_run_in_parallel_across_pool_instances(monkeypatch):
+    from core.vision.ocr import paddle_engine
+
+    monkeypatch.setenv("OCR_POOL_SIZE", "3")
+    pool = OCRInstancePool("en", 3, factory=lambda _l: object(), primary_factory=lambda _l: object())
+    monkeypatch.setattr(paddle_engine, "get_ocr_pool", lambda _lang: pool)
+
+    engine = paddle_engine.PaddleOCREngine(lang="en")
+    in_flight = {"now": 0, "peak": 0, "instances": set()}
+    lock = threading.Lock()
+
+    def _fake_process_chunk(ocr, chunk, _y, **_kwargs):
+        with lock:
+            in_flight["now"] += 1
+            in_flight["peak"] = max(in_flight["peak"], in_flight["now"])
+            in_flight["instances"].add(id(ocr))
+        time.sleep(0.05)
+        with lock:
+            in_flight["now"] -= 1
+        return [RegionData(box_2d=Box2D(x1=0, y1=0, x2=10, y2=10), source_text=str(chunk[0, 0, 0]))]
+
+    monkeypatch.setattr(engine, "_process_chunk", _fake_process_chunk)
+
+    class _Tile:
+        def __init__(self, image, index):
+            self.image = image
+            self.index = index
+
+    class _FakeTilingManager:
+        def should_tile(self, _height):
+            return True
+
+        def create_tiles(self, image):
+            return [_Tile(np.full((10, 10, 3), i, dtype=np.uint8), i) for i in range(3)]
+
+        def remap_regions(self, regions, _tile):
+            return regions
+
+        def merge_regions(self, regions, iou_threshold=0.5):
+            return regions
+
+    monkeypatch.setattr(paddle_engine, "get_tiling_manager", lambda: _FakeTilingManager())
+    monkeypatch.setattr(paddle_engine, "read_image", lambda _p: np.zeros((3000, 200, 3), dtype=np.uint8))
+    monkeypatch.setattr(paddle_engine, "filter_noise_regions", lambda regions, **_k: regions)
+    monkeypatch.setattr(paddle_engine, "remove_contained_regions", lambda regions, **_k: regions)
+    monkeypatch.setattr(paddle_engine, "merge_adjacent_text_regions", lambda regions: regions)
+
+    regions = engine._detect_and_recognize_sync("dummy.jpg")
+
+    assert [r.source_text for r in regions] == ["0", "1", "2"]
+    assert in_flight["peak"] > 1
+    assert len(in_flight["instances"]) > 1
+    assert engine.last_tile_count == 3
+    assert engine.last_pool_size == 3
@@ -0,0 +1,92 @@
+import shutil
+
+from core.models import Box2D, RegionData
+from core.vision.ocr.result_store import OCRResultStore, build_content_key
+
+
+def _regions(text="hello"):
+    return [
+        RegionData(
+            box_2d=Box2D(x1=1, y1=2, x2=30, y2=40),
+            source_text=text,
+            confidence=0.87,
+        )
+    ]
+
+
+def test_content_key_survives_copy_and_tracks_tiling_config(tmp_path, monkeypatch):
+    monkeypatch.delenv("OCR_TILE_HEIGHT", raising=False)
+    src = tmp_path / "a" / "001.jpg"
+    src.parent.mkdir()
+    src.write_bytes(b"fake-image-bytes")
+    moved = tmp_path / "b" / "page.jpg"
+    moved.parent.mkdir()
+    shutil.copy(src, moved)
+
+    key = build_content_key(str(src), "korean")
+    assert key == build_content_key(str(moved), "ko")
+    assert key != build_content_key(str(src), "en")
+
+    monkeypatch.setenv("OCR_TILE_HEIGHT", "777")
+    assert build_content_key(str(src), "korean") != key
+    assert build_content_key(str(tmp_path / "missing.jpg"), "korean") is None
+
+
+def test_result_store_round_trip_and_counters(tmp_path):
+    store = OCRResultStore(tmp_path / "ocr.sqlite3", max_bytes=1024 * 1024)
+    regions = _regions()
+
+    assert store.get("k1") is None
+    store.put("k1", regions)
+    loaded = store.get("k1")
+
+    assert loaded is not None
+    assert loaded[0].region_id == regions[0].region_id
+    assert loaded[0].source_text == "hello"
+    assert loaded[0].box_2d == regions[0].box_2d
+    stats = store.stats()
+    assert stats["hits"] == 1
+    assert stats["misses"] == 1
+    assert stats["entries"] == 1
+    assert stats["hit_rate"] == 0.5
+    store.close()
+
+
+def test_result_store_evicts_least_recently_used(tmp_path):
+    store = OCRResultStore(tmp_path / "ocr.sqlite3", max_bytes=0)
+    store.put("a", _regions("a" * 50))
+    size = store.stats()["bytes"]
+    store.max_bytes = size * 2 + size // 2
+
+    store.put("b", _regions("b" * 50))
+    assert store.get("a") is not None  # refresh a; b is now the LRU entry
+    store.put("c", _regions("c" * 50))
+
+    assert store.get("b") is None
+    assert store.get("a") is not None
+    assert store.get("c") is not None
+    assert store.stats()["evictions"] == 1
+    store.close()
+
+
+def test_result_store_defers_hit_touches_and_tracks_bytes(tmp_path):
+    db_path = tmp_path / "ocr.sqlite3"
+    store = OCRResultStore(db_path, max_bytes=1024 * 1024)
+    store.put("k1", _regions())
+    store.put("k2", _regions("other"))
+    written = store._conn.total_changes
+
+    for _ in range(5):
+        assert store.get("k1") is not None
+    assert store.get("missing") is None
+    # 命中只记在内存里，不会每次 UPDATE + commit
+    assert store._conn.total_changes == written
+
+    stats = store.stats()
+    assert stats["hits"] == 5 and stats["misses"] == 1
+    store.close()
+
+    reopened = OCRResultStore(db_path, max_bytes=1024 * 1024)
+    assert reopened.stats()["bytes"] == stats["bytes"] > 0
+    assert reopened.stats()["hits"] == 5
+    reopened.close()
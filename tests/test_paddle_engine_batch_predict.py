@@ -0,0 +1,52 @@
+import numpy as np
+
+from core.vision.ocr.paddle_engine import PaddleOCREngine
+
+
+def _item(text):
+    return {
+        "rec_texts": [text],
+        "rec_scores": [0.9],
+        "rec_boxes": [[0, 0, 20, 10]],
+    }
+
+
+class _BatchOCR:
+    def __init__(self, drop_last=False):
+        self.calls = []
+        self.drop_last = drop_last
+
+    def predict(self, inputs):
+        if isinstance(inputs, list):
+            self.calls.append(len(inputs))
+            items = [_item(f"t{int(img[0, 0, 0])}") for img in inputs]
+            return items[:-1] if self.drop_last else items
+        self.calls.append(1)
+        return [_item(f"t{int(inputs[0, 0, 0])}")]
+
+
+def _chunks(n):
+    return [np.full((10, 10, 3), i, dtype=np.uint8) for i in range(n)]
+
+
+def test_run_chunks_batches_predict_calls(monkeypatch):
+    monkeypatch.setenv("OCR_PREDICT_BATCH_SIZE", "4")
+    monkeypatch.delenv("OCR_POOL_SIZE", raising=False)
+    engine = PaddleOCREngine(lang="en")
+    ocr = _BatchOCR()
+
+    results = engine._run_chunks(ocr, None, _chunks(5), min_len=1)
+
+    assert ocr.calls == [4, 1]
+    assert [regions[0].source_text for regions, _ in results] == ["t0", "t1", "t2", "t3", "t4"]
+
+
+def test_batched_predict_falls_back_per_chunk_on_mismatch(monkeypatch):
+    monkeypatch.setenv("OCR_PREDICT_BATCH_SIZE", "3")
+    engine = PaddleOCREngine(lang="en")
+    ocr = _BatchOCR(drop_last=True)
+
+    results = engine._run_chunks(ocr, None, _chunks(3), min_len=1)
+
+    assert ocr.calls == [3, 1, 1, 1]
+    assert [regions[0].source_text for regions, _ in results] == ["t0", "t1", "t2"]
@@ -0,0 +1,169 @@
+import asyncio
+
+import pytest
+
+from app.services.job_queue import JobQueue
+from app.services.queued_pipeline import QueuedPipeline
+from core.models import TaskContext
+from core.modules.base import BaseModule
+from core.page_scheduler import PageScheduler, ScheduleTag, use_schedule
+from core.pipeline import Pipeline
+
+
+class _SlowModule(BaseModule):
+    def __init__(self, order=None):
+        super().__init__()
+        self.order = order
+
+    async def process(self, context):
+        await asyncio.sleep(0.01)
+        if self.order is not None:
+            self.order.append(context.image_path)
+        return context
+
+
+async def _hold(scheduler, tag, granted):
+    await scheduler.acquire(tag)
+    granted.append(tag.group)
+
+
+@pytest.mark.asyncio
+async def test_interactive_page_jumps_ahead_of_queued_bulk_pages():
+    scheduler = PageScheduler(slots=1)
+    await scheduler.acquire(ScheduleTag())
+    granted = []
+    waiters = [
+        asyncio.create_task(_hold(scheduler, ScheduleTag("bulk", "ch1"), granted)),
+        asyncio.create_task(_hold(scheduler, ScheduleTag("head", "ch2"), granted)),
+        asyncio.create_task(_hold(scheduler, ScheduleTag("interactive", "page"), granted)),
+    ]
+    await asyncio.sleep(0)
+
+    for _ in range(3):
+        scheduler.release()
+        await asyncio.sleep(0)
+    await asyncio.gather(*waiters)
+
+    assert granted == ["page", "ch2", "ch1"]
+    stats = scheduler.stats()["classes"]
+    assert stats["interactive"]["granted"] == 1
+    assert stats["bulk"]["wait_max_ms"] >= stats["interactive"]["wait_max_ms"]
+
+
+@pytest.mark.asyncio
+async def test_chapters_share_slots_by_weight():
+    scheduler = PageScheduler(slots=1)
+    await scheduler.acquire(ScheduleTag())
+    granted = []
+    waiters = [
+        asyncio.create_task(_hold(scheduler, ScheduleTag("bulk", group, weight), granted))
+        for group, weight in [("a", 2.0)] * 6 + [("b", 1.0)] * 6
+    ]
+    await asyncio.sleep(0)
+
+    for _ in range(6):
+        scheduler.release()
+        await asyncio.sleep(0)
+    # 权重 2:1，先到的章节 a 不会独占槽位
+    assert granted.count("a") == 4 and granted.count("b") == 2
+
+    for task in waiters:
+        task.cancel()
+    await asyncio.gather(*waiters, return_exceptions=True)
+    scheduler.release()
+    assert scheduler.stats()["running"] == 0
+    assert all(c["waiting"] == 0 for c in scheduler.stats()["classes"].values())
+
+
+@pytest.mark.asyncio
+async def test_retranslated_page_is_not_stuck_behind_a_chapter(monkeypatch, tmp_path):
+    monkeypatch.setenv("PAGE_SCHEDULER_ENABLE", "1")
+    monkeypatch.setenv("PAGE_SCHEDULER_SLOTS", "1")
+    monkeypatch.setenv("PAGE_SCHEDULER_HEAD_PAGES", "2")
+    monkeypatch.setenv("QUALITY_REPORT_DIR", str(tmp_path))
+    order = []
+    pipeline = Pipeline(
+        ocr=_SlowModule(order),
+        translator=_SlowModule(),
+        inpainter=_SlowModule(),
+        renderer=_SlowModule(),
+        upscaler=_SlowModule(),
+    )
+    chapter = [TaskContext(image_path=f"ch/{i}.jpg") for i in range(6)]
+
+    with use_schedule("bulk", group="m/ch"):
+        batch = asyncio.create_task(pipeline.process_batch(chapter, max_concurrent=6))
+    await asyncio.sleep(0.03)
+    with use_schedule("interactive"):
+        page = await pipeline.process(TaskContext(image_path="fix.jpg"))
+    results = await batch
+
+    # 单页只等当前正在跑的那一页
+    assert order.index("fix.jpg") <= 2
+    assert page.metrics.queue_class == "interactive"
+    assert [r.metrics.queue_class for r in results] == ["head", "head"] + ["bulk"] * 4
+    assert results[-1].metrics.queue_wait_ms > page.metrics.queue_wait_ms
+
+
+@pytest.mark.asyncio
+async def test_staged_batch_pages_take_scheduler_slots(monkeypatch, tmp_path):
+    from core.page_scheduler import get_page_scheduler
+
+    monkeypatch.setenv("PAGE_SCHEDULER_ENABLE", "1")
+    monkeypatch.setenv("PAGE_SCHEDULER_SLOTS", "1")
+    monkeypatch.setenv("PAGE_SCHEDULER_HEAD_PAGES", "1")
+    monkeypatch.setenv("QUALITY_REPORT_DIR", str(tmp_path))
+    order = []
+    pipeline = Pipeline(
+        ocr=_SlowModule(order),
+        translator=_SlowModule(),
+        inpainter=_SlowModule(),
+        renderer=_SlowModule(),
+        upscaler=_SlowModule(),
+    )
+    chapter = [TaskContext(image_path=f"ch/{i}.jpg") for i in range(4)]
+
+    with use_schedule("bulk", group="m/ch"):
+        batch = asyncio.create_task(pipeline.process_batch(chapter, staged=True))
+    await asyncio.sleep(0.03)
+    with use_schedule("interactive"):
+        page = await pipeline.process(TaskContext(image_path="fix.jpg"))
+    results = await batch
+
+    # 分阶段批处理同样经过页面调度：单页不用等整章跑完
+    assert order.index("fix.jpg") <= 2
+    assert page.metrics.queue_class == "interactive"
+    assert [r.metrics.queue_class for r in results] == ["head"] + ["bulk"] * 3
+    assert get_page_scheduler().stats()["running"] == 0
+
+
+def test_worker_queue_claims_interactive_pages_first(tmp_path):
+    queue = JobQueue(tmp_path / "jobs.sqlite3")
+    with use_schedule("bulk", group="m/ch"):
+        queue.enqueue_many(
+            [QueuedPipeline._job(TaskContext(image_path=f"{i}.jpg"), index=i) for i in range(3)]
+        )
+    with use_schedule("interactive"):
+        queue.enqueue_many([QueuedPipeline._job(TaskContext(image_path="fix.jpg"))])
+
+    claimed = [queue.claim("w1") for _ in range(4)]
+    assert [job.payload["context"]["image_path"] for job in claimed] == [
+        "fix.jpg",
+        "0.jpg",
+        "1.jpg",
+        "2.jpg",
+    ]
+    assert claimed[0].payload["schedule"]["priority"] == "interactive"
+    assert claimed[1].payload["schedule"] == {"priority": "head", "group": "m/ch", "weight": 1.0}
+
+
+def test_staged_chapters_keep_the_chapter_semaphore(monkeypatch):
+    from app.routes import translate as translate_routes
+
+    monkeypatch.setenv("PAGE_SCHEDULER_ENABLE", "1")
+    monkeypatch.setenv("PIPELINE_STAGED_BATCH", "0")
+    assert not isinstance(translate_routes._chapter_gate(1), asyncio.Semaphore)
+
+    # 分阶段批处理每章自带 stage worker 池：章节并发仍由信号量限制
+    monkeypatch.setenv("PIPELINE_STAGED_BATCH", "1")
+    assert isinstance(translate_routes._chapter_gate(1), asyncio.Semaphore)
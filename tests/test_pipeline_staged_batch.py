@@ -0,0 +1,99 @@
+import asyncio
+
+import pytest
+
+from core.modules.base import BaseModule
+from core.models import TaskContext, TaskStatus
+from core.pipeline import Pipeline
+
+
+class _SleepModule(BaseModule):
+    def __init__(self, name, delay, log, fail_on=None):
+        super().__init__(name)
+        self.delay = delay
+        self.log = log
+        self.fail_on = fail_on
+
+    async def process(self, context: TaskContext) -> TaskContext:
+        self.log.append((self.name, "start", context.image_path))
+        await asyncio.sleep(self.delay)
+        if self.fail_on == context.image_path:
+            raise RuntimeError(f"{self.name} boom")
+        self.log.append((self.name, "end", context.image_path))
+        return context
+
+
+def _pipeline(log, delay=0.02, fail_on=None):
+    return Pipeline(
+        ocr=_SleepModule("ocr", delay, log),
+        translator=_SleepModule("translator", delay, log, fail_on=fail_on),
+        inpainter=_SleepModule("inpainter", delay, log),
+        renderer=_SleepModule("renderer", delay, log),
+        upscaler=_SleepModule("upscaler", delay, log),
+    )
+
+
+@pytest.mark.asyncio
+async def test_staged_batch_overlaps_stages_and_keeps_order(tmp_path, monkeypatch):
+    monkeypatch.setenv("QUALITY_REPORT_DIR", str(tmp_path / "reports"))
+    monkeypatch.setenv("PIPELINE_STAGE_TRANSLATOR_WORKERS", "1")
+    log = []
+    pipeline = _pipeline(log)
+    contexts = [TaskContext(image_path=f"p{i}.png") for i in range(4)]
+
+    results = await pipeline.process_batch(contexts, staged=True)
+
+    assert [r.task.image_path for r in results] == [f"p{i}.png" for i in range(4)]
+    assert all(r.success for r in results)
+    assert all(r.task.status == TaskStatus.COMPLETED for r in results)
+
+    # page 1 enters OCR before page 0 leaves the pipeline
+    p1_ocr_start = log.index(("ocr", "start", "p1.png"))
+    p0_upscaler_end = log.index(("upscaler", "end", "p0.png"))
+    assert p1_ocr_start < p0_upscaler_end
+
+    metrics = results[-1].metrics
+    assert set(metrics.stage_queue_wait_ms) == {
+        "ocr",
+        "translator",
+        "inpainter",
+        "renderer",
+        "upscaler",
+    }
+    assert all(0.0 <= v <= 1.0 for v in metrics.stage_occupancy.values())
+    assert "stage_occupancy" in metrics.to_dict()
+
+
+@pytest.mark.asyncio
+async def test_staged_batch_isolates_stage_failure(tmp_path, monkeypatch):
+    monkeypatch.setenv("QUALITY_REPORT_DIR", str(tmp_path / "reports"))
+    log = []
+    pipeline = _pipeline(log, delay=0.0, fail_on="p1.png")
+    contexts = [TaskContext(image_path=f"p{i}.png") for i in range(3)]
+    events = []
+
+    async def callback(stage, status, task_id):
+        events.append((stage, status))
+
+    results = await pipeline.process_batch(
+        contexts, status_callback=callback, staged=True
+    )
+
+    assert [r.success for r in results] == [True, False, True]
+    assert results[1].stages_completed == ["ocr"]
+    assert results[1].task.error_message == "translator boom"
+    assert ("inpainter", "start", "p1.png") not in log
+    assert ("failed", TaskStatus.FAILED) in events
+    assert events.count(("complete", TaskStatus.COMPLETED)) == 2
+
+
+@pytest.mark.asyncio
+async def test_process_batch_defaults_to_sequential_mode(tmp_path, monkeypatch):
+    monkeypatch.setenv("QUALITY_REPORT_DIR", str(tmp_path / "reports"))
+    monkeypatch.delenv("PIPELINE_STAGED_BATCH", raising=False)
+    pipeline = _pipeline([], delay=0.0)
+
+    results = await pipeline.process_batch([TaskContext(image_path="a.png")])
+
+    assert results[0].success
+    assert results[0].metrics.stage_queue_wait_ms == {}
@@ -0,0 +1,122 @@
+import asyncio
+import json
+import os
+import time
+from types import SimpleNamespace
+
+from app.routes.manga import get_chapter_details
+from core.metrics import PipelineMetrics
+from core.models import PipelineResult, RegionData, TaskContext
+from core.quality_index import QualityReportIndex, get_quality_index
+from core.quality_report import write_quality_report
+
+
+def _result(image_path, confidence=0.9):
+    ctx = TaskContext(
+        image_path=str(image_path),
+        target_language="zh-CN",
+        regions=[RegionData(source_text="Hi", target_text="嗨", confidence=confidence)],
+    )
+    return PipelineResult(
+        success=True,
+        task=ctx,
+        processing_time_ms=10,
+        stages_completed=["ocr"],
+        metrics=PipelineMetrics(total_duration_ms=10).to_dict(),
+    )
+
+
+def test_write_records_latest_summary_and_prunes_old_reports(tmp_path, monkeypatch):
+    report_dir = tmp_path / "reports"
+    monkeypatch.setenv("QUALITY_REPORT_DIR", str(report_dir))
+    monkeypatch.setenv("QUALITY_REPORT_KEEP_PER_PAGE", "2")
+    image = tmp_path / "data" / "raw" / "m1" / "c1" / "1.jpg"
+
+    paths = []
+    for confidence in (0.9, 0.9, 0.3):
+        paths.append(write_quality_report(_result(image, confidence)))
+        time.sleep(0.01)
+
+    index = get_quality_index(report_dir)
+    latest = index.latest_many(["m1__c1__1", "m1__c1__2"])
+    assert set(latest) == {"m1__c1__1"}
+    assert latest["m1__c1__1"]["summary"]["low_ocr"] == 1
+    assert latest["m1__c1__1"]["summary"]["regions"] == 1
+    assert not os.path.exists(paths[0])
+    assert all(os.path.exists(path) for path in paths[1:])
+    assert index.stats()["reports"] == 2
+
+
+def test_existing_json_reports_are_imported_once(tmp_path):
+    report_dir = tmp_path / "reports"
+    report_dir.mkdir()
+    old = report_dir / "m1__c1__1__old.json"
+    old.write_text(json.dumps({"regions": []}), encoding="utf-8")
+    os.utime(old, (time.time() - 60, time.time() - 60))
+    (report_dir / "m1__c1__1__new.json").write_text(
+        json.dumps({"regions": [{"quality_score": 0.2, "confidence": 0.9}]}),
+        encoding="utf-8",
+    )
+    (report_dir / "m1__c1__2__bad.json").write_text("{", encoding="utf-8")
+
+    index = get_quality_index(report_dir)
+    latest = index.latest_many(["m1__c1__1", "m1__c1__2"])
+
+    assert latest["m1__c1__1"]["summary"]["quality_scores"] == [0.2]
+    assert latest["m1__c1__2"]["summary"] is None
+    assert not index.needs_import()
+    assert index.import_json_reports(report_dir) == 0
+
+
+def test_first_open_prune_is_opt_in(tmp_path, monkeypatch):
+    monkeypatch.setenv("QUALITY_REPORT_KEEP_PER_PAGE", "1")
+    old_dir, swept_dir = tmp_path / "keep", tmp_path / "swept"
+    for report_dir in (old_dir, swept_dir):
+        report_dir.mkdir()
+        for name, age in (("old", 60), ("new", 0)):
+            path = report_dir / f"m1__c1__1__{name}.json"
+            path.write_text("{}", encoding="utf-8")
+            os.utime(path, (time.time() - age, time.time() - age))
+
+    get_quality_index(old_dir)
+    assert (old_dir / "m1__c1__1__old.json").exists()
+
+    monkeypatch.setenv("QUALITY_REPORT_PRUNE_ON_OPEN", "1")
+    get_quality_index(swept_dir)
+    assert not (swept_dir / "m1__c1__1__old.json").exists()
+    assert (swept_dir / "m1__c1__1__new.json").exists()
+
+
+def test_retention_keeps_latest_report_of_each_page(tmp_path):
+    index = QualityReportIndex(tmp_path / "idx.sqlite3", keep_per_page=0, retention_days=1)
+    old = time.time() - 3 * 86400
+    for name, created in (("a__x", old), ("a__y", old + 1), ("b__z", old)):
+        path = tmp_path / f"m__c__{name}.json"
+        path.write_text("{}", encoding="utf-8")
+        index.record(path, {"regions": []}, created_at=created)
+
+    assert index.prune() == 1
+    assert not (tmp_path / "m__c__a__x.json").exists()
+    assert (tmp_path / "m__c__a__y.json").exists()
+    assert (tmp_path / "m__c__b__z.json").exists()
+
+
+def test_chapter_details_reads_status_from_index(tmp_path, monkeypatch):
+    data_dir = tmp_path / "data" / "raw"
+    chapter_dir = data_dir / "manga-a" / "chapter-1"
+    chapter_dir.mkdir(parents=True)
+    for name in ("1.jpg", "2.jpg"):
+        (chapter_dir / name).write_bytes(b"img")
+    output_dir = tmp_path / "output"
+    report_dir = output_dir / "quality_reports"
+    monkeypatch.setenv("QUALITY_REPORT_DIR", str(report_dir))
+    monkeypatch.setenv("LOW_QUALITY_THRESHOLD", "0.7")
+    monkeypatch.setenv("LOW_QUALITY_RATIO", "0.3")
+    write_quality_report(_result(chapter_dir / "1.jpg", confidence=0.3))
+
+    settings = SimpleNamespace(data_dir=str(data_dir), output_dir=str(output_dir))
+    payload = asyncio.run(get_chapter_details("manga-a", "chapter-1", settings))
+
+    statuses = {page["name"]: page["status"] for page in payload["pages"]}
+    # 低置信度区域质量分数 < 0.7 -> warning；第二页没有报告 -> not_started
+    assert statuses == {"1.jpg": "warning", "2.jpg": "not_started"}
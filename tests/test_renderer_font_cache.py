@@ -0,0 +1,36 @@
+from core.models import Box2D
+from core.renderer import TextRenderer, glyph_advances, load_font
+
+
+def test_fonts_are_shared_across_renderers_and_sizes():
+    first = TextRenderer()
+    second = TextRenderer(font_path=first.font_path)
+    assert first._get_font(24) is second._get_font(24)
+    assert first._get_font(24) is not first._get_font(25)
+
+    before = load_font.cache_info()
+    first.fit_text_to_box(
+        "这是一个非常非常长的文本需要被缩小", Box2D(x1=0, y1=0, x2=120, y2=90)
+    )
+    first.fit_text_to_box(
+        "这是一个非常非常长的文本需要被缩小", Box2D(x1=0, y1=0, x2=120, y2=90)
+    )
+    after = load_font.cache_info()
+    # 第二次布局的所有字号都应命中缓存
+    assert after.hits > before.hits
+    assert after.misses - before.misses <= 32 - 16 + 1
+
+
+def test_wrap_text_measures_each_glyph_once():
+    renderer = TextRenderer()
+    font = renderer._get_font(20)
+    text = "你好世界，" * 40
+
+    lines = renderer.wrap_text(text, font, 120)
+
+    assert "".join(lines) == text
+    assert len(glyph_advances(font)) <= len(set(text))
+    assert all(not line.startswith("，") for line in lines[1:])
+    for line in lines:
+        width = sum(glyph_advances(font).advance(c) for c in line)
+        assert width <= 120 or len(line) == 1
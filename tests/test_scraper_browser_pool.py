@@ -0,0 +1,245 @@
+import os
+
+import pytest
+
+from scraper import browser_pool
+from scraper.base import ScraperConfig
+from scraper.browser_pool import BrowserPool, ContextSpec
+from scraper.implementations.generic_playwright import GenericPlaywrightScraper
+
+
+class _FakePage:
+    def __init__(self, context):
+        self.context = context
+
+    async def close(self):
+        self.context.pages.remove(self)
+
+
+class _FakeContext:
+    def __init__(self, browser, options):
+        self.browser = browser
+        self.options = options
+        self.pages = []
+        self.closed = False
+        self.init_scripts = []
+        self.cookies = []
+        self.saved = []
+        self.timeout = None
+
+    def on(self, event, handler):
+        pass
+
+    async def new_page(self):
+        page = _FakePage(self)
+        self.pages.append(page)
+        return page
+
+    async def add_init_script(self, script):
+        self.init_scripts.append(script)
+
+    def set_default_timeout(self, timeout):
+        self.timeout = timeout
+
+    async def add_cookies(self, cookies):
+        self.cookies.extend(cookies)
+
+    async def storage_state(self, path):
+        self.saved.append(path)
+        with open(path, "w", encoding="utf-8") as handle:
+            handle.write("{}")
+
+    async def close(self):
+        self.closed = True
+
+
+class _FakeBrowser:
+    def __init__(self):
+        self.contexts = []
+        self.connected = True
+
+    def is_connected(self):
+        return self.connected
+
+    async def new_context(self, **options):
+        context = _FakeContext(self, options)
+        self.contexts.append(context)
+        return context
+
+    async def close(self):
+        self.connected = False
+
+
+class _FakeChromium:
+    def __init__(self):
+        self.launches = []
+        self.persistent = []
+
+    async def launch(self, **kwargs):
+        self.launches.append(kwargs)
+        return _FakeBrowser()
+
+    async def launch_persistent_context(self, user_data_dir, **kwargs):
+        self.persistent.append(user_data_dir)
+        context = _FakeContext(None, kwargs)
+        return context
+
+
+class _FakePlaywright:
+    def __init__(self):
+        self.chromium = _FakeChromium()
+        self.stopped = False
+
+    async def stop(self):
+        self.stopped = True
+
+
+@pytest.fixture
+def fake_playwright(monkeypatch):
+    instances = []
+
+    class _Starter:
+        async def start(self):
+            playwright = _FakePlaywright()
+            instances.append(playwright)
+            return playwright
+
+    monkeypatch.setattr(browser_pool, "async_playwright", _Starter)
+    return instances
+
+
+@pytest.mark.asyncio
+async def test_lease_reuses_context_and_browser(fake_playwright):
+    pool = BrowserPool(max_idle=4, idle_sec=300, enabled=True)
+    spec = ContextSpec.build(extra_headers={"X-Test": "1"}, init_script="stealth")
+
+    async with pool.lease(spec) as first:
+        await first.new_page()
+    async with pool.lease(spec) as second:
+        pass
+
+    assert second is first
+    assert first.pages == []
+    assert first.init_scripts == ["stealth"]
+    stats = pool.stats()
+    assert (stats["hits"], stats["misses"], stats["browser_launches"]) == (1, 1, 1)
+    assert len(fake_playwright) == 1
+    await pool.aclose()
+    assert fake_playwright[0].stopped
+
+
+@pytest.mark.asyncio
+async def test_concurrent_leases_share_browser_not_context(fake_playwright):
+    pool = BrowserPool(max_idle=1, idle_sec=300, enabled=True)
+    spec = ContextSpec()
+
+    async with pool.lease(spec) as first:
+        async with pool.lease(spec) as second:
+            assert first is not second
+            assert first.browser is second.browser
+            assert pool.stats()["in_use"] == 2
+
+    stats = pool.stats()
+    assert stats["browser_launches"] == 1
+    assert stats["idle_contexts"] == 1
+    assert stats["evicted"] == 1
+    await pool.aclose()
+
+
+@pytest.mark.asyncio
+async def test_storage_state_changed_elsewhere_discards_idle_context(
+    fake_playwright, tmp_path
+):
+    state = tmp_path / "state.json"
+    pool = BrowserPool(max_idle=4, idle_sec=300, enabled=True)
+    spec = ContextSpec(storage_state_path=str(state), save_storage_state=True)
+
+    async with pool.lease(spec) as first:
+        assert "storage_state" not in first.options
+    assert first.saved == [str(state)]
+    async with pool.lease(spec) as second:
+        assert second is first
+
+    state.write_text('{"cookies": []}')
+    stat = state.stat()
+    os.utime(state, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+    async with pool.lease(spec) as third:
+        assert third is not first
+        assert third.options["storage_state"] == str(state)
+    assert first.closed
+    assert pool.stats()["stale"] == 1
+    await pool.aclose()
+
+
+@pytest.mark.asyncio
+async def test_reap_closes_idle_contexts_and_stops_driver(fake_playwright):
+    pool = BrowserPool(max_idle=4, idle_sec=10, enabled=True)
+    async with pool.lease(ContextSpec()) as context:
+        pass
+
+    last_used = max(entry.last_used for items in pool._idle.values() for entry in items)
+    await pool.reap(now=last_used + 11)
+
+    assert context.closed
+    assert pool.stats()["browsers"] == 0
+    assert fake_playwright[0].stopped
+    await pool.aclose()
+
+
+@pytest.mark.asyncio
+async def test_disabled_pool_closes_everything_after_lease(fake_playwright):
+    pool = BrowserPool(enabled=False)
+    async with pool.lease(ContextSpec()) as context:
+        pass
+
+    assert context.closed
+    assert fake_playwright[0].stopped
+    assert pool.stats()["browsers"] == 0
+
+
+@pytest.mark.asyncio
+async def test_persistent_profile_is_kept_per_directory(fake_playwright, tmp_path):
+    pool = BrowserPool(max_idle=4, idle_sec=300, enabled=True)
+    spec = ContextSpec(user_data_dir=str(tmp_path / "profile"))
+
+    async with pool.lease(spec) as first:
+        pass
+    async with pool.lease(spec) as second:
+        pass
+
+    assert first is second
+    assert fake_playwright[0].chromium.persistent == [str(tmp_path / "profile")]
+    assert pool.stats()["hits"] == 1
+    await pool.aclose()
+    assert first.closed
+
+
+@pytest.mark.asyncio
+async def test_scraper_leases_from_shared_pool(fake_playwright, monkeypatch, tmp_path):
+    pool = BrowserPool(max_idle=4, idle_sec=300, enabled=True)
+    monkeypatch.setattr(
+        "scraper.implementations.generic_playwright.get_browser_pool", lambda: pool
+    )
+    config = ScraperConfig(
+        base_url="https://example.com",
+        cookies={"session": "abc"},
+        storage_state_path=str(tmp_path / "state.json"),
+    )
+
+    # 每个 API 请求都会新建 scraper，上下文仍应复用
+    for _ in range(3):
+        scraper = GenericPlaywrightScraper(config)
+        async with scraper._browser_context() as context:
+            await context.new_page()
+
+    stats = pool.stats()
+    assert (stats["hits"], stats["misses"], stats["browser_launches"]) == (2, 1, 1)
+    assert context.cookies == [
+        {"name": "session", "value": "abc", "domain": "example.com", "path": "/"}
+    ]
+    assert context.options["user_agent"] in config.user_agents
+    assert context.timeout == config.timeout_ms
+    assert fake_playwright[0].chromium.launches[0]["args"] == [
+        "--disable-blink-features=AutomationControlled"
+    ]
+    await pool.aclose()
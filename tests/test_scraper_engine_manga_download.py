@@ -0,0 +1,130 @@
+import asyncio
+import json
+
+import pytest
+
+from scraper import EngineConfig, ScraperEngine
+from scraper.base import BaseScraper, Chapter, Manga, ScraperConfig
+from scraper.downloader import (
+    AsyncDownloader,
+    DownloadConfig,
+    DownloadItem,
+    DownloadReport,
+    PageRecord,
+    use_connection_budget,
+)
+from scraper.journal import JOURNAL_NAME
+
+
+class _FakeScraper(BaseScraper):
+    def __init__(self, chapters, fail=(), list_delay=0.0):
+        super().__init__(ScraperConfig(base_url="https://example.com"))
+        self.chapters = chapters
+        self.fail = set(fail)
+        self.list_delay = list_delay
+        self.list_calls = 0
+        self.downloaded = []
+        self.started_before_listing = []
+        self.listing_done = False
+        self.active = 0
+        self.max_active = 0
+
+    async def search_manga(self, keyword):
+        return []
+
+    async def get_chapters(self, manga):
+        self.list_calls += 1
+        await asyncio.sleep(self.list_delay)
+        self.listing_done = True
+        return list(self.chapters)
+
+    async def download_images(self, manga, chapter, output_root):
+        if not self.listing_done:
+            self.started_before_listing.append(chapter.id)
+        self.active += 1
+        self.max_active = max(self.max_active, self.active)
+        await asyncio.sleep(0.01)
+        self.active -= 1
+        if chapter.id in self.fail:
+            raise RuntimeError(f"boom {chapter.id}")
+        self.downloaded.append(chapter.id)
+        return DownloadReport(
+            manga_id=manga.id,
+            chapter_id=chapter.id,
+            output_dir=output_root,
+            manifest_path=output_root / "manifest.json",
+            pages=[PageRecord(index=1, url="u", path="p", ok=True)],
+        )
+
+
+def _chapters(count):
+    return [Chapter(id=f"c{i}", title=f"Chapter {i}", index=i) for i in range(count)]
+
+
+@pytest.mark.asyncio
+async def test_download_manga_runs_chapters_concurrently_in_order(tmp_path):
+    scraper = _FakeScraper(_chapters(6))
+    engine = ScraperEngine(
+        scraper, EngineConfig(output_root=tmp_path, chapter_concurrency=3)
+    )
+
+    reports = await engine.download_manga(Manga(id="m1", title="M1"))
+
+    assert [report.chapter_id for report in reports] == [f"c{i}" for i in range(6)]
+    assert scraper.max_active == 3
+    journal = json.loads((tmp_path / "m1" / JOURNAL_NAME).read_text())
+    assert {entry["status"] for entry in journal["chapters"].values()} == {"done"}
+
+
+@pytest.mark.asyncio
+async def test_interrupted_download_resumes_from_journal(tmp_path):
+    manga = Manga(id="m1", title="M1")
+    first = _FakeScraper(_chapters(5), fail={"c3"})
+    engine = ScraperEngine(first, EngineConfig(output_root=tmp_path))
+
+    with pytest.raises(RuntimeError, match="boom c3"):
+        await engine.download_manga(manga)
+    journal = json.loads((tmp_path / "m1" / JOURNAL_NAME).read_text())
+    assert journal["chapters"]["c3"]["status"] == "failed"
+
+    second = _FakeScraper(_chapters(6), list_delay=0.05)
+    reports = await ScraperEngine(second, EngineConfig(output_root=tmp_path)).download_manga(
+        manga
+    )
+
+    # 只补下失败章节与新章节；失败章节在重新列目录完成前就已开始
+    assert sorted(second.downloaded) == ["c3", "c5"]
+    assert second.started_before_listing == ["c3"]
+    assert [report.chapter_id for report in reports] == ["c3", "c5"]
+
+
+@pytest.mark.asyncio
+async def test_connection_budget_caps_fetches_across_chapters(tmp_path):
+    downloader = AsyncDownloader(DownloadConfig(concurrency=4, rate_limit_rps=1000))
+    in_flight = 0
+    peak = 0
+
+    async def fake_fetch(session, url, headers, referer, file_path):
+        nonlocal in_flight, peak
+        in_flight += 1
+        peak = max(peak, in_flight)
+        await asyncio.sleep(0.01)
+        in_flight -= 1
+        file_path.write_bytes(b"img")
+        return 3
+
+    downloader._fetch_to_file = fake_fetch
+    manga = Manga(id="m1", title="M1")
+
+    async def chapter(idx):
+        out = tmp_path / f"c{idx}"
+        items = [DownloadItem(index=i, url=f"https://x/{idx}/{i}") for i in range(6)]
+        return await downloader.download_all(
+            items, manga, Chapter(id=f"c{idx}", title="c"), out, out / "manifest.json"
+        )
+
+    with use_connection_budget(3):
+        reports = await asyncio.gather(*(chapter(i) for i in range(3)))
+
+    assert all(report.success_count == 6 for report in reports)
+    assert peak == 3
@@ -0,0 +1,128 @@
+import asyncio
+import time
+from email.utils import formatdate
+
+import pytest
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+
+from scraper.base import Chapter, Manga
+from scraper.downloader import AsyncDownloader, DownloadConfig, DownloadItem
+from scraper.rate_limit import (
+    HostRateLimiters,
+    RequestRateLimiter,
+    parse_retry_after,
+)
+
+JPEG = b"\xff\xd8\xff\xe0" + b"\x00" * 64 + b"\xff\xd9"
+
+
+@pytest.mark.asyncio
+async def test_burst_is_free_then_paced():
+    limiter = RequestRateLimiter(20, burst=3)
+    started = time.monotonic()
+    for _ in range(3):
+        await limiter.acquire()
+    assert time.monotonic() - started < 0.03
+
+    await limiter.acquire()
+    await limiter.acquire()
+    assert time.monotonic() - started >= 0.08
+
+
+@pytest.mark.asyncio
+async def test_concurrent_callers_do_not_serialize_sleeps():
+    limiter = RequestRateLimiter(50, burst=1)
+    started = time.monotonic()
+    await asyncio.gather(*(limiter.acquire() for _ in range(6)))
+    elapsed = time.monotonic() - started
+    # 6 个请求按 20ms 间隔放行，总耗时约 100ms 而不是逐个排队叠加
+    assert 0.08 <= elapsed < 0.2
+
+
+def test_throttle_halves_rate_and_success_recovers():
+    limiter = RequestRateLimiter(4, burst=2)
+    limiter.on_status(429)
+    assert limiter.rate_rps == 2
+    limiter.on_status(503)
+    assert limiter.rate_rps == 1
+    for _ in range(5):
+        limiter.on_status(200)
+    assert limiter.rate_rps == pytest.approx(3.0)
+    for _ in range(5):
+        limiter.on_status(200)
+    assert limiter.rate_rps == 4
+    assert limiter.stats()["throttled"] == 2
+
+
+@pytest.mark.asyncio
+async def test_retry_after_pauses_the_host():
+    limiter = RequestRateLimiter(100, burst=10)
+    limiter.on_status(429, retry_after=0.1)
+    started = time.monotonic()
+    await limiter.acquire()
+    assert time.monotonic() - started >= 0.09
+
+
+def test_parse_retry_after_seconds_and_http_date():
+    assert parse_retry_after("3") == 3.0
+    assert parse_retry_after(None) is None
+    assert parse_retry_after("soon") is None
+    delta = parse_retry_after(formatdate(time.time() + 30, usegmt=True))
+    assert 25 <= delta <= 31
+
+
+def test_registry_shares_site_limiter_and_isolates_hosts(monkeypatch):
+    monkeypatch.setenv("SCRAPER_CDN_RPS", "12")
+    monkeypatch.setenv("SCRAPER_CDN_BURST", "5")
+    limiters = HostRateLimiters()
+    site = limiters.configure("https://Example.com/manga", 1.5)
+
+    assert limiters.for_url("https://example.com/cover.jpg") is site
+    assert limiters.configure("https://example.com", 2.0) is site
+    assert site.rate_rps == 2.0
+
+    cdn = limiters.for_url("https://i0.wp.com/example.com/a.jpg")
+    assert cdn is not site
+    assert cdn.stats()["base_rps"] == 12
+    assert cdn.stats()["burst"] == 5
+    cdn.on_status(429)
+    assert site.rate_rps == 2.0
+    assert set(limiters.stats()) == {"example.com", "i0.wp.com"}
+
+
+@pytest.mark.asyncio
+async def test_downloader_backs_off_on_429_and_retries(tmp_path):
+    calls = []
+
+    async def page(request):
+        calls.append(time.monotonic())
+        if len(calls) == 1:
+            return web.Response(status=429, headers={"Retry-After": "0.1"})
+        return web.Response(body=JPEG, content_type="image/jpeg")
+
+    app = web.Application()
+    app.router.add_get("/1.jpg", page)
+    limiters = HostRateLimiters()
+    async with TestServer(app) as server:
+        url = str(server.make_url("/1.jpg"))
+        site = limiters.configure("https://site.example", 1000)
+        downloader = AsyncDownloader(
+            DownloadConfig(max_retries=2, rate_limit_rps=1000),
+            request_limiter=site,
+            host_limiters=limiters,
+        )
+        report = await downloader.download_all(
+            [DownloadItem(index=1, url=url, filename="1.jpg")],
+            Manga(id="m", title="m"),
+            Chapter(id="c", title="c"),
+            tmp_path,
+            tmp_path / "manifest.json",
+        )
+
+    assert report.pages[0].ok
+    assert len(calls) == 2
+    assert calls[1] - calls[0] >= 0.09
+    cdn = limiters.for_url(url)
+    assert cdn.stats()["throttled"] == 1
+    assert site.stats()["throttled"] == 0
@@ -0,0 +1,158 @@
+import pytest
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+
+from scraper.base import Chapter, Manga
+from scraper.downloader import (
+    AsyncDownloader,
+    DownloadConfig,
+    DownloadItem,
+    is_complete_image,
+)
+
+JPEG = b"\xff\xd8\xff\xe0" + bytes(range(256)) * 40 + b"\xff\xd9"
+
+
+ETAG = '"v1"'
+
+
+def _make_app(seen_ranges, seen_if_range=None, range_shift=0):
+    async def page(request):
+        seen_ranges.append(request.headers.get("Range"))
+        if seen_if_range is not None:
+            seen_if_range.append(request.headers.get("If-Range"))
+        header = request.headers.get("Range")
+        if header:
+            start = int(header[len("bytes=") : -1]) + range_shift
+            return web.Response(
+                status=206,
+                body=JPEG[start:],
+                headers={
+                    "Content-Range": f"bytes {start}-{len(JPEG) - 1}/{len(JPEG)}",
+                    "ETag": ETAG,
+                },
+            )
+        return web.Response(body=JPEG, content_type="image/jpeg", headers={"ETag": ETAG})
+
+    async def html(request):
+        return web.Response(text="<html>just a moment...</html>", content_type="text/html")
+
+    app = web.Application()
+    app.router.add_get("/page.jpg", page)
+    app.router.add_get("/challenge.jpg", html)
+    return app
+
+
+async def _download(server, tmp_path, path, name="1.jpg"):
+    downloader = AsyncDownloader(
+        DownloadConfig(max_retries=0, rate_limit_rps=1000, chunk_size=512)
+    )
+    report = await downloader.download_all(
+        [DownloadItem(index=1, url=str(server.make_url(path)), filename=name)],
+        Manga(id="m", title="m"),
+        Chapter(id="c", title="c"),
+        tmp_path,
+        tmp_path / "manifest.json",
+    )
+    return report.pages[0]
+
+
+@pytest.mark.asyncio
+async def test_streams_to_disk_and_renames_atomically(tmp_path):
+    seen = []
+    async with TestServer(_make_app(seen)) as server:
+        record = await _download(server, tmp_path, "/page.jpg")
+
+    assert record.ok
+    assert (tmp_path / "1.jpg").read_bytes() == JPEG
+    assert not (tmp_path / "1.jpg.part").exists()
+    assert seen == [None]
+
+
+@pytest.mark.asyncio
+async def test_partial_file_is_resumed_with_range(tmp_path):
+    (tmp_path / "1.jpg.part").write_bytes(JPEG[:3000])
+    seen = []
+    async with TestServer(_make_app(seen)) as server:
+        record = await _download(server, tmp_path, "/page.jpg")
+
+    assert record.ok
+    assert seen == ["bytes=3000-"]
+    assert (tmp_path / "1.jpg").read_bytes() == JPEG
+
+
+@pytest.mark.asyncio
+async def test_truncated_existing_page_is_downloaded_again(tmp_path):
+    (tmp_path / "1.jpg").write_bytes(JPEG[:2000])
+    assert not is_complete_image(tmp_path / "1.jpg")
+    seen = []
+    async with TestServer(_make_app(seen)) as server:
+        record = await _download(server, tmp_path, "/page.jpg")
+
+    assert record.ok
+    assert seen == [None]
+    assert is_complete_image(tmp_path / "1.jpg")
+
+
+@pytest.mark.asyncio
+async def test_non_image_response_is_rejected(tmp_path):
+    async with TestServer(_make_app([])) as server:
+        record = await _download(server, tmp_path, "/challenge.jpg")
+
+    assert not record.ok
+    assert "not a complete image" in (record.error or "")
+    assert not (tmp_path / "1.jpg").exists()
+    assert not (tmp_path / "1.jpg.part").exists()
+
+
+@pytest.mark.asyncio
+async def test_resume_sends_validator_of_the_original_response(tmp_path):
+    (tmp_path / "1.jpg.part").write_bytes(JPEG[:3000])
+    (tmp_path / "1.jpg.part.validator").write_text(ETAG)
+    seen, if_range = [], []
+    async with TestServer(_make_app(seen, if_range)) as server:
+        record = await _download(server, tmp_path, "/page.jpg")
+
+    assert record.ok
+    assert if_range == [ETAG]
+    assert not (tmp_path / "1.jpg.part.validator").exists()
+
+
+@pytest.mark.asyncio
+async def test_mismatched_content_range_discards_part(tmp_path):
+    (tmp_path / "1.jpg.part").write_bytes(JPEG[:3000])
+    (tmp_path / "1.jpg.part.validator").write_text(ETAG)
+    async with TestServer(_make_app([], range_shift=100)) as server:
+        record = await _download(server, tmp_path, "/page.jpg")
+
+    assert not record.ok
+    assert "Content-Range" in (record.error or "")
+    assert not (tmp_path / "1.jpg.part").exists()
+    assert not (tmp_path / "1.jpg.part.validator").exists()
+
+
+@pytest.mark.asyncio
+async def test_incomplete_page_is_kept_when_refetch_fails(tmp_path):
+    truncated = JPEG[:2000]
+    (tmp_path / "1.jpg").write_bytes(truncated)
+    async with TestServer(_make_app([])) as server:
+        record = await _download(server, tmp_path, "/challenge.jpg")
+
+    # 新副本没通过校验：原页保留，不会先删后下
+    assert not record.ok
+    assert (tmp_path / "1.jpg").read_bytes() == truncated
+    assert not (tmp_path / "1.jpg.part").exists()
+
+
+def test_completeness_check_tolerates_padding_and_unknown_formats(tmp_path):
+    padded = tmp_path / "padded.jpg"
+    padded.write_bytes(JPEG + b"\x00" * 200)
+    assert is_complete_image(padded)
+
+    unknown = tmp_path / "page.jxl"
+    unknown.write_bytes(b"\xff\x0a" + bytes(range(256)) * 4)
+    assert is_complete_image(unknown)
+
+    html = tmp_path / "challenge.jpg"
+    html.write_bytes(b"\n  <!DOCTYPE html><html><body>just a moment</body></html>")
+    assert not is_complete_image(html)
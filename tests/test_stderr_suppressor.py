@@ -29,3 +29,22 @@ def test_suppress_native_stderr_preserves_inner_exception_when_restore_fails(mon
     with pytest.raises(RuntimeError, match="boom"):
         with suppress_native_stderr():
             raise RuntimeError("boom")
+
+
+def test_suppress_native_stderr_restores_under_lock(monkeypatch):
+    import core.utils.stderr_suppressor as suppressor_mod
+
+    real_dup2 = suppressor_mod.os.dup2
+    held = []
+
+    def recording_dup2(src, dst):
+        held.append(suppressor_mod._lock.locked())
+        return real_dup2(src, dst)
+
+    monkeypatch.setattr(suppressor_mod.os, "dup2", recording_dup2)
+
+    with suppress_native_stderr():
+        pass
+
+    # 进入与恢复两次 dup2 都必须在锁内，避免并发 _acquire 保存到 /dev/null
+    assert held and all(held)
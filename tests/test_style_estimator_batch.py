@@ -0,0 +1,50 @@
+from collections import Counter
+
+import numpy as np
+
+from core.models import Box2D
+from core.renderer import StyleEstimator, _quantized_mode_bgr
+
+
+def _counter_mode(pixels: np.ndarray) -> tuple[int, int, int]:
+    quantized = (pixels // 16) * 16
+    return tuple(int(v) for v in Counter(tuple(p) for p in quantized).most_common(1)[0][0])
+
+
+def test_quantized_mode_matches_counter_including_ties():
+    rng = np.random.default_rng(7)
+    for _ in range(20):
+        pixels = rng.integers(0, 256, size=(int(rng.integers(1, 300)), 3), dtype=np.uint8)
+        assert _quantized_mode_bgr(pixels) == _counter_mode(pixels)
+    tie = np.array([[200, 10, 10], [10, 10, 200], [200, 10, 10], [10, 10, 200]], dtype=np.uint8)
+    assert _quantized_mode_bgr(tie) == _counter_mode(tie) == (192, 0, 0)
+
+
+def test_estimate_styles_matches_per_region_calls():
+    rng = np.random.default_rng(3)
+    image = np.full((200, 300, 3), 240, dtype=np.uint8)
+    image[20:60, 20:120] = rng.integers(0, 90, size=(40, 100, 3), dtype=np.uint8)
+    image[100:180, 150:290] = 30
+    image[120:140, 170:260] = (250, 220, 200)
+    boxes = [
+        Box2D(x1=10, y1=10, x2=130, y2=70),
+        Box2D(x1=150, y1=100, x2=290, y2=180),
+        Box2D(x1=0, y1=0, x2=5, y2=5),
+        Box2D(x1=400, y1=400, x2=450, y2=450),
+    ]
+    estimator = StyleEstimator()
+
+    styles = estimator.estimate_styles(
+        image, boxes, text_lengths=[12, 0, 3, 5], line_spacing=1.2
+    )
+
+    assert len(styles) == len(boxes)
+    for box, style, length in zip(boxes, styles, [12, 0, 3, 5]):
+        assert style.text_color == estimator.estimate_text_color(image, box)
+        assert style.needs_stroke == estimator.needs_stroke(image, box)
+        if length:
+            assert style.font_size == estimator.estimate_font_size(box, length, line_spacing=1.2)
+        else:
+            assert style.font_size is None
+    assert styles[1].needs_stroke is True
+    assert styles[1].text_color == "#c0d0f0"
@@ -20,3 +20,4 @@ def test_system_runtime_endpoint_has_expected_sections():
         assert "model_registry" in payload
         assert "paths" in payload
         assert "ocr" in payload["settings"]
+        assert "ocr_result_cache" in payload
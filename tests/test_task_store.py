@@ -0,0 +1,172 @@
+from __future__ import annotations
+
+from pathlib import Path
+from types import SimpleNamespace
+
+from fastapi.testclient import TestClient
+
+from app.deps import get_pipeline, get_settings
+from app.main import app
+from app.routes import translate as translate_routes
+from app.services import task_store as task_store_module
+from app.services.task_store import TaskStore
+from core.models import PipelineResult, TaskContext, TaskStatus
+
+
+def _run_stages(store, task_id, stages, start=1000.0, step=1.0):
+    store.record_stage(task_id, "init", TaskStatus.PROCESSING, at=start)
+    at = start
+    for stage in stages:
+        at += step
+        store.record_stage(task_id, stage, TaskStatus.PROCESSING, at=at)
+    return at
+
+
+def test_progress_and_eta_follow_rolling_stage_latency(tmp_path: Path):
+    store = TaskStore(tmp_path / "tasks.sqlite3")
+    # 历史任务：OCR 1s，翻译 3s，其余阶段 1s
+    for _ in range(3):
+        done = TaskContext(image_path="x.jpg")
+        store.record_stage(done.task_id, "init", TaskStatus.PROCESSING, at=0.0)
+        for stage, at in (("ocr", 1), ("translator", 4), ("inpainter", 5), ("renderer", 6), ("upscaler", 7)):
+            store.record_stage(done.task_id, stage, TaskStatus.PROCESSING, at=at)
+        store.record_stage(done.task_id, "complete", TaskStatus.COMPLETED, at=7.0)
+
+    task = TaskContext(image_path="y.jpg")
+    store.upsert_task(task, {"manga_id": "m", "chapter_id": "c", "image_name": "1.jpg"})
+    store.record_stage(task.task_id, "init", TaskStatus.PROCESSING, at=100.0)
+    store.record_stage(task.task_id, "ocr", TaskStatus.PROCESSING, at=101.0)
+
+    latency = store.stage_latency()
+    assert latency["translator"]["p50_ms"] == 3000.0
+    row = store._rows("WHERE task_id = ?", (str(task.task_id),))[0]
+    progress, eta = store._estimate(row, latency, now=102.5)
+    # (1s OCR + 1.5s 翻译) / 7s
+    assert abs(progress - 2.5 / 7) < 1e-6
+    assert abs(eta - 4.5) < 1e-6
+
+    snapshot = store.get(task.task_id)
+    assert snapshot["chapter_id"] == "c"
+    assert snapshot["stage"] == "ocr"
+    assert snapshot["stage_timings_ms"] == {"ocr": 1000.0}
+
+
+def test_failed_task_keeps_completed_fraction(tmp_path: Path):
+    store = TaskStore(tmp_path / "tasks.sqlite3")
+    task = TaskContext(image_path="x.jpg")
+    _run_stages(store, task.task_id, ["ocr", "translator"])
+    store.record_stage(task.task_id, "failed", TaskStatus.FAILED, at=1003.0)
+
+    snapshot = store.get(task.task_id)
+    assert snapshot["status"] == "failed"
+    assert snapshot["stage"] == "translator"
+    assert snapshot["progress"] == 0.4
+    assert snapshot["eta_seconds"] is None
+
+
+def test_latency_window_keeps_recent_samples(tmp_path: Path):
+    store = TaskStore(tmp_path / "tasks.sqlite3", latency_window=2)
+    for step in (10.0, 1.0, 1.0):
+        task = TaskContext(image_path="x.jpg")
+        _run_stages(store, task.task_id, ["ocr"], step=step)
+    assert store.stage_latency()["ocr"] == {"p50_ms": 1000.0, "p90_ms": 1000.0, "samples": 2}
+
+
+class _StagedPipeline:
+    async def process(self, context: TaskContext, status_callback=None):
+        await status_callback("init", TaskStatus.PROCESSING, context.task_id)
+        await status_callback("ocr", TaskStatus.PROCESSING, context.task_id)
+        context.update_status(TaskStatus.COMPLETED)
+        await status_callback("complete", TaskStatus.COMPLETED, context.task_id)
+        return PipelineResult(success=True, task=context, processing_time_ms=1)
+
+
+def test_task_status_survives_losing_the_in_process_store(tmp_path: Path):
+    img = tmp_path / "1.png"
+    img.write_bytes(b"img")
+    app.dependency_overrides[get_pipeline] = lambda: _StagedPipeline()
+    app.dependency_overrides[get_settings] = lambda: SimpleNamespace(
+        source_language="korean",
+        target_language="zh",
+        data_dir=str(tmp_path),
+        output_dir=str(tmp_path / "out"),
+    )
+    try:
+        client = TestClient(app)
+        task_id = client.post(
+            "/api/v1/translate/image", json={"image_path": str(img)}
+        ).json()["task_id"]
+        # 模拟重启 / 另一个 worker：进程内缓存为空
+        translate_routes._tasks.clear()
+
+        response = client.get(f"/api/v1/translate/task/{task_id}")
+        assert response.status_code == 200
+        body = response.json()
+        assert body["status"] == "completed"
+        assert body["progress"] == 1.0
+        assert body["stage_timings_ms"].keys() == {"ocr"}
+    finally:
+        translate_routes._tasks.clear()
+        app.dependency_overrides = {}
+
+
+def test_chapter_progress_aggregates_pages(tmp_path: Path):
+    store = TaskStore(tmp_path / "tasks.sqlite3")
+    meta = {"manga_id": "m", "chapter_id": "c"}
+    first = TaskContext(image_path="1.jpg", status=TaskStatus.COMPLETED)
+    second = TaskContext(image_path="2.jpg")
+    store.upsert_task(first, {**meta, "image_name": "1.jpg"})
+    store.upsert_task(second, {**meta, "image_name": "2.jpg"})
+
+    progress = store.chapter_progress("m", "c")
+    assert progress["total"] == 2
+    assert progress["completed"] == 1
+    assert progress["pending"] == 1
+    assert progress["progress"] == 0.5
+    assert store.chapter_progress("m", "other") is None
+
+
+def test_unfinished_tasks_are_marked_interrupted_on_startup(tmp_path: Path):
+    store = TaskStore(tmp_path / "tasks.sqlite3")
+    stale = TaskContext(image_path="x.jpg")
+    _run_stages(store, stale.task_id, ["ocr"], start=1000.0)
+    live = TaskContext(image_path="y.jpg")
+    store.record_stage(live.task_id, "init", TaskStatus.PROCESSING)
+    done = TaskContext(image_path="z.jpg")
+    _run_stages(store, done.task_id, ["ocr"], start=1000.0)
+    store.record_stage(done.task_id, "complete", TaskStatus.COMPLETED, at=1002.0)
+
+    assert store.mark_interrupted(600) == 1
+
+    snapshot = store.get(stale.task_id)
+    assert snapshot["status"] == "failed"
+    assert "interrupted" in snapshot["error_message"]
+    assert store.get(live.task_id)["status"] == "processing"
+    assert store.get(done.task_id)["status"] == "completed"
+
+
+def test_ttl_sweep_is_rate_limited_but_max_tasks_still_holds(tmp_path: Path, monkeypatch):
+    store = TaskStore(tmp_path / "tasks.sqlite3")
+    for _ in range(3):
+        store.upsert_task(TaskContext(image_path="x.jpg"))
+    assert store.maybe_prune(max_tasks=2, ttl_seconds=3600) == 1
+
+    # 间隔内：TTL 过期的任务留到下一次清理，数量上限照常生效
+    monkeypatch.setattr(task_store_module.time, "time", lambda: 10**10)
+    store._last_prune = 10**10
+    assert store.maybe_prune(max_tasks=2, ttl_seconds=60) == 0
+    store.upsert_task(TaskContext(image_path="y.jpg"))
+    assert store.maybe_prune(max_tasks=2, ttl_seconds=60) == 1
+    assert len(store._rows("", ())) == 2
+
+
+def test_task_status_falls_back_to_in_process_tasks(tmp_path: Path):
+    task = TaskContext(image_path="x.jpg")
+    task.update_status(TaskStatus.COMPLETED)
+    translate_routes._tasks[task.task_id] = task
+    try:
+        response = TestClient(app).get(f"/api/v1/translate/task/{task.task_id}")
+        assert response.status_code == 200
+        assert response.json()["status"] == "completed"
+    finally:
+        translate_routes._tasks.clear()
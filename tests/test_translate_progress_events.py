@@ -38,3 +38,37 @@ async def test_pipeline_status_callback_includes_chapter_metadata(monkeypatch):
     assert event["chapter_id"] == "chapter-1"
     assert event["image_name"] == "1.jpg"
     assert event["stage"] == "translator"
+
+
+@pytest.mark.asyncio
+async def test_stage_events_are_written_off_the_page_path(monkeypatch):
+    import threading
+
+    from app.services.task_store import get_task_store
+    from core.artifact_sink import get_artifact_sink
+
+    async def _fake_broadcast(payload: dict):
+        return None
+
+    monkeypatch.setattr(translate_routes, "broadcast_event", _fake_broadcast)
+    store = get_task_store()
+    release = threading.Event()
+    recorded = []
+    real_record = store.record_stage
+
+    def _slow_record(*args):
+        release.wait(5)
+        recorded.append(args[1])
+        return real_record(*args)
+
+    monkeypatch.setattr(store, "record_stage", _slow_record)
+    task_id = uuid4()
+
+    # 写库阻塞时回调也立即返回：阶段事件不计入页面耗时
+    await translate_routes.pipeline_status_callback("init", TaskStatus.PROCESSING, task_id)
+    await translate_routes.pipeline_status_callback("ocr", TaskStatus.PROCESSING, task_id)
+    assert recorded == []
+
+    release.set()
+    assert get_artifact_sink().flush(5)
+    assert recorded == ["init", "ocr"]
@@ -0,0 +1,123 @@
+import asyncio
+import re
+
+import core.translation_batching as tb
+from core.translation_batching import LatencyModel, estimate_tokens, plan_batch
+
+
+def test_estimate_tokens_counts_wide_chars_individually():
+    assert estimate_tokens("") == 0
+    assert estimate_tokens("안녕하세요") == 5
+    assert estimate_tokens("hello world!") == 3
+
+
+def test_latency_model_learns_linear_fit():
+    model = LatencyModel()
+    assert model.predict(100) == 1500 + 10 * 100
+    for tokens in (50, 100, 200, 400, 800, 1600):
+        model.observe(tokens, 800 + 2 * tokens)
+    assert model.samples == 6
+    assert abs(model.base_ms - 800) < 1e-6
+    assert abs(model.ms_per_token - 2) < 1e-6
+    # 无效样本被忽略
+    model.observe(0, 100)
+    model.observe(10, -1)
+    assert model.samples == 6
+
+
+def test_plan_keeps_small_pages_whole():
+    pairs = [(i, "짧은 대사") for i in range(5)]
+    plan = plan_batch(
+        pairs, [5] * 5, LatencyModel(), max_items=200, max_concurrency=2, slice_penalty_ms=600
+    )
+    assert plan.slices == [pairs]
+    assert plan.concurrency == 1
+
+
+def test_plan_splits_heavy_pages_and_respects_token_budget():
+    pairs = [(i, "가" * 40) for i in range(30)]
+    tokens = [40] * 30
+    plan = plan_batch(
+        pairs, tokens, LatencyModel(), max_items=200, max_concurrency=2, slice_penalty_ms=600
+    )
+    assert len(plan.slices) == 2
+    assert plan.concurrency == 2
+    assert [p for s in plan.slices for p in s] == pairs
+
+    budgeted = plan_batch(
+        pairs,
+        tokens,
+        LatencyModel(),
+        max_items=200,
+        max_concurrency=2,
+        token_budget=300,
+        slice_penalty_ms=600,
+    )
+    assert len(budgeted.slices) >= 4
+    assert all(len(s) * 40 <= 320 for s in budgeted.slices)
+
+
+def test_translate_batch_uses_adaptive_plan(monkeypatch):
+    monkeypatch.setenv("AI_PROVIDER", "ppio")
+    monkeypatch.setenv("PPIO_API_KEY", "dummy")
+    monkeypatch.setenv("AI_TRANSLATE_ADAPTIVE_BATCH", "1")
+    monkeypatch.setenv("AI_TRANSLATE_BATCH_TOKEN_BUDGET", "100")
+    monkeypatch.setattr(tb, "_models", {})
+
+    from core.ai_translator import AITranslator
+
+    monkeypatch.setattr(AITranslator, "_init_ppio", lambda self: None)
+    translator = AITranslator(model="glm-4-flash-250414", source_lang="ko", target_lang="zh")
+    prompts = []
+
+    async def fake_call_api(prompt: str, max_tokens: int = 2000) -> str:
+        items = re.findall(r"^(\d+)\. ([가-힣].*)$", prompt, flags=re.M)
+        prompts.append(len(items))
+        return "\n".join(f"{idx}. 译文{text.count('가')}" for idx, text in items)
+
+    translator._call_api = fake_call_api
+    texts = ["가" * (i + 20) for i in range(8)]
+
+    result = asyncio.run(translator.translate_batch(texts))
+
+    assert result == [f"译文{i + 20}" for i in range(8)]
+    metrics = translator.last_metrics
+    assert metrics["batch_plan_slices"] == len(prompts) > 1
+    assert sum(prompts) == 8
+    assert metrics["batch_plan_tokens"] == sum(len(t) for t in texts)
+    assert tb.get_latency_model("ppio", "glm-4-flash-250414").samples == len(prompts)
+
+
+def test_latency_sample_excludes_global_semaphore_wait(monkeypatch):
+    monkeypatch.setenv("AI_PROVIDER", "ppio")
+    monkeypatch.setenv("PPIO_API_KEY", "dummy")
+    monkeypatch.setenv("AI_TRANSLATE_MAX_INFLIGHT_CALLS", "1")
+    monkeypatch.setattr(tb, "_models", {})
+
+    import core.ai_translator as ai_mod
+    from core.ai_translator import AITranslator
+
+    # 信号量绑定事件循环：测试结束后恢复，避免泄漏到其他测试
+    monkeypatch.setattr(ai_mod, "_GLOBAL_API_SEMAPHORE", None)
+    monkeypatch.setattr(ai_mod, "_GLOBAL_API_SEMAPHORE_LIMIT", None)
+    monkeypatch.setattr(AITranslator, "_init_ppio", lambda self: None)
+    translator = AITranslator(model="glm-4-flash-250414", source_lang="ko", target_lang="zh")
+
+    async def fake_call_api(prompt: str, max_tokens: int = 2000) -> str:
+        return "1. 译文"
+
+    translator._call_api = fake_call_api
+
+    async def run():
+        sem = ai_mod._get_global_api_semaphore()
+        await sem.acquire()
+        task = asyncio.create_task(translator.translate_batch(["가나다"]))
+        await asyncio.sleep(0.2)
+        sem.release()
+        return await task
+
+    assert asyncio.run(run()) == ["译文"]
+    model = tb.get_latency_model("ppio", "glm-4-flash-250414")
+    # 样本只含 provider 调用本身，不含 200ms 的信号量排队
+    assert model.samples == 1
+    assert model._samples[0][1] < 100
@@ -0,0 +1,75 @@
+import asyncio
+import re
+
+from core.translation_memory import TranslationMemory, build_memory_key
+
+_ZH = {"안녕": "你好", "뭐야": "什么", "누구": "谁"}
+
+
+def _make_translator(monkeypatch, tmp_path):
+    monkeypatch.setenv("AI_PROVIDER", "ppio")
+    monkeypatch.setenv("PPIO_API_KEY", "dummy")
+    monkeypatch.setenv("TRANSLATION_MEMORY_ENABLE", "1")
+    monkeypatch.setenv("TRANSLATION_MEMORY_PATH", str(tmp_path / "tm.sqlite3"))
+
+    from core.ai_translator import AITranslator
+
+    monkeypatch.setattr(AITranslator, "_init_ppio", lambda self: None)
+    translator = AITranslator(model="glm-4-flash-250414", source_lang="ko", target_lang="zh")
+    prompts = []
+
+    async def fake_call_api(prompt: str, max_tokens: int = 2000) -> str:
+        prompts.append(prompt)
+        items = re.findall(r"^(\d+)\. ([가-힣].*)$", prompt, flags=re.M)
+        return "\n".join(f"{idx}. {_ZH[text.strip()]}" for idx, text in items)
+
+    translator._call_api = fake_call_api
+    return translator, prompts
+
+
+def test_translate_batch_sends_only_memory_misses(monkeypatch, tmp_path):
+    translator, prompts = _make_translator(monkeypatch, tmp_path)
+
+    first = asyncio.run(translator.translate_batch(["안녕", "뭐야"]))
+    assert first == ["你好", "什么"]
+    assert translator.last_metrics["memory_hits"] == 0
+    assert translator.last_metrics["memory_misses"] == 2
+
+    second = asyncio.run(translator.translate_batch(["  안녕 ", "누구"]))
+    assert second == ["你好", "谁"]
+    assert "안녕" not in prompts[-1]
+    assert translator.last_metrics["memory_hits"] == 1
+    assert translator.last_metrics["memory_hit_rate"] == 0.5
+
+    calls_before = len(prompts)
+    third = asyncio.run(translator.translate_batch(["안녕", "뭐야"]))
+    assert third == ["你好", "什么"]
+    assert len(prompts) == calls_before
+    assert translator.last_metrics["api_calls"] == 0
+
+    translator.forget_translations(["뭐야"])
+    asyncio.run(translator.translate_batch(["뭐야"]))
+    assert len(prompts) == calls_before + 1
+
+
+def test_translation_memory_ttl_and_lru(tmp_path):
+    memory = TranslationMemory(tmp_path / "tm.sqlite3", ttl_seconds=0, max_entries=2)
+    memory.put_many({"a": "A"})
+    memory.put_many({"b": "B"})
+    assert memory.get_many(["a"]) == {"a": "A"}  # refresh a; b is now LRU
+    memory.put_many({"c": "C"})
+    assert memory.get_many(["a", "b", "c"]) == {"a": "A", "c": "C"}
+
+    memory.ttl_seconds = 1e-9
+    assert memory.get_many(["a"]) == {}
+    assert len(memory) == 1
+    memory.close()
+
+
+def test_memory_key_separates_context_and_model():
+    base = dict(source_lang="ko", target_lang="zh", provider="ppio", model="m", prompt_version="v1")
+    key = build_memory_key("hi  there", "", **base)
+    assert key == build_memory_key(" hi there ", "", **base)
+    assert key != build_memory_key("hi there", "prev line", **base)
+    assert key != build_memory_key("hi there", "", **{**base, "model": "other"})
+    assert key != build_memory_key("hi there", "", output_format="json", **base)
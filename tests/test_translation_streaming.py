@@ -0,0 +1,145 @@
+import asyncio
+import re
+
+from core.ai_translator import _JsonObjectStreamParser, _NumberedStreamParser
+
+_ZH = {"하나": "一", "둘": "二", "셋": "三"}
+
+
+def _make_translator(monkeypatch, script):
+    """script: list of per-call behaviours; each is (chunks, error_or_None)."""
+    monkeypatch.setenv("AI_PROVIDER", "ppio")
+    monkeypatch.setenv("PPIO_API_KEY", "dummy")
+    monkeypatch.setenv("AI_TRANSLATE_STREAM", "1")
+    monkeypatch.setenv("AI_TRANSLATE_ASYNC_CLIENT", "1")
+    from core.ai_translator import AITranslator
+
+    translator = AITranslator(model="glm-4-flash-250414", source_lang="ko", target_lang="zh")
+    prompts = []
+
+    async def fake_stream(prompt, max_tokens, on_text):
+        prompts.append(re.findall(r"^\d+\. ([가-힣]+)$", prompt, flags=re.M))
+        chunks, error = script[len(prompts) - 1]
+        if chunks is None:
+            items = prompts[-1]
+            chunks = ["\n".join(f"{i + 1}. {_ZH[t]}" for i, t in enumerate(items))]
+        for chunk in chunks:
+            on_text(chunk)
+            await asyncio.sleep(0)
+        if error is not None:
+            raise error
+        return "".join(chunks)
+
+    translator._call_api_stream = fake_stream
+    return translator, prompts
+
+
+def test_stream_parser_emits_completed_lines_only():
+    parser = _NumberedStreamParser(3)
+    assert parser.feed("1. 你") == []
+    assert parser.feed("好\n2) 再见\n3") == [(1, "你好"), (2, "再见")]
+    assert parser.feed(". 谢谢") == []
+    assert parser.close() == [(3, "谢谢")]
+
+
+def test_json_stream_parser_emits_closed_objects_in_order():
+    parser = _JsonObjectStreamParser(2)
+    assert parser.feed('[{"top": "上}') == []
+    assert parser.feed('", "bottom": "{下"}, {"top"') == [(1, '{"top": "上}", "bottom": "{下"}')]
+    assert parser.feed(': "甲", "bottom": "乙"}]') == [(2, '{"top": "甲", "bottom": "乙"}')]
+    assert parser.close() == []
+
+
+def test_truncated_stream_retries_only_missing_items(monkeypatch):
+    translator, prompts = _make_translator(
+        monkeypatch,
+        [(["1. 一\n2. ", "二\n"], None), (None, None)],
+    )
+    seen = []
+
+    result = asyncio.run(
+        translator.translate_batch(
+            ["하나", "둘", "셋"], on_item=lambda idx, text: seen.append((idx, text))
+        )
+    )
+
+    assert result == ["一", "二", "三"]
+    assert prompts == [["하나", "둘", "셋"], ["셋"]]
+    assert seen == [(0, "一"), (1, "二"), (2, "三")]
+    assert translator.last_metrics["stream_items"] == 3
+    assert translator.last_metrics["missing_number_retries"] == 1
+
+
+def test_interrupted_stream_keeps_finished_items(monkeypatch):
+    translator, prompts = _make_translator(
+        monkeypatch,
+        [(["1. 一\n", "2. 二\n3. "], RuntimeError("connection reset")), (None, None)],
+    )
+
+    result = asyncio.run(translator.translate_batch(["하나", "둘", "셋"]))
+
+    assert result == ["一", "二", "三"]
+    assert prompts[1] == ["셋"]
+
+
+class _StreamingFakeAI:
+    model = "fake"
+
+    def __init__(self, regions, fail_first=False):
+        self.regions = regions
+        self.fail_first = fail_first
+        self.seen = []
+
+    async def translate_batch(self, texts, output_format="numbered", contexts=None, on_item=None):
+        self.seen.append([r.target_text for r in self.regions])
+        if on_item is not None:
+            for i, text in enumerate(texts):
+                on_item(i, f"早:{text}")
+            self.seen.append([r.target_text for r in self.regions])
+            if self.fail_first:
+                raise TypeError("on_item not supported downstream")
+        return [f"译:{t}" for t in texts]
+
+
+def _stream_regions():
+    from core.models import Box2D, RegionData
+
+    return [
+        RegionData(box_2d=Box2D(x1=0, y1=y, x2=100, y2=y + 40), source_text=text, confidence=0.9)
+        for y, text in ((0, "HELLO"), (400, "WORLD"))
+    ]
+
+
+def test_stream_items_fill_owning_regions_before_final_parse(monkeypatch):
+    from core.models import TaskContext
+    from core.modules.translator import TranslatorModule
+
+    monkeypatch.setenv("AI_TRANSLATE_STREAM", "1")
+    module = TranslatorModule(source_lang="en", target_lang="en", use_ai=True)
+    regions = _stream_regions()
+    fake = _StreamingFakeAI(regions)
+    monkeypatch.setattr(module, "_get_ai_translator", lambda: fake)
+
+    ctx = asyncio.run(module.process(TaskContext(image_path="/tmp/input.png", regions=regions)))
+
+    assert fake.seen[-1] == ["早:HELLO", "早:WORLD"]
+    assert [r.target_text for r in ctx.regions] == ["译:HELLO", "译:WORLD"]
+    assert module.last_metrics["stream_items"] == 2
+
+
+def test_stream_fill_is_dropped_before_retry(monkeypatch):
+    from core.models import TaskContext
+    from core.modules.translator import TranslatorModule
+
+    monkeypatch.setenv("AI_TRANSLATE_STREAM", "1")
+    module = TranslatorModule(source_lang="en", target_lang="en", use_ai=True)
+    regions = _stream_regions()
+    fake = _StreamingFakeAI(regions, fail_first=True)
+    monkeypatch.setattr(module, "_get_ai_translator", lambda: fake)
+
+    ctx = asyncio.run(module.process(TaskContext(image_path="/tmp/input.png", regions=regions)))
+
+    # 第一次调用的提前填充在重试前撤回，不会残留到重试期间
+    assert fake.seen[1] == ["早:HELLO", "早:WORLD"]
+    assert not any(fake.seen[2])
+    assert [r.target_text for r in ctx.regions] == ["译:HELLO", "译:WORLD"]
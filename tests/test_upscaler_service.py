@@ -0,0 +1,129 @@
+import asyncio
+import sys
+import types
+
+import cv2
+import numpy as np
+import pytest
+
+from core.image_buffer import get_image_buffer_store
+from core.model_setup import ModelRegistry, ModelWarmupService
+from core.models import TaskContext
+from core.modules import upscaler
+from core.modules.upscaler import UpscaleModule
+
+
+@pytest.fixture
+def fake_realesrgan(monkeypatch, tmp_path):
+    created = []
+
+    class _DummyRRDBNet:
+        def __init__(self, *args, **kwargs):
+            pass
+
+    class _DummyESRGANer:
+        def __init__(self, *args, **kwargs):
+            created.append(kwargs)
+            self.inputs = []
+
+        def enhance(self, image, outscale=2):
+            self.inputs.append(image)
+            h, w = image.shape[:2]
+            return np.zeros((h * outscale, w * outscale, 3), dtype=np.uint8), None
+
+    torch = types.ModuleType("torch")
+    torch.backends = types.SimpleNamespace(mps=types.SimpleNamespace(is_available=lambda: False))
+    torch.device = lambda name: name
+    rrdb = types.ModuleType("basicsr.archs.rrdbnet_arch")
+    rrdb.RRDBNet = _DummyRRDBNet
+    realesrgan = types.ModuleType("realesrgan")
+    realesrgan.RealESRGANer = _DummyESRGANer
+    monkeypatch.setitem(sys.modules, "torch", torch)
+    monkeypatch.setitem(sys.modules, "basicsr", types.ModuleType("basicsr"))
+    monkeypatch.setitem(sys.modules, "basicsr.archs", types.ModuleType("basicsr.archs"))
+    monkeypatch.setitem(sys.modules, "basicsr.archs.rrdbnet_arch", rrdb)
+    monkeypatch.setitem(sys.modules, "realesrgan", realesrgan)
+    monkeypatch.setattr(upscaler, "_service", None)
+    monkeypatch.setattr(upscaler, "_service_key", None)
+
+    model_path = tmp_path / "RealESRGAN_x4plus.pth"
+    model_path.write_text("pth")
+    monkeypatch.setenv("UPSCALE_ENABLE", "1")
+    monkeypatch.setenv("UPSCALE_BACKEND", "pytorch")
+    monkeypatch.setenv("UPSCALE_DEVICE", "cpu")
+    monkeypatch.setenv("UPSCALE_SCALE", "2")
+    monkeypatch.setenv("UPSCALE_MODEL_PATH", str(model_path))
+    return created
+
+
+def _page(tmp_path, name):
+    path = tmp_path / f"{name}.png"
+    cv2.imwrite(str(path), np.full((8, 6, 3), 255, dtype=np.uint8))
+    return TaskContext(image_path=str(path), output_path=str(path))
+
+
+def test_model_loads_once_across_pages(fake_realesrgan, tmp_path):
+    module = UpscaleModule()
+
+    first = asyncio.run(module.process(_page(tmp_path, "p1")))
+    assert module.last_metrics["model_cold_start"] is True
+    second = asyncio.run(module.process(_page(tmp_path, "p2")))
+
+    assert len(fake_realesrgan) == 1
+    assert module.last_metrics["model_cold_start"] is False
+    assert module.last_metrics["model_load_ms"] == 0.0
+    scale = module.last_metrics["scale"]
+    assert cv2.imread(first.output_path).shape[:2] == (8 * scale, 6 * scale)
+    assert cv2.imread(second.output_path).shape[:2] == (8 * scale, 6 * scale)
+
+
+def test_upscaler_uses_rendered_array_from_buffer(fake_realesrgan, tmp_path, monkeypatch):
+    ctx = _page(tmp_path, "p1")
+    rendered = np.full((10, 4, 3), 7, dtype=np.uint8)
+    buffer = get_image_buffer_store().acquire(ctx.task_id, ctx.image_path)
+    buffer.rendered = rendered
+    buffer.rendered_path = ctx.output_path
+
+    def _no_read(*args, **kwargs):
+        raise AssertionError("rendered page should come from the buffer")
+
+    monkeypatch.setattr(cv2, "imread", _no_read)
+    try:
+        asyncio.run(UpscaleModule().process(ctx))
+        service = upscaler._service
+        assert service.calls == 1
+        assert service._upsampler.inputs[0] is rendered
+        assert buffer.rendered is None
+    finally:
+        get_image_buffer_store().release(ctx.task_id)
+
+
+@pytest.mark.asyncio
+async def test_warmup_preloads_upscaler(fake_realesrgan, monkeypatch):
+    async def fake_get_cached_ocr(lang="en"):
+        return object()
+
+    monkeypatch.setattr("core.model_setup.get_cached_ocr", fake_get_cached_ocr)
+    monkeypatch.setattr("core.model_setup.create_inpainter", lambda **kwargs: object())
+    registry = ModelRegistry()
+
+    await ModelWarmupService(registry).warmup()
+
+    assert registry.snapshot()["upscaler"]["status"] == "ready"
+    assert upscaler._service.loaded
+    assert len(fake_realesrgan) == 1
+
+
+@pytest.mark.asyncio
+async def test_warmup_skips_upscaler_when_disabled(monkeypatch):
+    async def fake_get_cached_ocr(lang="en"):
+        return object()
+
+    monkeypatch.setenv("UPSCALE_ENABLE", "0")
+    monkeypatch.setattr("core.model_setup.get_cached_ocr", fake_get_cached_ocr)
+    monkeypatch.setattr("core.model_setup.create_inpainter", lambda **kwargs: object())
+    registry = ModelRegistry()
+
+    await ModelWarmupService(registry).warmup()
+
+    assert registry.snapshot()["upscaler"]["status"] == "missing"